@@ -0,0 +1,54 @@
+"""
+耕地分析包（gengdi）
+只是仓库根目录各模块之上的一层导入门面（facade），本身不包含任何实现，按用途把名称分组重新导出:
+
+    gengdi.engine   分析引擎、运行配置、执行配置
+    gengdi.io       有效数据索引、窗口结果缓存、内存预算、任务清单和掩码读写
+    gengdi.crs      坐标系检查、转换和跨坐标系掩码裁剪
+    gengdi.color    颜色规则识别、参数扫描、变化先验、分块形态学
+    gengdi.model    U-Net模型、训练数据流水线和样本分片
+    gengdi.eval     面积核算、地块统计、评估指标、回归和基准测试
+
+所有实现仍是仓库根目录下的平铺模块（耕地分析系统.py、耕地识别模型训练(16).py 等），核心脚本之间也仍直接
+导入这些平铺模块；只有带编号的副本入口通过本包调用。本包依赖把仓库根目录加入 sys.path，不能脱离仓库单独安装。
+子模块在首次访问某个名称时才导入对应的实现模块，之后由 sys.modules 缓存，例如 import gengdi.eval 不会连带导入TensorFlow
+
+用法:
+    from gengdi.engine import 耕地分析系统, 运行配置
+    from gengdi.color import 颜色直方图, 扫描, 引擎规则
+"""
+
+import os
+import sys
+import importlib
+
+# 实现模块位于包的上一级目录（仓库根目录）
+_根目录 = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _根目录 not in sys.path:
+    sys.path.insert(0, _根目录)
+
+__all__ = ['engine', 'io', 'crs', 'color', 'model', 'eval']
+
+
+def _懒加载(导出表: dict, 命名空间: dict):
+    """
+    为子模块生成模块级 __getattr__ / __dir__：按导出表在首次访问时导入实现
+
+    参数:
+        导出表: {导出名称: (实现模块名, 属性名)}，属性名为None时导出模块本身
+        命名空间: 子模块的 globals()（导入后写回，之后的访问不再经过 __getattr__）
+    """
+    def __getattr__(名称):
+        if 名称 not in 导出表:
+            raise AttributeError(f"module {命名空间['__name__']!r} has no attribute {名称!r}")
+        模块名, 属性 = 导出表[名称]
+        值 = importlib.import_module(模块名)
+        if 属性 is not None:
+            值 = getattr(值, 属性)
+        命名空间[名称] = 值
+        return 值
+
+    def __dir__():
+        return sorted(set(命名空间) | set(导出表))
+
+    return __getattr__, __dir__
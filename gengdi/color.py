@@ -0,0 +1,29 @@
+"""
+颜色识别: 颜色规则、参数扫描、高精度/改进颜色识别、两期变化先验、分块形态学
+（实现见 参数扫描.py、改进的颜色识别.py、高精度颜色识别.py、变化先验.py、分块形态学.py）
+"""
+
+from gengdi import _懒加载
+
+_导出 = {
+    '颜色直方图': ('参数扫描', '颜色直方图'),
+    '扫描': ('参数扫描', '扫描'),
+    '参数网格': ('参数扫描', '参数网格'),
+    '曲面': ('参数扫描', '曲面'),
+    '最佳参数': ('参数扫描', '最佳参数'),
+    '引擎规则': ('参数扫描', '引擎规则'),
+    '绿棕规则': ('参数扫描', '绿棕规则'),
+    '严格程度规则': ('参数扫描', '严格程度规则'),
+    '改进的颜色识别': ('改进的颜色识别', '改进的颜色识别'),
+    '计算最优严格程度': ('改进的颜色识别', '计算最优严格程度'),
+    '高精度颜色识别器': ('高精度颜色识别', '高精度颜色识别器'),
+    '计算块变化': ('变化先验', '计算块变化'),
+    '窗口有变化': ('变化先验', '窗口有变化'),
+    '窗口变化掩码': ('变化先验', '窗口变化掩码'),
+    '分块形态学': ('分块形态学', '分块形态学'),
+    '分块大津二值化': ('分块形态学', '分块大津二值化'),
+    '直方图累加器': ('分块形态学', '直方图累加器'),
+}
+
+__all__ = list(_导出)
+__getattr__, __dir__ = _懒加载(_导出, globals())
@@ -0,0 +1,23 @@
+"""
+坐标系: 坐标系检查与转换、基准地图到当前影像坐标系的掩码裁剪
+（实现见 坐标系处理模块.py、智能坐标匹配器.py、修复坐标系差异.py、坐标系统修复.py、转换图像坐标系.py）
+"""
+
+from gengdi import _懒加载
+
+_导出 = {
+    '坐标系处理器': ('坐标系处理模块', '坐标系处理器'),
+    '预处理图像坐标系': ('坐标系处理模块', '预处理图像坐标系'),
+    '批量转换坐标系目录': ('坐标系处理模块', '批量转换坐标系目录'),
+    '智能坐标匹配器': ('智能坐标匹配器', '智能坐标匹配器'),
+    '创建带坐标系的去年掩码': ('修复坐标系差异', '创建带坐标系的去年掩码'),
+    '创建带坐标系的去年掩码_优化版': ('智能坐标匹配器', '创建带坐标系的去年掩码_优化版'),
+    '检查并转换坐标系': ('坐标系统修复', '检查并转换坐标系'),
+    '统一坐标系到基准数据': ('坐标系统修复', '统一坐标系到基准数据'),
+    '验证两个文件的对齐情况': ('坐标系统修复', '验证两个文件的对齐情况'),
+    '转换单个文件': ('转换图像坐标系', '转换单个文件'),
+    '等积坐标系': ('面积核算', '等积坐标系'),
+}
+
+__all__ = list(_导出)
+__getattr__, __dir__ = _懒加载(_导出, globals())
@@ -0,0 +1,22 @@
+"""
+分析引擎: 耕地分析系统、运行配置、执行配置（实现见 耕地分析系统.py、运行配置.py、执行配置.py）
+"""
+
+from gengdi import _懒加载
+
+_导出 = {
+    '耕地分析系统': ('耕地分析系统', '耕地分析系统'),
+    '默认配置': ('耕地分析系统', '默认配置'),
+    '主程序': ('耕地分析系统', '主程序'),
+    '命令行入口': ('耕地分析系统', '命令行入口'),
+    '运行配置': ('运行配置', '运行配置'),
+    '加载配置': ('运行配置', '加载配置'),
+    '应用执行配置': ('执行配置', '应用执行配置'),
+    '解析执行配置': ('执行配置', '解析执行配置'),
+    '批量运行': ('批量分析', '批量运行'),
+    '编排运行': ('异步编排', '编排运行'),
+    '性能剖析': ('性能剖析', None),
+}
+
+__all__ = list(_导出)
+__getattr__, __dir__ = _懒加载(_导出, globals())
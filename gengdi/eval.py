@@ -0,0 +1,24 @@
+"""
+评估: 面积核算、地块统计、变化评价指标、回归和基准测试
+（实现见 面积核算.py、地块统计.py、评估模块.py、耕地变化评价指标.py、回归测试.py、基准测试套件.py）
+"""
+
+from gengdi import _懒加载
+
+_导出 = {
+    '行像元面积': ('面积核算', '行像元面积'),
+    '掩码面积': ('面积核算', '掩码面积'),
+    '矢量面积核算': ('面积核算', '矢量面积核算'),
+    '面积对比': ('面积核算', '面积对比'),
+    '地块统计表': ('地块统计', '地块统计表'),
+    '地块分区统计': ('地块统计', '地块分区统计'),
+    '耕地评估器': ('评估模块', '耕地评估器'),
+    '耕地变化评估器': ('耕地变化评价指标', '耕地变化评估器'),
+    '掩码对比': ('回归测试', '掩码对比'),
+    '运行回归': ('回归测试', '运行回归'),
+    '运行基准': ('基准测试套件', '运行基准'),
+    '生成合成影像': ('基准测试套件', '生成合成影像'),
+}
+
+__all__ = list(_导出)
+__getattr__, __dir__ = _懒加载(_导出, globals())
@@ -0,0 +1,22 @@
+"""
+数据读写: 有效数据索引、窗口结果缓存、内存预算、任务清单和掩码读写
+（实现见 有效数据索引.py、结果缓存.py、内存预算.py、批量分析.py）
+"""
+
+from gengdi import _懒加载
+
+_导出 = {
+    '有效数据索引': ('有效数据索引', '有效数据索引'),
+    '获取有效数据索引': ('有效数据索引', '获取有效数据索引'),
+    '结果缓存': ('结果缓存', '结果缓存'),
+    '内存预算': ('内存预算', '内存预算'),
+    '内存不足错误': ('内存预算', '内存不足错误'),
+    '当前RSS': ('内存预算', '当前RSS'),
+    '峰值RSS': ('内存预算', '峰值RSS'),
+    '读取任务清单': ('批量分析', '读取任务清单'),
+    '对齐掩码': ('批量分析', '对齐掩码'),
+    '保存掩码': ('批量分析', '保存掩码'),
+}
+
+__all__ = list(_导出)
+__getattr__, __dir__ = _懒加载(_导出, globals())
@@ -0,0 +1,32 @@
+"""
+模型训练: U-Net模型、训练数据流水线、样本分片
+（实现见 耕地识别模型训练(16).py、训练数据流水线.py、训练样本分片.py、并行样本提取.py）
+
+训练脚本 为训练实现模块本身，其配置区域（训练图像目录、批次大小等）可通过 命令行入口(**覆盖) 或 应用运行配置() 修改
+"""
+
+from gengdi import _懒加载
+
+_训练 = '耕地识别模型训练(16)'
+
+_导出 = {
+    '训练脚本': (_训练, None),
+    '构建UNet模型': (_训练, '构建UNet模型'),
+    'dice_coefficient': (_训练, 'dice_coefficient'),
+    '从TIF和Shapefile生成训练数据': (_训练, '从TIF和Shapefile生成训练数据'),
+    '更新基准耕地地图': (_训练, '更新基准耕地地图'),
+    '训练模型': (_训练, '训练模型'),
+    '应用运行配置': (_训练, '应用运行配置'),
+    '命令行入口': (_训练, '命令行入口'),
+    '样本源': ('训练数据流水线', '样本源'),
+    '创建样本源列表': ('训练数据流水线', '创建样本源列表'),
+    '构建流式数据集': ('训练数据流水线', '构建流式数据集'),
+    '分层采样器': ('训练数据流水线', '分层采样器'),
+    '分片写入器': ('训练样本分片', '分片写入器'),
+    '导出样本分片': ('训练样本分片', '导出样本分片'),
+    '构建分片数据集': ('训练样本分片', '构建分片数据集'),
+    '并行导出样本分片': ('并行样本提取', '并行导出样本分片'),
+}
+
+__all__ = list(_导出)
+__getattr__, __dir__ = _懒加载(_导出, globals())
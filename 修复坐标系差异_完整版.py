@@ -3,30 +3,8 @@
 一次性解决所有问题
 """
 
-import os
-import numpy as np
-import rasterio
-from rasterio.warp import reproject, calculate_default_transform, transform_bounds
-from rasterio.transform import Affine
-import tempfile
-import shutil
-
-
-def 创建带坐标系的去年掩码(基准信息, 今年左上角, 今年右下角, 今年crs, 今年meta):
-    """
-    创建去年掩码，确保坐标系与今年图像一致
-    """
-    print("\n🔄 创建带坐标系的去年掩码...")
-
-    # 1. 使用现有的裁剪逻辑（已经在主函数中完成）
-    # 不需要重复裁剪，直接使用已经裁剪好的数据
-
-    # 2. 从基准信息获取裁剪后的数据
-    # 注意：主函数已经裁剪了数据，我们直接使用它
-    # 这里需要从外部传入裁剪后的数据
-
-    # 由于这个方法被调用的时机问题，我们需要一个更简单的解决方案
-    return None  # 暂时返回None，让主函数使用原始数据
+# 去年掩码的坐标系转换实现见 修复坐标系差异.py（gengdi.crs），这里只保留集成方案说明
+from gengdi.crs import 创建带坐标系的去年掩码
 
 
 def 简单坐标系转换方案():
@@ -0,0 +1,377 @@
+"""
+内存预算模块
+1. 进程内存：当前/峰值RSS（优先psutil，否则读取 /proc、resource，Windows下调用 GetProcessMemoryInfo /
+   GlobalMemoryStatusEx）；都无法获取时不做自动预算并打印警告
+2. 大块分配登记：整幅数组通过 分配数组() 创建，记录各数组的大小、在用总量和高水位
+3. 预算规划：根据预算选择降采样读取尺寸、分块处理的块尺寸，以及整幅掩码放在内存还是磁盘(np.memmap)
+4. 超出预算时在分配之前抛出 内存不足错误，附带预算报告，而不是运行到一半被系统OOM终止
+
+预算来源（优先级从高到低）: 参数 > 环境变量 GENGDI_MEMORY_BUDGET_MB > 可用物理内存的80%
+"""
+
+import os
+import sys
+import json
+import uuid
+import numpy as np
+from typing import Dict, Optional, Tuple
+
+环境变量 = "GENGDI_MEMORY_BUDGET_MB"
+默认可用比例 = 0.8
+MB = 1024 * 1024
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+
+# ==================== 进程内存 ====================
+
+def _windows进程内存() -> Optional[Tuple[int, int]]:
+    """Windows下没有psutil时通过 GetProcessMemoryInfo 读取 (当前工作集, 峰值工作集)，失败时返回None"""
+    if sys.platform != 'win32':
+        return None
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class 进程内存计数(ctypes.Structure):  # PROCESS_MEMORY_COUNTERS
+            _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                        ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                        ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                        ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+
+        kernel32, psapi = ctypes.WinDLL('kernel32'), ctypes.WinDLL('psapi')
+        kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+        psapi.GetProcessMemoryInfo.argtypes = [wintypes.HANDLE, ctypes.POINTER(进程内存计数), wintypes.DWORD]
+        计数 = 进程内存计数()
+        计数.cb = ctypes.sizeof(计数)
+        if not psapi.GetProcessMemoryInfo(kernel32.GetCurrentProcess(), ctypes.byref(计数), 计数.cb):
+            return None
+        return int(计数.WorkingSetSize), int(计数.PeakWorkingSetSize)
+    except (ImportError, OSError, AttributeError):
+        return None
+
+
+def _windows可用内存() -> Optional[int]:
+    """Windows下没有psutil时通过 GlobalMemoryStatusEx 读取可用物理内存，失败时返回None"""
+    if sys.platform != 'win32':
+        return None
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class 内存状态(ctypes.Structure):  # MEMORYSTATUSEX
+            _fields_ = [('dwLength', wintypes.DWORD), ('dwMemoryLoad', wintypes.DWORD),
+                        ('ullTotalPhys', ctypes.c_ulonglong), ('ullAvailPhys', ctypes.c_ulonglong),
+                        ('ullTotalPageFile', ctypes.c_ulonglong), ('ullAvailPageFile', ctypes.c_ulonglong),
+                        ('ullTotalVirtual', ctypes.c_ulonglong), ('ullAvailVirtual', ctypes.c_ulonglong),
+                        ('ullAvailExtendedVirtual', ctypes.c_ulonglong)]
+
+        状态 = 内存状态()
+        状态.dwLength = ctypes.sizeof(状态)
+        if not ctypes.WinDLL('kernel32').GlobalMemoryStatusEx(ctypes.byref(状态)):
+            return None
+        return int(状态.ullAvailPhys)
+    except (ImportError, OSError, AttributeError):
+        return None
+
+
+def _读取proc状态(字段: str) -> Optional[int]:
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for 行 in f:
+                if 行.startswith(字段 + ':'):
+                    return int(行.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def 当前RSS() -> int:
+    """当前进程常驻内存（字节）"""
+    if PSUTIL_AVAILABLE:
+        return psutil.Process().memory_info().rss
+    值 = _读取proc状态('VmRSS')
+    if 值 is None:
+        windows = _windows进程内存()
+        值 = windows[0] if windows else None
+    return 值 if 值 is not None else 峰值RSS()
+
+
+def 峰值RSS() -> int:
+    """进程启动以来的峰值常驻内存（字节）"""
+    值 = _读取proc状态('VmHWM')
+    if 值 is not None:
+        return 值
+    if PSUTIL_AVAILABLE:
+        信息 = psutil.Process().memory_info()
+        return getattr(信息, 'peak_wset', 信息.rss)  # Windows下为峰值工作集
+    windows = _windows进程内存()
+    if windows:
+        return windows[1]
+    try:
+        import resource
+        峰值 = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return 峰值 if sys.platform == 'darwin' else 峰值 * 1024
+    except ImportError:
+        return 0
+
+
+def 可用内存() -> Optional[int]:
+    """系统可用物理内存（字节），无法获取时返回None"""
+    if PSUTIL_AVAILABLE:
+        return psutil.virtual_memory().available
+    try:
+        with open('/proc/meminfo', 'r') as f:
+            for 行 in f:
+                if 行.startswith('MemAvailable:'):
+                    return int(行.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return _windows可用内存()
+
+
+class 内存不足错误(MemoryError):
+    """超出内存预算（报告 属性为预算报告字典）"""
+
+    def __init__(self, 消息: str, 报告: Dict):
+        super().__init__(消息)
+        self.报告 = 报告
+
+
+# ==================== 预算 ====================
+
+class 内存预算:
+    """
+    一次运行的内存预算
+
+    用法:
+        预算 = 内存预算(上限_MB, 临时目录)
+        计划 = 预算.规划(宽, 高)
+        掩码 = 预算.分配数组("耕地掩码", (高, 宽), np.float32, 磁盘=计划['掩码存储'] == '磁盘')
+        预算.检查("连通域过滤", 高 * 宽 * 4)
+    """
+
+    def __init__(self, 上限_MB: float = None, 临时目录: str = None):
+        if not 上限_MB:
+            上限_MB = float(os.environ.get(环境变量, 0) or 0)
+        if 上限_MB:
+            self.上限 = int(上限_MB * MB)
+            self.来源 = "配置"
+        else:
+            可用 = 可用内存()
+            # 自动预算：当前进程已用 + 剩余可用物理内存的80%
+            self.上限 = int(当前RSS() + 可用 * 默认可用比例) if 可用 else None
+            self.来源 = "自动" if 可用 else "未知"
+            if not 可用:
+                print(f"⚠️  无法获取系统可用内存（未安装psutil且不支持 /proc 或 Windows API），"
+                      f"内存预算不生效: 请安装psutil，或用配置 内存预算_MB / 环境变量 {环境变量} 指定预算",
+                      file=sys.stderr)
+
+        self.临时目录 = 临时目录
+        self.分配: Dict[str, Tuple[int, str]] = {}  # 名称 -> (字节, '内存'/'磁盘')
+        self.在用高水位 = 0
+        self.高水位阶段 = None
+        self.最近阶段 = None
+        self.计划: Dict = {}
+        self._临时文件 = []
+        self._清理残留()
+
+    # ---------- 登记 ----------
+
+    def 在用(self) -> int:
+        """已登记的内存中整幅数组总字节数"""
+        return sum(字节 for 字节, 位置 in self.分配.values() if 位置 == '内存')
+
+    def 登记(self, 名称: str, 数组或字节):
+        """登记一个大块分配（np.memmap 记为磁盘）"""
+        if isinstance(数组或字节, np.memmap):
+            self.分配[名称] = (数组或字节.nbytes, '磁盘')
+        else:
+            self.分配[名称] = (int(getattr(数组或字节, 'nbytes', 数组或字节)), '内存')
+        self.最近阶段 = 名称
+        在用 = self.在用()
+        if 在用 > self.在用高水位:
+            self.在用高水位 = 在用
+            self.高水位阶段 = 名称
+
+    def 释放(self, 名称: str):
+        self.分配.pop(名称, None)
+
+    def 剩余(self) -> Optional[int]:
+        return None if self.上限 is None else self.上限 - 当前RSS()
+
+    def 检查(self, 阶段: str, 需求字节: int):
+        """
+        分配之前检查预算，超出时抛出 内存不足错误
+
+        参数:
+            阶段: 阶段名（写入报告）
+            需求字节: 该阶段即将新分配的内存
+        """
+        self.最近阶段 = 阶段
+        剩余 = self.剩余()
+        if 剩余 is not None and 需求字节 > 剩余:
+            报告 = self.报告(阶段, 需求字节)
+            raise 内存不足错误(
+                f"❌ 内存预算不足: {阶段} 需要 {需求字节 / MB:.0f} MB，"
+                f"预算剩余 {max(剩余, 0) / MB:.0f} MB（预算 {self.上限 / MB:.0f} MB）", 报告)
+
+    def 分配数组(self, 名称: str, 形状: tuple, dtype, 磁盘: bool = False) -> np.ndarray:
+        """
+        分配一个置零的整幅数组并登记
+
+        参数:
+            磁盘: 为True时在临时目录创建np.memmap（只占用页缓存，不计入预算）
+        """
+        字节 = int(np.prod(形状)) * np.dtype(dtype).itemsize
+        if not 磁盘:
+            self.检查(名称, 字节)
+            数组 = np.zeros(形状, dtype=dtype)
+        else:
+            目录 = self.临时目录 or os.path.join(os.getcwd(), '.内存映射')
+            os.makedirs(目录, exist_ok=True)
+            路径 = os.path.join(目录, f"{名称}_{uuid.uuid4().hex[:8]}.dat")
+            数组 = np.memmap(路径, dtype=dtype, mode='w+', shape=形状)
+            try:
+                os.remove(路径)  # POSIX下删除后映射仍然有效，释放数组时由系统回收
+            except OSError:
+                self._临时文件.append(路径)  # Windows下映射期间不能删除，之后由 清理() 删除
+        self.登记(名称, 数组)
+        return 数组
+
+    def 清理(self):
+        """删除本次运行遗留的磁盘映射文件（仍被映射的文件跳过）"""
+        剩下 = []
+        for 路径 in self._临时文件:
+            try:
+                os.remove(路径)
+            except FileNotFoundError:
+                pass
+            except OSError:
+                剩下.append(路径)
+        self._临时文件 = 剩下
+
+    def _清理残留(self):
+        """删除之前运行遗留的映射文件"""
+        if self.临时目录 and os.path.isdir(self.临时目录):
+            for 文件 in os.listdir(self.临时目录):
+                if 文件.endswith('.dat'):
+                    try:
+                        os.remove(os.path.join(self.临时目录, 文件))
+                    except OSError:
+                        pass
+
+    # ---------- 规划 ----------
+
+    def 规划(self, 宽: int, 高: int, 最大尺寸: int = 2000, 掩码存储: str = None) -> Dict:
+        """
+        根据预算选择执行方式
+
+        整幅阶段的需求（像素数 N = 宽×高）:
+            识别: float32 掩码 4N
+            后处理: 二值化/形态学 uint8 缓冲 2N，连通域标签 int32 4N + 结果 uint8 N
+        掩码和后处理缓冲放到磁盘时，内存中只需要连通域的 5N
+
+        参数:
+            最大尺寸: 降采样读取的最大边长（期望值，预算不足时减小）
+            掩码存储: 指定 '内存' 或 '磁盘'（默认按预算自动选择）
+
+        返回:
+            {'掩码存储': '内存'/'磁盘', '块尺寸', '最大尺寸', '预计峰值_MB', '预算_MB'}
+        """
+        N = 宽 * 高
+        全内存 = 4 * N + 2 * N + 5 * N
+        磁盘模式 = 5 * N
+        剩余 = self.剩余()
+
+        if 掩码存储 is None:
+            掩码存储 = '内存' if 剩余 is None or 全内存 <= 剩余 else '磁盘'
+        elif 掩码存储 not in ('内存', '磁盘'):
+            raise ValueError(f"❌ 不支持的掩码存储方式: {掩码存储}")
+        预计 = 全内存 if 掩码存储 == '内存' else 磁盘模式
+
+        if 剩余 is not None and 预计 > 剩余:
+            报告 = self.报告("规划", 预计)
+            raise 内存不足错误(
+                f"❌ 内存预算不足: {宽}x{高} 影像（掩码存储: {掩码存储}）至少需要 {预计 / MB:.0f} MB，"
+                f"预算剩余 {max(剩余, 0) / MB:.0f} MB（预算 {self.上限 / MB:.0f} MB）", 报告)
+
+        # 分块处理的工作内存约为 块尺寸² × 16 字节（含光环的输入块和中间结果），不超过剩余预算的5%
+        块尺寸 = 4096
+        if 剩余 is not None:
+            while 块尺寸 > 512 and 块尺寸 * 块尺寸 * 16 > 0.05 * (剩余 - 预计):
+                块尺寸 //= 2
+
+        # 降采样读取的影像（float32 三波段）不超过剩余预算的10%
+        if 剩余 is not None:
+            while 最大尺寸 > 500 and 最大尺寸 * 最大尺寸 * 12 > 0.10 * (剩余 - 预计):
+                最大尺寸 = int(最大尺寸 * 0.75)
+
+        self.计划 = {
+            '掩码存储': 掩码存储,
+            '块尺寸': 块尺寸,
+            '最大尺寸': 最大尺寸,
+            '预计峰值_MB': round((当前RSS() + 预计) / MB),
+            '预算_MB': None if self.上限 is None else round(self.上限 / MB),
+        }
+        return self.计划
+
+    # ---------- 报告 ----------
+
+    def 报告(self, 失败阶段: str = None, 需求字节: int = None) -> Dict:
+        return {
+            '预算_MB': None if self.上限 is None else round(self.上限 / MB, 1),
+            '预算来源': self.来源,
+            '当前RSS_MB': round(当前RSS() / MB, 1),
+            '峰值RSS_MB': round(峰值RSS() / MB, 1),
+            '系统可用_MB': None if 可用内存() is None else round(可用内存() / MB, 1),
+            '失败阶段': 失败阶段,
+            '需求_MB': None if 需求字节 is None else round(需求字节 / MB, 1),
+            '计划': self.计划,
+            '大块分配': {名称: {'MB': round(字节 / MB, 1), '位置': 位置} for 名称, (字节, 位置) in self.分配.items()},
+            '在用高水位_MB': round(self.在用高水位 / MB, 1),
+            '高水位阶段': self.高水位阶段,
+        }
+
+    @staticmethod
+    def 报告文本(报告: Dict) -> str:
+        行 = [
+            "📊 内存预算报告",
+            f"   预算: {报告['预算_MB']} MB（{报告['预算来源']}），系统可用: {报告['系统可用_MB']} MB",
+            f"   当前RSS: {报告['当前RSS_MB']} MB，峰值RSS: {报告['峰值RSS_MB']} MB",
+        ]
+        if 报告['失败阶段']:
+            行.append(f"   ❌ 失败阶段: {报告['失败阶段']}（需要 {报告['需求_MB']} MB）")
+        if 报告['计划']:
+            行.append(f"   计划: {报告['计划']}")
+        for 名称, 项 in 报告['大块分配'].items():
+            行.append(f"   - {名称}: {项['MB']} MB（{项['位置']}）")
+        行.append(f"   整幅数组高水位: {报告['在用高水位_MB']} MB（{报告['高水位阶段']}）")
+        if 报告['失败阶段']:
+            行.append(f"   建议: 增大预算（环境变量 {环境变量}）、释放其他程序的内存，或使用快速模式")
+        return "\n".join(行)
+
+    def 保存报告(self, 报告: Dict, 路径: str):
+        os.makedirs(os.path.dirname(os.path.abspath(路径)), exist_ok=True)
+        with open(路径, 'w', encoding='utf-8') as f:
+            json.dump(报告, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    # 查看某个尺寸影像在当前预算下的执行计划：python 内存预算.py 宽 高 [预算MB]
+    if len(sys.argv) < 3:
+        print("用法: python 内存预算.py <宽> <高> [预算MB]")
+        sys.exit(1)
+
+    预算 = 内存预算(float(sys.argv[3]) if len(sys.argv) > 3 else None)
+    try:
+        print(预算.规划(int(sys.argv[1]), int(sys.argv[2])))
+    except 内存不足错误 as e:
+        print(e)
+        print(内存预算.报告文本(e.报告))
+        sys.exit(1)
@@ -0,0 +1,244 @@
+"""
+分块形态学模块
+对大幅掩码按块做开/闭/膨胀/腐蚀、高斯平滑和二值化，每块带光环(halo)读取相邻像素，
+结果与整幅图像一次性计算完全一致，内存占用只与块尺寸有关（输入输出可以是np.memmap）；
+Otsu阈值由各块累加的全局直方图计算，不需要整幅uint8副本
+"""
+
+import cv2
+import numpy as np
+from typing import Callable, Tuple
+
+默认块尺寸 = 2048
+
+
+def _核半径(核) -> Tuple[int, int]:
+    """结构元素的 (行半径, 列半径)，锚点在中心"""
+    核高, 核宽 = 核.shape[:2] if hasattr(核, 'shape') else 核
+    return 核高 // 2, 核宽 // 2
+
+
+def 分块处理(输入: np.ndarray,
+         函数: Callable[[np.ndarray], np.ndarray],
+         光环: Tuple[int, int],
+         块尺寸: int = 默认块尺寸,
+         输出: np.ndarray = None,
+         输出类型=None) -> np.ndarray:
+    """
+    按块处理二维数组
+
+    每块向四周多取 光环 个像素交给 函数，只把块本身的结果写回输出；
+    图像边缘处光环被截断，函数看到的边界与整幅处理时相同
+
+    参数:
+        输入: 二维数组（可以是np.memmap）
+        函数: 对带光环的块做处理，返回同尺寸数组
+        光环: (行光环, 列光环) 像素
+        块尺寸: 块大小（不含光环）
+        输出: 输出数组（默认新建；不能与输入是同一数组，光环为0时可以原地处理）
+        输出类型: 新建输出时的数据类型（默认与输入相同）
+
+    返回:
+        输出数组
+    """
+    高, 宽 = 输入.shape[:2]
+    if 输出 is None:
+        输出 = np.empty(输入.shape, dtype=输出类型 or 输入.dtype)
+    行光环, 列光环 = 光环
+
+    for y in range(0, 高, 块尺寸):
+        for x in range(0, 宽, 块尺寸):
+            y0, x0 = max(0, y - 行光环), max(0, x - 列光环)
+            y1, x1 = min(高, y + 块尺寸 + 行光环), min(宽, x + 块尺寸 + 列光环)
+            结果 = 函数(np.ascontiguousarray(输入[y0:y1, x0:x1]))
+            块高, 块宽 = min(块尺寸, 高 - y), min(块尺寸, 宽 - x)
+            输出[y:y + 块高, x:x + 块宽] = 结果[y - y0:y - y0 + 块高, x - x0:x - x0 + 块宽]
+
+    return 输出
+
+
+def 分块形态学(掩码: np.ndarray,
+          操作: str,
+          核: np.ndarray,
+          迭代次数: int = 1,
+          块尺寸: int = 默认块尺寸,
+          输出: np.ndarray = None) -> np.ndarray:
+    """
+    分块形态学运算，结果与 cv2.dilate / cv2.erode / cv2.morphologyEx 整幅计算相同
+
+    参数:
+        掩码: uint8二维掩码
+        操作: "膨胀" / "腐蚀" / "开" / "闭"
+        核: 结构元素
+        迭代次数: 迭代次数
+        块尺寸: 块大小
+        输出: 输出数组（默认新建）
+
+    返回:
+        结果掩码
+    """
+    行半径, 列半径 = _核半径(核)
+
+    if 操作 == "膨胀":
+        函数 = lambda 块: cv2.dilate(块, 核, iterations=迭代次数)
+        倍数 = 1
+    elif 操作 == "腐蚀":
+        函数 = lambda 块: cv2.erode(块, 核, iterations=迭代次数)
+        倍数 = 1
+    elif 操作 == "开":
+        函数 = lambda 块: cv2.morphologyEx(块, cv2.MORPH_OPEN, 核, iterations=迭代次数)
+        倍数 = 2  # 腐蚀+膨胀，光环为两倍半径
+    elif 操作 == "闭":
+        函数 = lambda 块: cv2.morphologyEx(块, cv2.MORPH_CLOSE, 核, iterations=迭代次数)
+        倍数 = 2
+    else:
+        raise ValueError(f"❌ 不支持的形态学操作: {操作}")
+
+    光环 = (行半径 * 倍数 * 迭代次数, 列半径 * 倍数 * 迭代次数)
+    return 分块处理(掩码, 函数, 光环, 块尺寸, 输出)
+
+
+def 分块高斯平滑(数组: np.ndarray, 核尺寸: int, sigma: float,
+           块尺寸: int = 默认块尺寸, 输出: np.ndarray = None, 输出类型=None) -> np.ndarray:
+    """
+    分块 cv2.GaussianBlur（光环为核半径），结果与cv2对整幅同类型输入的结果一致
+
+    输出类型（或 输出 的类型）与输入不同时每块先转换再平滑，
+    例如uint8掩码平滑为float32时不生成整幅浮点副本
+    """
+    半径 = 核尺寸 // 2
+    输出类型 = 输出.dtype if 输出 is not None else (输出类型 or 数组.dtype)
+    return 分块处理(
+        数组,
+        lambda 块: cv2.GaussianBlur(块.astype(输出类型, copy=False), (核尺寸, 核尺寸), sigma),
+        (半径, 半径),
+        块尺寸,
+        输出,
+        输出类型
+    )
+
+
+def 量化为uint8(数组: np.ndarray) -> np.ndarray:
+    """与 (数组 * 255).astype(np.uint8) 相同的量化（0-1浮点 -> 0-255）"""
+    if 数组.dtype == np.uint8:
+        return 数组
+    return (数组 * 255).astype(np.uint8)
+
+
+def 分块直方图(数组: np.ndarray, 块尺寸: int = 默认块尺寸) -> np.ndarray:
+    """
+    按块累加256级直方图（0-1浮点按 *255 截断量化，uint8直接统计）
+
+    返回:
+        长度256的int64计数
+    """
+    直方图 = np.zeros(256, dtype=np.int64)
+    for y in range(0, 数组.shape[0], 块尺寸):
+        直方图 += np.bincount(量化为uint8(数组[y:y + 块尺寸]).ravel(), minlength=256)
+    return 直方图
+
+
+class 直方图累加器:
+    """
+    逐行带累加256级直方图，用于边预测边统计Otsu阈值
+
+    滑动窗口按行优先顺序以取最大值合并时，新一行窗口起始行之上的像素不会再被修改，
+    每开始一行窗口就把已确定的行带计入直方图；预测结束后直接得到全局阈值，
+    不需要再遍历整幅掩码或生成uint8副本
+
+    用法:
+        累加器 = 直方图累加器()
+        for 每行窗口:
+            累加器.完成到行(掩码, 该行窗口的起始行)
+            ...
+        阈值 = 累加器.完成(掩码)
+    """
+
+    def __init__(self, 块尺寸: int = 默认块尺寸):
+        self.块尺寸 = 块尺寸
+        self.直方图 = np.zeros(256, dtype=np.int64)
+        self.已统计行 = 0
+
+    def 完成到行(self, 数组: np.ndarray, 行: int):
+        """把 [已统计行, 行) 的像素计入直方图（这些行之后不得再修改）"""
+        行 = min(行, 数组.shape[0])
+        if 行 > self.已统计行:
+            self.直方图 += 分块直方图(数组[self.已统计行:行], self.块尺寸)
+            self.已统计行 = 行
+
+    def 完成(self, 数组: np.ndarray) -> int:
+        """
+        统计剩余的行
+
+        返回:
+            Otsu阈值(0-255)
+        """
+        self.完成到行(数组, 数组.shape[0])
+        return self.阈值()
+
+    def 阈值(self) -> int:
+        return 大津阈值(self.直方图)
+
+
+def 大津阈值(直方图: np.ndarray) -> int:
+    """
+    由256级直方图计算Otsu阈值（与cv2.THRESH_OTSU相同：取类间方差最大的第一个灰度级，
+    二值化时大于该值为前景）
+
+    返回:
+        阈值(0-255)
+    """
+    总数 = 直方图.sum()
+    if 总数 == 0:
+        return 0
+
+    p = 直方图.astype(np.float64) / 总数
+    灰度 = np.arange(256, dtype=np.float64)
+    q1 = np.cumsum(p)
+    q2 = 1.0 - q1
+    累计均值 = np.cumsum(p * 灰度)
+    总均值 = 累计均值[-1]
+
+    eps = np.finfo(np.float32).eps
+    有效 = (np.minimum(q1, q2) >= eps) & (np.maximum(q1, q2) <= 1.0 - eps)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mu1 = 累计均值 / q1
+        mu2 = (总均值 - 累计均值) / q2
+        类间方差 = np.where(有效, q1 * q2 * (mu1 - mu2) ** 2, -1.0)
+
+    if not np.any(有效):
+        return 0
+    return int(np.argmax(类间方差))
+
+
+def 分块二值化(数组: np.ndarray, 阈值: float, 块尺寸: int = 默认块尺寸,
+          前景值: int = 1, 输出: np.ndarray = None) -> np.ndarray:
+    """
+    分块二值化: 数组 > 阈值 为前景，输出uint8
+
+    参数:
+        数组: 二维数组
+        阈值: 与数组同量纲的阈值
+        前景值: 前景像素值（1 或 255）
+    """
+    if 输出 is None:
+        输出 = np.empty(数组.shape, dtype=np.uint8)
+    for y in range(0, 数组.shape[0], 块尺寸):
+        np.multiply(数组[y:y + 块尺寸] > 阈值, 前景值, out=输出[y:y + 块尺寸], casting='unsafe')
+    return 输出
+
+
+def 分块大津二值化(数组: np.ndarray, 块尺寸: int = 默认块尺寸, 前景值: int = 1,
+            输出: np.ndarray = None) -> Tuple[float, np.ndarray]:
+    """
+    全局Otsu二值化（直方图分块累加，二值化分块写出）
+
+    阈值与 cv2.threshold((数组*255).astype(np.uint8), 0, 255, THRESH_BINARY+THRESH_OTSU) 相同，
+    二值化在原始数值上进行: 数组 > 阈值/255
+
+    返回:
+        (0-1量纲的阈值, uint8掩码)
+    """
+    阈值 = 大津阈值(分块直方图(数组, 块尺寸))
+    原始阈值 = 阈值 if 数组.dtype == np.uint8 else 阈值 / 255.0
+    return 阈值 / 255.0, 分块二值化(数组, 原始阈值, 块尺寸, 前景值, 输出)
@@ -0,0 +1,273 @@
+"""
+本地HTTP分析服务
+把 耕地分析系统 放在内部接口后面：作业提交后进入进程池排队，工作进程启动时导入引擎并加载模型，
+之后所有作业复用（有效数据索引在进程内复用；窗口结果缓存在磁盘上，多个工作进程共用一个缓存库，
+见 结果缓存.py），单个请求不再承担导入和加载模型的开销；只依赖标准库，可完全在本机测试
+
+用法:
+    python 分析服务.py 输出目录 [--端口 8765] [--进程数 1] [--模型 模型.h5] [--配置 配置.yaml]
+
+接口:
+    GET  /health                       服务状态
+    POST /jobs                         提交作业 {"去年": "...tif", "今年": "...tif", "shapefile": "...shp"(可选),
+                                                 "去年掩码": "...tif"(可选)}
+                                       去年影像的种子耕地见 批量分析.去年种子掩码，没有种子时作业失败
+    GET  /jobs                         作业列表
+    GET  /jobs/<作业ID>                作业状态和结果汇总
+    GET  /jobs/<作业ID>/files/<文件名>  下载结果文件（掩码、变化地块、地块统计、summary.json 等）
+
+服务关闭后或工作进程池损坏时提交作业返回 503
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import shutil
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote, unquote, urlparse
+from typing import Dict, List, Union
+
+from 运行配置 import 运行配置
+from 批量分析 import _初始化工作进程, _执行任务
+
+默认端口 = 8765
+
+
+class 服务不可用(Exception):
+    """服务已关闭或工作进程池不可用，不再接受新作业"""
+
+
+def _空任务():
+    """预热：让工作进程在第一个作业之前启动并完成初始化"""
+    return os.getpid()
+
+
+class 分析服务:
+    """
+    作业队列（进程池 + 内存中的作业表，结果保存在 输出根目录/<作业ID>/）
+    """
+
+    def __init__(self, 输出根目录: str, 进程数: int = 1, 模型路径: str = None, 快速模式: bool = False,
+                 配置: Union[运行配置, Dict] = None):
+        """
+        参数:
+            配置: 工作进程中分析系统使用的运行配置，或只含改动项的字典（在工作进程中叠加到
+                 耕地分析系统.py 顶部配置区域上）；默认为顶部配置区域
+        """
+        os.makedirs(输出根目录, exist_ok=True)
+        self.输出根目录 = os.path.abspath(输出根目录)
+        self.模型路径 = 模型路径
+        self.快速模式 = 快速模式
+        self.进程数 = max(1, 进程数)
+        self.启动时间 = time.time()
+
+        self._锁 = threading.Lock()
+        self._作业: Dict[str, Dict] = {}
+        self._已关闭 = False
+
+        self._执行器 = ProcessPoolExecutor(
+            max_workers=self.进程数,
+            initializer=_初始化工作进程,
+            initargs=(self.输出根目录, 模型路径, 配置)
+        )
+        for _ in range(self.进程数):
+            self._执行器.submit(_空任务)
+
+    def 提交(self, 任务: Dict) -> Dict:
+        """
+        提交作业
+
+        参数:
+            任务: {'去年', '今年', 'shapefile'(可选), '去年掩码'(可选)}
+
+        返回:
+            作业信息
+
+        异常:
+            ValueError: 任务字段缺失或文件不存在
+            服务不可用: 服务已关闭或工作进程池已损坏
+        """
+        if self._已关闭:
+            raise 服务不可用("服务正在关闭，不再接受新作业")
+        for 字段 in ('去年', '今年'):
+            if not 任务.get(字段):
+                raise ValueError(f"缺少字段: {字段}")
+        for 字段 in ('去年', '今年', 'shapefile', '去年掩码'):
+            if 任务.get(字段) and not os.path.exists(任务[字段]):
+                raise ValueError(f"文件不存在: {任务[字段]}")
+
+        作业ID = uuid.uuid4().hex[:12]
+        任务 = {'去年': 任务['去年'], '今年': 任务['今年'], 'shapefile': 任务.get('shapefile'),
+              '去年掩码': 任务.get('去年掩码'), '名称': 作业ID}
+        作业 = {'作业ID': 作业ID, '状态': '排队', '任务': 任务, '提交时间': time.time()}
+
+        try:
+            未来 = self._执行器.submit(_执行任务, 任务, self.输出根目录, self.模型路径, self.快速模式,
+                                    独立缓存=False)
+        except BrokenProcessPool as e:
+            print(f"❌ 工作进程池不可用: {e}", file=sys.stderr, flush=True)
+            raise 服务不可用("工作进程池不可用（工作进程初始化失败或崩溃），请查看服务日志后重启服务")
+        except RuntimeError:  # 提交与关闭同时发生
+            raise 服务不可用("服务正在关闭，不再接受新作业")
+        作业['_未来'] = 未来
+        with self._锁:
+            self._作业[作业ID] = 作业
+        未来.add_done_callback(lambda f, i=作业ID: self._作业完成(i, f))
+        return self._公开(作业)
+
+    def _作业完成(self, 作业ID: str, 未来):
+        try:
+            汇总 = 未来.result()
+        except Exception as e:  # 工作进程崩溃
+            汇总 = {'状态': '失败', '错误': f"{type(e).__name__}: {e}"}
+        with self._锁:
+            作业 = self._作业[作业ID]
+            作业['状态'] = 汇总.get('状态', '失败')
+            作业['完成时间'] = time.time()
+            作业['汇总'] = 汇总
+
+    def _公开(self, 作业: Dict) -> Dict:
+        """作业信息（不含内部字段）"""
+        信息 = {k: v for k, v in 作业.items() if not k.startswith('_')}
+        未来 = 作业.get('_未来')
+        if 信息['状态'] == '排队' and 未来 is not None and 未来.running():
+            信息['状态'] = '运行中'
+        if 信息['状态'] in ('完成', '失败'):
+            信息['文件'] = self.结果文件(作业['作业ID'])
+        return 信息
+
+    def 查询(self, 作业ID: str) -> Dict:
+        with self._锁:
+            作业 = self._作业.get(作业ID)
+            return None if 作业 is None else self._公开(作业)
+
+    def 列表(self) -> List[Dict]:
+        with self._锁:
+            return [
+                {k: v for k, v in self._公开(作业).items() if k != '汇总'}
+                for 作业 in sorted(self._作业.values(), key=lambda j: j['提交时间'])
+            ]
+
+    def 结果目录(self, 作业ID: str) -> str:
+        return os.path.join(self.输出根目录, 作业ID)
+
+    def 结果文件(self, 作业ID: str) -> List[str]:
+        目录 = self.结果目录(作业ID)
+        if not os.path.isdir(目录):
+            return []
+        return sorted(f for f in os.listdir(目录) if os.path.isfile(os.path.join(目录, f)))
+
+    def 状态(self) -> Dict:
+        with self._锁:
+            计数 = {}
+            for 作业 in self._作业.values():
+                状态 = self._公开(作业)['状态']
+                计数[状态] = 计数.get(状态, 0) + 1
+        return {'状态': '关闭中' if self._已关闭 else '正常', '进程数': self.进程数, '运行时间_秒': round(time.time() - self.启动时间), '作业': 计数}
+
+    def 关闭(self):
+        self._已关闭 = True
+        self._执行器.shutdown(wait=False, cancel_futures=True)
+
+
+class _请求处理(BaseHTTPRequestHandler):
+    server_version = "GengdiAnalysis/1.0"
+
+    @property
+    def 服务(self) -> 分析服务:
+        return self.server.分析服务
+
+    def _发送JSON(self, 状态码: int, 数据):
+        内容 = json.dumps(数据, ensure_ascii=False, indent=2, default=str).encode('utf-8')
+        self.send_response(状态码)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(内容)))
+        self.end_headers()
+        self.wfile.write(内容)
+
+    def _发送文件(self, 路径: str):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(os.path.getsize(路径)))
+        self.send_header('Content-Disposition', f"attachment; filename*=UTF-8''{quote(os.path.basename(路径))}")
+        self.end_headers()
+        with open(路径, 'rb') as f:
+            shutil.copyfileobj(f, self.wfile)
+
+    def do_GET(self):
+        部分 = [unquote(p) for p in urlparse(self.path).path.strip('/').split('/') if p]
+
+        if 部分 == ['health']:
+            return self._发送JSON(200, self.服务.状态())
+        if 部分 == ['jobs']:
+            return self._发送JSON(200, self.服务.列表())
+        if len(部分) >= 2 and 部分[0] == 'jobs':
+            作业 = self.服务.查询(部分[1])
+            if 作业 is None:
+                return self._发送JSON(404, {'错误': '作业不存在'})
+            if len(部分) == 2:
+                return self._发送JSON(200, 作业)
+            if len(部分) == 4 and 部分[2] == 'files':
+                文件名 = 部分[3]
+                if 文件名 not in self.服务.结果文件(部分[1]):
+                    return self._发送JSON(404, {'错误': '文件不存在'})
+                return self._发送文件(os.path.join(self.服务.结果目录(部分[1]), 文件名))
+        self._发送JSON(404, {'错误': '未知路径'})
+
+    def do_POST(self):
+        if urlparse(self.path).path.rstrip('/') != '/jobs':
+            return self._发送JSON(404, {'错误': '未知路径'})
+        try:
+            长度 = int(self.headers.get('Content-Length', 0))
+            任务 = json.loads(self.rfile.read(长度) or b'{}')
+            作业 = self.服务.提交(任务)
+        except (ValueError, json.JSONDecodeError) as e:
+            return self._发送JSON(400, {'错误': str(e)})
+        except 服务不可用 as e:
+            return self._发送JSON(503, {'错误': str(e)})
+        self._发送JSON(202, 作业)
+
+    def log_message(self, 格式, *参数):
+        print(f"🌐 {self.address_string()} {格式 % 参数}", flush=True)
+
+
+def 启动服务(输出根目录: str, 端口: int = 默认端口, 主机: str = "127.0.0.1",
+         进程数: int = 1, 模型路径: str = None, 快速模式: bool = False,
+         配置: Union[运行配置, Dict] = None):
+    """启动服务并阻塞运行（Ctrl+C 停止）"""
+    服务 = 分析服务(输出根目录, 进程数, 模型路径, 快速模式, 配置)
+    服务器 = ThreadingHTTPServer((主机, 端口), _请求处理)
+    服务器.分析服务 = 服务
+    print(f"🚀 分析服务已启动: http://{主机}:{服务器.server_address[1]}  (进程数 {服务.进程数}，结果目录 {服务.输出根目录})")
+    try:
+        服务器.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 正在停止服务...")
+    finally:
+        服务器.server_close()
+        服务.关闭()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    解析器 = argparse.ArgumentParser(description="本地耕地分析HTTP服务")
+    解析器.add_argument('输出目录')
+    解析器.add_argument('--端口', type=int, default=默认端口)
+    解析器.add_argument('--主机', default="127.0.0.1", help="监听地址（默认只允许本机访问）")
+    解析器.add_argument('--进程数', type=int, default=None, help="默认使用配置中的进程数")
+    解析器.add_argument('--模型', default=None, help="模型路径（默认使用配置中的模型保存路径）")
+    解析器.add_argument('--配置', default=None, help="运行配置文件（.json / .yaml）")
+    解析器.add_argument('--快速模式', action='store_true')
+    参数 = 解析器.parse_args()
+
+    # 配置文件只给出改动项，工作进程中叠加到引擎配置区域上（主进程不导入引擎）
+    配置 = 运行配置.读取文件(参数.配置) if 参数.配置 else None
+    进程数 = 参数.进程数 or 运行配置.从字典(配置 or {}).进程数
+    启动服务(参数.输出目录, 参数.端口, 参数.主机, 进程数, 参数.模型, 参数.快速模式, 配置)
+    sys.exit(0)
@@ -0,0 +1,319 @@
+"""
+颜色阈值参数扫描
+颜色规则只依赖单个像素的RGB值，所以影像只需读取一次，统计每种颜色的像素数、面积和落在参考掩码内的像素数
+（颜色直方图，通常只有几十万种颜色）；之后每组参数只需在这些颜色上求值，
+整个参数网格按批广播成 (参数组合 × 颜色) 的矩阵，用矩阵乘法一次得到所有组合的面积和IoU，各批在线程池中并行
+
+用法:
+    python 参数扫描.py 影像.tif [--参考 参考掩码.tif] [--规则 引擎|绿棕|严格程度] [--采样步长 2] [--期望面积 12.6]
+"""
+
+import os
+import itertools
+import numpy as np
+import pandas as pd
+import rasterio
+from rasterio.windows import Window
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Union
+
+块行数 = 1024
+_合并阈值 = 20_000_000  # 累积的(颜色,计数)条目超过该数量时合并一次，限制内存
+
+
+def _打包(图像块: np.ndarray, 参考块: np.ndarray = None) -> np.ndarray:
+    """HxWx3 uint8 -> 每像素一个键 (R<<17 | G<<9 | B<<1 | 参考)"""
+    键 = (图像块[..., 0].astype(np.uint32) << 17) | (图像块[..., 1].astype(np.uint32) << 9) | \
+        (图像块[..., 2].astype(np.uint32) << 1)
+    if 参考块 is not None:
+        键 |= (参考块 > 0.5).astype(np.uint32)
+    return 键
+
+
+def _转uint8(图像块: np.ndarray) -> np.ndarray:
+    """与引擎相同的换算：0-1浮点乘255截断，否则直接转uint8"""
+    if 图像块.dtype == np.uint8:
+        return 图像块
+    return (图像块 * 255).astype(np.uint8) if 图像块.max() <= 1.0 else 图像块.astype(np.uint8)
+
+
+def _合并(键列表: List[np.ndarray], 计数列表: List[np.ndarray], 面积列表: List[np.ndarray]):
+    键 = np.concatenate(键列表)
+    唯一键, 逆 = np.unique(键, return_inverse=True)
+    return (唯一键,
+            np.bincount(逆, weights=np.concatenate(计数列表), minlength=len(唯一键)),
+            np.bincount(逆, weights=np.concatenate(面积列表), minlength=len(唯一键)))
+
+
+class 颜色直方图:
+    """
+    影像的颜色统计（只读取一次影像）
+
+    属性:
+        颜色: 唯一颜色 (R<<16 | G<<8 | B)
+        计数: 每种颜色的像素数（已按采样步长放大）
+        面积: 每种颜色的面积（平方米）
+        参考计数: 每种颜色落在参考掩码内的像素数（没有参考掩码时为None）
+    """
+
+    def __init__(self, 键: np.ndarray, 计数: np.ndarray, 面积: np.ndarray, 有参考: bool, 采样步长: int = 1):
+        颜色键 = 键 >> 1
+        self.颜色, 逆 = np.unique(颜色键, return_inverse=True)
+        self.计数 = np.bincount(逆, weights=计数, minlength=len(self.颜色))
+        self.面积 = np.bincount(逆, weights=面积, minlength=len(self.颜色))
+        self.参考计数 = np.bincount(逆, weights=计数 * (键 & 1), minlength=len(self.颜色)) if 有参考 else None
+        self.采样步长 = 采样步长
+        self._通道 = None
+
+    @property
+    def 总像素数(self) -> float:
+        return float(self.计数.sum())
+
+    @property
+    def 参考像素数(self) -> float:
+        return float(self.参考计数.sum()) if self.参考计数 is not None else 0.0
+
+    def 通道(self) -> Dict[str, np.ndarray]:
+        """唯一颜色的 R/G/B（float32）和HSV饱和度S，供颜色规则使用"""
+        if self._通道 is None:
+            R = ((self.颜色 >> 16) & 255).astype(np.uint8)
+            G = ((self.颜色 >> 8) & 255).astype(np.uint8)
+            B = (self.颜色 & 255).astype(np.uint8)
+            try:
+                import cv2
+                S = cv2.cvtColor(np.stack([R, G, B], axis=-1)[:, np.newaxis, :], cv2.COLOR_RGB2HSV)[:, 0, 1]
+            except ImportError:
+                S = np.zeros_like(R)
+            self._通道 = {'R': R.astype(np.float32), 'G': G.astype(np.float32),
+                        'B': B.astype(np.float32), 'S': S.astype(np.float32)}
+        return self._通道
+
+    @classmethod
+    def 从影像构建(cls,
+              tif路径: str,
+              参考掩码: Union[np.ndarray, str] = None,
+              采样步长: int = 1,
+              窗口: Window = None) -> '颜色直方图':
+        """
+        按行带读取影像，统计颜色直方图
+
+        参数:
+            tif路径: 影像路径
+            参考掩码: 参考耕地掩码（与影像对齐的数组或栅格路径，可选）
+            采样步长: 行列各每隔多少像素取一个（>1时面积和像素数按步长平方放大）
+            窗口: 只统计该窗口（默认整幅）
+        """
+        from 面积核算 import 行像元面积
+
+        with rasterio.open(tif路径) as src:
+            窗口 = 窗口 or Window(0, 0, src.width, src.height)
+            x0, y0 = int(窗口.col_off), int(窗口.row_off)
+            宽, 高 = int(窗口.width), int(窗口.height)
+            行面积 = 行像元面积(src.transform, src.crs, src.height)[y0:y0 + 高]
+
+            参考源 = rasterio.open(参考掩码) if isinstance(参考掩码, str) else None
+            try:
+                键列表, 计数列表, 面积列表, 条目数 = [], [], [], 0
+                # 行带起点对齐到采样步长，保证各行带的采样与整幅 [::步长] 一致
+                带高 = max(块行数 // 采样步长, 1) * 采样步长
+                for y in range(0, 高, 带高):
+                    h = min(带高, 高 - y)
+                    w = Window(x0, y0 + y, 宽, h)
+                    数据 = src.read([1, 2, 3], window=w)[:, ::采样步长, ::采样步长]
+                    图像块 = _转uint8(np.transpose(数据, (1, 2, 0)))
+
+                    参考块 = None
+                    if 参考源 is not None:
+                        参考块 = 参考源.read(1, window=w)[::采样步长, ::采样步长]
+                    elif 参考掩码 is not None:
+                        参考块 = 参考掩码[y0 + y:y0 + y + h:采样步长, x0:x0 + 宽:采样步长]
+
+                    键, 逆, 计数 = np.unique(_打包(图像块, 参考块).ravel(), return_inverse=True, return_counts=True)
+                    # 每个像素的面积 = 所在行的像元面积 × 步长²
+                    像素面积 = np.repeat(行面积[y:y + h:采样步长], 图像块.shape[1]) * 采样步长 * 采样步长
+                    键列表.append(键)
+                    计数列表.append(计数.astype(np.float64) * 采样步长 * 采样步长)
+                    面积列表.append(np.bincount(逆.ravel(), weights=像素面积, minlength=len(键)))
+
+                    条目数 += len(键)
+                    if 条目数 > _合并阈值:
+                        键, 计数, 面积 = _合并(键列表, 计数列表, 面积列表)
+                        键列表, 计数列表, 面积列表, 条目数 = [键], [计数], [面积], len(键)
+            finally:
+                if 参考源 is not None:
+                    参考源.close()
+
+        键, 计数, 面积 = _合并(键列表, 计数列表, 面积列表)
+        return cls(键, 计数, 面积, 参考掩码 is not None, 采样步长)
+
+    @classmethod
+    def 从数组构建(cls, 图像: np.ndarray, 参考掩码: np.ndarray = None,
+              像元面积: float = 1.0) -> '颜色直方图':
+        """
+        从内存中的 HxWx3 影像统计（0-1浮点或uint8）
+
+        参数:
+            像元面积: 每个像素的面积（平方米）
+        """
+        键, 计数 = np.unique(_打包(_转uint8(图像[..., :3]), 参考掩码).ravel(), return_counts=True)
+        计数 = 计数.astype(np.float64)
+        return cls(键, 计数, 计数 * 像元面积, 参考掩码 is not None)
+
+
+# ==================== 颜色规则 ====================
+# 参数可以是标量，也可以是 (组合数, 1) 的列向量（通道为 (1, 颜色数)），广播后一次得到整个网格的结果
+
+def 引擎规则(通道: Dict, 棕色阈值=20, 绿色阈值=20, 灰度阈值=10, 黑边阈值=10):
+    """耕地分析系统._颜色规则预测块 的颜色识别部分（完整预测）"""
+    R, G, B = 通道['R'], 通道['G'], 通道['B']
+    # 与引擎一致：引擎中 R + G + B 为uint8相加（按256回绕）
+    亮度 = np.mod(R + G + B, 256) / 3.0
+    色差 = np.maximum(np.abs(R - 亮度), np.maximum(np.abs(G - 亮度), np.abs(B - 亮度)))
+    return (((R - B) > 棕色阈值) | ((G - R) > 绿色阈值)) & (色差 > 灰度阈值) & ((R + G + B) > 黑边阈值)
+
+
+def 绿棕规则(通道: Dict, 绿色阈值=35, 棕色阈值=30, 绿色Gmin=90, 棕色Rmin=100):
+    """测试最佳参数.py 中的绿色/棕色/黄色规则"""
+    R, G, B = 通道['R'], 通道['G'], 通道['B']
+    绿 = ((G - R) > 绿色阈值) & ((G - B) > 绿色阈值) & (G > 绿色Gmin)
+    棕 = ((R - B) > 棕色阈值) & (np.maximum(0, R - G) > 10) & (R > 棕色Rmin) & (B < R * 0.7)
+    黄 = (R > 140) & (G > 140) & (B < 120) & (np.abs(R - G) < 20)
+    亮度 = (R + G + B) / 3
+    蓝 = (B > R * 1.3) & (B > G * 1.3) & (B > 80)
+    return (绿 | 棕 | 黄) & (亮度 >= 60) & (亮度 <= 190) & ~蓝
+
+
+def 严格程度规则(通道: Dict, 严格程度=1.0):
+    """改进的颜色识别 的逐像素部分（不含其后的形态学去噪）"""
+    R, G, B, S = 通道['R'], 通道['G'], 通道['B'], 通道['S']
+    严格程度 = np.asarray(严格程度, dtype=np.float32)
+    绿色阈值 = np.floor(30 * 严格程度)
+    棕色阈值 = np.floor(25 * 严格程度)
+    最小亮度 = np.floor(50 * 严格程度)
+    最大亮度 = np.where(严格程度 > 1, np.floor(200 / 严格程度), 200)
+
+    绿 = ((G - R) > 绿色阈值) & ((G - B) > 绿色阈值) & (G > 80) & (S > 30)
+    棕 = ((R - B) > 棕色阈值) & (np.maximum(0, R - G) > 10) & (R > 80) & (B < R * 0.7)
+    黄 = (R > 120) & (G > 120) & (B < 100) & (np.abs(R - G) < 25)
+    亮度 = (R + G + B) / 3
+    蓝 = (B > R * 1.3) & (B > G * 1.3) & (B > 80)
+    灰 = (np.abs(R - G) < 10) & (np.abs(G - B) < 10) & (np.abs(R - B) < 10)
+    return (绿 | 棕 | 黄) & (亮度 >= 最小亮度) & (亮度 <= 最大亮度) & ~蓝 & ~灰 & (S >= 20)
+
+
+规则表 = {'引擎': 引擎规则, '绿棕': 绿棕规则, '严格程度': 严格程度规则}
+
+默认网格 = {
+    '引擎': {'棕色阈值': range(5, 45, 5), '绿色阈值': range(5, 45, 5), '灰度阈值': range(0, 25, 5)},
+    '绿棕': {'绿色阈值': range(20, 60, 5), '棕色阈值': range(15, 55, 5),
+           '绿色Gmin': range(60, 140, 10), '棕色Rmin': range(70, 150, 10)},
+    '严格程度': {'严格程度': np.round(np.linspace(0.5, 2.0, 31), 3)},
+}
+
+
+# ==================== 扫描 ====================
+
+def 参数网格(**取值) -> List[Dict]:
+    """参数网格(a=[1,2], b=[3,4]) -> [{'a':1,'b':3}, {'a':1,'b':4}, ...]"""
+    名称 = list(取值)
+    return [dict(zip(名称, 组合)) for 组合 in itertools.product(*(list(v) for v in 取值.values()))]
+
+
+def 扫描(直方图: 颜色直方图,
+       规则: Callable,
+       参数: Union[Dict[str, list], List[Dict]],
+       线程数: int = None,
+       批元素数: int = 4_000_000) -> pd.DataFrame:
+    """
+    在整个参数网格上求值颜色规则
+
+    参数:
+        直方图: 颜色直方图
+        规则: 颜色规则函数（见 引擎规则 / 绿棕规则 / 严格程度规则）
+        参数: 参数网格 {名称: 取值列表}，或参数组合列表 [{名称: 值}]
+        线程数: 并行线程数（默认CPU核数）
+        批元素数: 每批 组合数×颜色数 的上限（控制内存）
+
+    返回:
+        每个参数组合一行：参数 + 像素数、面积_亩（有参考掩码时另有 交集像素数、IoU、精确率、召回率）
+    """
+    组合 = 参数网格(**参数) if isinstance(参数, dict) else list(参数)
+    通道 = {k: v[np.newaxis, :] for k, v in 直方图.通道().items()}
+    颜色数 = len(直方图.颜色)
+    权重 = [直方图.计数, 直方图.面积] + ([直方图.参考计数] if 直方图.参考计数 is not None else [])
+    权重 = np.stack(权重, axis=1)  # (颜色数, 2或3)
+
+    每批 = max(1, 批元素数 // max(颜色数, 1))
+    批列表 = [组合[i:i + 每批] for i in range(0, len(组合), 每批)]
+
+    def 计算(批: List[Dict]) -> np.ndarray:
+        列 = {名: np.array([c[名] for c in 批], dtype=np.float32)[:, np.newaxis] for 名 in 批[0]} if 批[0] else {}
+        掩码 = np.broadcast_to(规则(通道, **列), (len(批), 颜色数))
+        return 掩码.astype(np.float64) @ 权重  # (批大小, 2或3)
+
+    with ThreadPoolExecutor(max_workers=线程数 or os.cpu_count()) as 线程池:
+        汇总 = np.concatenate(list(线程池.map(计算, 批列表)), axis=0) if 批列表 else np.zeros((0, 权重.shape[1]))
+
+    结果 = pd.DataFrame(组合)
+    结果['像素数'] = 汇总[:, 0]
+    结果['面积_亩'] = 汇总[:, 1] / 666.67
+    if 直方图.参考计数 is not None:
+        交集 = 汇总[:, 2]
+        参考 = 直方图.参考像素数
+        结果['交集像素数'] = 交集
+        结果['IoU'] = np.where(结果['像素数'] + 参考 - 交集 > 0, 交集 / np.maximum(结果['像素数'] + 参考 - 交集, 1), 1.0)
+        结果['精确率'] = np.where(结果['像素数'] > 0, 交集 / np.maximum(结果['像素数'], 1), 0.0)
+        结果['召回率'] = 交集 / 参考 if 参考 > 0 else 0.0
+    return 结果
+
+
+def 曲面(结果: pd.DataFrame, 行参数: str, 列参数: str, 值: str = 'IoU') -> pd.DataFrame:
+    """两个参数上的 面积/IoU 曲面（其余参数取使该值最大的组合）"""
+    return 结果.pivot_table(index=行参数, columns=列参数, values=值, aggfunc='max')
+
+
+def 最佳参数(结果: pd.DataFrame, 期望面积_亩: float = None) -> pd.Series:
+    """有期望面积时取面积最接近的组合，否则取IoU最高的组合"""
+    if 期望面积_亩 is not None:
+        return 结果.loc[(结果['面积_亩'] - 期望面积_亩).abs().idxmin()]
+    if 'IoU' not in 结果:
+        raise ValueError("❌ 没有参考掩码时需要提供期望面积")
+    return 结果.loc[结果['IoU'].idxmax()]
+
+
+if __name__ == "__main__":
+    import time
+    import argparse
+
+    解析器 = argparse.ArgumentParser(description="颜色阈值参数扫描（读取一次影像，整网格并行求值）")
+    解析器.add_argument('影像')
+    解析器.add_argument('--参考', default=None, help="参考耕地掩码（与影像对齐的栅格）")
+    解析器.add_argument('--规则', choices=list(规则表), default='引擎')
+    解析器.add_argument('--采样步长', type=int, default=1)
+    解析器.add_argument('--期望面积', type=float, default=None, help="期望耕地面积（亩），如 12.6")
+    解析器.add_argument('--线程数', type=int, default=None)
+    解析器.add_argument('--输出', default=None, help="扫描结果CSV路径")
+    参数 = 解析器.parse_args()
+
+    if 参数.参考 is None and 参数.期望面积 is None:
+        解析器.error("需要 --参考 或 --期望面积")
+
+    开始 = time.time()
+    直方图 = 颜色直方图.从影像构建(参数.影像, 参数.参考, 参数.采样步长)
+    print(f"📊 颜色直方图: {len(直方图.颜色):,} 种颜色，{直方图.总像素数:,.0f} 像素（{time.time() - 开始:.1f}s）")
+
+    开始 = time.time()
+    结果 = 扫描(直方图, 规则表[参数.规则], 默认网格[参数.规则], 参数.线程数)
+    print(f"⚡ {len(结果)} 组参数扫描完成（{time.time() - 开始:.2f}s）")
+
+    排序列 = 'IoU' if 参数.参考 else None
+    if 参数.期望面积 is not None:
+        结果['面积差_亩'] = (结果['面积_亩'] - 参数.期望面积).abs()
+        print(结果.nsmallest(10, '面积差_亩').to_string(index=False))
+    else:
+        print(结果.nlargest(10, 排序列).to_string(index=False))
+    print(f"\n✅ 最佳参数:\n{最佳参数(结果, 参数.期望面积).to_string()}")
+
+    输出 = 参数.输出 or f"参数扫描_{参数.规则}_{os.path.splitext(os.path.basename(参数.影像))[0]}.csv"
+    结果.to_csv(输出, index=False, encoding='utf-8-sig')
+    print(f"📄 扫描结果已保存: {输出}")
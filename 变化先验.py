@@ -0,0 +1,164 @@
+"""
+变化先验模块
+在低分辨率下比较配准后的去年/今年影像，按块(默认256像素)计算光谱差异，
+只有发生变化的块才需要重新识别，未变化的块直接沿用去年结果
+
+去年影像通过WarpedVRT重投影到今年影像的网格上，两期影像的坐标系和范围可以不同
+"""
+
+import numpy as np
+import rasterio
+from rasterio.enums import Resampling
+from rasterio.vrt import WarpedVRT
+from typing import Dict
+
+# 直方图参数（在标准化后的亮度上统计，对两期整体明暗差异不敏感）
+直方图分箱 = 16
+直方图范围 = (-3.0, 3.0)
+
+
+def _读取低分辨率RGB(数据集, 输出形状) -> np.ndarray:
+    """按平均值重采样读取前3个波段，返回 HxWx3 float32"""
+    波段 = list(range(1, min(3, 数据集.count) + 1))
+    数据 = 数据集.read(波段, out_shape=(len(波段),) + tuple(输出形状), resampling=Resampling.average)
+    if len(波段) < 3:
+        数据 = np.concatenate([数据] + [数据[-1:]] * (3 - len(波段)), axis=0)
+    return np.transpose(数据, (1, 2, 0)).astype(np.float32)
+
+
+def _标准化(影像: np.ndarray, 有效: np.ndarray) -> np.ndarray:
+    """每个波段按有效像素的均值/标准差标准化（消除两期影像整体亮度和对比度差异）"""
+    结果 = np.zeros_like(影像)
+    if not np.any(有效):
+        return 结果
+    for b in range(3):
+        值 = 影像[..., b][有效]
+        结果[..., b] = (影像[..., b] - 值.mean()) / max(float(值.std()), 1e-6)
+    return 结果
+
+
+def _分块(数组: np.ndarray, k: int) -> np.ndarray:
+    """(H, W, ...) 补齐到k的整数倍后变形为 (块行, 块列, k*k, ...)"""
+    h, w = 数组.shape[:2]
+    补h = (-h) % k
+    补w = (-w) % k
+    if 补h or 补w:
+        数组 = np.pad(数组, ((0, 补h), (0, 补w)) + ((0, 0),) * (数组.ndim - 2))
+    行, 列 = 数组.shape[0] // k, 数组.shape[1] // k
+    数组 = 数组.reshape((行, k, 列, k) + 数组.shape[2:])
+    数组 = np.moveaxis(数组, 2, 1)
+    return 数组.reshape((行, 列, k * k) + 数组.shape[4:])
+
+
+def _自动阈值(分数: np.ndarray, 下限: float) -> float:
+    """中位数 + 3倍稳健标准差（MAD），且不低于下限"""
+    if 分数.size == 0:
+        return 下限
+    中位数 = float(np.median(分数))
+    mad = float(np.median(np.abs(分数 - 中位数))) * 1.4826
+    return max(中位数 + 3.0 * mad, 下限)
+
+
+def 计算块变化(去年图像路径: str,
+            今年图像路径: str,
+            块尺寸: int = 256,
+            降采样: int = None,
+            色差阈值: float = None,
+            直方图阈值: float = None) -> Dict:
+    """
+    计算两期影像的块级变化
+
+    参数:
+        去年图像路径: 去年影像路径
+        今年图像路径: 今年影像路径（结果以今年影像的像素网格为准）
+        块尺寸: 块大小(今年影像像素)
+        降采样: 低分辨率读取倍数（默认 块尺寸//32，每块32x32个低分辨率像元）
+        色差阈值: 块内标准化颜色平均绝对差阈值（默认自动）
+        直方图阈值: 块内标准化亮度直方图距离阈值(0-1)（默认自动）
+
+    返回:
+        {'变化块': (块行, 块列) bool, '色差', '直方图距离', '块尺寸', '变化比例', '色差阈值', '直方图阈值'}
+    """
+    降采样 = 降采样 or max(1, 块尺寸 // 32)
+    k = max(1, 块尺寸 // 降采样)
+    降采样 = 块尺寸 // k  # 保证块边界与低分辨率像元对齐
+
+    with rasterio.open(今年图像路径) as 今年:
+        输出形状 = (int(np.ceil(今年.height / 降采样)), int(np.ceil(今年.width / 降采样)))
+        今年影像 = _读取低分辨率RGB(今年, 输出形状)
+
+        with rasterio.open(去年图像路径) as 去年源:
+            with WarpedVRT(去年源, crs=今年.crs, transform=今年.transform,
+                           width=今年.width, height=今年.height,
+                           resampling=Resampling.bilinear) as 去年:
+                去年影像 = _读取低分辨率RGB(去年, 输出形状)
+
+    # 有效像素：非黑边（与颜色识别的黑边规则一致）
+    今年有效 = 今年影像.sum(axis=-1) > 10
+    去年有效 = 去年影像.sum(axis=-1) > 10
+    共同有效 = 今年有效 & 去年有效
+
+    今年标准 = _标准化(今年影像, 共同有效)
+    去年标准 = _标准化(去年影像, 共同有效)
+
+    # 1. 块内平均色差
+    像素色差 = np.abs(今年标准 - 去年标准).mean(axis=-1)
+    块有效 = _分块(共同有效, k)
+    有效数 = 块有效.sum(axis=-1)
+    色差 = np.where(有效数 > 0, (_分块(像素色差, k) * 块有效).sum(axis=-1) / np.maximum(有效数, 1), 0.0)
+
+    # 2. 块内标准化亮度直方图距离（全变差距离，0-1），所有块一次bincount
+    def _块直方图(标准影像):
+        亮度 = 标准影像.mean(axis=-1)
+        分箱 = np.clip(((亮度 - 直方图范围[0]) / (直方图范围[1] - 直方图范围[0]) * 直方图分箱).astype(np.int32),
+                     0, 直方图分箱 - 1)
+        块分箱 = _分块(分箱, k)
+        块数 = 块分箱.shape[0] * 块分箱.shape[1]
+        块号 = np.broadcast_to(np.arange(块数).reshape(块分箱.shape[:2] + (1,)), 块分箱.shape)
+        计数 = np.bincount(
+            (块号 * 直方图分箱 + 块分箱)[块有效].ravel(),
+            minlength=块数 * 直方图分箱
+        ).reshape(块分箱.shape[:2] + (直方图分箱,))
+        return 计数 / np.maximum(计数.sum(axis=-1, keepdims=True), 1)
+
+    直方图距离 = 0.5 * np.abs(_块直方图(今年标准) - _块直方图(去年标准)).sum(axis=-1)
+
+    # 3. 阈值与变化判定
+    有块 = 有效数 > 0
+    色差阈值 = 色差阈值 if 色差阈值 is not None else _自动阈值(色差[有块], 0.5)
+    直方图阈值 = 直方图阈值 if 直方图阈值 is not None else _自动阈值(直方图距离[有块], 0.25)
+    变化块 = 有块 & ((色差 > 色差阈值) | (直方图距离 > 直方图阈值))
+
+    # 去年无数据（黑边）而今年有数据的块，无法沿用去年结果，视为变化
+    今年有效比例 = _分块(今年有效, k).mean(axis=-1)
+    去年缺失比例 = _分块(今年有效 & ~去年有效, k).mean(axis=-1)
+    变化块 |= (今年有效比例 > 0) & (去年缺失比例 > 0.1 * np.maximum(今年有效比例, 1e-6))
+
+    有数据块数 = int(np.sum(今年有效比例 > 0))
+    return {
+        '变化块': 变化块,
+        '色差': 色差,
+        '直方图距离': 直方图距离,
+        '块尺寸': 块尺寸,
+        '变化比例': float(变化块.sum() / max(有数据块数, 1)),
+        '色差阈值': float(色差阈值),
+        '直方图阈值': float(直方图阈值),
+    }
+
+
+def 窗口变化掩码(变化块: np.ndarray, 块尺寸: int, x: int, y: int, 宽: int, 高: int) -> np.ndarray:
+    """
+    窗口内属于变化块的像素
+
+    返回:
+        (高, 宽) bool
+    """
+    列 = np.minimum((x + np.arange(宽)) // 块尺寸, 变化块.shape[1] - 1)
+    行 = np.minimum((y + np.arange(高)) // 块尺寸, 变化块.shape[0] - 1)
+    return 变化块[np.ix_(行, 列)]
+
+
+def 窗口有变化(变化块: np.ndarray, 块尺寸: int, x: int, y: int, 宽: int, 高: int) -> bool:
+    """窗口是否与任一变化块重叠"""
+    return bool(np.any(变化块[y // 块尺寸:(y + 高 - 1) // 块尺寸 + 1,
+                          x // 块尺寸:(x + 宽 - 1) // 块尺寸 + 1]))
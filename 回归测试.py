@@ -0,0 +1,407 @@
+"""
+回归测试（黄金输出）
+对每个夹具、每种引擎模式（颜色规则、U-Net、增量、变化先验、流式、批量）运行一次，
+把耕地面积和掩码与保存的基线比较，同时列出吞吐量，性能优化不会在不知不觉中改变报告的亩数
+
+夹具:
+    合成夹具: 由 基准测试套件.生成合成影像 生成，带真值地块（另报告与真值的面积误差和IoU）；
+             去年掩码为真值去掉部分地块，去年影像为把这些地块涂成背景的影像，用于增量和变化先验模式
+    真实夹具: 在 回归基线/夹具.json 中登记（路径相对于该文件），例如
+             [{"名称": "jinnian", "影像": "../jinnian.tif", "期望面积_亩": 12.6,
+               "去年影像": "../qunian.tif", "去年掩码": "../qunian_mask.tif"}]
+
+颜色规则模式直接调用引擎的 _颜色规则预测块（整幅影像作为一个窗口完整识别）；
+其余模式调用 使用模型预测耕地_大图，窗口识别同样是颜色规则，模型只决定窗口尺寸，
+没有模型（或未安装TensorFlow）时使用引擎的默认窗口尺寸，基线按默认窗口尺寸记录；
+颜色规则只在已有耕地附近扩展，没有去年数据时窗口结果恒为空，因此 U-Net/流式 模式把窗口识别
+换成整窗完整识别的桩（相当于对整个窗口打分的模型），无先验的后处理（Otsu阈值、分块形态学、
+连通域过滤）在非空掩码上运行；
+批量模式用 批量分析.计算影像对 分析 (去年影像, 今年影像, 地块)，去年以地块为种子，结果为今年掩码
+
+用法:
+    python 回归测试.py --更新基线 [--模型 耕地识别模型.h5]   记录当前结果为基线
+    python 回归测试.py [--模型 耕地识别模型.h5] [--速度容差 0.2]
+        与基线比较：面积差异超出容差、掩码IoU低于下限或某个模式运行出错时退出码为1
+        增量/变化先验模式另外检查去年耕地是否全部保留，批量模式检查去年和今年面积都不为0（与基线无关）；
+        有真值或期望面积的夹具面积为0时判为失败，也不会记录为基线
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import contextlib
+import numpy as np
+import rasterio
+from typing import Dict, List, Optional
+
+import 基准测试套件
+
+# ==================== 配置 ====================
+
+默认基线目录 = "回归基线"
+合成夹具尺寸 = [1000, 2000]
+全部模式 = ["颜色规则", "U-Net", "增量", "变化先验", "流式", "批量"]
+
+面积容差_亩 = 0.01       # 与基线的面积差同时超过这两个容差才算失败
+面积容差_比例 = 0.001
+掩码IoU下限 = 0.999
+去年缺失地块间隔 = 基准测试套件.去年缺失地块间隔  # 合成夹具的去年掩码：每7个地块去掉1个（今年新增）
+
+
+class _跳过(Exception):
+    """该夹具不适用于该模式（缺少去年数据或地块）"""
+
+
+# ==================== 夹具 ====================
+
+def _保存掩码(路径: str, 掩码: np.ndarray):
+    np.savez_compressed(路径, 位=np.packbits(掩码.astype(bool)), 形状=np.array(掩码.shape))
+
+
+def _读取掩码(路径: str) -> np.ndarray:
+    if 路径.lower().endswith(('.tif', '.tiff')):
+        with rasterio.open(路径) as src:
+            return (src.read(1) > 0).astype(np.uint8)
+    if 路径.lower().endswith('.npy'):
+        return (np.load(路径) > 0).astype(np.uint8)
+    数据 = np.load(路径)
+    形状 = tuple(数据['形状'])
+    return np.unpackbits(数据['位'], count=int(np.prod(形状))).reshape(形状)
+
+
+def _生成去年影像(影像路径: str, 新增掩码: np.ndarray, 路径: str, 种子: int):
+    """今年影像中新增地块的像素改为背景颜色（加同样幅度的噪声），作为去年影像"""
+    with rasterio.open(影像路径) as src:
+        配置 = src.profile
+        数据 = src.read()
+    噪声源 = np.random.default_rng(种子)
+    背景 = np.array(基准测试套件._颜色[0], dtype=np.int16)
+    数量 = int(np.count_nonzero(新增掩码))
+    for 波段 in range(3):
+        噪声 = 噪声源.integers(-基准测试套件._噪声幅度, 基准测试套件._噪声幅度 + 1, size=数量, dtype=np.int16)
+        数据[波段][新增掩码 > 0] = np.clip(背景[波段] + 噪声, 1, 255).astype(np.uint8)
+    with rasterio.open(路径, 'w', **配置) as dst:
+        dst.write(数据)
+
+
+def 准备合成夹具(尺寸: int, 数据目录: str) -> Dict:
+    """生成（或复用）合成影像，并栅格化真值掩码、去年掩码，生成去年影像"""
+    import geopandas as gpd
+    from rasterio.features import rasterize
+
+    信息 = 基准测试套件.生成合成影像(尺寸, 数据目录)
+    前缀 = os.path.splitext(信息['影像'])[0]
+    真值路径, 去年路径, 去年影像路径 = 前缀 + "_真值.npz", 前缀 + "_去年.npz", 前缀 + "_去年.tif"
+
+    if not all(os.path.exists(p) for p in (真值路径, 去年路径, 去年影像路径)):
+        地块 = gpd.read_file(信息['地块'])
+        with rasterio.open(信息['影像']) as src:
+            形状, 变换 = (src.height, src.width), src.transform
+        几何 = list(地块.geometry)
+        _保存掩码(真值路径, rasterize(((g, 1) for g in 几何), out_shape=形状, transform=变换, dtype='uint8'))
+        去年几何 = [g for i, g in enumerate(几何) if i % 去年缺失地块间隔 != 0]
+        新增几何 = [g for i, g in enumerate(几何) if i % 去年缺失地块间隔 == 0]
+        _保存掩码(去年路径, rasterize(((g, 1) for g in 去年几何), out_shape=形状, transform=变换, dtype='uint8'))
+        新增掩码 = rasterize(((g, 1) for g in 新增几何), out_shape=形状, transform=变换, dtype='uint8') \
+            if 新增几何 else np.zeros(形状, dtype=np.uint8)
+        _生成去年影像(信息['影像'], 新增掩码, 去年影像路径, 信息['种子'])
+
+    return {
+        '名称': f"合成_{尺寸}",
+        '影像': 信息['影像'],
+        '真值掩码': 真值路径,
+        '真值面积_平方米': 信息['真值面积_平方米'],
+        '去年掩码': 去年路径,
+        '去年影像': 去年影像路径,
+        '地块': 信息['地块'],
+    }
+
+
+def 读取真实夹具(基线目录: str) -> List[Dict]:
+    清单 = os.path.join(基线目录, "夹具.json")
+    if not os.path.exists(清单):
+        return []
+    with open(清单, 'r', encoding='utf-8') as f:
+        列表 = json.load(f)
+
+    夹具列表 = []
+    for 项 in 列表:
+        夹具 = dict(项)
+        for 字段 in ('影像', '去年影像', '去年掩码', '地块'):
+            if 夹具.get(字段):
+                夹具[字段] = os.path.normpath(os.path.join(基线目录, 夹具[字段]))
+        if not os.path.exists(夹具['影像']):
+            print(f"⚠️  真实夹具不存在，已跳过: {夹具['影像']}")
+            continue
+        夹具.setdefault('名称', os.path.splitext(os.path.basename(夹具['影像']))[0])
+        夹具列表.append(夹具)
+    return 夹具列表
+
+
+# ==================== 运行 ====================
+
+@contextlib.contextmanager
+def _整窗识别(系统):
+    """窗口识别换成整窗完整识别（模型桩），用于没有去年数据的模式"""
+    原函数 = 系统._颜色规则预测块
+    系统._颜色规则预测块 = lambda 块, 去年块掩码, 完整预测=False: 原函数(块, 去年块掩码, 完整预测=True)
+    try:
+        yield
+    finally:
+        del 系统._颜色规则预测块  # 恢复类上的实现
+
+
+def 运行模式(系统, 夹具: Dict, 模式: str, 模型路径: Optional[str]) -> Dict:
+    """
+    在一个夹具上运行一种引擎模式
+
+    返回:
+        {'耕地面积_亩', '掩码', '耗时_秒', 'MPix每秒', '去年保留率', '去年面积_亩'}
+        （去年保留率只在增量/变化先验模式下有值，去年面积_亩只在批量模式下有值）
+    """
+    tif路径 = 夹具['影像']
+    去年掩码 = _读取掩码(夹具['去年掩码']) if 夹具.get('去年掩码') else None
+    if 模式 in ("增量", "变化先验") and 去年掩码 is None:
+        raise _跳过("没有去年掩码")
+    if 模式 in ("变化先验", "批量") and not 夹具.get('去年影像'):
+        raise _跳过("没有去年影像")
+    if 模式 == "批量" and not 夹具.get('地块'):
+        raise _跳过("没有地块")
+
+    去年面积 = None
+    开始 = time.perf_counter()
+    if 模式 == "颜色规则":
+        # 生产窗口识别函数，整幅影像作为一个窗口、不带去年数据完整识别
+        with rasterio.open(tif路径) as src:
+            影像 = np.transpose(src.read()[:3], (1, 2, 0))
+        掩码 = 系统._颜色规则预测块(影像, np.zeros(影像.shape[:2], dtype=np.float32), 完整预测=True)
+        结果 = 系统.计算耕地面积和比例({'文件路径': tif路径}, 耕地掩码=掩码)
+    elif 模式 == "批量":
+        import 批量分析
+        任务 = {'名称': 夹具['名称'], '去年': 夹具['去年影像'], '今年': tif路径, 'shapefile': 夹具['地块']}
+        计算结果 = 批量分析.计算影像对(系统, 任务, 模型路径)
+        结果, 掩码 = 计算结果['今年结果'], 计算结果['今年掩码']
+        去年面积 = float(计算结果['去年结果']['耕地面积_亩'])
+    else:
+        原配置 = 系统.配置
+        if 模式 == "流式":
+            系统.配置 = 原配置.替换(掩码存储方式="磁盘")
+        有去年 = 模式 in ("增量", "变化先验")
+        try:
+            with (contextlib.nullcontext() if 有去年 else _整窗识别(系统)):
+                结果 = 系统.使用模型预测耕地_大图(
+                    tif路径, 模型路径,
+                    去年掩码=去年掩码 if 有去年 else None,
+                    去年图像路径=夹具.get('去年影像') if 模式 == "变化先验" else None,
+                    使用缓存=False
+                )
+        finally:
+            系统.配置 = 原配置
+        掩码 = 结果['耕地掩码']
+    耗时 = time.perf_counter() - 开始
+
+    掩码 = (np.asarray(掩码) > 0.5).astype(np.uint8)
+    去年保留率 = None
+    if 模式 in ("增量", "变化先验") and 去年掩码.shape == 掩码.shape:
+        去年像素 = int(np.count_nonzero(去年掩码))
+        去年保留率 = int(np.count_nonzero(掩码[去年掩码 > 0])) / 去年像素 if 去年像素 else 1.0
+    return {
+        '耕地面积_亩': float(结果['耕地面积_亩']),
+        '掩码': 掩码,
+        '耗时_秒': round(耗时, 4),
+        'MPix每秒': round(掩码.size / 1e6 / 耗时, 2) if 耗时 > 0 else None,
+        '去年保留率': 去年保留率,
+        '去年面积_亩': 去年面积,
+    }
+
+
+def 掩码对比(掩码: np.ndarray, 参考: np.ndarray) -> Dict:
+    if 掩码.shape != 参考.shape:
+        return {'IoU': 0.0, '不一致像素': None, '说明': f"尺寸不同 {掩码.shape} vs {参考.shape}"}
+    a, b = 掩码.astype(bool), 参考.astype(bool)
+    交 = int(np.count_nonzero(a & b))
+    并 = int(np.count_nonzero(a | b))
+    return {'IoU': 1.0 if 并 == 0 else 交 / 并, '不一致像素': 并 - 交}
+
+
+def 运行回归(基线目录: str = 默认基线目录,
+         数据目录: str = "基准数据",
+         模型路径: str = None,
+         模式列表: List[str] = None,
+         更新基线: bool = False,
+         速度容差: float = None) -> List[Dict]:
+    """
+    运行全部夹具 × 模式，与基线比较（或更新基线）
+
+    参数:
+        速度容差: 吞吐量低于基线 (1-速度容差) 倍时也判为失败（默认只报告）
+
+    返回:
+        每个 夹具×模式 一行的结果列表（'状态' 为 通过/失败/错误/跳过/新增/已更新）
+    """
+    from 耕地分析系统 import 耕地分析系统
+
+    os.makedirs(基线目录, exist_ok=True)
+    版本 = 基准测试套件._版本信息()  # 在写入基线文件之前记录，基线文件本身的改动不算未提交修改
+    基线路径 = os.path.join(基线目录, "基线.json")
+    基线 = {'结果': {}}
+    if os.path.exists(基线路径):
+        with open(基线路径, 'r', encoding='utf-8') as f:
+            基线 = json.load(f)
+
+    夹具列表 = [准备合成夹具(尺寸, 数据目录) for 尺寸 in 合成夹具尺寸] + 读取真实夹具(基线目录)
+    模式列表 = 模式列表 or 全部模式
+
+    临时目录 = tempfile.mkdtemp(prefix="回归_")
+    行列表 = []
+    try:
+        系统 = 耕地分析系统(输出目录=临时目录)
+        try:
+            模型路径 = 系统.加载模型(模型路径)  # 预先加载，计时不含模型加载
+        except (RuntimeError, FileNotFoundError) as e:
+            模型路径 = None
+            print(f"⚠️  模型不可用，使用默认窗口尺寸 {系统._默认窗口尺寸}: {str(e).splitlines()[0]}")
+
+        for 夹具 in 夹具列表:
+            真值 = _读取掩码(夹具['真值掩码']) if 夹具.get('真值掩码') else None
+            for 模式 in 模式列表:
+                行 = {'夹具': 夹具['名称'], '模式': 模式}
+                行列表.append(行)
+                print(f"\n🔁 {夹具['名称']} / {模式}")
+                try:
+                    当前 = 运行模式(系统, 夹具, 模式, 模型路径)
+                except _跳过 as e:
+                    行.update({'状态': '跳过', '说明': str(e)})
+                    continue
+                except Exception as e:
+                    # 单个模式出错不影响其余模式，报告中标为错误（退出码为1）
+                    行.update({'状态': '错误', '说明': f"{type(e).__name__}: {e}"})
+                    print(f"  ❌ {type(e).__name__}: {e}")
+                    continue
+
+                行.update({'面积_亩': round(当前['耕地面积_亩'], 4),
+                          '耗时_秒': 当前['耗时_秒'], 'MPix每秒': 当前['MPix每秒']})
+                if 真值 is not None:
+                    行['IoU_真值'] = round(掩码对比(当前['掩码'], 真值)['IoU'], 5)
+                    行['真值面积误差'] = round(当前['耕地面积_亩'] * 666.67 / 夹具['真值面积_平方米'] - 1, 5)
+                if 夹具.get('期望面积_亩') is not None:
+                    行['期望面积差_亩'] = round(当前['耕地面积_亩'] - 夹具['期望面积_亩'], 4)
+
+                # 增量/变化先验模式：去年的耕地必须全部保留（与基线无关）
+                问题 = []
+                if 当前['去年保留率'] is not None:
+                    行['去年保留率'] = round(当前['去年保留率'], 6)
+                    if 当前['去年保留率'] < 1.0:
+                        问题.append(f"去年耕地只保留 {当前['去年保留率'] * 100:.3f}%")
+                # 有耕地的夹具面积不能为0（空掩码的基线只能检查输出仍为空）
+                if 当前['耕地面积_亩'] <= 0 and (夹具.get('真值面积_平方米') or 夹具.get('期望面积_亩')):
+                    问题.append("面积为0")
+                # 批量模式：有已知地块的影像对，去年和今年面积都不能为0
+                if 当前['去年面积_亩'] is not None:
+                    行['去年面积_亩'] = round(当前['去年面积_亩'], 4)
+                    if 当前['去年面积_亩'] <= 0 or 当前['耕地面积_亩'] <= 0:
+                        问题.append(f"批量分析面积为0（去年 {当前['去年面积_亩']:.3f} 亩，今年 {当前['耕地面积_亩']:.3f} 亩）")
+
+                掩码文件 = f"{夹具['名称']}_{模式}.npz"
+                记录 = 基线['结果'].get(夹具['名称'], {}).get(模式)
+                if 更新基线:
+                    if 问题:
+                        # 有问题的结果不记录为基线
+                        行.update({'状态': '失败', '说明': "；".join(问题) + "（未记录基线）"})
+                        continue
+                    _保存掩码(os.path.join(基线目录, 掩码文件), 当前['掩码'])
+                    基线['结果'].setdefault(夹具['名称'], {})[模式] = {
+                        '耕地面积_亩': 当前['耕地面积_亩'], '掩码': 掩码文件,
+                        '耗时_秒': 当前['耗时_秒'], 'MPix每秒': 当前['MPix每秒'],
+                    }
+                    行['状态'] = '已更新'
+                    continue
+                if 记录 is None:
+                    行['状态'] = '失败' if 问题 else '新增'
+                    if 问题:
+                        行['说明'] = "；".join(问题)
+                    continue
+
+                面积差 = 当前['耕地面积_亩'] - 记录['耕地面积_亩']
+                面积差比例 = 面积差 / 记录['耕地面积_亩'] if 记录['耕地面积_亩'] else (0.0 if 面积差 == 0 else float('inf'))
+                对比 = 掩码对比(当前['掩码'], _读取掩码(os.path.join(基线目录, 记录['掩码'])))
+                速度比 = (当前['MPix每秒'] / 记录['MPix每秒']) if 当前['MPix每秒'] and 记录.get('MPix每秒') else None
+                行.update({
+                    '基线面积_亩': round(记录['耕地面积_亩'], 4),
+                    '面积差_亩': round(面积差, 4),
+                    '面积差比例': round(面积差比例, 6),
+                    'IoU_基线': round(对比['IoU'], 6),
+                    '不一致像素': 对比['不一致像素'],
+                    '基线MPix每秒': 记录.get('MPix每秒'),
+                    '速度比': None if 速度比 is None else round(速度比, 3),
+                })
+
+                if abs(面积差) > 面积容差_亩 and abs(面积差比例) > 面积容差_比例:
+                    问题.append(f"面积变化 {面积差:+.4f} 亩")
+                if 对比['IoU'] < 掩码IoU下限:
+                    问题.append(f"掩码IoU {对比['IoU']:.5f}")
+                if 速度容差 is not None and 速度比 is not None and 速度比 < 1 - 速度容差:
+                    问题.append(f"吞吐量降为 {速度比:.2f}x")
+                行['状态'] = '失败' if 问题 else '通过'
+                if 问题:
+                    行['说明'] = "；".join(问题)
+    finally:
+        shutil.rmtree(临时目录, ignore_errors=True)
+
+    if 更新基线:
+        基线.update(版本)
+        基线['时间'] = time.strftime('%Y-%m-%d %H:%M:%S')
+        with open(基线路径, 'w', encoding='utf-8') as f:
+            json.dump(基线, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 基线已更新: {基线路径}")
+
+    return 行列表
+
+
+def 打印报告(行列表: List[Dict]):
+    """精度差异与吞吐量并排显示"""
+    图标 = {'通过': '✅', '失败': '❌', '错误': '💥', '跳过': '⏭️', '新增': '🆕', '已更新': '💾'}
+    print("\n" + "=" * 110)
+    print(f"{'':3}{'夹具':<14}{'模式':<8}{'面积(亩)':>12}{'基线(亩)':>12}{'差(亩)':>10}"
+          f"{'IoU基线':>10}{'IoU真值':>10}{'MPix/s':>9}{'基线':>9}{'速度比':>8}")
+    print("-" * 110)
+
+    def 格式(值, 宽, 精度):
+        return f"{值:>{宽}.{精度}f}" if isinstance(值, (int, float)) else f"{'-':>{宽}}"
+
+    for 行 in 行列表:
+        print(f"{图标.get(行['状态'], ''):3}{行['夹具']:<14}{行['模式']:<8}"
+              f"{格式(行.get('面积_亩'), 12, 3)}{格式(行.get('基线面积_亩'), 12, 3)}"
+              f"{格式(行.get('面积差_亩'), 10, 4)}{格式(行.get('IoU_基线'), 10, 5)}"
+              f"{格式(行.get('IoU_真值'), 10, 4)}{格式(行.get('MPix每秒'), 9, 2)}"
+              f"{格式(行.get('基线MPix每秒'), 9, 2)}{格式(行.get('速度比'), 8, 2)}"
+              + (f"  {行['说明']}" if 行.get('说明') else ""))
+    print("=" * 110)
+    计数 = {}
+    for 行 in 行列表:
+        计数[行['状态']] = 计数.get(行['状态'], 0) + 1
+    print("  ".join(f"{状态}: {数量}" for 状态, 数量 in 计数.items()))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    解析器 = argparse.ArgumentParser(description="耕地分析回归测试（面积/掩码黄金输出 + 吞吐量）")
+    解析器.add_argument('--更新基线', action='store_true')
+    解析器.add_argument('--模型', default=None)
+    解析器.add_argument('--模式', nargs='+', choices=全部模式, default=None)
+    解析器.add_argument('--基线目录', default=默认基线目录)
+    解析器.add_argument('--数据目录', default="基准数据")
+    解析器.add_argument('--速度容差', type=float, default=None, help="吞吐量下降超过该比例也判为失败")
+    解析器.add_argument('--报告', default=None, help="把结果另存为JSON")
+    参数 = 解析器.parse_args()
+
+    行列表 = 运行回归(参数.基线目录, 参数.数据目录, 参数.模型, 参数.模式, 参数.更新基线, 参数.速度容差)
+    打印报告(行列表)
+    if 参数.报告:
+        with open(参数.报告, 'w', encoding='utf-8') as f:
+            json.dump({**基准测试套件._版本信息(), '结果': 行列表}, f, ensure_ascii=False, indent=2)
+    sys.exit(1 if any(行['状态'] in ('失败', '错误') for 行 in 行列表) else 0)
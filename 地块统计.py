@@ -0,0 +1,251 @@
+"""
+地块分区统计模块
+把Shapefile地块编号一次性栅格化为int32分块GeoTIFF标签图（与影像像素网格对齐），
+之后按窗口流式读取标签图和耕地掩码，用一次 np.bincount 同时统计每个地块的
+地块像素数、耕地像素数、新增和减少像素数，结果与地块属性表连接，可支持10万以上地块
+"""
+
+import os
+import sys
+import json
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import rasterio
+from rasterio.features import rasterize
+from rasterio.windows import Window, bounds as 窗口范围, transform as 窗口变换
+from shapely.geometry import box
+from contextlib import ExitStack
+from typing import Union
+
+from 详细变化统计 import 计算变化类别图, 类别_稳定, 类别_新增, 类别_减少
+
+默认块尺寸 = 1024  # 标签图内部块为256，窗口取其整数倍
+
+
+def _读取地块(shp路径: str, crs) -> gpd.GeoDataFrame:
+    地块 = gpd.read_file(shp路径)
+    if 地块.crs is not None and crs is not None and 地块.crs != crs:
+        地块 = 地块.to_crs(crs)
+    return 地块.reset_index(drop=True)
+
+
+def 构建地块标签图(shp路径: str,
+            参考tif路径: str,
+            输出路径: str,
+            块尺寸: int = 默认块尺寸,
+            强制重建: bool = False) -> str:
+    """
+    把地块栅格化为标签图（地块编号 = 属性表行号 + 1，0为不属于任何地块）
+
+    按窗口栅格化，每个窗口只处理与之相交的地块（空间索引查询），内存只与窗口大小有关；
+    Shapefile和参考影像未变化时直接复用已有的标签图
+
+    参数:
+        shp路径: 地块Shapefile
+        参考tif路径: 提供像素网格（坐标系、变换、尺寸）的影像
+        输出路径: 标签图路径(.tif)
+        块尺寸: 栅格化窗口大小
+        强制重建: 忽略已有标签图
+
+    返回:
+        标签图路径
+    """
+    记录路径 = 输出路径 + ".json"
+    记录 = {
+        'shp': os.path.abspath(shp路径),
+        'shp修改时间': os.path.getmtime(shp路径),
+        '参考影像': os.path.abspath(参考tif路径),
+        '参考影像修改时间': os.path.getmtime(参考tif路径),
+    }
+    if not 强制重建 and os.path.exists(输出路径) and os.path.exists(记录路径):
+        with open(记录路径, 'r', encoding='utf-8') as f:
+            if json.load(f) == 记录:
+                print(f"✅ 复用地块标签图: {输出路径}")
+                return 输出路径
+
+    with rasterio.open(参考tif路径) as src:
+        crs, transform, 宽, 高 = src.crs, src.transform, src.width, src.height
+
+    地块 = _读取地块(shp路径, crs)
+    print(f"🗺️ 栅格化 {len(地块)} 个地块 -> {os.path.basename(输出路径)} ({宽}x{高})")
+
+    配置 = {
+        'driver': 'GTiff', 'dtype': 'int32', 'count': 1, 'nodata': 0,
+        'width': 宽, 'height': 高, 'crs': crs, 'transform': transform,
+        'tiled': True, 'blockxsize': 256, 'blockysize': 256,
+        'compress': 'deflate', 'BIGTIFF': 'IF_SAFER',
+    }
+    空间索引 = 地块.sindex
+    几何 = 地块.geometry.values
+
+    os.makedirs(os.path.dirname(os.path.abspath(输出路径)), exist_ok=True)
+    with rasterio.open(输出路径, 'w', **配置) as dst:
+        for y in range(0, 高, 块尺寸):
+            for x in range(0, 宽, 块尺寸):
+                窗口 = Window(x, y, min(块尺寸, 宽 - x), min(块尺寸, 高 - y))
+                序号 = 空间索引.query(box(*窗口范围(窗口, transform)))
+                if len(序号) == 0:
+                    continue
+                # 重叠地块以行号较大者为准
+                序号 = np.sort(序号)
+                标签 = rasterize(
+                    ((几何[i], int(i) + 1) for i in 序号 if 几何[i] is not None and not 几何[i].is_empty),
+                    out_shape=(int(窗口.height), int(窗口.width)),
+                    transform=窗口变换(窗口, transform),
+                    fill=0,
+                    dtype='int32'
+                )
+                dst.write(标签, 1, window=窗口)
+
+    with open(记录路径, 'w', encoding='utf-8') as f:
+        json.dump(记录, f, ensure_ascii=False, indent=2)
+    print(f"✅ 地块标签图已保存: {输出路径}")
+    return 输出路径
+
+
+def _读取掩码窗口(掩码: Union[np.ndarray, str, None], 窗口: Window):
+    """掩码可以是与标签图对齐的数组（含np.memmap）或已打开的单波段栅格"""
+    if 掩码 is None:
+        return None
+    if hasattr(掩码, 'read'):
+        return 掩码.read(1, window=窗口)
+    y, x = int(窗口.row_off), int(窗口.col_off)
+    return 掩码[y:y + int(窗口.height), x:x + int(窗口.width)]
+
+
+def 统计地块像素(标签图路径: str,
+           今年掩码: Union[np.ndarray, str],
+           去年掩码: Union[np.ndarray, str],
+           地块数: int,
+           块尺寸: int = 默认块尺寸) -> np.ndarray:
+    """
+    流式统计每个地块各变化类别的像素数
+
+    每个窗口计算变化类别图，对 标签*4+类别 做一次bincount，
+    一遍得到所有地块的 非耕地/稳定/新增/减少 像素数
+
+    参数:
+        标签图路径: 构建地块标签图 的输出
+        今年掩码: 今年耕地掩码（>0.5为耕地）
+        去年掩码: 去年耕地掩码（为None时全部视为去年非耕地）
+        地块数: 地块数量
+        块尺寸: 窗口大小
+
+    返回:
+        (地块数+1, 4) int64，行为地块编号（0为地块外），列为变化类别
+    """
+    计数 = np.zeros((地块数 + 1) * 4, dtype=np.int64)
+
+    with ExitStack() as 栈:
+        标签源 = 栈.enter_context(rasterio.open(标签图路径))
+        今年掩码, 去年掩码 = (栈.enter_context(rasterio.open(m)) if isinstance(m, str) else m
+                        for m in (今年掩码, 去年掩码))
+        宽, 高 = 标签源.width, 标签源.height
+        for y in range(0, 高, 块尺寸):
+            for x in range(0, 宽, 块尺寸):
+                窗口 = Window(x, y, min(块尺寸, 宽 - x), min(块尺寸, 高 - y))
+                标签 = 标签源.read(1, window=窗口)
+                if not 标签.any():
+                    continue
+
+                今年 = _读取掩码窗口(今年掩码, 窗口)
+                去年 = _读取掩码窗口(去年掩码, 窗口)
+                if 去年 is None:
+                    去年 = np.zeros(今年.shape, dtype=np.uint8)
+                类别 = 计算变化类别图(去年, 今年)
+
+                计数 += np.bincount((标签.astype(np.int64) * 4 + 类别).ravel(), minlength=计数.size)
+
+    return 计数.reshape(-1, 4)
+
+
+def 地块统计表(地块: gpd.GeoDataFrame, 像素计数: np.ndarray, 像素面积_亩: float,
+          有去年: bool = True) -> pd.DataFrame:
+    """
+    把像素计数与地块属性表连接
+
+    返回:
+        每个地块一行：原属性 + 地块编号、地块面积、耕地面积、耕地比例（有去年时再加 稳定/新增/减少/净变化）
+    """
+    地块数 = len(地块)
+    计数 = 像素计数[1:地块数 + 1]
+
+    地块像素数 = 计数.sum(axis=1)
+    今年像素数 = 计数[:, 类别_稳定] + 计数[:, 类别_新增]
+
+    表 = pd.DataFrame(地块.drop(columns=地块.geometry.name))
+    表['地块编号'] = np.arange(1, 地块数 + 1)
+    表['地块像素数'] = 地块像素数
+    表['地块面积_亩'] = 地块像素数 * 像素面积_亩
+    表['耕地像素数'] = 今年像素数
+    表['耕地面积_亩'] = 今年像素数 * 像素面积_亩
+    表['耕地比例'] = np.where(地块像素数 > 0, 今年像素数 / np.maximum(地块像素数, 1), 0.0)
+
+    if 有去年:
+        去年像素数 = 计数[:, 类别_稳定] + 计数[:, 类别_减少]
+        表['去年耕地面积_亩'] = 去年像素数 * 像素面积_亩
+        表['稳定面积_亩'] = 计数[:, 类别_稳定] * 像素面积_亩
+        表['新增面积_亩'] = 计数[:, 类别_新增] * 像素面积_亩
+        表['减少面积_亩'] = 计数[:, 类别_减少] * 像素面积_亩
+        表['净变化_亩'] = (今年像素数 - 去年像素数) * 像素面积_亩
+
+    return 表
+
+
+def 地块分区统计(shp路径: str,
+           参考tif路径: str,
+           今年掩码: Union[np.ndarray, str],
+           去年掩码: Union[np.ndarray, str] = None,
+           输出目录: str = ".",
+           块尺寸: int = 默认块尺寸) -> pd.DataFrame:
+    """
+    按地块统计耕地面积和变化，结果保存为CSV
+
+    参数:
+        shp路径: 地块Shapefile（如 通北局种植作物.shp）
+        参考tif路径: 今年影像（掩码与其像素网格一致）
+        今年掩码: 今年耕地掩码数组或栅格路径
+        去年掩码: 去年耕地掩码数组或栅格路径（已对齐到今年影像网格，可选）
+        输出目录: 标签图和统计表的保存目录
+        块尺寸: 窗口大小
+
+    返回:
+        地块统计表
+    """
+    影像名 = os.path.splitext(os.path.basename(参考tif路径))[0]
+    标签图路径 = 构建地块标签图(
+        shp路径, 参考tif路径,
+        os.path.join(输出目录, f"地块标签_{影像名}.tif"),
+        块尺寸
+    )
+
+    with rasterio.open(参考tif路径) as src:
+        crs = src.crs
+        像素面积_亩 = abs(src.transform.a) * abs(src.transform.e) / 666.67
+
+    地块 = _读取地块(shp路径, crs)
+    print(f"📊 统计 {len(地块)} 个地块...")
+    像素计数 = 统计地块像素(标签图路径, 今年掩码, 去年掩码, len(地块), 块尺寸)
+    表 = 地块统计表(地块, 像素计数, 像素面积_亩, 有去年=去年掩码 is not None)
+
+    输出路径 = os.path.join(输出目录, f"地块统计_{影像名}.csv")
+    表.to_csv(输出路径, index=False, encoding='utf-8-sig')
+    print(f"📄 地块统计已保存: {输出路径}")
+    print(f"   有耕地的地块: {int((表['耕地像素数'] > 0).sum())}/{len(表)}，"
+          f"耕地合计 {表['耕地面积_亩'].sum():.3f} 亩")
+    if 去年掩码 is not None:
+        print(f"   新增 {表['新增面积_亩'].sum():.3f} 亩，减少 {表['减少面积_亩'].sum():.3f} 亩")
+    return 表
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 4:
+        print("用法: python 地块统计.py <地块.shp> <今年影像.tif> <今年掩码.tif> [去年掩码.tif] [输出目录]")
+        sys.exit(1)
+
+    地块分区统计(
+        sys.argv[1], sys.argv[2], sys.argv[3],
+        sys.argv[4] if len(sys.argv) > 4 and sys.argv[4] else None,
+        sys.argv[5] if len(sys.argv) > 5 else "."
+    )
@@ -0,0 +1,451 @@
+"""
+基准测试套件
+生成带地理参考的合成RGB影像（已知耕地地块多边形），在多个尺寸（1k² ~ 40k²）上分别计时
+裁剪、匹配和引擎的大图识别（耕地分析系统.使用模型预测耕地_大图，无去年数据 / 以去年掩码增量识别），
+大图识别另按引擎的性能剖析阶段（读取、颜色规则识别、合并、形态学、面积计算等）分项计时，
+结果保存为JSON，用于对比不同提交之间的性能回归
+
+合成数据只由 尺寸 + 随机种子 决定，第一次生成后保存在数据目录中复用；
+耕地颜色与颜色规则的阈值留有余量，面积核算结果可以与真值地块面积比较
+
+用法:
+    python 基准测试套件.py [--尺寸 1000 4000 10000] [--重复 3] [--阶段 大图识别 增量识别]
+    python 基准测试套件.py --对比 旧结果.json 新结果.json [--容差 0.1]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import subprocess
+import tempfile
+import numpy as np
+import rasterio
+import geopandas as gpd
+from rasterio.transform import from_origin
+from rasterio.features import rasterize
+from rasterio.windows import Window
+from shapely.geometry import box
+from shapely.affinity import rotate, affine_transform
+from typing import Dict, List
+
+# ==================== 配置 ====================
+
+默认尺寸 = [1000, 4000, 10000, 20000, 40000]
+默认种子 = 20250422
+数据版本 = 1  # 合成数据生成方式变化时加1，旧数据自动重新生成
+
+像元大小 = 0.1                  # 米
+坐标系 = 'EPSG:32652'           # UTM 52N
+原点 = (600000.0, 5400000.0)    # 左上角投影坐标
+地块网格 = 400                  # 像素，每个网格单元最多一个地块
+黑边宽度比例 = 0.02             # 左侧无数据黑边
+条带行数 = 1024                 # 生成影像时每次写出的行数
+
+裁剪尺寸 = 1000
+裁剪重叠 = 100
+矢量面积上限 = 10000            # 超过该尺寸不做矢量面积核算（矢量化耗时过长）
+去年缺失地块间隔 = 7            # 增量识别的去年掩码：每7个地块去掉1个（今年新增）
+
+全部阶段 = ["裁剪", "匹配", "大图识别", "增量识别"]
+
+# 地块颜色（RGB均值）与噪声幅度：棕色 R-B=60、绿色 G-R=60，背景灰色色差<10
+_颜色 = {
+    0: (118, 120, 122),  # 背景
+    1: (140, 110, 80),   # 棕色耕地
+    2: (70, 130, 60),    # 绿色耕地
+}
+_噪声幅度 = 6
+
+
+# ==================== 合成数据 ====================
+
+def _生成地块(尺寸: int, 随机数: np.random.Generator) -> gpd.GeoDataFrame:
+    """在网格上生成随机大小、轻微旋转的矩形地块（地理坐标），不进入黑边"""
+    黑边 = int(尺寸 * 黑边宽度比例)
+    像素到地理 = [像元大小, 0, 0, -像元大小, 原点[0], 原点[1]]
+    影像范围 = box(黑边, 0, 尺寸, 尺寸)
+
+    几何, 类型 = [], []
+    for 行 in range(0, 尺寸, 地块网格):
+        for 列 in range(0, 尺寸, 地块网格):
+            if 随机数.random() < 0.35:
+                continue  # 该网格单元不是耕地
+            宽 = 随机数.uniform(0.4, 0.9) * 地块网格
+            高 = 随机数.uniform(0.4, 0.9) * 地块网格
+            中心x = 列 + 地块网格 / 2 + 随机数.uniform(-0.05, 0.05) * 地块网格
+            中心y = 行 + 地块网格 / 2 + 随机数.uniform(-0.05, 0.05) * 地块网格
+            地块 = rotate(box(中心x - 宽 / 2, 中心y - 高 / 2, 中心x + 宽 / 2, 中心y + 高 / 2),
+                        随机数.uniform(-15, 15), origin='center')
+            地块 = 地块.intersection(影像范围)
+            if 地块.is_empty or 地块.area < 1:
+                continue
+            几何.append(affine_transform(地块, 像素到地理))
+            类型.append(int(随机数.integers(1, 3)))
+
+    return gpd.GeoDataFrame({'类型': 类型}, geometry=几何, crs=坐标系)
+
+
+def 生成合成影像(尺寸: int, 数据目录: str, 种子: int = 默认种子, 强制: bool = False) -> Dict:
+    """
+    生成 尺寸x尺寸 的合成RGB GeoTIFF（分块+deflate压缩）和真值地块
+
+    参数:
+        尺寸: 边长（像素）
+        数据目录: 保存目录
+        种子: 随机种子（相同的尺寸和种子生成完全相同的数据）
+        强制: 忽略已有数据重新生成
+
+    返回:
+        {'影像', '地块', '尺寸', '种子', '地块数', '真值面积_平方米'}
+    """
+    os.makedirs(数据目录, exist_ok=True)
+    前缀 = os.path.join(数据目录, f"合成_{尺寸}_{种子}")
+    信息路径 = 前缀 + ".json"
+    if not 强制 and os.path.exists(信息路径):
+        with open(信息路径, 'r', encoding='utf-8') as f:
+            信息 = json.load(f)
+        if 信息.get('版本') == 数据版本 and os.path.exists(信息['影像']) and os.path.exists(信息['地块']):
+            return 信息
+
+    print(f"🧪 生成合成影像 {尺寸}x{尺寸}（种子 {种子}）...")
+    随机数 = np.random.default_rng([种子, 尺寸])
+    地块 = _生成地块(尺寸, 随机数)
+    变换 = from_origin(原点[0], 原点[1], 像元大小, 像元大小)
+    黑边 = int(尺寸 * 黑边宽度比例)
+    颜色表 = np.array([_颜色[k] for k in sorted(_颜色)], dtype=np.int16)  # 类型 -> RGB
+
+    配置 = {
+        'driver': 'GTiff', 'dtype': 'uint8', 'count': 3, 'width': 尺寸, 'height': 尺寸,
+        'crs': 坐标系, 'transform': 变换, 'nodata': 0,
+        'tiled': True, 'blockxsize': 512, 'blockysize': 512,
+        'compress': 'deflate', 'BIGTIFF': 'IF_SAFER',
+    }
+    空间索引 = 地块.sindex
+    影像路径 = 前缀 + ".tif"
+    with rasterio.open(影像路径, 'w', **配置) as dst:
+        for y in range(0, 尺寸, 条带行数):
+            行数 = min(条带行数, 尺寸 - y)
+            窗口 = Window(0, y, 尺寸, 行数)
+            条带范围 = box(*rasterio.windows.bounds(窗口, 变换))
+            序号 = 空间索引.query(条带范围)
+            类型图 = np.zeros((行数, 尺寸), dtype=np.uint8)
+            if len(序号):
+                类型图 = rasterize(
+                    ((地块.geometry.iloc[i], int(地块['类型'].iloc[i])) for i in 序号),
+                    out_shape=(行数, 尺寸), transform=rasterio.windows.transform(窗口, 变换),
+                    fill=0, dtype='uint8'
+                )
+            # 每个条带使用独立的随机数流，条带生成顺序不影响结果
+            噪声源 = np.random.default_rng([种子, 尺寸, y])
+            数据 = np.empty((3, 行数, 尺寸), dtype=np.uint8)
+            for 波段 in range(3):
+                噪声 = 噪声源.integers(-_噪声幅度, _噪声幅度 + 1, size=(行数, 尺寸), dtype=np.int16)
+                np.clip(颜色表[类型图, 波段] + 噪声, 1, 255, out=噪声)
+                数据[波段] = 噪声
+            数据[:, :, :黑边] = 0
+            dst.write(数据, window=窗口)
+
+    地块路径 = 前缀 + "_地块.gpkg"
+    地块.to_file(地块路径, driver='GPKG')
+
+    信息 = {
+        '版本': 数据版本,
+        '影像': os.path.abspath(影像路径),
+        '地块': os.path.abspath(地块路径),
+        '尺寸': 尺寸,
+        '种子': 种子,
+        '地块数': len(地块),
+        '真值面积_平方米': float(地块.area.sum()),
+    }
+    with open(信息路径, 'w', encoding='utf-8') as f:
+        json.dump(信息, f, ensure_ascii=False, indent=2)
+    print(f"✅ 已生成: {影像路径}（{len(地块)} 个地块，真值面积 {信息['真值面积_平方米'] / 666.67:.1f} 亩）")
+    return 信息
+
+
+# ==================== 计时 ====================
+
+class _计时器:
+    """多次重复取最小值；同一阶段在一次重复中可以多次累加（如逐窗口计时）"""
+
+    def __init__(self):
+        self.本次: Dict[str, float] = {}
+        self.全部: Dict[str, List[float]] = {}
+
+    def 累加(self, 阶段: str, 秒: float):
+        self.本次[阶段] = self.本次.get(阶段, 0.0) + 秒
+
+    def 结束一次(self):
+        for 阶段, 秒 in self.本次.items():
+            self.全部.setdefault(阶段, []).append(秒)
+        self.本次 = {}
+
+    def 汇总(self, 像素数: int) -> Dict:
+        return {
+            阶段: {
+                '秒': round(min(列表), 4),
+                '中位数_秒': round(float(np.median(列表)), 4),
+                '重复': len(列表),
+                'MPix每秒': round(像素数 / 1e6 / min(列表), 2) if min(列表) > 0 else None,
+            }
+            for 阶段, 列表 in self.全部.items()
+        }
+
+
+def _运行一次(系统, 信息: Dict, 阶段集: set, 计时: _计时器, 临时目录: str) -> Dict:
+    """按顺序运行一遍各阶段，返回面积等结果"""
+    tif路径 = 信息['影像']
+    结果 = {}
+
+    if {"裁剪", "匹配"} & 阶段集:
+        系统.输出目录 = os.path.join(临时目录, "裁剪")
+        开始 = time.perf_counter()
+        裁剪块 = 系统.裁剪图像并保留地理信息(tif路径, 裁剪尺寸, 裁剪重叠)
+        计时.累加("裁剪", time.perf_counter() - 开始)
+        shutil.rmtree(系统.输出目录, ignore_errors=True)
+
+        if "匹配" in 阶段集:
+            # 第二期裁剪块：同一网格整体平移约半个裁剪块
+            偏移经度 = (裁剪块[0]['经纬度_右下角'][0] - 裁剪块[0]['经纬度_左上角'][0]) / 2
+            偏移纬度 = (裁剪块[0]['经纬度_左上角'][1] - 裁剪块[0]['经纬度_右下角'][1]) / 3
+            第二期 = [{**块,
+                     '经纬度_左上角': (块['经纬度_左上角'][0] + 偏移经度, 块['经纬度_左上角'][1] - 偏移纬度),
+                     '经纬度_右下角': (块['经纬度_右下角'][0] + 偏移经度, 块['经纬度_右下角'][1] - 偏移纬度)}
+                    for 块 in 裁剪块]
+            开始 = time.perf_counter()
+            匹配 = 系统._匹配裁剪块(裁剪块, 第二期, 0.3)
+            计时.累加("匹配", time.perf_counter() - 开始)
+            结果['裁剪块数'] = len(裁剪块)
+            结果['匹配数'] = len(匹配)
+
+    if not {"大图识别", "增量识别"} & 阶段集:
+        return 结果
+
+    with rasterio.open(tif路径) as src:
+        形状, 变换 = (src.height, src.width), src.transform
+    面积模式 = "矢量" if 形状[1] <= 矢量面积上限 else "像素"
+
+    if "大图识别" in 阶段集:
+        引擎结果 = _计时引擎(系统, 计时, "大图识别", tif路径, 面积模式=面积模式)
+        结果['大图识别面积_平方米'] = 引擎结果['耕地面积_平方米']
+
+    if "增量识别" in 阶段集:
+        # 去年掩码：真值地块去掉每 去年缺失地块间隔 个中的一个（今年新增）
+        几何 = [g for i, g in enumerate(gpd.read_file(信息['地块']).geometry) if i % 去年缺失地块间隔 != 0]
+        去年掩码 = rasterize(((g, 1) for g in 几何), out_shape=形状, transform=变换, dtype='uint8') \
+            if 几何 else np.zeros(形状, dtype=np.uint8)
+        引擎结果 = _计时引擎(系统, 计时, "增量识别", tif路径, 去年掩码=去年掩码, 面积模式=面积模式)
+        del 去年掩码
+
+        真值 = 信息['真值面积_平方米']
+        像素面积 = 引擎结果.get('像素计数面积_平方米', 引擎结果['耕地面积_平方米'])
+        结果['像素面积_平方米'] = 像素面积
+        结果['像素面积误差'] = 像素面积 / 真值 - 1 if 真值 else None
+        if 引擎结果['面积模式'] == "矢量":
+            结果['矢量面积_平方米'] = 引擎结果['耕地面积_平方米']
+            结果['矢量面积误差'] = 引擎结果['耕地面积_平方米'] / 真值 - 1 if 真值 else None
+
+    return 结果
+
+
+def _计时引擎(系统, 计时: _计时器, 名称: str, tif路径: str, **参数) -> Dict:
+    """
+    运行一次 耕地分析系统.使用模型预测耕地_大图（_预测大图 + 内存预算），不使用结果缓存
+
+    总耗时记为 名称，引擎内部各阶段（性能剖析.阶段 的计时）记为 名称/阶段名；引擎日志不输出
+
+    返回:
+        引擎结果字典
+    """
+    import contextlib
+    import 性能剖析
+
+    原值 = os.environ.get(性能剖析.环境变量)
+    os.environ[性能剖析.环境变量] = 系统.输出目录  # 开启剖析，报告写到临时目录
+    try:
+        with open(os.devnull, 'w') as 空, contextlib.redirect_stdout(空):
+            with 性能剖析.运行("基准") as 剖析:
+                开始 = time.perf_counter()
+                引擎结果 = 系统.使用模型预测耕地_大图(tif路径, 使用缓存=False, **参数)
+                计时.累加(名称, time.perf_counter() - 开始)
+    finally:
+        if 原值 is None:
+            os.environ.pop(性能剖析.环境变量, None)
+        else:
+            os.environ[性能剖析.环境变量] = 原值
+
+    # 路径为 (基准, 使用模型预测耕地_大图, 阶段名)
+    for 路径, (秒, _) in 剖析.耗时.items():
+        if len(路径) == 3:
+            计时.累加(f"{名称}/{路径[2]}", 秒)
+    return 引擎结果
+
+
+def 运行基准(尺寸列表: List[int] = None,
+         数据目录: str = "基准数据",
+         重复: int = 1,
+         阶段列表: List[str] = None,
+         种子: int = 默认种子) -> Dict:
+    """
+    在每个尺寸上运行基准测试
+
+    参数:
+        尺寸列表: 合成影像边长列表（默认 1000 ~ 40000）
+        数据目录: 合成数据目录
+        重复: 每个尺寸重复次数（各阶段取最小值）
+        阶段列表: 只运行这些阶段（默认全部）
+        种子: 随机种子
+
+    返回:
+        基准结果字典（可直接保存为JSON）
+    """
+    from 耕地分析系统 import 耕地分析系统
+    from 内存预算 import 峰值RSS, MB
+
+    尺寸列表 = 尺寸列表 or 默认尺寸
+    阶段集 = set(阶段列表 or 全部阶段)
+
+    结果 = {
+        '版本': 2,
+        '时间': time.strftime('%Y-%m-%d %H:%M:%S'),
+        **_版本信息(),
+        '环境': _环境信息(),
+        '参数': {'种子': 种子, '重复': 重复, '阶段': sorted(阶段集),
+               '裁剪尺寸': 裁剪尺寸, '裁剪重叠': 裁剪重叠},
+        '结果': {},
+    }
+
+    for 尺寸 in 尺寸列表:
+        信息 = 生成合成影像(尺寸, 数据目录, 种子)
+        print(f"\n⏱️ 基准测试 {尺寸}x{尺寸}（重复 {重复} 次）")
+        计时 = _计时器()
+        临时目录 = tempfile.mkdtemp(prefix="基准_")
+        try:
+            系统 = 耕地分析系统(输出目录=临时目录)
+            for _ in range(重复):
+                面积结果 = _运行一次(系统, 信息, 阶段集, 计时, 临时目录)
+                计时.结束一次()
+        finally:
+            shutil.rmtree(临时目录, ignore_errors=True)
+
+        结果['结果'][str(尺寸)] = {
+            '阶段': 计时.汇总(尺寸 * 尺寸),
+            '地块数': 信息['地块数'],
+            '真值面积_平方米': 信息['真值面积_平方米'],
+            **面积结果,
+            '峰值RSS_MB': round(峰值RSS() / MB, 1),
+        }
+        for 阶段, 项 in 结果['结果'][str(尺寸)]['阶段'].items():
+            print(f"   {阶段:<8} {项['秒']:9.3f}s  {项['MPix每秒'] or 0:8.2f} MPix/s")
+        if '像素面积误差' in 面积结果:
+            print(f"   面积误差: 像素 {面积结果['像素面积误差'] * 100:+.3f}%"
+                  + (f"，矢量 {面积结果['矢量面积误差'] * 100:+.3f}%" if '矢量面积误差' in 面积结果 else ""))
+
+    return 结果
+
+
+# ==================== 结果保存与对比 ====================
+
+def _版本信息() -> Dict:
+    """当前git提交（不在git仓库中时为None）"""
+    目录 = os.path.dirname(os.path.abspath(__file__))
+
+    def git(*参数):
+        try:
+            return subprocess.run(['git', *参数], cwd=目录, capture_output=True, text=True,
+                                  timeout=10).stdout.strip() or None
+        except (OSError, subprocess.SubprocessError):
+            return None
+
+    return {
+        '提交': git('rev-parse', 'HEAD'),
+        '分支': git('rev-parse', '--abbrev-ref', 'HEAD'),
+        '有未提交修改': bool(git('status', '--porcelain', '--untracked-files=no')),
+    }
+
+
+def _环境信息() -> Dict:
+    import cv2
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'opencv': cv2.__version__,
+        'rasterio': rasterio.__version__,
+        '平台': platform.platform(),
+        '处理器': platform.processor() or platform.machine(),
+        'CPU核数': os.cpu_count(),
+    }
+
+
+def 保存结果(结果: Dict, 结果目录: str = "基准结果") -> str:
+    os.makedirs(结果目录, exist_ok=True)
+    提交 = (结果.get('提交') or 'nogit')[:7]
+    路径 = os.path.join(结果目录, f"基准_{time.strftime('%Y%m%d_%H%M%S')}_{提交}.json")
+    with open(路径, 'w', encoding='utf-8') as f:
+        json.dump(结果, f, ensure_ascii=False, indent=2)
+    print(f"\n📄 基准结果已保存: {路径}")
+    return 路径
+
+
+def 对比结果(旧路径: str, 新路径: str, 容差: float = 0.10) -> List[Dict]:
+    """
+    对比两次基准结果（同尺寸同阶段的最小耗时）
+
+    参数:
+        容差: 新耗时超过旧耗时 (1+容差) 倍视为回归
+
+    返回:
+        回归列表 [{'尺寸', '阶段', '旧_秒', '新_秒', '倍数'}]
+    """
+    with open(旧路径, 'r', encoding='utf-8') as f:
+        旧 = json.load(f)
+    with open(新路径, 'r', encoding='utf-8') as f:
+        新 = json.load(f)
+
+    print(f"📊 对比: {(旧.get('提交') or '?')[:7]} -> {(新.get('提交') or '?')[:7]}（容差 {容差 * 100:.0f}%）")
+    if 旧.get('环境', {}).get('平台') != 新.get('环境', {}).get('平台'):
+        print("⚠️  两次结果的运行平台不同，耗时不能直接比较")
+
+    回归 = []
+    for 尺寸, 新项 in 新['结果'].items():
+        旧项 = 旧['结果'].get(尺寸)
+        if 旧项 is None:
+            continue
+        print(f"\n  {尺寸}x{尺寸}")
+        for 阶段, 新计时 in 新项['阶段'].items():
+            旧计时 = 旧项['阶段'].get(阶段)
+            if 旧计时 is None or not 旧计时['秒']:
+                continue
+            倍数 = 新计时['秒'] / 旧计时['秒']
+            标记 = "❌" if 倍数 > 1 + 容差 else ("✅" if 倍数 < 1 - 容差 else "  ")
+            print(f"   {标记} {阶段:<8} {旧计时['秒']:9.3f}s -> {新计时['秒']:9.3f}s  ({倍数:.2f}x)")
+            if 倍数 > 1 + 容差:
+                回归.append({'尺寸': int(尺寸), '阶段': 阶段, '旧_秒': 旧计时['秒'],
+                           '新_秒': 新计时['秒'], '倍数': round(倍数, 3)})
+
+    print(f"\n{'❌ 发现 %d 项性能回归' % len(回归) if 回归 else '✅ 无性能回归'}")
+    return 回归
+
+
+if __name__ == "__main__":
+    import argparse
+
+    解析器 = argparse.ArgumentParser(description="耕地分析基准测试（合成GeoTIFF）")
+    解析器.add_argument('--尺寸', type=int, nargs='+', default=None, help="影像边长（默认 1000 4000 10000 20000 40000）")
+    解析器.add_argument('--重复', type=int, default=1)
+    解析器.add_argument('--阶段', nargs='+', choices=全部阶段, default=None)
+    解析器.add_argument('--种子', type=int, default=默认种子)
+    解析器.add_argument('--数据目录', default="基准数据")
+    解析器.add_argument('--结果目录', default="基准结果")
+    解析器.add_argument('--对比', nargs=2, metavar=('旧结果', '新结果'), default=None)
+    解析器.add_argument('--容差', type=float, default=0.10)
+    参数 = 解析器.parse_args()
+
+    if 参数.对比:
+        sys.exit(1 if 对比结果(*参数.对比, 容差=参数.容差) else 0)
+
+    结果 = 运行基准(参数.尺寸, 参数.数据目录, 参数.重复, 参数.阶段, 参数.种子)
+    保存结果(结果, 参数.结果目录)
@@ -0,0 +1,283 @@
+"""
+并行样本提取模块
+每个TIF一个工作进程，独立读取该TIF范围内的标注并采样，
+结果直接写成各自的样本分片（或放入有界队列供训练消费），父进程只合并清单
+"""
+
+import os
+import queue
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List
+
+import numpy as np
+
+from 训练样本分片 import 分片写入器, 写入清单
+
+# 队列模式中工作进程结束的标记
+_结束标记 = None
+
+# 队列模式中等待样本的超时（秒），超时后检查工作进程是否异常退出
+队列等待_秒 = 5.0
+
+
+def _读取TIF范围标注(tif路径: str, shapefile路径: str):
+    """只读取与TIF范围相交的标注（按外接矩形过滤），每个进程内存只与本TIF相关"""
+    import geopandas as gpd
+    import rasterio
+    from rasterio.warp import transform_bounds
+
+    shp_crs = gpd.read_file(shapefile路径, rows=0).crs
+    with rasterio.open(tif路径) as src:
+        范围 = tuple(src.bounds)
+        if shp_crs is not None and src.crs is not None and shp_crs != src.crs:
+            范围 = transform_bounds(src.crs, shp_crs, *范围)
+
+    return gpd.read_file(shapefile路径, bbox=范围)
+
+
+def _创建样本源(tif路径: str, shapefile路径: str, 目标尺寸: int):
+    """创建单个TIF的样本源，无标注或图像过小时返回None"""
+    from 训练数据流水线 import 样本源
+
+    源 = 样本源(tif路径, 目标尺寸=目标尺寸, gdf=_读取TIF范围标注(tif路径, shapefile路径))
+    if 源.几何数量 == 0 or 源.宽度 < 目标尺寸 or 源.高度 < 目标尺寸:
+        源.关闭()
+        return None
+    return 源
+
+
+def _提取单个TIF(任务: Dict) -> Dict:
+    """
+    工作进程：采样一个TIF并写出分片
+
+    参数:
+        任务: 包含 tif路径 / shapefile路径 / 输出目录 / 目标尺寸 / 每TIF样本数 / 每片样本数 / 种子 / 前缀
+
+    返回:
+        {'来源': 来源统计或None, '分片': 分片信息列表, '错误': 错误信息或None}
+    """
+    from 训练数据流水线 import 配额采样
+
+    tif文件 = os.path.basename(任务['tif路径'])
+    try:
+        源 = _创建样本源(任务['tif路径'], 任务['shapefile路径'], 任务['目标尺寸'])
+        if 源 is None:
+            return {'来源': None, '分片': [], '错误': '该TIF区域无耕地标注或图像过小'}
+
+        写入器 = 分片写入器(任务['输出目录'], 任务['每片样本数'], 前缀=任务['前缀'])
+        类型计数 = {'纯耕地': 0, '混合': 0, '非耕地': 0}
+
+        for x, y, 类型, 标签块 in 配额采样(源, 任务['每TIF样本数'], 任务['种子']):
+            影像 = 源.读取影像(x, y)
+            if 影像.shape[:2] != (任务['目标尺寸'], 任务['目标尺寸']):
+                continue
+            写入器.添加(影像, 标签块, tif文件)
+            类型计数[类型] += 1
+
+        源.关闭()
+        return {
+            '来源': {
+                'tif文件': tif文件,
+                'tif完整路径': 任务['tif路径'],
+                '样本数': sum(类型计数.values()),
+                '类型计数': 类型计数
+            },
+            '分片': 写入器.关闭(),
+            '错误': None
+        }
+    except Exception as e:
+        return {'来源': None, '分片': [], '错误': str(e)}
+
+
+def 默认进程数() -> int:
+    """保留一个核心给主进程"""
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+def 并行导出样本分片(tif列表: List[str],
+                 shapefile路径: str,
+                 输出目录: str,
+                 目标尺寸: int = 256,
+                 每TIF样本数: int = 1500,
+                 每片样本数: int = 256,
+                 种子: int = None,
+                 进程数: int = None) -> str:
+    """
+    多进程提取训练样本分片（与 训练样本分片.导出样本分片 输出格式相同）
+
+    每个工作进程同一时间只持有一个TIF的标注和不超过 每片样本数 个样本，
+    分片文件名带TIF序号前缀，不同进程之间不会冲突
+
+    参数:
+        tif列表: TIF文件路径列表
+        shapefile路径: 标注文件路径
+        输出目录: 分片输出目录
+        目标尺寸: 样本尺寸
+        每TIF样本数: 每个TIF的采样数量
+        每片样本数: 每个分片的样本数（决定每个进程的内存上限）
+        种子: 随机种子（每个TIF使用 种子+该TIF在 tif列表 中的序号，与 训练样本分片.导出样本分片 相同）
+        进程数: 工作进程数（默认CPU核心数-1）
+
+    返回:
+        清单文件路径
+    """
+    进程数 = 进程数 or 默认进程数()
+
+    print("\n" + "=" * 60)
+    print(f"📦 并行提取训练样本分片（{len(tif列表)} 个TIF，{进程数} 个进程）")
+    print("=" * 60)
+
+    os.makedirs(输出目录, exist_ok=True)
+    任务列表 = [{
+        'tif路径': tif路径,
+        'shapefile路径': shapefile路径,
+        '输出目录': 输出目录,
+        '目标尺寸': 目标尺寸,
+        '每TIF样本数': 每TIF样本数,
+        '每片样本数': 每片样本数,
+        '种子': None if 种子 is None else 种子 + 序号,
+        '前缀': f"shard_t{序号:04d}"
+    } for 序号, tif路径 in enumerate(tif列表)]
+
+    结果 = [None] * len(任务列表)
+    with ProcessPoolExecutor(max_workers=进程数) as 执行器:
+        futures = {执行器.submit(_提取单个TIF, 任务): 序号 for 序号, 任务 in enumerate(任务列表)}
+        for 完成数, future in enumerate(as_completed(futures), 1):
+            序号 = futures[future]
+            结果[序号] = future.result()
+            tif文件 = os.path.basename(tif列表[序号])
+
+            if 结果[序号]['错误']:
+                print(f"  ⚠️  [{完成数}/{len(tif列表)}] 跳过 {tif文件}: {结果[序号]['错误']}")
+            else:
+                计数 = 结果[序号]['来源']['类型计数']
+                print(f"  ✅ [{完成数}/{len(tif列表)}] {tif文件}: 纯耕地{计数['纯耕地']}, 混合{计数['混合']}, 非耕地{计数['非耕地']}")
+
+    # 按TIF顺序合并清单
+    分片列表 = [分片 for r in 结果 for 分片 in r['分片']]
+    来源统计 = [r['来源'] for r in 结果 if r['来源'] is not None]
+
+    清单路径 = 写入清单(输出目录, 分片列表, 目标尺寸, {
+        '标注文件': shapefile路径,
+        '每TIF样本数': 每TIF样本数,
+        '种子': 种子,
+        '来源': 来源统计
+    })
+
+    总样本数 = sum(分片['样本数'] for 分片 in 分片列表)
+    print(f"\n✅ 共写出 {len(分片列表)} 个分片, {总样本数} 个样本")
+    print(f"📋 清单: {清单路径}")
+
+    return 清单路径
+
+
+def _生产样本(任务: Dict, 队列):
+    """
+    工作进程：采样一个TIF并把 (影像uint8, 标签uint8) 放入共享队列
+
+    队列满时put阻塞，生产速度受训练消费速度限制，内存有上界
+    """
+    from 训练数据流水线 import 配额采样
+
+    try:
+        源 = _创建样本源(任务['tif路径'], 任务['shapefile路径'], 任务['目标尺寸'])
+        if 源 is not None:
+            for x, y, _, 标签块 in 配额采样(源, 任务['每TIF样本数'], 任务['种子']):
+                影像 = 源.读取影像(x, y)
+                if 影像.shape[:2] != (任务['目标尺寸'], 任务['目标尺寸']):
+                    continue
+                队列.put((np.clip(np.round(影像 * 255.0), 0, 255).astype(np.uint8), 标签块))
+            源.关闭()
+    except Exception as e:
+        print(f"  ⚠️  {os.path.basename(任务['tif路径'])} 采样失败: {e}")
+    finally:
+        try:
+            队列.put(_结束标记)
+        except Exception:
+            pass  # 消费端已提前结束，队列已关闭
+
+
+def 并行样本生成器(tif列表: List[str],
+               shapefile路径: str,
+               目标尺寸: int = 256,
+               每TIF样本数: int = 1500,
+               种子: int = None,
+               进程数: int = None,
+               队列容量: int = 256):
+    """
+    多进程采样，通过有界队列把样本直接交给训练（不落盘）
+
+    用法（tf.data）:
+        tf.data.Dataset.from_generator(
+            lambda: 并行样本生成器(tif列表, shp路径),
+            output_signature=(tf.TensorSpec((256, 256, 3), tf.float32),
+                              tf.TensorSpec((256, 256, 1), tf.float32)))
+
+    生成:
+        (HxWx3 float32影像, HxWx1 float32标签)，所有TIF采样完成后结束
+
+    异常:
+        RuntimeError: 工作进程异常退出（如被系统终止），没有放入结束标记
+    """
+    进程数 = 进程数 or 默认进程数()
+    管理器 = multiprocessing.Manager()
+    队列 = 管理器.Queue(maxsize=队列容量)
+
+    任务列表 = [{
+        'tif路径': tif路径,
+        'shapefile路径': shapefile路径,
+        '目标尺寸': 目标尺寸,
+        '每TIF样本数': 每TIF样本数,
+        '种子': None if 种子 is None else 种子 + 序号,
+    } for 序号, tif路径 in enumerate(tif列表)]
+
+    执行器 = ProcessPoolExecutor(max_workers=进程数)
+    try:
+        futures = {执行器.submit(_生产样本, 任务, 队列): 任务['tif路径'] for 任务 in 任务列表}
+
+        剩余 = len(任务列表)
+        全部结束 = False
+        while 剩余 > 0:
+            try:
+                样本 = 队列.get(timeout=队列等待_秒)
+            except queue.Empty:
+                for future, tif路径 in futures.items():
+                    if future.done() and future.exception() is not None:
+                        raise RuntimeError(
+                            f"❌ 采样工作进程异常退出 ({os.path.basename(tif路径)}): {future.exception()}"
+                        ) from future.exception()
+                # 上一轮等待前所有工作进程已结束、本轮仍没有收到样本，说明有结束标记丢失
+                if 全部结束:
+                    raise RuntimeError(f"❌ 所有采样工作进程已结束，但仍有 {剩余} 个TIF未发送结束标记")
+                全部结束 = all(future.done() for future in futures)
+                continue
+
+            if 样本 is _结束标记:
+                剩余 -= 1
+                continue
+            影像, 标签 = 样本
+            yield 影像.astype(np.float32) / 255.0, 标签.astype(np.float32)[..., np.newaxis]
+    finally:
+        # 先关闭队列，让阻塞在put上的工作进程退出，再回收进程池
+        管理器.shutdown()
+        执行器.shutdown(wait=True, cancel_futures=True)
+
+
+if __name__ == "__main__":
+    import sys
+    import glob
+
+    if len(sys.argv) < 4:
+        print("用法: python 并行样本提取.py <TIF目录> <标注SHP> <输出目录> [每TIF样本数] [进程数]")
+        sys.exit(1)
+
+    tif列表 = sorted(glob.glob(os.path.join(sys.argv[1], '**', '*.tif'), recursive=True))
+    并行导出样本分片(
+        tif列表,
+        sys.argv[2],
+        sys.argv[3],
+        每TIF样本数=int(sys.argv[4]) if len(sys.argv) > 4 else 1500,
+        种子=42,
+        进程数=int(sys.argv[5]) if len(sys.argv) > 5 else None
+    )
@@ -0,0 +1,313 @@
+"""
+异步编排模块
+用asyncio把批量分析的阻塞I/O阶段（扫描目录、预读输入影像和Shapefile、写出掩码/地块/统计表）
+放到线程池中并发执行，与进程池中的识别计算重叠：
+    扫描 -> 预读(线程池) -> 计算(进程池) -> 写出(线程池)
+在途作业数有上限，下一批作业的预读与当前作业的计算同时进行，
+小影像批量处理的总耗时主要由计算决定，而不是I/O等待
+
+工作进程把整幅掩码和变化类别图写成 .npy 中间文件，只把路径传回主进程，
+写出线程以内存映射方式读取，写出完成后删除（大影像的数组不经过进程池管道序列化）
+
+用法:
+    python 异步编排.py 输出目录 --清单 任务清单.csv [--进程数 2] [--配置 配置.yaml]
+    python 异步编排.py 输出目录 --去年目录 D:\\2024 --今年目录 D:\\2025 [--shapefile 地块.shp]
+
+去年影像的种子耕地见 批量分析.去年种子掩码（按目录配对时没有 --shapefile 就需要模型旁的基准耕地地图）
+"""
+
+import os
+import sys
+import time
+import shutil
+import asyncio
+import contextlib
+import traceback
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Union
+
+import numpy as np
+
+import 批量分析
+from 批量分析 import _初始化工作进程, _报告进度, _已完成, 写出影像对结果, 汇总文件名, 检查名称唯一, 任务目录
+from 运行配置 import 运行配置
+
+# Shapefile的附属文件（预读时一并读取）
+_shp附属扩展名 = ('.shp', '.shx', '.dbf', '.prj', '.cpg')
+
+# 工作进程写出整幅数组的目录（在任务输出目录下，写出完成后删除）
+_中间结果目录名 = ".中间结果"
+
+
+# ==================== 扫描 ====================
+
+async def 异步扫描TIF(根目录: str, 并发: int = 16) -> List[str]:
+    """
+    并发递归扫描目录下的所有.tif文件（每个子目录的列举在线程中执行，
+    网络盘等高延迟存储上比 os.walk 顺序遍历快得多）
+
+    返回:
+        排序后的TIF路径列表
+    """
+    信号量 = asyncio.Semaphore(并发)
+    结果 = []
+
+    def _列举(目录):
+        文件, 子目录 = [], []
+        try:
+            with os.scandir(目录) as 迭代:
+                for 项 in 迭代:
+                    if 项.is_dir(follow_symlinks=False):
+                        子目录.append(项.path)
+                    elif 项.name.lower().endswith(('.tif', '.tiff')):
+                        文件.append(项.path)
+        except (PermissionError, FileNotFoundError):
+            pass
+        return 文件, 子目录
+
+    async def _扫描(目录):
+        async with 信号量:
+            文件, 子目录 = await asyncio.to_thread(_列举, 目录)
+        结果.extend(文件)
+        await asyncio.gather(*(_扫描(d) for d in 子目录))
+
+    await _扫描(os.path.abspath(根目录))
+    return sorted(结果)
+
+
+async def 按目录配对(去年目录: str, 今年目录: str, shapefile: str = None) -> List[Dict]:
+    """
+    同时扫描两个目录，按相对路径（去掉扩展名）配对去年/今年影像
+
+    返回:
+        任务列表 [{'去年', '今年', 'shapefile', '去年掩码', '名称'}]
+    """
+    去年列表, 今年列表 = await asyncio.gather(异步扫描TIF(去年目录), 异步扫描TIF(今年目录))
+
+    def _键(路径, 根):
+        return os.path.splitext(os.path.relpath(路径, os.path.abspath(根)))[0].lower()
+
+    去年索引 = {_键(p, 去年目录): p for p in 去年列表}
+    任务列表 = []
+    for 今年 in 今年列表:
+        键 = _键(今年, 今年目录)
+        if 键 in 去年索引:
+            任务列表.append({
+                '去年': 去年索引[键],
+                '今年': 今年,
+                'shapefile': shapefile,
+                '去年掩码': None,
+                '名称': 键.replace(os.sep, '_'),
+            })
+    未配对 = len(今年列表) - len(任务列表)
+    if 未配对:
+        print(f"⚠️  {未配对} 个今年影像在去年目录中没有同名影像，已忽略", file=sys.stderr)
+    检查名称唯一(任务列表)  # 同名不同扩展名（.tif / .tiff）的影像会得到相同的名称
+    return 任务列表
+
+
+# ==================== 各阶段 ====================
+
+def _读完(路径: str):
+    with open(路径, 'rb') as f:
+        while f.read(8 * 1024 * 1024):
+            pass
+
+
+def _预读(任务: Dict):
+    """预读输入文件（进入系统页缓存），工作进程读取影像时不再等待磁盘/网络"""
+    for 路径 in (任务['去年'], 任务['今年'], 任务.get('去年掩码')):
+        if 路径:
+            _读完(路径)
+
+    if 任务.get('shapefile'):
+        主干 = os.path.splitext(任务['shapefile'])[0]
+        for 扩展名 in _shp附属扩展名:
+            if os.path.exists(主干 + 扩展名):
+                _读完(主干 + 扩展名)
+
+
+def _数组字段(计算结果: Dict):
+    """计算结果中的整幅数组字段: [(所在字典, 键)]"""
+    return [(计算结果, '去年掩码'), (计算结果, '今年掩码'), (计算结果['变化统计'], '变化类别图')]
+
+
+def _数组落盘(计算结果: Dict, 目录: str) -> Dict:
+    """把整幅数组写成 .npy，返回只含路径的计算结果（进程间只传递小对象）"""
+    os.makedirs(目录, exist_ok=True)
+    结果 = dict(计算结果, 变化统计=dict(计算结果['变化统计']))
+    for 字典, 键 in _数组字段(结果):
+        路径 = os.path.join(目录, f"{键}.npy")
+        np.save(路径, 字典[键])
+        字典[键] = 路径
+    return 结果
+
+
+def _读取落盘数组(计算结果: Dict) -> Dict:
+    """_数组落盘 的逆过程：数组以只读内存映射方式打开"""
+    结果 = dict(计算结果, 变化统计=dict(计算结果['变化统计']))
+    for 字典, 键 in _数组字段(结果):
+        字典[键] = np.load(字典[键], mmap_mode='r')
+    return 结果
+
+
+def _计算任务(任务: Dict, 输出根目录: str, 模型路径: str, 快速模式: bool):
+    """
+    在工作进程中执行计算部分，详细日志写入该任务的 分析日志.txt
+
+    返回:
+        ('完成', 计算结果, 计算_秒) 或 ('失败', 错误信息, 计算_秒)；计算结果中的整幅数组已写到
+        任务输出目录下的中间结果文件，只含路径（见 _数组落盘）。计算_秒 在工作进程内计时，
+        不含在途名额和进程池队列的等待，也不含写中间文件
+    """
+    输出目录 = os.path.join(输出根目录, 任务['名称'])
+    os.makedirs(输出目录, exist_ok=True)
+    with open(os.path.join(输出目录, "分析日志.txt"), 'w', encoding='utf-8') as 日志:
+        with contextlib.redirect_stdout(日志):
+            开始 = time.perf_counter()
+            try:
+                with 任务目录(任务, 输出根目录):
+                    结果 = 批量分析.计算影像对(批量分析._工作进程系统, 任务, 模型路径, 快速模式)
+                耗时 = time.perf_counter() - 开始
+                return '完成', _数组落盘(结果, os.path.join(输出目录, _中间结果目录名)), 耗时
+            except Exception as e:
+                traceback.print_exc(file=日志)
+                return '失败', f"{type(e).__name__}: {e}", time.perf_counter() - 开始
+
+
+def _写出任务(任务: Dict, 计算结果: Dict, 输出目录: str) -> Dict:
+    """写出阶段（线程池）：从中间结果文件读取整幅数组写出结果，之后删除中间结果"""
+    try:
+        return 写出影像对结果(任务, _读取落盘数组(计算结果), 输出目录)
+    finally:
+        shutil.rmtree(os.path.join(输出目录, _中间结果目录名), ignore_errors=True)
+
+
+def _记录失败(任务: Dict, 输出根目录: str, 错误: str) -> Dict:
+    import json
+    汇总 = {'名称': 任务['名称'], '状态': '失败', '任务': 任务, '错误': 错误}
+    输出目录 = os.path.join(输出根目录, 任务['名称'])
+    os.makedirs(输出目录, exist_ok=True)
+    with open(os.path.join(输出目录, 汇总文件名), 'w', encoding='utf-8') as f:
+        json.dump(汇总, f, ensure_ascii=False, indent=2)
+    return 汇总
+
+
+# ==================== 编排 ====================
+
+async def 编排运行(任务列表: List[Dict],
+              输出根目录: str,
+              进程数: int = 1,
+              IO线程数: int = 8,
+              在途上限: int = None,
+              模型路径: str = None,
+              快速模式: bool = False,
+              重新运行: bool = False,
+              配置: Union[运行配置, Dict] = None) -> Dict:
+    """
+    异步编排批量分析
+
+    参数:
+        进程数: 计算进程数（每个进程加载一份模型）
+        IO线程数: 预读和写出使用的线程数
+        在途上限: 同时处于 预读/计算 阶段的作业数（默认 进程数*2，保证计算进程始终有已预读的作业）
+        重新运行: 不跳过已完成的任务
+        配置: 工作进程中分析系统使用的运行配置，或只含改动项的字典（在工作进程中叠加到
+             耕地分析系统.py 顶部配置区域上）；默认为顶部配置区域
+
+    返回:
+        {'成功', '失败', '耗时_秒', '计算占比'}
+
+    异常:
+        ValueError: 任务名称重复
+    """
+    检查名称唯一(任务列表)
+    os.makedirs(输出根目录, exist_ok=True)
+    循环 = asyncio.get_running_loop()
+    在途 = asyncio.Semaphore(在途上限 or 进程数 * 2)
+
+    待运行 = [t for t in 任务列表 if 重新运行 or not _已完成(输出根目录, t)]
+    _报告进度('开始', 总数=len(任务列表), 待运行=len(待运行), 进程数=进程数, IO线程数=IO线程数)
+
+    统计 = {'成功': 0, '失败': 0, '计算_秒': 0.0}
+    开始 = time.time()
+
+    with ProcessPoolExecutor(max_workers=max(1, 进程数), initializer=_初始化工作进程,
+                             initargs=(输出根目录, 模型路径, 配置)) as 进程池, \
+            ThreadPoolExecutor(max_workers=IO线程数, thread_name_prefix='io') as 线程池:
+
+        async def 处理(任务: Dict):
+            try:
+                async with 在途:
+                    await 循环.run_in_executor(线程池, _预读, 任务)
+                    状态, 结果, 计算_秒 = await 循环.run_in_executor(
+                        进程池, _计算任务, 任务, 输出根目录, 模型路径, 快速模式)
+                    统计['计算_秒'] += 计算_秒
+
+                if 状态 != '完成':
+                    raise RuntimeError(结果)
+                # 写出不占用在途名额，与后续作业的计算重叠
+                汇总 = await 循环.run_in_executor(
+                    线程池, _写出任务, 任务, 结果, os.path.join(输出根目录, 任务['名称']))
+            except Exception as e:
+                统计['失败'] += 1
+                _记录失败(任务, 输出根目录, str(e) if isinstance(e, RuntimeError) else f"{type(e).__name__}: {e}")
+                _报告进度('失败', 名称=任务['名称'], 已完成=统计['成功'] + 统计['失败'], 总数=len(待运行), 错误=str(e))
+                return
+
+            统计['成功'] += 1
+            _报告进度('完成', 名称=任务['名称'], 已完成=统计['成功'] + 统计['失败'], 总数=len(待运行),
+                  新增_亩=汇总['变化统计']['新增面积_亩'], 减少_亩=汇总['变化统计']['减少面积_亩'])
+
+        # 预读/写出阶段在线程中打印的日志转到标准错误，标准输出只有JSON进度
+        with contextlib.redirect_stdout(sys.stderr):
+            await asyncio.gather(*(处理(t) for t in 待运行))
+
+    总耗时 = time.time() - 开始
+    结果 = {
+        '成功': 统计['成功'],
+        '失败': 统计['失败'],
+        '耗时_秒': round(总耗时, 1),
+        # 计算时间之和 / (总耗时 × 进程数)，接近1说明总耗时由计算决定
+        '计算占比': round(统计['计算_秒'] / max(总耗时 * max(1, 进程数), 1e-6), 3),
+    }
+    _报告进度('结束', **结果)
+    return 结果
+
+
+if __name__ == "__main__":
+    import argparse
+
+    解析器 = argparse.ArgumentParser(description="异步编排的批量耕地变化分析")
+    解析器.add_argument('输出目录')
+    解析器.add_argument('--清单', default=None, help="任务清单（.csv / .json / .jsonl）")
+    解析器.add_argument('--去年目录', default=None)
+    解析器.add_argument('--今年目录', default=None)
+    解析器.add_argument('--shapefile', default=None, help="按目录配对时所有任务共用的地块Shapefile")
+    解析器.add_argument('--进程数', type=int, default=None, help="默认使用配置中的进程数")
+    解析器.add_argument('--IO线程数', type=int, default=None, help="默认使用配置中的IO线程数")
+    解析器.add_argument('--模型', default=None)
+    解析器.add_argument('--配置', default=None, help="运行配置文件（.json / .yaml）")
+    解析器.add_argument('--快速模式', action='store_true')
+    解析器.add_argument('--重新运行', action='store_true')
+    参数 = 解析器.parse_args()
+
+    try:
+        # 配置文件只给出改动项，工作进程中叠加到引擎配置区域上（主进程不导入引擎）
+        配置 = 运行配置.读取文件(参数.配置) if 参数.配置 else None
+        默认 = 运行配置.从字典(配置 or {})
+        if 参数.清单:
+            任务列表 = 批量分析.读取任务清单(参数.清单)
+        elif 参数.去年目录 and 参数.今年目录:
+            任务列表 = asyncio.run(按目录配对(参数.去年目录, 参数.今年目录, 参数.shapefile))
+        else:
+            解析器.error("需要 --清单 或 --去年目录/--今年目录")
+    except Exception as e:
+        _报告进度('错误', 错误=f"{type(e).__name__}: {e}")
+        sys.exit(2)
+
+    结果 = asyncio.run(编排运行(
+        任务列表, 参数.输出目录, 参数.进程数 or 默认.进程数, 参数.IO线程数 or 默认.IO线程数,
+        模型路径=参数.模型, 快速模式=参数.快速模式, 重新运行=参数.重新运行, 配置=配置
+    ))
+    sys.exit(0 if 结果['失败'] == 0 else 1)
@@ -0,0 +1,241 @@
+"""
+性能剖析模块
+按阶段计时和计数，定位大图识别的耗时分布（读取、归一化、窗口识别、合并、形态学、面积核算等）
+
+设置环境变量 GENGDI_PROFILE=1 开启（或设为一个目录，报告写到该目录）；未开启时
+阶段() 返回同一个空上下文，计数() 直接返回，对热点路径几乎没有开销
+
+每次运行输出两份报告:
+    性能报告_<运行名>_<时间>.json    各阶段耗时/次数/占比、阶段结束时的最大RSS和计数器
+    性能报告_<运行名>_<时间>.folded  折叠栈格式（微秒），可直接用 flamegraph.pl / speedscope 打开
+
+用法:
+    from 性能剖析 import 阶段, 计数, 运行
+
+    with 运行("使用模型预测耕地_大图", 输出目录) as 剖析:
+        with 阶段("读取影像"):
+            ...
+        计数("缓存命中")
+    剖析.报告路径, 剖析.摘要
+"""
+
+import os
+import json
+import time
+import threading
+import contextlib
+from datetime import datetime
+from typing import Dict, Optional
+
+from 内存预算 import 当前RSS, 峰值RSS, MB
+
+环境变量 = "GENGDI_PROFILE"
+_空上下文 = contextlib.nullcontext()
+
+
+def 已启用() -> bool:
+    return os.environ.get(环境变量, "").strip().lower() not in ("", "0", "false", "off", "no")
+
+
+class _计时:
+    """单个阶段的计时上下文（只在开启剖析时创建）"""
+    __slots__ = ('_记录', '_名称', '_开始')
+
+    def __init__(self, 记录: '剖析记录', 名称: str):
+        self._记录 = 记录
+        self._名称 = 名称
+
+    def __enter__(self):
+        self._记录._栈().append(self._名称)
+        self._开始 = time.perf_counter()
+        return self
+
+    def __exit__(self, *异常):
+        耗时 = time.perf_counter() - self._开始
+        栈 = self._记录._栈()
+        self._记录._累加(tuple(栈), 耗时, 当前RSS())
+        栈.pop()
+        return False
+
+
+class 剖析记录:
+    """
+    一次运行的阶段耗时和计数器
+
+    阶段按嵌套关系记录为路径（如 使用模型预测耕地_大图;缓存查询），根为运行名，同一路径多次进入时累加
+    """
+
+    def __init__(self, 名称: str):
+        self.名称 = 名称
+        self.耗时: Dict[tuple, list] = {}  # 路径 -> [总秒数, 次数]
+        self.内存: Dict[tuple, int] = {}  # 路径 -> 阶段结束时的最大RSS（字节）
+        self.计数器: Dict[str, int] = {}
+        self.报告路径: Optional[str] = None
+        self.摘要: Optional[str] = None
+        self._锁 = threading.Lock()
+        self._线程栈 = threading.local()
+        self._开始 = time.perf_counter()
+        self._开始时间 = datetime.now()
+
+    def _栈(self) -> list:
+        栈 = getattr(self._线程栈, '栈', None)
+        if 栈 is None:
+            栈 = self._线程栈.栈 = [self.名称]
+        return 栈
+
+    def _累加(self, 路径: tuple, 耗时: float, rss: int = 0):
+        with self._锁:
+            项 = self.耗时.get(路径)
+            if 项 is None:
+                self.耗时[路径] = [耗时, 1]
+            else:
+                项[0] += 耗时
+                项[1] += 1
+            if rss > self.内存.get(路径, 0):
+                self.内存[路径] = rss
+
+    def 阶段(self, 名称: str) -> _计时:
+        return _计时(self, 名称)
+
+    def 计数(self, 名称: str, 增量: int = 1):
+        with self._锁:
+            self.计数器[名称] = self.计数器.get(名称, 0) + 增量
+
+    def 总耗时(self) -> float:
+        根 = self.耗时.get((self.名称,))
+        return 根[0] if 根 else time.perf_counter() - self._开始
+
+    def 报告(self) -> Dict:
+        """
+        返回:
+            {'运行', '开始时间', '总耗时_秒', '峰值RSS_MB',
+             '阶段': [{'路径', '耗时_秒', '自身耗时_秒', '次数', '占比', 'RSS_MB'}], '计数'}
+        """
+        总耗时 = self.总耗时()
+        阶段列表 = []
+        for 路径, (耗时, 次数) in sorted(self.耗时.items()):
+            阶段列表.append({
+                '路径': ';'.join(路径),
+                '耗时_秒': round(耗时, 6),
+                '自身耗时_秒': round(self._自身耗时(路径), 6),
+                '次数': 次数,
+                '占比': round(耗时 / 总耗时, 4) if 总耗时 > 0 else 0.0,
+                'RSS_MB': round(self.内存.get(路径, 0) / MB, 1),
+            })
+        return {
+            '运行': self.名称,
+            '开始时间': self._开始时间.strftime('%Y-%m-%d %H:%M:%S'),
+            '总耗时_秒': round(总耗时, 6),
+            '峰值RSS_MB': round(峰值RSS() / MB, 1),
+            '阶段': 阶段列表,
+            '计数': dict(self.计数器),
+        }
+
+    def _自身耗时(self, 路径: tuple) -> float:
+        """阶段耗时减去直接子阶段的耗时"""
+        子耗时 = sum(v[0] for k, v in self.耗时.items() if len(k) == len(路径) + 1 and k[:len(路径)] == 路径)
+        return max(self.耗时[路径][0] - 子耗时, 0.0)
+
+    def 折叠栈(self) -> str:
+        """flamegraph折叠栈格式：每行 '路径 自身耗时(微秒)'"""
+        行 = []
+        for 路径 in sorted(self.耗时):
+            微秒 = int(round(self._自身耗时(路径) * 1e6))
+            if 微秒 > 0:
+                行.append(f"{';'.join(路径)} {微秒}")
+        return "\n".join(行) + "\n"
+
+    def 摘要行(self, 最多: int = 6) -> str:
+        """一级阶段耗时摘要（按耗时降序），用于日志"""
+        总耗时 = self.总耗时()
+        一级 = sorted(((k[1], v[0]) for k, v in self.耗时.items() if len(k) == 2), key=lambda x: -x[1])
+        部分 = [f"{名称} {耗时:.2f}s({耗时 / 总耗时 * 100:.0f}%)" for 名称, 耗时 in 一级[:最多]] if 总耗时 > 0 else []
+        return f"⏱️ 总耗时 {总耗时:.2f}s，峰值内存 {峰值RSS() / MB:.0f} MB：" + "，".join(部分)
+
+    def 保存(self, 输出目录: str) -> str:
+        """写出JSON和折叠栈报告，返回JSON路径"""
+        os.makedirs(输出目录, exist_ok=True)
+        前缀 = os.path.join(输出目录, f"性能报告_{self.名称}_{self._开始时间.strftime('%Y%m%d_%H%M%S')}")
+        with open(前缀 + ".json", 'w', encoding='utf-8') as f:
+            json.dump(self.报告(), f, ensure_ascii=False, indent=2)
+        with open(前缀 + ".folded", 'w', encoding='utf-8') as f:
+            f.write(self.折叠栈())
+        self.报告路径 = 前缀 + ".json"
+        return self.报告路径
+
+
+# 当前运行（未开启剖析或不在运行中时为None）
+_当前: Optional[剖析记录] = None
+
+
+def 阶段(名称: str):
+    """阶段计时上下文；未开启时返回空上下文"""
+    记录 = _当前
+    if 记录 is None:
+        return _空上下文
+    return 记录.阶段(名称)
+
+
+def 计数(名称: str, 增量: int = 1):
+    """计数器累加；未开启时直接返回"""
+    记录 = _当前
+    if 记录 is not None:
+        记录.计数(名称, 增量)
+
+
+@contextlib.contextmanager
+def 运行(名称: str, 输出目录: str = "."):
+    """
+    一次运行的剖析范围
+
+    未开启剖析时产出None；已在另一个运行中时（嵌套调用）只作为该运行的一个阶段
+    结束时写出报告，并在标准输出打印一行摘要
+
+    参数:
+        名称: 运行名（报告文件名的一部分，也是折叠栈的根）
+        输出目录: 报告目录（环境变量为目录时使用环境变量指定的目录）
+    """
+    global _当前
+    if _当前 is not None:
+        with _当前.阶段(名称):
+            yield _当前
+        return
+    if not 已启用():
+        yield None
+        return
+
+    记录 = 剖析记录(名称)
+    _当前 = 记录
+    try:
+        yield 记录
+    finally:
+        _当前 = None
+        记录._累加((名称,), time.perf_counter() - 记录._开始, 当前RSS())
+        环境值 = os.environ.get(环境变量, "").strip()
+        报告目录 = 环境值 if os.path.isdir(环境值) else 输出目录
+        try:
+            记录.保存(报告目录)
+            记录.摘要 = 记录.摘要行()
+            print(f"  {记录.摘要}")
+            print(f"  📄 性能报告: {记录.报告路径}")
+        except Exception as e:
+            print(f"  ⚠️  性能报告保存失败: {e}")
+
+
+if __name__ == "__main__":
+    import sys
+
+    # 查看已保存的报告：python 性能剖析.py 性能报告_xxx.json
+    if len(sys.argv) < 2:
+        print("用法: python 性能剖析.py <性能报告.json>")
+        sys.exit(1)
+
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        报告 = json.load(f)
+    print(f"运行: {报告['运行']}  开始: {报告['开始时间']}  总耗时: {报告['总耗时_秒']:.3f}s"
+          f"  峰值RSS: {报告.get('峰值RSS_MB')} MB")
+    for 项 in sorted(报告['阶段'], key=lambda x: -x['自身耗时_秒']):
+        print(f"  {项['自身耗时_秒']:9.3f}s  {项['占比']*100:5.1f}%  ×{项['次数']:<6} "
+              f"{项.get('RSS_MB', 0):8.1f}MB  {项['路径']}")
+    for 名称, 值 in 报告['计数'].items():
+        print(f"  {名称}: {值}")
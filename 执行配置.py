@@ -0,0 +1,349 @@
+"""
+执行配置模块
+统一配置TensorFlow的线程池、oneDNN、混合精度(float16/bfloat16)和XLA编译，
+训练脚本和耕地分析系统共用；并提供按配置测量 图像/秒 的基准测试
+
+注意: 线程池和oneDNN环境变量必须在TensorFlow初始化之前设置，
+应用执行配置() 应在任何TensorFlow运算之前调用
+"""
+
+import os
+import sys
+import json
+import time
+from typing import Dict
+
+# 预设执行配置
+#   线程内/线程间: TensorFlow intra-op / inter-op 线程数，0 = TensorFlow默认
+#   oneDNN: True/False 显式开关 TF_ENABLE_ONEDNN_OPTS，None = 保持默认
+#   精度: "float32" / "mixed_float16"(GPU) / "mixed_bfloat16"(支持AVX512_BF16/AMX的CPU)，"自动" = 按硬件选择
+#   XLA: 训练时是否启用XLA即时编译
+# 混合精度和XLA只在训练时启用，推理保持float32且不开XLA（已保存的float32模型加载后不受全局精度策略影响；
+# XLA的 set_jit 对整个进程生效，分析引擎和图形界面中形状多变的推理会反复触发编译）
+执行配置预设 = {
+    "默认": {
+        '线程内': 0, '线程间': 0, 'oneDNN': None, '精度': "float32", 'XLA': False,
+        '说明': "TensorFlow默认设置"
+    },
+    "GPU": {
+        '线程内': 0, '线程间': 0, 'oneDNN': None, '精度': "mixed_float16", 'XLA': False,
+        '说明': "GPU内存动态增长 + FP16混合精度训练"
+    },
+    "CPU高吞吐": {
+        '线程内': -1, '线程间': 2, 'oneDNN': True, '精度': "自动", 'XLA': True,
+        '说明': "占满物理核心，oneDNN，训练时XLA，CPU支持时使用bfloat16"
+    },
+    "CPU低占用": {
+        '线程内': 2, '线程间': 1, 'oneDNN': True, '精度': "float32", 'XLA': False,
+        '说明': "只占用2个核心，适合图形界面后台分析时继续操作电脑"
+    },
+}
+
+_已应用配置 = None
+
+
+def 物理核心数() -> int:
+    """物理核心数（psutil不可用时退回逻辑核心数）"""
+    try:
+        import psutil
+        return psutil.cpu_count(logical=False) or os.cpu_count() or 1
+    except ImportError:
+        return os.cpu_count() or 1
+
+
+def _CPU指令标志() -> set:
+    """
+    CPU指令集标志（小写），读取不到时返回空集合
+
+    Linux读 /proc/cpuinfo；其他系统（Windows / macOS）需要可选依赖 py-cpuinfo
+    """
+    try:
+        with open('/proc/cpuinfo', 'r') as f:
+            for 行 in f:
+                if 行.startswith('flags'):
+                    return set(行.split(':', 1)[1].lower().split())
+    except OSError:
+        pass
+
+    try:
+        import cpuinfo
+        return {标志.lower() for 标志 in cpuinfo.get_cpu_info().get('flags', [])}
+    except Exception:
+        return set()
+
+
+def CPU支持bfloat16() -> bool:
+    """
+    检测CPU是否有bfloat16指令（AVX512_BF16 或 AMX），可用环境变量 GENGDI_BF16=0/1 强制指定
+
+    读取不到指令集标志时（非Linux且未安装 py-cpuinfo）按不支持处理，保持float32；
+    确认CPU支持时可设置 GENGDI_BF16=1
+    """
+    强制 = os.environ.get('GENGDI_BF16')
+    if 强制 is not None:
+        return 强制 == '1'
+
+    标志 = _CPU指令标志()
+    return 'avx512_bf16' in 标志 or 'amx_bf16' in 标志
+
+
+def 检测GPU() -> list:
+    """列出GPU设备（会初始化TensorFlow，需在设置环境变量之后调用）"""
+    try:
+        import tensorflow as tf
+        return tf.config.list_physical_devices('GPU')
+    except ImportError:
+        return []
+
+
+def 解析执行配置(配置="自动") -> Dict:
+    """
+    把配置名称或字典解析为完整配置
+
+    参数:
+        配置: 预设名称、"自动"（有GPU用"GPU"，否则"CPU高吞吐"）或自定义字典
+
+    返回:
+        配置字典（含 '名称'）
+    """
+    if isinstance(配置, dict):
+        return {**执行配置预设["默认"], '名称': "自定义", **配置}
+
+    名称 = 配置 or "自动"
+    if 名称 == "自动":
+        名称 = "GPU" if 检测GPU() else "CPU高吞吐"
+    if 名称 not in 执行配置预设:
+        raise ValueError(f"❌ 未知的执行配置: {名称}，可选: {', '.join(执行配置预设)} 或 自动")
+
+    return {**执行配置预设[名称], '名称': 名称}
+
+
+def _设置环境变量(配置: Dict):
+    """设置必须在TensorFlow初始化前生效的环境变量"""
+    if 配置['oneDNN'] is not None:
+        os.environ['TF_ENABLE_ONEDNN_OPTS'] = '1' if 配置['oneDNN'] else '0'
+    if 配置['线程内'] > 0:
+        os.environ.setdefault('OMP_NUM_THREADS', str(配置['线程内']))
+
+
+def 应用执行配置(配置="自动", 训练: bool = False) -> Dict:
+    """
+    应用执行配置（替代原来的GPU检测代码块）
+
+    参数:
+        配置: 预设名称 / "自动" / 自定义字典，环境变量 GENGDI_EXEC_PROFILE 优先
+        训练: 是否用于训练（混合精度和XLA只在训练时启用，推理保持float32且不开XLA）
+
+    返回:
+        实际生效的配置字典
+    """
+    global _已应用配置
+
+    配置 = os.environ.get('GENGDI_EXEC_PROFILE') or 配置
+
+    print("=" * 60)
+    print("🚀 执行配置")
+    print("=" * 60)
+
+    if 'tensorflow' in sys.modules and _已应用配置 is None:
+        print("⚠️  TensorFlow已提前导入，oneDNN环境变量可能不生效")
+
+    # 环境变量要在导入TensorFlow之前设置；"自动"要导入TensorFlow检测GPU，先按CPU高吞吐设置
+    if isinstance(配置, dict):
+        _设置环境变量({**执行配置预设["默认"], **配置})
+    elif 配置 in (None, "自动"):
+        _设置环境变量(执行配置预设["CPU高吞吐"])
+    else:
+        _设置环境变量(执行配置预设.get(配置, 执行配置预设["默认"]))
+
+    try:
+        import tensorflow as tf
+    except ImportError:
+        print("❌ 未安装TensorFlow，执行配置不生效")
+        print("=" * 60)
+        print()
+        return None
+
+    配置 = 解析执行配置(配置)
+    print(f"📋 配置: {配置['名称']}（{配置.get('说明', '')}）")
+
+    # 线程池（TensorFlow运行时初始化后不能再修改）
+    线程内 = 物理核心数() if 配置['线程内'] == -1 else 配置['线程内']
+    try:
+        if 线程内 > 0:
+            tf.config.threading.set_intra_op_parallelism_threads(线程内)
+        if 配置['线程间'] > 0:
+            tf.config.threading.set_inter_op_parallelism_threads(配置['线程间'])
+        print(f"✅ 线程池: 线程内 {线程内 or '默认'}, 线程间 {配置['线程间'] or '默认'}")
+    except RuntimeError as e:
+        print(f"⚠️  线程池配置无效（TensorFlow已初始化）: {e}")
+
+    if 配置['oneDNN'] is not None:
+        print(f"✅ oneDNN: {'启用' if 配置['oneDNN'] else '禁用'}")
+
+    # GPU
+    gpus = tf.config.list_physical_devices('GPU')
+    if gpus:
+        print(f"✅ 检测到 {len(gpus)} 个GPU设备:")
+        for i, gpu in enumerate(gpus):
+            print(f"   GPU {i}: {gpu.name}")
+        try:
+            for gpu in gpus:
+                tf.config.experimental.set_memory_growth(gpu, True)
+            print("✅ 已启用GPU内存动态增长")
+        except RuntimeError as e:
+            print(f"⚠️  GPU配置警告: {e}")
+    else:
+        print("ℹ️  未检测到GPU，使用CPU")
+
+    # 混合精度
+    精度 = 配置['精度']
+    if 精度 == "自动":
+        精度 = "mixed_float16" if gpus else ("mixed_bfloat16" if CPU支持bfloat16() else "float32")
+    if 精度 == "mixed_float16" and not gpus:
+        精度 = "float32"  # CPU上float16比float32更慢
+    if not 训练:
+        精度 = "float32"
+
+    if 精度 != "float32":
+        try:
+            from tensorflow.keras import mixed_precision
+            mixed_precision.set_global_policy(mixed_precision.Policy(精度))
+            print(f"✅ 已启用混合精度训练（{精度}）")
+        except Exception:
+            print("⚠️  混合精度训练不可用（TensorFlow版本较旧）")
+            精度 = "float32"
+    配置['实际精度'] = 精度
+
+    # XLA（set_jit 对整个进程生效，只在训练进程中开启）
+    if 配置['XLA'] and not 训练:
+        配置['XLA'] = False
+    if 配置['XLA']:
+        try:
+            tf.config.optimizer.set_jit(True)
+            print("✅ 已启用XLA即时编译")
+        except Exception as e:
+            print(f"⚠️  XLA不可用: {e}")
+            配置['XLA'] = False
+
+    配置['线程内'] = 线程内
+    _已应用配置 = 配置
+
+    print("=" * 60)
+    print()
+    return 配置
+
+
+def 当前执行配置() -> Dict:
+    """返回已应用的执行配置（未应用时为None）"""
+    return _已应用配置
+
+
+def _测量吞吐(模型路径: str, 批次大小: int, 重复次数: int, 训练: bool) -> Dict:
+    """在当前进程内测量 图像/秒（需已应用执行配置）"""
+    import numpy as np
+    import tensorflow as tf
+
+    if 模型路径:
+        模型 = tf.keras.models.load_model(模型路径, compile=False)
+    else:
+        # 没有模型时用一个小型全卷积网络
+        输入 = tf.keras.Input((256, 256, 3))
+        x = 输入
+        for 通道 in (32, 64, 64, 32):
+            x = tf.keras.layers.Conv2D(通道, 3, padding='same', activation='relu')(x)
+        输出 = tf.keras.layers.Conv2D(1, 1, activation='sigmoid', dtype='float32')(x)
+        模型 = tf.keras.Model(输入, 输出)
+
+    尺寸 = 模型.input_shape[1]
+    数据 = np.random.rand(批次大小, 尺寸, 尺寸, 3).astype(np.float32)
+    标签 = (np.random.rand(批次大小, 尺寸, 尺寸, 1) > 0.5).astype(np.float32)
+
+    if 训练:
+        模型.compile(optimizer='adam', loss='binary_crossentropy')
+        步骤 = lambda: 模型.train_on_batch(数据, 标签)
+    else:
+        步骤 = lambda: 模型.predict_on_batch(数据)
+
+    # 预热（含XLA编译）
+    for _ in range(2):
+        步骤()
+
+    开始 = time.perf_counter()
+    for _ in range(重复次数):
+        步骤()
+    耗时 = time.perf_counter() - 开始
+
+    return {'图像每秒': 批次大小 * 重复次数 / 耗时, '耗时_秒': 耗时}
+
+
+def 基准测试(配置列表=None, 模型路径: str = None, 批次大小: int = 8, 重复次数: int = 20, 训练: bool = False) -> list:
+    """
+    逐个执行配置测量 图像/秒
+
+    线程池在TensorFlow初始化后无法修改，每个配置在独立子进程中测量
+
+    参数:
+        配置列表: 配置名称列表（默认全部预设）
+        模型路径: .h5模型路径（为空时使用内置小型卷积网络）
+        批次大小: 每批图像数
+        重复次数: 计时的批次数
+        训练: True测量训练步，False测量推理
+
+    返回:
+        [{'配置': 名称, '图像每秒': ..., '耗时_秒': ...}, ...]
+    """
+    import subprocess
+
+    配置列表 = 配置列表 or list(执行配置预设)
+    结果列表 = []
+
+    print(f"\n⏱️  执行配置基准测试（{'训练' if 训练 else '推理'}，批次 {批次大小} x {重复次数}）")
+    for 名称 in 配置列表:
+        命令 = [sys.executable, os.path.abspath(__file__), '--单项', 名称,
+              '--批次', str(批次大小), '--重复', str(重复次数)]
+        if 模型路径:
+            命令 += ['--模型', 模型路径]
+        if 训练:
+            命令.append('--训练')
+
+        进程 = subprocess.run(命令, capture_output=True, text=True, encoding='utf-8')
+        结果行 = [行 for 行 in 进程.stdout.splitlines() if 行.startswith('{')]
+        if 进程.returncode != 0 or not 结果行:
+            错误 = 进程.stderr.strip().splitlines()
+            print(f"  ❌ {名称}: 测试失败 {错误[-1] if 错误 else ''}")
+            continue
+
+        结果 = {'配置': 名称, **json.loads(结果行[-1])}
+        结果列表.append(结果)
+        print(f"  ✅ {名称}: {结果['图像每秒']:.1f} 图像/秒 (精度 {结果['精度']}, XLA {结果['XLA']})")
+
+    return 结果列表
+
+
+if __name__ == "__main__":
+    import argparse
+
+    解析器 = argparse.ArgumentParser(description="执行配置基准测试（图像/秒）")
+    解析器.add_argument('--模型', default=None, help=".h5模型路径（默认使用内置小型卷积网络）")
+    解析器.add_argument('--配置', nargs='*', default=None, help="要测试的配置名称（默认全部）")
+    解析器.add_argument('--批次', type=int, default=8)
+    解析器.add_argument('--重复', type=int, default=20)
+    解析器.add_argument('--训练', action='store_true', help="测量训练步而不是推理")
+    解析器.add_argument('--输出', default=None, help="结果JSON文件路径")
+    解析器.add_argument('--单项', default=None, help=argparse.SUPPRESS)
+    参数 = 解析器.parse_args()
+
+    if 参数.单项:
+        # 子进程: 应用单个配置并输出一行JSON
+        已应用 = 应用执行配置(参数.单项, 训练=参数.训练)
+        结果 = _测量吞吐(参数.模型, 参数.批次, 参数.重复, 参数.训练)
+        结果.update({'精度': 已应用['实际精度'], 'XLA': 已应用['XLA'], '线程内': 已应用['线程内']})
+        print(json.dumps(结果, ensure_ascii=False))
+        sys.exit(0)
+
+    结果列表 = 基准测试(参数.配置, 参数.模型, 参数.批次, 参数.重复, 参数.训练)
+    if 参数.输出:
+        with open(参数.输出, 'w', encoding='utf-8') as f:
+            json.dump(结果列表, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 结果已保存: {参数.输出}")
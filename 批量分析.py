@@ -0,0 +1,465 @@
+"""
+批量变化分析（无界面命令行）
+读取任务清单中的 (去年影像, 今年影像, 地块Shapefile, 去年掩码) 组合，用进程池逐对分析，
+每对输出 掩码GeoTIFF、变化地块GeoPackage、地块统计CSV 和 summary.json；
+标准输出为逐行JSON进度（分析过程的详细日志写入每对的 分析日志.txt），便于定时任务调度
+
+用法:
+    python 批量分析.py 任务清单.csv 输出目录 [--进程数 2] [--模型 模型.h5] [--配置 配置.yaml] [--重新运行]
+
+任务清单: CSV（列: 去年,今年,shapefile,去年掩码,名称）、JSON数组 或 JSONL，shapefile、去年掩码和名称可省略，
+         名称（输出子目录名）不能重复
+去年影像的种子耕地: 去年掩码（栅格） > shapefile 地块 > 模型旁的基准耕地地图（<模型>_基准数据.pkl），
+         都没有时该任务失败（颜色规则只在已有耕地附近扩展，没有种子时识别结果恒为空）
+每个任务使用自己的内存映射目录和结果缓存目录（<目录>/<名称>），多个工作进程互不干扰
+退出码: 0 全部成功，1 有任务失败，2 参数或清单错误
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import traceback
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+
+from 运行配置 import 运行配置
+
+汇总文件名 = "summary.json"
+
+# 清单字段别名
+_字段别名 = {
+    '去年': ('去年', '去年影像', 'previous', 'prev'),
+    '今年': ('今年', '今年影像', 'current', 'curr'),
+    'shapefile': ('shapefile', '地块', 'shp'),
+    '去年掩码': ('去年掩码', 'previous_mask', 'prev_mask'),
+    '名称': ('名称', 'name'),
+}
+
+
+def 读取任务清单(清单路径: str) -> List[Dict]:
+    """
+    读取任务清单
+
+    返回:
+        [{'去年', '今年', 'shapefile', '去年掩码', '名称'}]，相对路径按清单所在目录解析
+    """
+    扩展名 = os.path.splitext(清单路径)[1].lower()
+    with open(清单路径, 'r', encoding='utf-8-sig') as f:
+        if 扩展名 == '.csv':
+            原始 = list(csv.DictReader(f))
+        elif 扩展名 == '.jsonl':
+            原始 = [json.loads(行) for 行 in f if 行.strip()]
+        else:
+            原始 = json.load(f)
+
+    基准目录 = os.path.dirname(os.path.abspath(清单路径))
+    任务列表 = []
+    for 序号, 行 in enumerate(原始):
+        任务 = {}
+        for 字段, 别名 in _字段别名.items():
+            值 = next((行[k] for k in 别名 if 行.get(k)), None)
+            if 值 and 字段 != '名称':
+                值 = os.path.normpath(os.path.join(基准目录, 值))
+            任务[字段] = 值
+        if not 任务['去年'] or not 任务['今年']:
+            raise ValueError(f"❌ 清单第 {序号 + 1} 项缺少 去年/今年 影像路径")
+        任务['名称'] = 任务['名称'] or f"{序号 + 1:04d}_{os.path.splitext(os.path.basename(任务['今年']))[0]}"
+        任务列表.append(任务)
+    检查名称唯一(任务列表)
+    return 任务列表
+
+
+def 检查名称唯一(任务列表: List[Dict]):
+    """任务名称即输出子目录名，重复时后一个任务会覆盖前一个的结果，抛出 ValueError"""
+    已有 = {}
+    重复 = []
+    for 任务 in 任务列表:
+        键 = 任务['名称'].lower()  # Windows文件系统不区分大小写
+        if 键 in 已有:
+            重复.append(f"{已有[键]} / {任务['名称']}")
+        else:
+            已有[键] = 任务['名称']
+    if 重复:
+        raise ValueError(f"❌ 任务名称重复（输出目录会互相覆盖）: {', '.join(重复)}")
+
+
+def 对齐掩码(掩码: np.ndarray, 源路径: str, 目标路径: str) -> np.ndarray:
+    """把源影像网格上的掩码重投影到目标影像网格（最近邻）"""
+    import rasterio
+    from rasterio.warp import reproject, Resampling
+
+    with rasterio.open(源路径) as 源, rasterio.open(目标路径) as 目标:
+        if 源.crs == 目标.crs and 源.transform == 目标.transform and 源.shape == 目标.shape:
+            return 掩码.astype(np.uint8)
+        结果 = np.zeros((目标.height, 目标.width), dtype=np.uint8)
+        reproject(
+            掩码.astype(np.uint8), 结果,
+            src_transform=源.transform, src_crs=源.crs,
+            dst_transform=目标.transform, dst_crs=目标.crs,
+            resampling=Resampling.nearest
+        )
+    return 结果
+
+
+def 保存掩码(路径: str, 掩码: np.ndarray, 参考路径: str):
+    """保存为与参考影像同网格的uint8分块压缩GeoTIFF"""
+    import rasterio
+
+    with rasterio.open(参考路径) as src:
+        配置 = {
+            'driver': 'GTiff', 'dtype': 'uint8', 'count': 1,
+            'width': src.width, 'height': src.height, 'crs': src.crs, 'transform': src.transform,
+            'tiled': True, 'blockxsize': 256, 'blockysize': 256, 'compress': 'deflate',
+        }
+    with rasterio.open(路径, 'w', **配置) as dst:
+        dst.write(np.asarray(掩码, dtype=np.uint8), 1)
+
+
+def _可序列化(结果: Dict) -> Dict:
+    """去掉数组字段，numpy标量转为Python类型"""
+    return {
+        k: (v.item() if isinstance(v, np.generic) else v)
+        for k, v in 结果.items() if not isinstance(v, np.ndarray)
+    }
+
+
+def _基准地图种子(基准数据路径: str, tif路径: str):
+    """把基准耕地地图（训练时生成的 _基准数据.pkl）重投影到影像网格，没有基准耕地地图时返回None"""
+    import pickle
+    import rasterio
+    from affine import Affine
+    from rasterio.warp import reproject, Resampling
+
+    with open(基准数据路径, 'rb') as f:
+        基准信息 = pickle.load(f)
+    if '基准耕地地图' not in 基准信息:
+        return None
+
+    变换 = 基准信息['地理变换']
+    with rasterio.open(tif路径) as 目标:
+        结果 = np.zeros((目标.height, 目标.width), dtype=np.uint8)
+        reproject(
+            np.asarray(基准信息['基准耕地地图'], dtype=np.uint8), 结果,
+            src_transform=Affine(变换['a'], 变换['b'], 变换['c'], 变换['d'], 变换['e'], 变换['f']),
+            src_crs=基准信息.get('crs') or 目标.crs,
+            dst_transform=目标.transform, dst_crs=目标.crs,
+            resampling=Resampling.nearest
+        )
+    return 结果
+
+
+def 去年种子掩码(系统, 任务: Dict, 模型路径: str = None) -> Tuple[np.ndarray, str]:
+    """
+    去年影像识别的种子耕地掩码（去年影像网格）
+
+    窗口颜色规则只在已有耕地的边界附近扩展，不带种子识别去年影像时结果恒为空，
+    因此依次使用: 任务的 去年掩码（栅格）、任务的 shapefile 地块、模型旁的基准耕地地图（与图形界面相同）
+
+    返回:
+        (种子掩码, 来源)
+
+    异常:
+        ValueError: 没有可用的种子，或种子在去年影像范围内没有耕地
+    """
+    import rasterio
+
+    if 任务.get('去年掩码'):
+        with rasterio.open(任务['去年掩码']) as src:
+            掩码 = src.read(1) > 0
+        种子, 来源 = 对齐掩码(掩码, 任务['去年掩码'], 任务['去年']), f"去年掩码 {任务['去年掩码']}"
+    elif 任务.get('shapefile'):
+        种子, 来源 = 系统.基于shapefile提取耕地(任务['去年'], 任务['shapefile']), f"地块 {任务['shapefile']}"
+    else:
+        模型路径 = 模型路径 or 系统.配置.模型保存路径
+        基准数据路径 = 模型路径.replace('.h5', '_基准数据.pkl') if 模型路径 else ""
+        种子 = _基准地图种子(基准数据路径, 任务['去年']) if 基准数据路径 and os.path.exists(基准数据路径) else None
+        if 种子 is None:
+            raise ValueError("❌ 没有去年的种子耕地（任务未提供 去年掩码 或 shapefile，模型旁也没有基准耕地地图），"
+                             "颜色规则无法识别去年影像")
+        来源 = f"基准耕地地图 {基准数据路径}"
+
+    if not np.any(种子):
+        raise ValueError(f"❌ 种子耕地（{来源}）在去年影像范围内没有耕地")
+    return 种子.astype(np.uint8), 来源
+
+
+def 计算影像对(系统, 任务: Dict, 模型路径: str = None, 快速模式: bool = False) -> Dict:
+    """
+    计算部分：取去年种子耕地 -> 识别去年影像 -> 对齐到今年网格 -> 以去年结果为基础增量识别今年影像 -> 变化类别统计
+    （配置 使用变化先验 为True时，今年影像只重新识别与去年影像相比发生变化的块）
+
+    参数:
+        系统: 耕地分析系统 实例（模型只加载一次，可复用）
+        任务: {'去年', '今年', 'shapefile', '去年掩码', '名称'}
+
+    返回:
+        {'去年结果', '今年结果', '去年掩码', '今年掩码', '变化统计', '耗时_秒'}（含数组）
+
+    异常:
+        ValueError: 没有去年的种子耕地（见 去年种子掩码）
+    """
+    from 详细变化统计 import 计算详细变化
+    from 面积核算 import 行像元面积
+    import rasterio
+
+    开始 = time.time()
+    种子, 种子来源 = 去年种子掩码(系统, 任务, 模型路径)
+    print(f"🌱 去年种子耕地: {种子来源}")
+    去年结果 = 系统.使用模型预测耕地_大图(任务['去年'], 模型路径=模型路径, 快速模式=快速模式, 去年掩码=种子)
+    去年结果['种子来源'] = 种子来源
+    del 种子
+    去年掩码 = 对齐掩码(去年结果.pop('耕地掩码') > 0.5, 任务['去年'], 任务['今年'])
+
+    今年结果 = 系统.使用模型预测耕地_大图(
+        任务['今年'], 模型路径=模型路径, 快速模式=快速模式,
+        去年掩码=去年掩码, 去年图像路径=任务['去年'] if 系统.配置.使用变化先验 else None
+    )
+    今年掩码 = (今年结果.pop('耕地掩码') > 0.5).astype(np.uint8)
+
+    with rasterio.open(任务['今年']) as src:
+        像素分辨率 = float(np.sqrt(行像元面积(src.transform, src.crs, src.height).mean()))
+
+    return {
+        '去年结果': 去年结果,
+        '今年结果': 今年结果,
+        '去年掩码': 去年掩码,
+        '今年掩码': 今年掩码,
+        '变化统计': 计算详细变化(去年掩码, 今年掩码, 像素分辨率),
+        '耗时_秒': time.time() - 开始,
+    }
+
+
+def 写出影像对结果(任务: Dict, 计算结果: Dict, 输出目录: str) -> Dict:
+    """
+    输出部分：掩码GeoTIFF、变化地块GeoPackage、地块统计CSV 和 summary.json
+
+    返回:
+        汇总字典
+    """
+    from 详细变化统计 import 导出变化地块
+    import rasterio
+
+    os.makedirs(输出目录, exist_ok=True)
+    开始 = time.time()
+    变化统计 = 计算结果['变化统计']
+    with rasterio.open(任务['今年']) as src:
+        transform, crs = src.transform, src.crs
+
+    文件 = {
+        '去年掩码': os.path.join(输出目录, "去年掩码.tif"),
+        '今年掩码': os.path.join(输出目录, "今年掩码.tif"),
+        '变化类别': os.path.join(输出目录, "变化类别.tif"),
+        '变化地块': os.path.join(输出目录, "变化地块.gpkg"),
+    }
+    保存掩码(文件['去年掩码'], 计算结果['去年掩码'], 任务['今年'])
+    保存掩码(文件['今年掩码'], 计算结果['今年掩码'], 任务['今年'])
+    保存掩码(文件['变化类别'], 变化统计['变化类别图'], 任务['今年'])
+    导出变化地块(变化统计['变化类别图'], transform, crs, 文件['变化地块'], 变化统计['像素面积_亩'])
+
+    汇总 = {
+        '名称': 任务['名称'],
+        '状态': '完成',
+        '任务': 任务,
+        '去年结果': _可序列化(计算结果['去年结果']),
+        '今年结果': _可序列化(计算结果['今年结果']),
+        '变化统计': _可序列化(变化统计),
+        '文件': 文件,
+    }
+
+    if 任务.get('shapefile'):
+        from 地块统计 import 地块分区统计
+        地块表 = 地块分区统计(任务['shapefile'], 任务['今年'], 计算结果['今年掩码'], 计算结果['去年掩码'], 输出目录)
+        文件['地块统计'] = os.path.join(
+            输出目录, f"地块统计_{os.path.splitext(os.path.basename(任务['今年']))[0]}.csv")
+        汇总['地块数'] = int(len(地块表))
+
+    汇总['耗时_秒'] = round(计算结果['耗时_秒'] + time.time() - 开始, 1)
+    with open(os.path.join(输出目录, 汇总文件名), 'w', encoding='utf-8') as f:
+        json.dump(汇总, f, ensure_ascii=False, indent=2, default=str)
+    return 汇总
+
+
+def 分析影像对(系统, 任务: Dict, 输出目录: str, 模型路径: str = None, 快速模式: bool = False) -> Dict:
+    """
+    分析一对影像（计算影像对 + 写出影像对结果）
+
+    返回:
+        汇总字典（同时保存为 输出目录/summary.json）
+    """
+    return 写出影像对结果(任务, 计算影像对(系统, 任务, 模型路径, 快速模式), 输出目录)
+
+
+# ==================== 进程池 ====================
+
+_工作进程系统 = None
+_工作进程配置 = None  # 工作进程分析系统的原始配置，每个任务在此基础上切换目录
+
+
+def _初始化工作进程(输出根目录: str, 模型路径: str = None, 配置: Union[运行配置, Dict] = None):
+    """
+    每个工作进程按配置创建一个分析系统并预先加载模型，之后所有任务复用
+    （配置为字典时叠加到 耕地分析系统.py 顶部配置区域上）
+
+    初始化日志不输出（标准输出只有JSON进度），出错时把错误写到标准错误；
+    模型加载失败时任务中会再次尝试加载，错误同时写入该任务的日志和汇总
+    """
+    global _工作进程系统, _工作进程配置
+    with open(os.devnull, 'w') as 空:
+        with contextlib.redirect_stdout(空):
+            try:
+                from 耕地分析系统 import 耕地分析系统, 默认配置
+                if isinstance(配置, dict):
+                    配置 = 默认配置(**配置)
+                _工作进程系统 = 耕地分析系统(输出根目录, 配置)
+                _工作进程配置 = _工作进程系统.配置
+            except Exception as e:
+                print(f"❌ 工作进程 {os.getpid()} 初始化失败: {type(e).__name__}: {e}", file=sys.stderr, flush=True)
+                raise
+            try:
+                _工作进程系统.加载模型(模型路径)
+            except Exception as e:
+                print(f"⚠️  工作进程 {os.getpid()} 预加载模型失败: {type(e).__name__}: {e}", file=sys.stderr, flush=True)
+
+
+@contextlib.contextmanager
+def 任务目录(任务: Dict, 输出根目录: str, 独立缓存: bool = True):
+    """
+    工作进程中的分析系统在该任务期间使用任务自己的内存映射目录（和结果缓存目录）
+
+    内存预算 启动时会删除映射目录中遗留的 .dat 文件，多个工作进程共用一个目录会删掉彼此正在使用的映射；
+    独立缓存 为False时所有任务共用一个结果缓存库（分析服务的作业名称每次都不同，独立缓存无法复用）
+    """
+    系统 = _工作进程系统
+    映射根 = _工作进程配置.内存映射目录 or os.path.join(输出根目录, '.内存映射')
+    缓存根 = _工作进程配置.结果缓存目录 or os.path.join(输出根目录, '.结果缓存')
+    映射目录 = os.path.join(映射根, 任务['名称'])
+    缓存目录 = os.path.join(缓存根, 任务['名称']) if 独立缓存 else 缓存根
+
+    旧缓存 = getattr(系统, '_结果缓存', None)
+    if 旧缓存 is not None and 旧缓存.缓存目录 != 缓存目录:
+        旧缓存.关闭()
+        系统._结果缓存 = None
+    系统.配置 = _工作进程配置.替换(内存映射目录=映射目录, 结果缓存目录=缓存目录)
+    try:
+        yield
+    finally:
+        with contextlib.suppress(OSError):
+            os.rmdir(映射目录)  # 映射文件已由内存预算清理，只删除空目录
+
+
+def _执行任务(任务: Dict, 输出根目录: str, 模型路径: str, 快速模式: bool, 独立缓存: bool = True) -> Dict:
+    输出目录 = os.path.join(输出根目录, 任务['名称'])
+    os.makedirs(输出目录, exist_ok=True)
+    with open(os.path.join(输出目录, "分析日志.txt"), 'w', encoding='utf-8') as 日志:
+        with contextlib.redirect_stdout(日志):
+            try:
+                with 任务目录(任务, 输出根目录, 独立缓存):
+                    return 分析影像对(_工作进程系统, 任务, 输出目录, 模型路径, 快速模式)
+            except Exception as e:
+                traceback.print_exc(file=日志)
+                汇总 = {'名称': 任务['名称'], '状态': '失败', '任务': 任务, '错误': f"{type(e).__name__}: {e}"}
+                with open(os.path.join(输出目录, 汇总文件名), 'w', encoding='utf-8') as f:
+                    json.dump(汇总, f, ensure_ascii=False, indent=2)
+                return 汇总
+
+
+# 进度固定写到启动时的标准输出（调用方把日志重定向到别处时也不受影响）
+_进度输出 = sys.stdout
+
+
+def _报告进度(事件: str, **字段):
+    """标准输出逐行JSON进度"""
+    print(json.dumps({'事件': 事件, '时间': time.strftime('%Y-%m-%d %H:%M:%S'), **字段},
+                     ensure_ascii=False, default=str), file=_进度输出, flush=True)
+
+
+def _已完成(输出根目录: str, 任务: Dict) -> bool:
+    路径 = os.path.join(输出根目录, 任务['名称'], 汇总文件名)
+    if not os.path.exists(路径):
+        return False
+    with open(路径, 'r', encoding='utf-8') as f:
+        return json.load(f).get('状态') == '完成'
+
+
+def 批量运行(任务列表: List[Dict],
+         输出根目录: str,
+         进程数: int = 1,
+         模型路径: str = None,
+         快速模式: bool = False,
+         重新运行: bool = False,
+         配置: Union[运行配置, Dict] = None) -> int:
+    """
+    用进程池分析所有影像对（已完成的任务默认跳过，可随时中断后重跑）
+
+    参数:
+        进程数: 工作进程数（每个进程各加载一份模型，使用GPU时建议为1）
+        配置: 工作进程中分析系统使用的运行配置，或只含改动项的字典（如 运行配置.读取文件 的结果，
+             在工作进程中叠加到 耕地分析系统.py 顶部配置区域上）；默认为顶部配置区域
+
+    返回:
+        退出码：0 全部成功，1 有任务失败
+
+    异常:
+        ValueError: 任务名称重复
+    """
+    检查名称唯一(任务列表)
+    os.makedirs(输出根目录, exist_ok=True)
+    待运行 = [t for t in 任务列表 if 重新运行 or not _已完成(输出根目录, t)]
+    _报告进度('开始', 总数=len(任务列表), 待运行=len(待运行), 跳过=len(任务列表) - len(待运行), 进程数=进程数)
+
+    成功 = 失败 = 0
+    汇总列表 = []
+    with ProcessPoolExecutor(max_workers=max(1, 进程数), initializer=_初始化工作进程,
+                             initargs=(输出根目录, 模型路径, 配置)) as 执行器:
+        未来 = {执行器.submit(_执行任务, t, 输出根目录, 模型路径, 快速模式): t for t in 待运行}
+        for 完成 in as_completed(未来):
+            任务 = 未来[完成]
+            try:
+                汇总 = 完成.result()
+            except Exception as e:  # 工作进程崩溃
+                汇总 = {'名称': 任务['名称'], '状态': '失败', '错误': f"{type(e).__name__}: {e}"}
+
+            if 汇总['状态'] == '完成':
+                成功 += 1
+                _报告进度('完成', 名称=汇总['名称'], 已完成=成功 + 失败, 总数=len(待运行),
+                      耗时_秒=汇总.get('耗时_秒'), 新增_亩=汇总['变化统计']['新增面积_亩'],
+                      减少_亩=汇总['变化统计']['减少面积_亩'])
+            else:
+                失败 += 1
+                _报告进度('失败', 名称=汇总['名称'], 已完成=成功 + 失败, 总数=len(待运行), 错误=汇总.get('错误'))
+            汇总列表.append({k: 汇总.get(k) for k in ('名称', '状态', '耗时_秒', '错误')})
+
+    with open(os.path.join(输出根目录, "batch_summary.json"), 'w', encoding='utf-8') as f:
+        json.dump({'成功': 成功, '失败': 失败, '任务': 汇总列表}, f, ensure_ascii=False, indent=2)
+    _报告进度('结束', 成功=成功, 失败=失败)
+    return 0 if 失败 == 0 else 1
+
+
+if __name__ == "__main__":
+    import argparse
+
+    解析器 = argparse.ArgumentParser(description="批量耕地变化分析（无界面）")
+    解析器.add_argument('清单', help="任务清单（.csv / .json / .jsonl）")
+    解析器.add_argument('输出目录')
+    解析器.add_argument('--进程数', type=int, default=None, help="默认使用配置中的进程数")
+    解析器.add_argument('--模型', default=None, help="模型路径（默认使用配置中的模型保存路径）")
+    解析器.add_argument('--配置', default=None, help="运行配置文件（.json / .yaml）")
+    解析器.add_argument('--快速模式', action='store_true')
+    解析器.add_argument('--重新运行', action='store_true', help="不跳过已完成的任务")
+    参数 = 解析器.parse_args()
+
+    try:
+        # 配置文件只给出改动项，工作进程中叠加到引擎配置区域上（主进程不导入引擎）
+        配置 = 运行配置.读取文件(参数.配置) if 参数.配置 else None
+        进程数 = 参数.进程数 or 运行配置.从字典(配置 or {}).进程数
+        任务列表 = 读取任务清单(参数.清单)
+    except Exception as e:
+        _报告进度('错误', 错误=f"{type(e).__name__}: {e}")
+        sys.exit(2)
+
+    sys.exit(批量运行(任务列表, 参数.输出目录, 进程数, 参数.模型, 参数.快速模式, 参数.重新运行, 配置))
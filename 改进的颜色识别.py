@@ -101,14 +101,18 @@ def 改进的颜色识别(图像块, 去年块掩码=None, 严格程度=1.0):
 
     return mask_farmland.astype(float)
 
-def 计算最优严格程度(tif_path, 像素分辨率, 预期面积_亩=12.6):
+def 计算最优严格程度(tif_path, 像素分辨率, 预期面积_亩=12.6, 候选数=3):
     """
     通过测试不同的严格程度来找到最优参数
 
+    Args:
+        候选数: 直方图扫描（不含形态学去噪）中最接近预期的几个严格程度，再用完整识别比较
+
     Returns:
         最优的严格程度参数
     """
     import rasterio
+    from 参数扫描 import 颜色直方图, 扫描, 严格程度规则
 
     with rasterio.open(tif_path) as src:
         图像数据 = src.read()
@@ -127,27 +131,30 @@ def 计算最优严格程度(tif_path, 像素分辨率, 预期面积_亩=12.6):
     预期像素数 = (预期面积_亩 * 666.67) / (像素分辨率 * 像素分辨率)
     测试块预期像素 = 预期像素数 * (测试块.shape[0] * 测试块.shape[1]) / (图像.shape[0] * 图像.shape[1])
 
-    best_strictness = 1.0
-    min_diff = float('inf')
-
     print(f"\n🔍 寻找最优严格程度...")
     print(f"   测试块预期像素数: {测试块预期像素:.0f}")
 
-    # 测试不同的严格程度
-    for strictness in np.linspace(0.7, 1.5, 17):  # 从0.7到1.5，步长0.05
+    # 测试不同的严格程度：颜色判定只依赖像素值，统计一次颜色直方图后整组严格程度一次求值
+    直方图 = 颜色直方图.从数组构建(测试块)
+    结果 = 扫描(直方图, 严格程度规则, {'严格程度': np.linspace(0.7, 1.5, 17)})  # 从0.7到1.5，步长0.05
+    差异 = (结果['像素数'] - 测试块预期像素).abs()
+
+    # 直方图不含形态学去噪，最接近的几个候选再完整识别，按完整识别的像素数选最优
+    # （差异相同时取较小的严格程度，与逐个测试时的顺序一致）
+    候选 = sorted(差异.nsmallest(候选数).index, key=lambda i: 结果.loc[i, '严格程度'])
+    best_strictness, min_diff, 最优掩码 = None, float('inf'), None
+    for i in 候选:
+        strictness = float(结果.loc[i, '严格程度'])
         掩码 = 改进的颜色识别(测试块, 严格程度=strictness)
-        像素数 = np.sum(掩码 > 0.5)
-        差异 = abs(像素数 - 测试块预期像素)
-
-        if 差异 < min_diff:
-            min_diff = 差异
-            best_strictness = strictness
+        像素差异 = abs(np.sum(掩码 > 0.5) - 测试块预期像素)
+        print(f"   候选 {strictness:.2f}: 直方图差异 {差异[i]:.0f}, 完整识别差异 {像素差异:.0f} 像素")
+        if 像素差异 < min_diff:
+            best_strictness, min_diff, 最优掩码 = strictness, 像素差异, 掩码
 
     print(f"\n✅ 最优严格程度: {best_strictness:.2f}")
     print(f"   最小差异: {min_diff:.0f} 像素")
 
-    # 使用最优参数重新识别
-    最优掩码 = 改进的颜色识别(测试块, 严格程度=best_strictness)
+    # 最优参数的完整识别结果
     最优像素数 = np.sum(最优掩码 > 0.5)
     最优面积 = 最优像素数 * (像素分辨率 * 像素分辨率) / 666.67
 
@@ -0,0 +1,282 @@
+"""
+断点续训模块
+多TIF逐个训练的非交互驱动：运行清单记录已完成的TIF、当前TIF和轮次，
+tf.train.CheckpointManager 每轮保存模型权重、优化器状态和轮次，
+中断后重新运行即可从中断的那一轮继续；模型在TIF之间常驻内存，不再反复load_model
+"""
+
+import os
+import sys
+import json
+import time
+import subprocess
+from datetime import datetime
+from typing import Callable, Dict, List
+
+import numpy as np
+
+清单文件名 = "run_manifest.json"
+不可重试退出码 = 2  # 训练脚本遇到重启后仍会出现的错误（配置错误、数据错误等）时使用，自动重启运行 不再重启
+
+
+def _原子写入JSON(路径: str, 数据: Dict):
+    """先写临时文件再替换，中途崩溃不会留下损坏的清单"""
+    临时路径 = 路径 + ".tmp"
+    with open(临时路径, 'w', encoding='utf-8') as f:
+        json.dump(数据, f, ensure_ascii=False, indent=2)
+    os.replace(临时路径, 路径)
+
+
+class 续训运行:
+    """
+    可断点恢复的多TIF训练运行
+
+    用法:
+        运行 = 续训运行(运行目录, tif列表, 构建模型, 生成样本, 训练轮数=50)
+        运行.执行()
+    """
+
+    def __init__(self,
+                 运行目录: str,
+                 tif列表: List[str],
+                 构建模型: Callable,
+                 生成样本: Callable,
+                 训练轮数: int = 50,
+                 批次大小: int = 4,
+                 验证比例: float = 0.15,
+                 模型保存路径: str = None,
+                 初始权重路径: str = None,
+                 回调列表: Callable = None,
+                 保留检查点数: int = 2):
+        """
+        参数:
+            运行目录: 保存运行清单和检查点的目录
+            tif列表: 按顺序训练的TIF路径列表（恢复时以清单中的列表为准）
+            构建模型: 无参函数，返回已编译的模型
+            生成样本: f(tif路径, 种子) -> (X, y)，没有有效样本时返回空数组；相同种子须得到相同样本
+            训练轮数: 每个TIF的训练轮数
+            批次大小: 批次大小
+            验证比例: 验证集比例
+            模型保存路径: 每个TIF完成后保存的.h5路径（同时作为最佳模型路径）
+            初始权重路径: 新运行时加载的已有模型（增量学习），为空则从零开始
+            回调列表: 无参函数，返回额外的Keras回调（早停、学习率衰减等），每个TIF重新创建
+            保留检查点数: 保留的检查点数量
+        """
+        self.运行目录 = 运行目录
+        self.清单路径 = os.path.join(运行目录, 清单文件名)
+        self.构建模型 = 构建模型
+        self.生成样本 = 生成样本
+        self.训练轮数 = 训练轮数
+        self.批次大小 = 批次大小
+        self.验证比例 = 验证比例
+        self.模型保存路径 = 模型保存路径
+        self.初始权重路径 = 初始权重路径
+        self.回调列表 = 回调列表
+        self.保留检查点数 = 保留检查点数
+
+        os.makedirs(运行目录, exist_ok=True)
+        self.清单 = self._读取或创建清单(tif列表)
+
+        self.model = None
+        self._检查点 = None
+        self._检查点管理器 = None
+
+    def _读取或创建清单(self, tif列表: List[str]) -> Dict:
+        if os.path.exists(self.清单路径):
+            with open(self.清单路径, 'r', encoding='utf-8') as f:
+                清单 = json.load(f)
+            print(f"📋 发现运行清单: {self.清单路径}")
+            print(f"   已完成 {len(清单['已完成'])}/{len(清单['tif列表'])} 个TIF"
+                  + (f"，当前TIF第 {清单['当前轮'] + 1} 轮" if 清单['当前TIF'] else ""))
+
+            新增 = [路径 for 路径 in tif列表 if 路径 not in 清单['tif列表']]
+            if 新增:
+                print(f"   追加新发现的TIF {len(新增)} 个")
+                清单['tif列表'].extend(新增)
+                清单['状态'] = '进行中'
+            return 清单
+
+        清单 = {
+            '创建时间': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            '状态': '进行中',
+            'tif列表': list(tif列表),
+            '已完成': [],
+            '失败': {},
+            '当前TIF': None,
+            '当前轮': 0,
+            '训练轮数': self.训练轮数,
+            '历史': {}
+        }
+        _原子写入JSON(self.清单路径, 清单)
+        return 清单
+
+    def 保存清单(self):
+        self.清单['更新时间'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        _原子写入JSON(self.清单路径, self.清单)
+
+    def _准备模型(self):
+        """构建模型并恢复最新检查点（权重 + 优化器状态 + 轮次）"""
+        import tensorflow as tf
+
+        self.model = self.构建模型()
+        self._轮次 = tf.Variable(0, dtype=tf.int64, name='epoch')
+        self._检查点 = tf.train.Checkpoint(
+            model=self.model,
+            optimizer=self.model.optimizer,
+            epoch=self._轮次
+        )
+        self._检查点管理器 = tf.train.CheckpointManager(
+            self._检查点,
+            os.path.join(self.运行目录, 'checkpoints'),
+            max_to_keep=self.保留检查点数
+        )
+
+        最新 = self._检查点管理器.latest_checkpoint
+        if 最新:
+            self._检查点.restore(最新)
+            print(f"✅ 已恢复检查点: {os.path.basename(最新)}（模型权重 + 优化器状态）")
+        elif self.初始权重路径 and os.path.exists(self.初始权重路径):
+            self.model.load_weights(self.初始权重路径)
+            print(f"✅ 已加载初始权重（增量学习）: {os.path.basename(self.初始权重路径)}")
+        else:
+            print("🏗️ 从零开始训练新模型")
+
+    def _检查点回调(self):
+        """每轮结束保存检查点并更新清单中的轮次"""
+        try:
+            from tensorflow import keras
+        except ImportError:
+            import keras
+
+        运行 = self
+
+        class 保存检查点(keras.callbacks.Callback):
+            def on_epoch_end(self, epoch, logs=None):
+                运行._轮次.assign(epoch + 1)
+                运行._检查点管理器.save()
+                运行.清单['当前轮'] = epoch + 1
+                运行.保存清单()
+
+        return 保存检查点()
+
+    def _训练单个TIF(self, 序号: int, tif路径: str):
+        起始轮 = self.清单['当前轮'] if self.清单['当前TIF'] == tif路径 else 0
+        if 起始轮 >= self.训练轮数:
+            return None
+
+        # 样本用固定种子生成，恢复时得到与中断前相同的训练/验证集
+        X, y = self.生成样本(tif路径, 序号)
+        if len(X) == 0:
+            raise ValueError("该TIF无有效样本")
+
+        X = np.asarray(X)
+        y = np.asarray(y)
+        rng = np.random.default_rng(序号)
+        顺序 = rng.permutation(len(X))
+        验证数 = max(1, int(len(X) * self.验证比例))
+        验证序号, 训练序号 = 顺序[:验证数], 顺序[验证数:]
+
+        self.清单['当前TIF'] = tif路径
+        self.清单['当前轮'] = 起始轮
+        self.保存清单()
+
+        if 起始轮 > 0:
+            print(f"⏩ 从第 {起始轮 + 1} 轮继续")
+
+        回调 = [self._检查点回调()] + (self.回调列表() if self.回调列表 else [])
+        history = self.model.fit(
+            X[训练序号], y[训练序号],
+            validation_data=(X[验证序号], y[验证序号]),
+            batch_size=self.批次大小,
+            epochs=self.训练轮数,
+            initial_epoch=起始轮,
+            callbacks=回调,
+            verbose=1
+        )
+        return {k: [float(v) for v in vs] for k, vs in history.history.items()}
+
+    def 执行(self) -> Dict:
+        """
+        训练清单中所有未完成的TIF，单个TIF出错时记入 '失败' 并继续（删除清单中的记录即可重试）
+
+        返回:
+            运行清单
+        """
+        if self.model is None:
+            self._准备模型()
+
+        tif列表 = self.清单['tif列表']
+        for 序号, tif路径 in enumerate(tif列表):
+            if tif路径 in self.清单['已完成'] or tif路径 in self.清单['失败']:
+                continue
+
+            print(f"\n{'='*60}")
+            print(f"🎯 正在训练第 {序号 + 1}/{len(tif列表)} 个TIF: {os.path.basename(tif路径)}")
+            print(f"{'='*60}")
+
+            开始 = time.time()
+            try:
+                历史 = self._训练单个TIF(序号, tif路径)
+            except Exception as e:
+                print(f"\n❌ 训练出错，跳过该TIF: {e}")
+                self.清单['失败'][tif路径] = str(e)
+                self.清单['当前TIF'] = None
+                self.清单['当前轮'] = 0
+                self.保存清单()
+                continue
+
+            if 历史 is not None:
+                self.清单['历史'][tif路径] = 历史
+            self.清单['已完成'].append(tif路径)
+            self.清单['当前TIF'] = None
+            self.清单['当前轮'] = 0
+
+            # 下一个TIF从第0轮开始，检查点中的轮次同步清零
+            self._轮次.assign(0)
+            self._检查点管理器.save()
+            if self.模型保存路径:
+                self.model.save(self.模型保存路径)
+            self.保存清单()
+
+            print(f"✅ 完成（{time.time() - 开始:.0f}秒），已完成 {len(self.清单['已完成'])}/{len(tif列表)}")
+
+        self.清单['状态'] = '完成'
+        self.保存清单()
+        return self.清单
+
+
+def 自动重启运行(命令: List[str], 最大重启次数: int = 5, 重启间隔: float = 10.0) -> int:
+    """
+    运行训练命令，进程异常退出时自动重启（配合续训运行从检查点继续）；
+    退出码为 不可重试退出码 时直接返回
+
+    返回:
+        最后一次运行的退出码
+    """
+    for 次数 in range(最大重启次数 + 1):
+        if 次数 > 0:
+            print(f"\n🔄 第 {次数} 次自动重启（{重启间隔:.0f}秒后）...")
+            time.sleep(重启间隔)
+
+        退出码 = subprocess.call(命令)
+        if 退出码 == 0:
+            return 0
+        if 退出码 == 不可重试退出码:
+            print(f"\n❌ 训练进程报告不可重试的错误（退出码 {退出码}），不再自动重启")
+            return 退出码
+        print(f"\n⚠️  训练进程异常退出（退出码 {退出码}）")
+
+    print(f"\n❌ 已达到最大重启次数 {最大重启次数}")
+    return 退出码
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("用法: python 断点续训.py <训练脚本.py> [最大重启次数]")
+        print("      训练脚本需设置 训练模式 = \"续训\"")
+        sys.exit(1)
+
+    sys.exit(自动重启运行(
+        [sys.executable, sys.argv[1]],
+        最大重启次数=int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    ))
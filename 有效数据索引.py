@@ -0,0 +1,184 @@
+"""
+有效数据索引模块
+每幅影像一次性建立块级有效数据索引（来自数据集掩码/nodata和低分辨率概览上的黑边检测），
+分析、面积核算和可视化直接跳过没有任何有效数据的块，不再读取和逐像素过滤大片黑边
+"""
+
+import os
+import numpy as np
+import rasterio
+from rasterio.enums import Resampling, MaskFlags
+from rasterio.windows import Window
+from typing import Dict
+
+# 低分辨率像元的RGB平均值之和不超过该值视为黑边（比逐像素的 >10 规则更保守，
+# 降采样平均后块内只要有少量非黑像素就会超过该值）
+黑边阈值 = 1.0
+
+_索引缓存: Dict[tuple, '有效数据索引'] = {}
+_缓存上限 = 16
+
+
+def _低分辨率掩码(src, 降采样: int, 低高: int, 低宽: int) -> np.ndarray:
+    """
+    数据集掩码（nodata / alpha / 内部掩码）的低分辨率版本：低分辨率像元内任一像素有效即为有效
+
+    GDAL读取时不支持max重采样，按行带读取全分辨率掩码后取块内最大值；没有声明掩码时直接全部有效
+    """
+    if all(MaskFlags.all_valid in 标志 for 标志 in src.mask_flag_enums):
+        return np.ones((低高, 低宽), dtype=bool)
+
+    有效 = np.zeros((低高, 低宽), dtype=bool)
+    行带 = 降采样 * 64
+    for y in range(0, src.height, 行带):
+        高 = min(行带, src.height - y)
+        掩码 = src.dataset_mask(window=Window(0, y, src.width, 高)) > 0
+        掩码 = np.pad(掩码, ((0, (-高) % 降采样), (0, (-src.width) % 降采样)))
+        低 = 掩码.reshape(掩码.shape[0] // 降采样, 降采样, 掩码.shape[1] // 降采样, 降采样).any(axis=(1, 3))
+        有效[y // 降采样:y // 降采样 + 低.shape[0]] = 低
+    return 有效
+
+
+class 有效数据索引:
+    """
+    影像的块级有效数据索引
+
+    有效块[i, j] 为True表示第i行第j列的块（块尺寸x块尺寸像素）内至少有一个有效像素
+    """
+
+    def __init__(self, tif路径: str, 块尺寸: int = 256, 降采样: int = None):
+        """
+        参数:
+            tif路径: 影像路径
+            块尺寸: 块大小(像素)
+            降采样: 低分辨率读取倍数（默认 块尺寸//16，优先使用影像概览）
+        """
+        self.tif路径 = tif路径
+        self.块尺寸 = 块尺寸
+        降采样 = 降采样 or max(1, 块尺寸 // 16)
+        k = max(1, 块尺寸 // 降采样)
+        降采样 = 块尺寸 // k
+
+        with rasterio.open(tif路径) as src:
+            self.宽度 = src.width
+            self.高度 = src.height
+            低高 = int(np.ceil(src.height / 降采样))
+            低宽 = int(np.ceil(src.width / 降采样))
+
+            # 1. 数据集掩码（nodata / alpha / 内部掩码），没有声明时全部有效
+            有效 = _低分辨率掩码(src, 降采样, 低高, 低宽)
+
+            # 2. 黑边（RGB接近0），平均重采样时自动使用影像概览
+            波段 = list(range(1, min(3, src.count) + 1))
+            低分辨率 = src.read(波段, out_shape=(len(波段), 低高, 低宽), resampling=Resampling.average)
+            有效 &= 低分辨率.astype(np.float32).sum(axis=0) > 黑边阈值
+
+        # 块内任一低分辨率像元有效即为有效块
+        补h = (-低高) % k
+        补w = (-低宽) % k
+        有效 = np.pad(有效, ((0, 补h), (0, 补w)))
+        块行, 块列 = 有效.shape[0] // k, 有效.shape[1] // k
+        self.有效块 = 有效.reshape(块行, k, 块列, k).any(axis=(1, 3))
+
+        # 每个块的实际像素面积（最后一行/列的块可能不完整）
+        行高 = np.minimum(self.块尺寸, self.高度 - np.arange(块行) * self.块尺寸).clip(min=0)
+        列宽 = np.minimum(self.块尺寸, self.宽度 - np.arange(块列) * self.块尺寸).clip(min=0)
+        self._块像素数 = np.outer(行高, 列宽)
+
+    @property
+    def 有效块比例(self) -> float:
+        return float(self.有效块.mean()) if self.有效块.size else 0.0
+
+    def 有效像素数(self) -> int:
+        """有效块包含的像素总数（用作 总像素数，黑边块不计入）"""
+        return int(self._块像素数[self.有效块].sum())
+
+    def 有效区域计数(self, 掩码: np.ndarray) -> int:
+        """
+        掩码在有效块内的非零像素数（与 有效像素数 范围相同，两者之比即不含黑边的比例）
+
+        按块行统计，不生成整幅临时数组
+        """
+        if 掩码.shape[:2] != (self.高度, self.宽度):
+            raise ValueError(f"掩码尺寸 {掩码.shape[:2]} 与影像 {(self.高度, self.宽度)} 不一致")
+        块 = self.块尺寸
+        列起点 = np.arange(0, self.宽度, 块)
+        总数 = 0
+        for 块行 in range(self.有效块.shape[0]):
+            有效 = self.有效块[块行, :len(列起点)]
+            if not 有效.any():
+                continue
+            列计数 = np.count_nonzero(掩码[块行 * 块:(块行 + 1) * 块], axis=0)
+            总数 += int(np.add.reduceat(列计数, 列起点)[有效].sum())
+        return 总数
+
+    def 有效面积(self, 行面积: np.ndarray) -> float:
+        """
+        有效块的总面积（平方米）
+
+        参数:
+            行面积: 每行像元面积（见 面积核算.行像元面积），地理坐标系下随纬度变化
+        """
+        块行数, 块列数 = self.有效块.shape
+        补齐 = np.zeros(块行数 * self.块尺寸)
+        补齐[:len(行面积)] = 行面积[:len(补齐)]
+        块行面积 = 补齐.reshape(块行数, self.块尺寸).sum(axis=1)
+        列宽 = np.minimum(self.块尺寸, self.宽度 - np.arange(块列数) * self.块尺寸).clip(min=0)
+        return float((np.outer(块行面积, 列宽) * self.有效块).sum())
+
+    def 窗口有数据(self, x: int, y: int, 宽: int, 高: int) -> bool:
+        """窗口是否与任一有效块重叠"""
+        if 宽 <= 0 or 高 <= 0:
+            return False
+        return bool(np.any(self.有效块[y // self.块尺寸:(y + 高 - 1) // self.块尺寸 + 1,
+                                      x // self.块尺寸:(x + 宽 - 1) // self.块尺寸 + 1]))
+
+    def 窗口无数据掩码(self, x: int, y: int, 宽: int, 高: int) -> np.ndarray:
+        """
+        窗口内位于无数据块的像素
+
+        返回:
+            (高, 宽) bool，True为无数据
+        """
+        列 = np.minimum((x + np.arange(宽)) // self.块尺寸, self.有效块.shape[1] - 1)
+        行 = np.minimum((y + np.arange(高)) // self.块尺寸, self.有效块.shape[0] - 1)
+        return ~self.有效块[np.ix_(行, 列)]
+
+    def 读取窗口(self, src, 窗口: Window, 波段=(1, 2, 3)) -> np.ndarray:
+        """
+        按块读取窗口，只读取有效块，无数据块保持为0
+
+        返回:
+            (波段数, 高, 宽) 与 src.read(波段, window=窗口) 相同形状和类型的数组
+        """
+        x0, y0 = int(窗口.col_off), int(窗口.row_off)
+        宽, 高 = int(窗口.width), int(窗口.height)
+        结果 = np.zeros((len(波段), 高, 宽), dtype=src.dtypes[0])
+
+        块 = self.块尺寸
+        for 块行 in range(y0 // 块, (y0 + 高 - 1) // 块 + 1):
+            for 块列 in range(x0 // 块, (x0 + 宽 - 1) // 块 + 1):
+                if not self.有效块[min(块行, self.有效块.shape[0] - 1), min(块列, self.有效块.shape[1] - 1)]:
+                    continue
+                左 = max(x0, 块列 * 块)
+                上 = max(y0, 块行 * 块)
+                右 = min(x0 + 宽, (块列 + 1) * 块)
+                下 = min(y0 + 高, (块行 + 1) * 块)
+                结果[:, 上 - y0:下 - y0, 左 - x0:右 - x0] = src.read(
+                    list(波段), window=Window(左, 上, 右 - 左, 下 - 上))
+        return 结果
+
+
+def 获取有效数据索引(tif路径: str, 块尺寸: int = 256) -> 有效数据索引:
+    """
+    获取影像的有效数据索引（同一文件未修改时只建立一次）
+    """
+    状态 = os.stat(tif路径)
+    键 = (os.path.abspath(tif路径), 状态.st_size, 状态.st_mtime, 块尺寸)
+    索引 = _索引缓存.get(键)
+    if 索引 is None:
+        索引 = 有效数据索引(tif路径, 块尺寸)
+        if len(_索引缓存) >= _缓存上限:
+            _索引缓存.pop(next(iter(_索引缓存)))
+        _索引缓存[键] = 索引
+    return 索引
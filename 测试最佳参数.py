@@ -5,39 +5,27 @@ import numpy as np
 import rasterio
 import os
 
+from 参数扫描 import 颜色直方图, 扫描, 绿棕规则, 默认网格
+
 def 测试绿色阈值():
     """测试不同的绿色阈值对识别结果的影响"""
     print("="*60)
     print("测试颜色识别参数")
     print("="*60)
 
-    # 打开图像
+    # 读取一次中心区域，统计颜色直方图；各组参数只在唯一颜色上求值
     with rasterio.open("jinnian.tif") as src:
-        # 读取中心区域进行测试
         window = rasterio.windows.Window(
             src.width//4, src.height//4,
             src.width//2, src.height//2
         )
-        data = src.read(window=window)
-
-        if data.shape[0] <= 4:
-            图像 = np.transpose(data[:3], (1, 2, 0))
-        else:
-            图像 = data[1:4]
-
-    # 归一化
-    if 图像.max() > 1.0:
-        图像 = 图像.astype(np.float32) / 255.0
-
-    # 转换为0-255范围
-    块 = (图像 * 255).astype(np.uint8)
-    R, G, B = 块[:,:,0].astype(np.float32), 块[:,:,1].astype(np.float32), 块[:,:,2].astype(np.float32)
+        全图像素 = src.width * src.height
+    直方图 = 颜色直方图.从影像构建("jinnian.tif", 窗口=window)
 
     # 目标值
     预期面积_亩 = 12.6
     像素分辨率 = 0.0972  # 从jinnian.tif获取
-    测试块像素 = 块.shape[0] * 块.shape[1]
-    全图像素 = src.width * src.height
+    测试块像素 = 直方图.总像素数
     缩放因子 = 全图像素 / 测试块像素
 
     # 计算测试块需要的像素数
@@ -47,8 +35,9 @@ def 测试绿色阈值():
 
     print(f"\n📊 测试信息:")
     print(f"   图像分辨率: {像素分辨率:.6f} 米/像素")
-    print(f"   测试块尺寸: {块.shape[:2]}")
-    print(f"   测试块像素数: {测试块像素:,}")
+    print(f"   测试块尺寸: {(int(window.height), int(window.width))}")
+    print(f"   测试块像素数: {测试块像素:,.0f}")
+    print(f"   测试块颜色数: {len(直方图.颜色):,}")
     print(f"   缩放到全图的因子: {缩放因子:.2f}")
     print(f"   预期全图像素数: {预期全图像素:,.0f}")
     print(f"   预期测试块像素数: {预期测试块像素:,.0f}")
@@ -64,59 +53,42 @@ def 测试绿色阈值():
         {"绿色阈值": 50, "棕色阈值": 45, "绿色Gmin": 120, "棕色Rmin": 130, "名": "最严格"},
     ]
 
-    best_diff = float('inf')
-    best_params = None
-
-    for params in 参数列表:
-        # 应用参数
-        绿色阈值 = params["绿色阈值"]
-        棕色阈值 = params["棕色阈值"]
-        绿色Gmin = params["绿色Gmin"]
-        棕色Rmin = params["棕色Rmin"]
+    def 换算(结果):
+        结果["全图像素"] = 结果["像素数"] * 缩放因子
+        结果["识别面积"] = 结果["全图像素"] * (像素分辨率 * 像素分辨率) / 666.67
+        结果["与预期差异"] = (结果["识别面积"] - 预期面积_亩).abs()
+        return 结果
 
-        # 绿色检测
-        green_diff_rg = G - R
-        green_diff_bg = G - B
-        mask_green = (green_diff_rg > 绿色阈值) & (green_diff_bg > 绿色阈值) & (G > 绿色Gmin)
+    结果 = 换算(扫描(直方图, 绿棕规则, [{k: v for k, v in p.items() if k != "名"} for p in 参数列表]))
 
-        # 棕色检测
-        brown_diff_rb = R - B
-        brown_diff_rg = np.maximum(0, R - G)
-        mask_brown = (brown_diff_rb > 棕色阈值) & (brown_diff_rg > 10) & (R > 棕色Rmin) & (B < R * 0.7)
-
-        # 黄色检测
-        mask_yellow = (R > 140) & (G > 140) & (B < 120) & (np.abs(R - G) < 20)
-
-        # 排除条件
-        亮度 = (R + G + B) / 3
-        mask_too_dark = 亮度 < 60
-        mask_too_bright = 亮度 > 190
-        blue_dominant = (B > R * 1.3) & (B > G * 1.3) & (B > 80)
-
-        # 合并
-        mask_farmland = (mask_green | mask_brown | mask_yellow) & \
-                       ~mask_too_dark & ~mask_too_bright & \
-                       ~blue_dominant
-
-        # 计算结果
-        识别像素 = np.sum(mask_farmland)
-        识别像素_全图 = 识别像素 * 缩放因子
-        识别面积 = 识别像素_全图 * (像素分辨率 * 像素分辨率) / 666.67
-
-        与预期差异 = abs(识别面积 - 预期面积_亩)
+    best_diff = float('inf')
+    best_params = None
 
+    for params, (_, 行) in zip(参数列表, 结果.iterrows()):
         print(f"\n   {params['名']}:")
-        print(f"     绿色阈值={绿色阈值}, 棕色阈值={棕色阈值}")
-        print(f"     测试块识别像素: {识别像素:,}")
-        print(f"     全图识别像素: {识别像素_全图:,.0f}")
-        print(f"     识别面积: {识别面积:.2f} 亩")
-        print(f"     与预期差异: {与预期差异:.2f} 亩")
-
-        if 与预期差异 < best_diff:
-            best_diff = 与预期差异
+        print(f"     绿色阈值={params['绿色阈值']}, 棕色阈值={params['棕色阈值']}")
+        print(f"     测试块识别像素: {行['像素数']:,.0f}")
+        print(f"     全图识别像素: {行['全图像素']:,.0f}")
+        print(f"     识别面积: {行['识别面积']:.2f} 亩")
+        print(f"     与预期差异: {行['与预期差异']:.2f} 亩")
+
+        if 行['与预期差异'] < best_diff:
+            best_diff = 行['与预期差异']
             best_params = params.copy()
-            best_params["像素数"] = 识别像素_全图
-            best_params["面积"] = 识别面积
+            best_params["像素数"] = 行['全图像素']
+            best_params["面积"] = 行['识别面积']
+
+    # 整个参数网格（同一份直方图，几秒内完成）
+    网格结果 = 换算(扫描(直方图, 绿棕规则, 默认网格['绿棕']))
+    网格最佳 = 网格结果.loc[网格结果["与预期差异"].idxmin()]
+    print(f"\n🔍 网格扫描 {len(网格结果)} 组参数，最接近预期:")
+    print(f"   绿色阈值={网格最佳['绿色阈值']:.0f}, 棕色阈值={网格最佳['棕色阈值']:.0f}, "
+          f"绿色Gmin={网格最佳['绿色Gmin']:.0f}, 棕色Rmin={网格最佳['棕色Rmin']:.0f}")
+    print(f"   识别面积: {网格最佳['识别面积']:.2f} 亩，与预期差异: {网格最佳['与预期差异']:.2f} 亩")
+    if 网格最佳["与预期差异"] < best_diff:
+        best_diff = 网格最佳["与预期差异"]
+        best_params = {k: int(网格最佳[k]) for k in ("绿色阈值", "棕色阈值", "绿色Gmin", "棕色Rmin")}
+        best_params.update({"名": "网格扫描", "像素数": 网格最佳["全图像素"], "面积": 网格最佳["识别面积"]})
 
     print(f"\n✅ 最佳参数组合:")
     print(f"   参数名: {best_params['名']}")
@@ -0,0 +1,271 @@
+"""
+窗口预测结果缓存模块
+按 源文件指纹 + 窗口 + 模型指纹 + 参数 缓存每个滑动窗口的预测结果，
+索引和数据保存在同一个sqlite数据库中，超过容量上限时按最近最少使用(LRU)淘汰，
+并统计命中率；同一对图像重复分析时只重新计算输入或参数变化的窗口
+
+多个进程可以同时使用同一个缓存目录：读取不加写锁，写入和访问时间先在内存中累积，
+每 批量提交 条用一个短事务写入，其他进程等待写锁最多 锁等待_秒
+"""
+
+import os
+import io
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+
+数据库文件名 = "window_cache.sqlite"
+
+# 结果格式或键的组成变化时递增，旧缓存自动失效
+缓存版本 = 2
+
+# 文件指纹的采样：均匀分布（含首尾）的 采样块数 个块，每块 采样块大小 字节
+采样块数 = 16
+采样块大小 = 64 * 1024
+
+锁等待_秒 = 30.0  # 其他进程正在写入时等待的最长时间（sqlite busy timeout）
+
+
+class 结果缓存:
+    """
+    持久化的窗口结果缓存（线程安全，可在图形界面的后台线程中使用）
+    """
+
+    def __init__(self, 缓存目录: str, 上限_MB: float = 2048, 批量提交: int = 200):
+        """
+        参数:
+            缓存目录: 缓存数据库所在目录
+            上限_MB: 缓存数据总量上限（MB），超过后淘汰最久未使用的条目
+            批量提交: 内存中累积多少条写入/访问记录后写入数据库（一个短事务）
+        """
+        os.makedirs(缓存目录, exist_ok=True)
+        self.缓存目录 = 缓存目录
+        self.上限字节 = int(上限_MB * 1024 * 1024)
+        self.批量提交 = 批量提交
+
+        self._锁 = threading.Lock()
+        self._连接 = sqlite3.connect(os.path.join(缓存目录, 数据库文件名), timeout=锁等待_秒,
+                                   check_same_thread=False)
+        self._连接.execute("PRAGMA journal_mode=WAL")
+        self._连接.execute("PRAGMA synchronous=NORMAL")
+        self._连接.executescript("""
+            CREATE TABLE IF NOT EXISTS 窗口结果 (
+                键 TEXT PRIMARY KEY,
+                数据 BLOB NOT NULL,
+                大小 INTEGER NOT NULL,
+                创建时间 REAL NOT NULL,
+                访问时间 REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS 窗口结果_访问时间 ON 窗口结果(访问时间);
+            CREATE TABLE IF NOT EXISTS 统计 (
+                名称 TEXT PRIMARY KEY,
+                值 INTEGER NOT NULL
+            );
+        """)
+        self._连接.commit()
+
+        self._总字节 = self._连接.execute("SELECT COALESCE(SUM(大小), 0) FROM 窗口结果").fetchone()[0]
+        self._待写入: Dict[str, tuple] = {}   # 键 -> (数据, 时间)
+        self._待访问: Dict[str, float] = {}   # 键 -> 访问时间
+        self.命中 = 0
+        self.未命中 = 0
+        self.写入数 = 0
+        self.淘汰 = 0
+
+    # ==================== 哈希 ====================
+
+    @staticmethod
+    def 文件哈希(路径: str) -> str:
+        """
+        文件指纹: 大小 + 修改时间 + 采样块内容的blake2b（不读取整个文件，多GB影像也只读 1 MB）
+
+        文件被替换或改写后大小/修改时间会变化；保留修改时间的原地改写只有落在采样块内才能发现
+        """
+        状态 = os.stat(路径)
+        h = hashlib.blake2b(digest_size=20)
+        h.update(f"{状态.st_size}:{状态.st_mtime_ns}".encode())
+        with open(路径, 'rb') as f:
+            if 状态.st_size <= 采样块数 * 采样块大小:
+                h.update(f.read())
+            else:
+                for i in range(采样块数):
+                    f.seek((状态.st_size - 采样块大小) * i // (采样块数 - 1))
+                    h.update(f.read(采样块大小))
+        return h.hexdigest()
+
+    @staticmethod
+    def 数组哈希(数组: np.ndarray) -> str:
+        """数组内容哈希（布尔数组先按位打包）"""
+        数组 = np.ascontiguousarray(数组)
+        if 数组.dtype == bool:
+            数组 = np.packbits(数组)
+        h = hashlib.blake2b(数组.tobytes(), digest_size=16)
+        h.update(str(数组.shape).encode())
+        return h.hexdigest()
+
+    @staticmethod
+    def 生成键(**部分) -> str:
+        """由 文件哈希 / 窗口 / 模型哈希 / 参数 等组成缓存键"""
+        内容 = json.dumps({'版本': 缓存版本, **部分}, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.blake2b(内容.encode('utf-8'), digest_size=20).hexdigest()
+
+    # ==================== 读写 ====================
+
+    @staticmethod
+    def _编码(数组: np.ndarray) -> bytes:
+        缓冲 = io.BytesIO()
+        if 数组.dtype == bool:
+            np.save(缓冲, np.packbits(数组), allow_pickle=False)
+            头 = json.dumps({'布尔': True, '形状': 数组.shape}).encode()
+        else:
+            np.save(缓冲, 数组, allow_pickle=False)
+            头 = json.dumps({'布尔': False}).encode()
+        return len(头).to_bytes(4, 'little') + 头 + zlib.compress(缓冲.getvalue(), 1)
+
+    @staticmethod
+    def _解码(数据: bytes) -> np.ndarray:
+        头长 = int.from_bytes(数据[:4], 'little')
+        头 = json.loads(数据[4:4 + 头长])
+        数组 = np.load(io.BytesIO(zlib.decompress(数据[4 + 头长:])), allow_pickle=False)
+        if 头['布尔']:
+            形状 = tuple(头['形状'])
+            数组 = np.unpackbits(数组, count=int(np.prod(形状))).reshape(形状).astype(bool)
+        return 数组
+
+    def 读取(self, 键: str) -> Optional[np.ndarray]:
+        """读取缓存结果，未命中返回None（只读，访问时间在下次提交时写入）"""
+        with self._锁:
+            待写 = self._待写入.get(键)
+            if 待写 is not None:
+                数据 = 待写[0]
+            else:
+                行 = self._连接.execute("SELECT 数据 FROM 窗口结果 WHERE 键=?", (键,)).fetchone()
+                if 行 is None:
+                    self.未命中 += 1
+                    return None
+                数据 = 行[0]
+                self._待访问[键] = time.time()
+            self.命中 += 1
+            self._计数提交()
+        return self._解码(数据)
+
+    def 写入(self, 键: str, 数组: np.ndarray):
+        """写入缓存结果（先在内存中累积），超过容量上限时淘汰最久未使用的条目"""
+        数据 = self._编码(数组)
+        with self._锁:
+            self._待写入[键] = (数据, time.time())
+            self.写入数 += 1
+            self._计数提交()
+
+    def _提交(self):
+        """把累积的写入和访问时间用一个短事务写入数据库（调用方持有锁）"""
+        if not self._待写入 and not self._待访问:
+            return
+        with self._连接:  # BEGIN ... COMMIT，出错时回滚
+            self._连接.execute("BEGIN IMMEDIATE")
+            if self._待访问:
+                self._连接.executemany(
+                    "UPDATE 窗口结果 SET 访问时间=? WHERE 键=?",
+                    [(t, 键) for 键, t in self._待访问.items()]
+                )
+            if self._待写入:
+                self._连接.executemany(
+                    "INSERT OR REPLACE INTO 窗口结果 VALUES (?, ?, ?, ?, ?)",
+                    [(键, 数据, len(数据), t, t) for 键, (数据, t) in self._待写入.items()]
+                )
+                self._总字节 += sum(len(数据) for 数据, _ in self._待写入.values())
+                if self._总字节 > self.上限字节:
+                    # 其他进程也在写入，按数据库中的实际大小判断是否需要淘汰
+                    self._总字节 = self._连接.execute(
+                        "SELECT COALESCE(SUM(大小), 0) FROM 窗口结果").fetchone()[0]
+                    if self._总字节 > self.上限字节:
+                        self._淘汰()
+        self._待写入.clear()
+        self._待访问.clear()
+
+    def _淘汰(self):
+        """淘汰到上限的90%，留出余量避免每次写入都触发（调用方持有锁，在事务中调用）"""
+        目标 = int(self.上限字节 * 0.9)
+        while self._总字节 > 目标:
+            行列表 = self._连接.execute(
+                "SELECT 键, 大小 FROM 窗口结果 ORDER BY 访问时间 LIMIT 256"
+            ).fetchall()
+            if not 行列表:
+                self._总字节 = 0
+                break
+            for 键, 大小 in 行列表:
+                self._连接.execute("DELETE FROM 窗口结果 WHERE 键=?", (键,))
+                self._总字节 -= 大小
+                self.淘汰 += 1
+                if self._总字节 <= 目标:
+                    break
+
+    def _计数提交(self):
+        if len(self._待写入) + len(self._待访问) >= self.批量提交:
+            self._提交()
+
+    # ==================== 统计 ====================
+
+    def 刷新(self):
+        """写入内存中累积的结果，并把本次会话的命中统计累加到数据库"""
+        with self._锁:
+            self._提交()
+            with self._连接:
+                for 名称, 值 in (('命中', self.命中), ('未命中', self.未命中), ('写入', self.写入数), ('淘汰', self.淘汰)):
+                    self._连接.execute(
+                        "INSERT INTO 统计 VALUES (?, ?) ON CONFLICT(名称) DO UPDATE SET 值 = 值 + excluded.值",
+                        (名称, 值)
+                    )
+            self.命中 = self.未命中 = self.写入数 = self.淘汰 = 0
+
+    def 统计(self) -> Dict:
+        """
+        返回:
+            本次会话和累计的命中统计、条目数、占用空间
+        """
+        with self._锁:
+            条目数 = self._连接.execute("SELECT COUNT(*) FROM 窗口结果").fetchone()[0]
+            累计 = dict(self._连接.execute("SELECT 名称, 值 FROM 统计").fetchall())
+
+        总查询 = self.命中 + self.未命中
+        累计命中 = 累计.get('命中', 0) + self.命中
+        累计查询 = 累计命中 + 累计.get('未命中', 0) + self.未命中
+        return {
+            '命中': self.命中,
+            '未命中': self.未命中,
+            '命中率': self.命中 / 总查询 if 总查询 else 0.0,
+            '累计命中率': 累计命中 / 累计查询 if 累计查询 else 0.0,
+            '写入': self.写入数,
+            '淘汰': self.淘汰,
+            '条目数': 条目数,
+            '占用_MB': self._总字节 / 1024 / 1024,
+            '上限_MB': self.上限字节 / 1024 / 1024,
+        }
+
+    def 打印统计(self):
+        统计 = self.统计()
+        print(f"  💾 结果缓存: 命中 {统计['命中']}/{统计['命中'] + 统计['未命中']} "
+              f"({统计['命中率']*100:.1f}%), 累计命中率 {统计['累计命中率']*100:.1f}%, "
+              f"占用 {统计['占用_MB']:.1f}/{统计['上限_MB']:.0f} MB")
+
+    def 清空(self):
+        """删除所有窗口结果和累计统计"""
+        with self._锁:
+            self._待写入.clear()
+            self._待访问.clear()
+            self._连接.execute("DELETE FROM 窗口结果")
+            self._连接.execute("DELETE FROM 统计")
+            self._连接.commit()
+            self._连接.execute("VACUUM")
+            self._总字节 = 0
+
+    def 关闭(self):
+        self.刷新()
+        with self._锁:
+            self._连接.close()
@@ -11,6 +11,8 @@ import threading
 from PIL import Image, ImageTk, ImageDraw  # 添加PIL用于图像处理
 import numpy as np
 
+from 运行配置 import 运行配置
+
 # 嵌入模型路径（打包后自动定位）
 if getattr(sys, 'frozen', False):
     # 打包后的路径
@@ -22,9 +24,16 @@ else:
 模型路径 = r"C:\Users\jiao\Desktop\python\耕地识别模型.h5"
 基准数据路径 = os.path.join(BASE_DIR, "耕地识别模型_基准数据.pkl")
 
+def 默认配置() -> 运行配置:
+    """图形界面的默认运行配置（输出到 分析结果 目录，使用上面的模型路径）"""
+    return 运行配置(输出目录="分析结果", 模型保存路径=模型路径)
+
+
 class 耕地分析界面:
-    def __init__(self, root):
+    def __init__(self, root, 配置: 运行配置 = None):
         self.root = root
+        # 运行配置（模型路径、内存预算、缓存等），可用 --配置 指定配置文件
+        self.配置 = 配置 or 默认配置()
         self.root.title("🌾 耕地智能分析系统 v2.0")
         self.root.geometry("950x720")
         self.root.resizable(True, True)
@@ -159,6 +168,16 @@ class 耕地分析界面:
                                 command=self.开始分析)
         self.分析按钮.pack(pady=10, padx=10, fill="x")
         
+        # 变化先验（可选）：按两期影像的块级差异只重新识别变化的块
+        self.使用变化先验 = tk.BooleanVar(value=self.配置.使用变化先验)
+        tk.Checkbutton(分析卡片, text="只重新识别变化区域（按两期影像差异，更快）",
+                       variable=self.使用变化先验,
+                       font=("微软雅黑", 9),
+                       bg=self.bg_dark, fg=self.text_secondary,
+                       selectcolor=self.bg_card,
+                       activebackground=self.bg_dark,
+                       activeforeground=self.text_primary).pack(anchor="w", padx=10, pady=(0,5))
+        
         # 进度条
         self.进度条 = ttk.Progressbar(分析卡片, mode='indeterminate', length=280)
         # 初始隐藏
@@ -350,6 +369,7 @@ class 耕地分析界面:
             from rasterio.warp import transform as warp_transform
             from rasterio.windows import Window
             from affine import Affine
+            from 有效数据索引 import 获取有效数据索引
             
             # === 第1步：计算两张图的经纬度交集 ===
             from rasterio.warp import transform_bounds
@@ -501,8 +521,12 @@ class 耕地分析界面:
                     去年_window = Window(去年_col_min, 去年_row_min, 
                                          去年_col_max - 去年_col_min, 
                                          去年_row_max - 去年_row_min)
-                    去年图像 = src_去年.read([1,2,3], window=去年_window)
+                    # 只读取有效数据块，黑边/无数据块不读取
+                    去年数据索引 = 获取有效数据索引(self.去年图像路径)
+                    去年图像 = 去年数据索引.读取窗口(src_去年, 去年_window)
                     去年图像 = np.transpose(去年图像, (1, 2, 0))
+                    去年无数据块 = 去年数据索引.窗口无数据掩码(去年_col_min, 去年_row_min,
+                                                    去年图像.shape[1], 去年图像.shape[0])
                     
                     # === 第3步：从今年图中裁剪交集区域 ===
                     今年_inv = ~今年_transform
@@ -519,8 +543,11 @@ class 耕地分析界面:
                     今年_window = Window(今年_col_min, 今年_row_min, 
                                          今年_col_max - 今年_col_min, 
                                          今年_row_max - 今年_row_min)
-                    今年图像 = src_今年.read([1,2,3], window=今年_window)
+                    今年数据索引 = 获取有效数据索引(self.今年图像路径)
+                    今年图像 = 今年数据索引.读取窗口(src_今年, 今年_window)
                     今年图像 = np.transpose(今年图像, (1, 2, 0))
+                    今年无数据块 = 今年数据索引.窗口无数据掩码(今年_col_min, 今年_row_min,
+                                                    今年图像.shape[1], 今年图像.shape[0])
             
             # === 第4步：归一化到0-255并确保C-连续 ===
             # ✅ 添加黑色区域检测：过滤掉无效的黑色边缘
@@ -531,7 +558,7 @@ class 耕地分析界面:
             
             # 检测黑色区域（所有通道都接近0的像素）
             # ✅ 更严格：<5 认为是黑色
-            去年黑色掩码 = (去年图像_归一化[:,:,0] < 5) & (去年图像_归一化[:,:,1] < 5) & (去年图像_归一化[:,:,2] < 5)
+            去年黑色掩码 = 去年无数据块 | ((去年图像_归一化[:,:,0] < 5) & (去年图像_归一化[:,:,1] < 5) & (去年图像_归一化[:,:,2] < 5))
             去年图像 = np.ascontiguousarray(去年图像_归一化)
             
             if 今年图像.max() > 1.0:
@@ -541,7 +568,7 @@ class 耕地分析界面:
             
             # 检测黑色区域（所有通道都接近0的像素）
             # ✅ 更严格：<5 认为是黑色
-            今年黑色掩码 = (今年图像_归一化[:,:,0] < 5) & (今年图像_归一化[:,:,1] < 5) & (今年图像_归一化[:,:,2] < 5)
+            今年黑色掩码 = 今年无数据块 | ((今年图像_归一化[:,:,0] < 5) & (今年图像_归一化[:,:,1] < 5) & (今年图像_归一化[:,:,2] < 5))
             今年图像 = np.ascontiguousarray(今年图像_归一化)
             
             # === 第5步：裁剪掩码并绘制轮廓和变化区域 ===
@@ -722,9 +749,9 @@ class 耕地分析界面:
             self.输出结果("=" * 50)
             
             # 检查模型文件
-            if not os.path.exists(模型路径):
+            if not os.path.exists(self.配置.模型保存路径):
                 self.输出结果(f"\n❌ 错误: 找不到模型文件!")
-                self.输出结果(f"   路径: {模型路径}")
+                self.输出结果(f"   路径: {self.配置.模型保存路径}")
                 messagebox.showerror("错误", "模型文件不存在！\n请确保模型文件在程序目录中。")
                 self.分析按钮.config(state="normal")
                 return
@@ -734,7 +761,7 @@ class 耕地分析界面:
             from 耕地分析系统 import 耕地分析系统
             import pickle
             
-            系统 = 耕地分析系统(输出目录="分析结果")
+            系统 = 耕地分析系统(配置=self.配置)
             
             # 加载基准数据
             有基准数据 = False
@@ -891,14 +918,27 @@ class 耕地分析界面:
                     else:
                         self.输出结果("\n⚠️  今年图像不在基准范围内，无法使用去年数据")
             
+            # 变化先验只在勾选时使用（两期影像差异，只重新识别变化的块）
+            去年图像路径 = None
+            if self.使用变化先验.get() and 去年掩码 is not None:
+                去年图像路径 = getattr(self, '去年图像路径', None)
+                if 去年图像路径:
+                    self.输出结果("   已开启变化先验：只重新识别两期影像发生变化的块")
+            
             # 调用识别（传入去年掩码）
             结果 = 系统.使用模型预测耕地_大图(
                 self.今年图像路径, 
-                模型路径=模型路径, 
+                模型路径=self.配置.模型保存路径, 
                 快速模式=True,
-                去年掩码=去年掩码  # 传入去年掩码
+                去年掩码=去年掩码,  # 传入去年掩码
+                去年图像路径=去年图像路径
             )
             
+            # 性能剖析（环境变量 GENGDI_PROFILE 开启时）的阶段耗时摘要
+            if 结果.get('性能摘要'):
+                self.输出结果(f"\n{结果['性能摘要']}")
+                self.输出结果(f"   📄 性能报告: {结果['性能报告']}")
+            
             # 计算总面积
             当前耕地面积_亩 = 结果['耕地面积_亩']
             耕地掩码 = 结果.get('耕地掩码', None)  # 获取掩码用于可视化
@@ -1341,7 +1381,16 @@ class 耕地分析界面:
             self.进度条.pack_forget()
             self.状态标签.config(text="● 就绪", fg=self.success)
 
-if __name__ == "__main__":
+def 启动(配置: 运行配置 = None):
+    """打开图形界面（命令行 --配置 指定的配置文件叠加在参数 配置（默认为 默认配置()）之上）"""
+    import argparse
+    解析器 = argparse.ArgumentParser(description="耕地分析工具 - 图形界面版")
+    解析器.add_argument('--配置', default=None, help="运行配置文件（.json / .yaml）")
+    参数, _ = 解析器.parse_known_args()
+    
     root = tk.Tk()
-    app = 耕地分析界面(root)
+    app = 耕地分析界面(root, 运行配置.从文件(参数.配置, 默认=配置 or 默认配置()) if 参数.配置 else 配置)
     root.mainloop()
+
+if __name__ == "__main__":
+    启动()
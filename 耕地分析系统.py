@@ -9,6 +9,8 @@
 """
 
 # ==================== 配置区域 - 请在这里修改路径 ====================
+# 以下为直接运行本文件时的默认配置；也可以用 --配置 指定 JSON/YAML 配置文件，
+# 或在代码中传入 运行配置 对象（见 运行配置.py），不同配置的实例可以在同一进程中并行运行
 
 # 输入文件路径配置
 TIF图像路径 = r"E:\八二\20250422通北八二2_3\result13.tif"
@@ -36,6 +38,27 @@ Shapefile路径 = r"E:\通北局种植作物"  # 如果有Shapefile标注文件,
 # 模型训练参数
 模型保存路径 = r"D:\微信\document\xwechat_files\wxid_h80ke0c6ca1m22_27bc\msg\file\2025-11\001\001\耕地识别模型.h5"
 训练数据比例 = 0.8  # 80%用于训练, 20%用于验证
+基准年数据文件 = r""  # 为空时使用 输出目录 下的 基准年数据.pkl
+
+# 大图识别: 超过该尺寸的影像降采样读取；滑动窗口步长为0时取模型输入尺寸的一半（50%重叠）
+降采样尺寸 = 2000
+快速模式降采样尺寸 = 1000
+窗口步长 = 0
+
+# 窗口结果缓存（重复分析同一图像时只重新计算变化的窗口）
+结果缓存目录 = r""  # 为空时使用 输出目录 下的 ".结果缓存" 目录
+结果缓存上限_MB = 2048
+
+# 面积核算: "像素"（像素数 × 像元面积）或 "矢量"（矢量化后在等积投影上计算，并报告与像素计数的差异）
+面积核算模式 = "像素"
+
+# 内存预算(MB): 0为自动（可用物理内存的80%，也可用环境变量 GENGDI_MEMORY_BUDGET_MB 指定）
+# 预算不足时整幅掩码改用磁盘映射并减小分块尺寸，仍不足时在开始前报错并输出预算报告（见 内存预算.py）
+内存预算_MB = 0
+掩码存储方式 = "自动"  # "自动" / "内存" / "磁盘"（整幅掩码始终使用磁盘映射，逐块流式处理）
+
+# 执行配置: "自动" / "GPU" / "CPU高吞吐" / "CPU低占用" / "默认"（见 执行配置.py）
+执行配置名称 = "自动"
 
 # ===================================================================
 
@@ -54,37 +77,17 @@ import cv2
 import pickle
 from datetime import datetime
 
-# ==================== GPU加速检测 ====================
-print("="*60)
-print("🚀 GPU加速检测")
-print("="*60)
+# ==================== 执行配置（线程池 / oneDNN / GPU） ====================
+from 执行配置 import 应用执行配置
+应用执行配置(执行配置名称)
+
+from 运行配置 import 运行配置
 
-try:
-    import tensorflow as tf
-    
-    # 检测GPU
-    gpus = tf.config.list_physical_devices('GPU')
-    if gpus:
-        print(f"✅ 检测到 {len(gpus)} 个GPU设备:")
-        for i, gpu in enumerate(gpus):
-            print(f"   GPU {i}: {gpu.name}")
-        
-        # 启用GPU内存动态增长
-        try:
-            for gpu in gpus:
-                tf.config.experimental.set_memory_growth(gpu, True)
-            print("✅ 已启用GPU内存动态增长")
-        except RuntimeError as e:
-            print(f"⚠️  GPU配置警告: {e}")
-        
-        print("🎯 AI预测将使用GPU加速！")
-    else:
-        print("❌ 未检测到GPU，将使用CPU预测（速度较慢）")
-except ImportError:
-    print("⚠️  TensorFlow未加载，稍后将检测")
 
-print("="*60)
-print()
+def 默认配置(**改动) -> 运行配置:
+    """由本文件顶部配置区域生成运行配置（读取调用时的值）"""
+    import sys
+    return 运行配置.从模块(sys.modules[__name__], **改动)
 
 try:
     from tensorflow import keras
@@ -102,31 +105,35 @@ class 耕地分析系统:
     耕地图像分析处理系统
     """
     
-    def __init__(self, 输出目录: str = None):
+    def __init__(self, 输出目录: str = None, 配置: 运行配置 = None):
         """
         初始化系统
         
         参数:
-            输出目录: 结果输出目录路径
+            输出目录: 结果输出目录路径（默认使用配置中的输出目录）
+            配置: 运行配置（默认由文件顶部配置区域生成）
         """
-        self.输出目录 = 输出目录 or "./output"
+        self.配置 = 配置 or 默认配置()
+        self.输出目录 = 输出目录 or (配置.输出目录 if 配置 is not None else None) or "./output"
         os.makedirs(self.输出目录, exist_ok=True)
         
     def 裁剪图像并保留地理信息(self, 
                           tif路径: str,
-                          裁剪尺寸: int = 1000,
-                          重叠像素: int = 0) -> List[Dict]:
+                          裁剪尺寸: int = None,
+                          重叠像素: int = None) -> List[Dict]:
         """
         裁剪TIF图像为多个小块,并保留每块的地理信息
         
         参数:
             tif路径: 输入TIF文件路径
-            裁剪尺寸: 每个小块的尺寸(像素)
-            重叠像素: 裁剪块之间的重叠像素数
+            裁剪尺寸: 每个小块的尺寸(像素)（默认使用配置）
+            重叠像素: 裁剪块之间的重叠像素数（默认使用配置）
             
         返回:
             裁剪块信息列表,包含文件路径和地理坐标
         """
+        裁剪尺寸 = 裁剪尺寸 or self.配置.裁剪尺寸
+        重叠像素 = self.配置.重叠像素 if 重叠像素 is None else 重叠像素
         裁剪块列表 = []
         
         with rasterio.open(tif路径) as src:
@@ -261,7 +268,8 @@ class 耕地分析系统:
     def 计算耕地面积和比例(self,
                        裁剪块信息: Dict,
                        耕地掩码: np.ndarray = None,
-                       shapefile路径: str = None) -> Dict:
+                       shapefile路径: str = None,
+                       面积模式: str = None) -> Dict:
         """
         计算裁剪块的耕地面积和比例
         
@@ -269,6 +277,7 @@ class 耕地分析系统:
             裁剪块信息: 裁剪块的信息字典
             耕地掩码: 耕地掩码数组
             shapefile路径: Shapefile路径(如果未提供掩码)
+            面积模式: "像素" 或 "矢量"（默认使用配置 面积核算模式）
             
         返回:
             包含面积和比例信息的字典
@@ -276,7 +285,10 @@ class 耕地分析系统:
         tif路径 = 裁剪块信息['文件路径']
         
         with rasterio.open(tif路径) as src:
-            总像素数 = src.width * src.height
+            # 总像素数不含黑边/无数据块
+            from 有效数据索引 import 获取有效数据索引
+            数据索引 = 获取有效数据索引(tif路径)
+            总像素数 = 数据索引.有效像素数()
             
             # 如果没有提供掩码,尝试从shapefile生成
             if 耕地掩码 is None and shapefile路径:
@@ -286,19 +298,23 @@ class 耕地分析系统:
                 影像数据 = src.read()
                 耕地掩码 = self._简单耕地识别(影像数据)
             
-            # 计算耕地像素数
-            耕地像素数 = np.sum(耕地掩码 == 1)
+            # 计算耕地像素数（与总像素数相同，只统计有效块）
+            耕地像素数 = 数据索引.有效区域计数(耕地掩码 == 1)
             
             # 计算比例
             耕地比例 = 耕地像素数 / 总像素数 if 总像素数 > 0 else 0
             
-            # 计算实际面积(基于像素分辨率)
-            像素分辨率x = abs(src.transform.a)  # 米/像素
-            像素分辨率y = abs(src.transform.e)  # 米/像素
-            单像素面积 = 像素分辨率x * 像素分辨率y  # 平方米
+            # 计算实际面积(每行像元面积，经纬度影像按纬度计算)
+            from 面积核算 import 行像元面积, 掩码面积
+            行面积 = 行像元面积(src.transform, src.crs, src.height)
+            像素分辨率x = float(np.sqrt(行面积.mean()))  # 米/像素
             
-            耕地面积_平方米 = 耕地像素数 * 单像素面积
-            总面积_平方米 = 总像素数 * 单像素面积
+            耕地面积_平方米 = 掩码面积(耕地掩码 == 1, 行面积)
+            总面积_平方米 = 数据索引.有效面积(行面积)
+            
+            面积核算 = self._矢量面积核算(耕地掩码 == 1, src, 面积模式)
+            if 面积核算 is not None:
+                耕地面积_平方米 = 面积核算['矢量面积_平方米']
             
             结果 = {
                 **裁剪块信息,
@@ -308,11 +324,36 @@ class 耕地分析系统:
                 '耕地面积_平方米': float(耕地面积_平方米),
                 '耕地面积_亩': float(耕地面积_平方米 / 666.67),  # 1亩 = 666.67平方米
                 '总面积_平方米': float(总面积_平方米),
-                '像素分辨率_米': float(像素分辨率x)
+                '像素分辨率_米': float(像素分辨率x),
+                **self._面积核算字段(面积核算)
             }
         
         return 结果
     
+    def _矢量面积核算(self, 耕地掩码: np.ndarray, src, 面积模式: str = None):
+        """
+        矢量面积模式下按块矢量化掩码并在等积投影上计算面积，像素模式返回None
+        """
+        面积模式 = 面积模式 or self.配置.面积核算模式
+        if 面积模式 == "像素":
+            return None
+        if 面积模式 != "矢量":
+            raise ValueError(f"❌ 未知的面积模式: {面积模式}（可选 \"像素\" / \"矢量\"）")
+        from 面积核算 import 面积对比
+        return 面积对比(耕地掩码, src.transform, src.crs)
+    
+    @staticmethod
+    def _面积核算字段(面积核算) -> Dict:
+        """结果字典中的面积核算字段"""
+        if 面积核算 is None:
+            return {'面积模式': '像素'}
+        return {
+            '面积模式': '矢量',
+            '像素计数面积_平方米': 面积核算['像素计数面积_平方米'],
+            '面积差异比例': 面积核算['面积差异比例'],
+            '耕地地块数': 面积核算['地块数'],
+        }
+    
     def _简单耕地识别(self, 影像数据: np.ndarray) -> np.ndarray:
         """
         简单的基于颜色的耕地识别(示例方法)
@@ -401,12 +442,38 @@ class 耕地分析系统:
         
         return 重叠面积 / 块1面积
     
+    def _匹配裁剪块(self, 年份1结果: List[Dict], 年份2结果: List[Dict],
+                 重叠阈值: float = 0.5) -> List[Tuple[Dict, Dict, float]]:
+        """
+        基于地理坐标为第一年的每个裁剪块查找重叠最大的第二年裁剪块
+        
+        返回:
+            [(块1, 最佳匹配块, 重叠比例)]，只包含重叠比例达到阈值的块
+        """
+        匹配列表 = []
+        for 块1 in 年份1结果:
+            最佳匹配块 = None
+            最大重叠比例 = 0
+            
+            # 在第二年的所有块中查找与块1重叠最大的块
+            for 块2 in 年份2结果:
+                if self._检查地理重叠(块1, 块2):
+                    重叠比例 = self._计算重叠面积(块1, 块2)
+                    if 重叠比例 > 最大重叠比例:
+                        最大重叠比例 = 重叠比例
+                        最佳匹配块 = 块2
+            
+            # 如果找到重叠度足够的匹配块
+            if 最佳匹配块 and 最大重叠比例 >= 重叠阈值:
+                匹配列表.append((块1, 最佳匹配块, 最大重叠比例))
+        return 匹配列表
+    
     def 比较两年耕地变化(self,
                       年份1_tif: str,
                       年份2_tif: str,
                       shapefile1: str = None,
                       shapefile2: str = None,
-                      重叠阈值: float = 0.5) -> pd.DataFrame:
+                      重叠阈值: float = None) -> pd.DataFrame:
         """
         比较两年图像的耕地变化(智能地理匹配)
         
@@ -415,7 +482,7 @@ class 耕地分析系统:
             年份2_tif: 第二年TIF图像路径
             shapefile1: 第一年Shapefile路径
             shapefile2: 第二年Shapefile路径
-            重叠阈值: 认为是同一区域的最小重叠比例(0-1)
+            重叠阈值: 认为是同一区域的最小重叠比例(0-1)（默认使用配置）
             
         返回:
             耕地变化数据DataFrame
@@ -424,8 +491,10 @@ class 耕地分析系统:
             - 自动基于地理坐标匹配两年图像中的相同区域
             - 支持不同大小、不同位置的图像对比
             - 只要地理位置有重叠就能进行对比
+            - 两年图像都按不重叠裁剪（重叠像素=0），重叠裁剪会让匹配的块重复计入面积
         """
         print("📊 开始耕地变化分析(智能地理匹配)...")
+        重叠阈值 = 重叠阈值 or self.配置.重叠阈值
         
         # 读取两年图像的基本信息
         with rasterio.open(年份1_tif) as src1, rasterio.open(年份2_tif) as src2:
@@ -435,10 +504,10 @@ class 耕地分析系统:
         
         # 裁剪两年图像
         print("\n✂️ 裁剪第一年图像...")
-        裁剪块1 = self.裁剪图像并保留地理信息(年份1_tif)
+        裁剪块1 = self.裁剪图像并保留地理信息(年份1_tif, 重叠像素=0)
         
         print("\n✂️ 裁剪第二年图像...")
-        裁剪块2 = self.裁剪图像并保留地理信息(年份2_tif)
+        裁剪块2 = self.裁剪图像并保留地理信息(年份2_tif, 重叠像素=0)
         
         # 计算每块的耕地面积
         print("\n📏 计算第一年耕地面积...")
@@ -458,50 +527,36 @@ class 耕地分析系统:
                 print(f"  已处理 {idx + 1}/{len(裁剪块2)} 个裁剪块")
         
         # 基于地理坐标匹配相同位置的裁剪块
-        print(f"\n🔍 基于地理坐标匹配区域(重叠阈值: {重叠阈값*100}%)...")
+        print(f"\n🔍 基于地理坐标匹配区域(重叠阈值: {重叠阈值*100}%)...")
         变化列表 = []
-        匹配计数 = 0
+        匹配列表 = self._匹配裁剪块(年份1结果, 年份2结果, 重叠阈值)
+        匹配计数 = len(匹配列表)
         
-        for 块1 in 年份1结果:
-            最佳匹配块 = None
-            最大重叠比例 = 0
+        for 块1, 最佳匹配块, 最大重叠比例 in 匹配列表:
+            面积变化 = 最佳匹配块['耕地面积_平方米'] - 块1['耕地面积_平方米']
+            比例变化 = 最佳匹配块['耕地比例'] - 块1['耕地比例']
             
-            # 在第二年的所有块中查找与块1重叠最大的块
-            for 块2 in 年份2结果:
-                if self._检查地理重叠(块1, 块2):
-                    重叠比例 = self._计算重叠面积(块1, 块2)
-                    if 重叠比例 > 最大重叠比例:
-                        最大重叠比例 = 重叠比例
-                        最佳匹配块 = 块2
+            变化信息 = {
+                '块编号_年份1': 块1['块编号'],
+                '块编号_年份2': 最佳匹配块['块编号'],
+                '左上角经度': 块1['经纬度_左上角'][0],
+                '左上角纬度': 块1['经纬度_左上角'][1],
+                '右下角经度': 块1['经纬度_右下角'][0],
+                '右下角纬度': 块1['经纬度_右下角'][1],
+                '重叠比例': 最大重叠比例,
+                '年份1_耕地面积_平方米': 块1['耕地面积_平方米'],
+                '年份1_耕地面积_亩': 块1['耕地面积_亩'],
+                '年份1_耕地比例': 块1['耕地比例'],
+                '年份2_耕地面积_平方米': 最佳匹配块['耕地面积_平方米'],
+                '年份2_耕地面积_亩': 最佳匹配块['耕地面积_亩'],
+                '年份2_耕地比例': 最佳匹配块['耕地比例'],
+                '面积变化_平方米': 面积变化,
+                '面积变化_亩': 面积变化 / 666.67,
+                '比例变化': 比例变化,
+                '变化类型': '增加' if 面积变化 > 0 else ('减少' if 面积变化 < 0 else '无变化')
+            }
             
-            # 如果找到重叠度足够的匹配块
-            if 最佳匹配块 and 最大重叠比例 >= 重叠阈值:
-                匹配计数 += 1
-                
-                面积变化 = 最佳匹配块['耕地面积_平方米'] - 块1['耕地面积_平方米']
-                比例变化 = 最佳匹配块['耕地比例'] - 块1['耕地比例']
-                
-                变化信息 = {
-                    '块编号_年份1': 块1['块编号'],
-                    '块编号_年份2': 最佳匹配块['块编号'],
-                    '左上角经度': 块1['经纬度_左上角'][0],
-                    '左上角纬度': 块1['经纬度_左上角'][1],
-                    '右下角经度': 块1['经纬度_右下角'][0],
-                    '右下角纬度': 块1['经纬度_右下角'][1],
-                    '重叠比例': 最大重叠比例,
-                    '年份1_耕地面积_平方米': 块1['耕地面积_平方米'],
-                    '年份1_耕地面积_亩': 块1['耕地面积_亩'],
-                    '年份1_耕地比例': 块1['耕地比例'],
-                    '年份2_耕地面积_平方米': 最佳匹配块['耕地面积_平方米'],
-                    '年份2_耕地面积_亩': 最佳匹配块['耕地面积_亩'],
-                    '年份2_耕地比例': 最佳匹配块['耕地比例'],
-                    '面积变化_平方米': 面积变化,
-                    '面积变化_亩': 面积变化 / 666.67,
-                    '比例变化': 比例变化,
-                    '变化类型': '增加' if 面积变化 > 0 else ('减少' if 面积变化 < 0 else '无变化')
-                }
-                
-                变化列表.append(变化信息)
+            变化列表.append(变化信息)
         
         变化df = pd.DataFrame(变化列表)
         
@@ -529,6 +584,9 @@ class 耕地分析系统:
             
         返回:
             保存的文件路径
+
+        说明:
+            基准年图像按不重叠裁剪（重叠像素=0），与基准年对比 用同样的裁剪参数裁剪当前年图像
         """
         print("\n" + "=" * 60)
         print("📦 保存基准年数据")
@@ -536,7 +594,8 @@ class 耕地分析系统:
         
         # 裁剪图像
         print("\n✂️ 裁剪基准年图像...")
-        裁剪块列表 = self.裁剪图像并保留地理信息(tif路径)
+        裁剪尺寸, 重叠像素 = self.配置.裁剪尺寸, 0
+        裁剪块列表 = self.裁剪图像并保留地理信息(tif路径, 裁剪尺寸, 重叠像素)
         
         # 计算耕地面积
         print("\n📊 计算耕地面积...")
@@ -566,7 +625,7 @@ class 耕地分析系统:
         }
         
         # 保存数据
-        保存路径 = 保存路径 or 基准年数据文件
+        保存路径 = 保存路径 or self.配置.基准年数据路径()
         with open(保存路径, 'wb') as f:
             pickle.dump(基准年数据, f)
         
@@ -584,7 +643,7 @@ class 耕地分析系统:
                   当前年tif: str,
                   基准年数据路径: str = None,
                   当前年shapefile: str = None,
-                  重叠阈值: float = 0.5) -> pd.DataFrame:
+                  重叠阈值: float = None) -> pd.DataFrame:
         """
         将当前年图像与已保存的基准年数据进行对比
         
@@ -592,13 +651,14 @@ class 耕地分析系统:
             当前年tif: 当前年TIF图像路径
             基准年数据路径: 基准年数据文件路径(默认使用配置的路径)
             当前年shapefile: 当前年Shapefile路径(可选)
-            重叠阈值: 重叠阈值
+            重叠阈值: 重叠阈值（默认使用配置）
             
         返回:
             耕地变化数据DataFrame
         """
         # 加载基准年数据
-        基准年数据路径 = 基准年数据路径 or 基准年数据文件
+        基准年数据路径 = 基准年数据路径 or self.配置.基准年数据路径()
+        重叠阈值 = 重叠阈值 or self.配置.重叠阈值
         
         if not os.path.exists(基准年数据路径):
             raise FileNotFoundError(f"❌ 未找到基准年数据文件: {基准年数据路径}\n请先运行'保存基准年'模式保存基准年数据!")
@@ -621,7 +681,9 @@ class 耕地分析系统:
         # 分析当前年图像
         print(f"\n📂 当前年图像: {os.path.basename(当前年tif)}")
         print("\n✂️ 裁剪当前年图像...")
-        当前年裁剪块 = self.裁剪图像并保留地理信息(当前年tif)
+        裁剪参数 = 基准年数据.get('裁剪参数', {})
+        # 基准年一直按不重叠裁剪；较早保存的数据在 重叠像素 中记录的是配置值(100)而不是实际裁剪用的0，因此不读取该项
+        当前年裁剪块 = self.裁剪图像并保留地理信息(当前年tif, 裁剪参数.get('裁剪尺寸'), 0)
         
         print("\n📊 计算当前年耕地面积...")
         当前年结果 = []
@@ -632,7 +694,7 @@ class 耕地分析系统:
                 print(f"  已处理 {idx + 1}/{len(当前年裁剪块)} 个裁剪块")
         
         # 基于地理坐标匹配
-        print(f"\n🔍 基于地理坐标匹配区域(重叠阈值: {重叠阈값*100}%)...")
+        print(f"\n🔍 基于地理坐标匹配区域(重叠阈值: {重叠阈值*100}%)...")
         变化列表 = []
         匹配计数 = 0
         
@@ -687,21 +749,20 @@ class 耕地分析系统:
         
         return 变化df
     
-    def 使用模型预测耕地(self, 图像块: Dict, 模型路径: str = None) -> Dict:
+    def 加载模型(self, 模型路径: str = None) -> str:
         """
-        使用训练好的U-Net模型预测耕地区域
+        加载识别模型（每个实例只加载一次，批量分析/服务的工作进程可提前调用以预热）
         
         参数:
-            图像块: 裁剪块字典
-            模型路径: 模型文件路径
+            模型路径: 模型文件路径（默认使用配置 模型保存路径）
             
         返回:
-            包含耕地面积和比例的结果字典
+            实际使用的模型路径
         """
         if not KERAS_AVAILABLE:
             raise RuntimeError("❌ 未安装TensorFlow/Keras,无法使用模型预测功能!")
         
-        模型路径 = 模型路径 or 模型保存路径
+        模型路径 = 模型路径 or self.配置.模型保存路径
         
         if not os.path.exists(模型路径):
             raise FileNotFoundError(f"❌ 模型文件不存在: {模型路径}\n请先训练模型或指定正确的模型路径!")
@@ -727,11 +788,24 @@ class 耕地分析系统:
                 print(f"⚠️  标准加载失败，尝试容错模式: {str(e)}")
                 # 尝试容错加载（忽略不识别的参数）
                 import tensorflow as tf
+                
+                # 🔧 修复：自定义Conv2DTranspose，忽略groups参数
+                class Conv2DTranspose_Compat(tf.keras.layers.Conv2DTranspose):
+                    def __init__(self, *args, **kwargs):
+                        # 移除不兼容的参数
+                        kwargs.pop('groups', None)
+                        super().__init__(*args, **kwargs)
+                
+                custom_objs = {
+                    'dice_coefficient': self._dice_coefficient,
+                    'Conv2DTranspose': Conv2DTranspose_Compat
+                }
+                
                 try:
                     # TensorFlow 2.16+版本支持safe_mode
                     self._model = tf.keras.models.load_model(
                         模型路径,
-                        custom_objects={'dice_coefficient': self._dice_coefficient},
+                        custom_objects=custom_objs,
                         compile=False,
                         safe_mode=False
                     )
@@ -739,7 +813,7 @@ class 耕地分析系统:
                     # 旧版本不支持safe_mode参数
                     self._model = tf.keras.models.load_model(
                         模型路径,
-                        custom_objects={'dice_coefficient': self._dice_coefficient},
+                        custom_objects=custom_objs,
                         compile=False
                     )
                 self._model.compile(
@@ -749,6 +823,21 @@ class 耕地分析系统:
                 )
                 print("✅ 模型容错加载成功")
         
+        return 模型路径
+    
+    def 使用模型预测耕地(self, 图像块: Dict, 模型路径: str = None) -> Dict:
+        """
+        使用训练好的U-Net模型预测耕地区域
+        
+        参数:
+            图像块: 裁剪块字典
+            模型路径: 模型文件路径
+            
+        返回:
+            包含耕地面积和比例的结果字典
+        """
+        模型路径 = self.加载模型(模型路径)
+        
         # 准备图像
         图像 = 图像块['图像数据']
         
@@ -822,7 +911,119 @@ class 耕地分析系统:
         intersection = K.sum(y_true_f * y_pred_f)
         return (2. * intersection + smooth) / (K.sum(y_true_f) + K.sum(y_pred_f) + smooth)
     
-    def 使用模型预测耕地_大图(self, tif路径: str, 模型路径: str = None, 快速模式: bool = False, 去年掩码: np.ndarray = None) -> Dict:
+    # 窗口颜色识别阈值（_颜色规则预测块 使用）
+    _颜色规则阈值 = {
+        '棕色阈值': 20,     # R-B 大于该值为棕色耕地
+        '绿色阈值': 20,     # G-R 大于该值为绿色耕地
+        '灰色色差阈值': 10,  # 各波段与亮度的最大差不超过该值为纯灰色
+        '黑边阈值': 10,     # R+G+B 不超过该值为黑边
+        '边界膨胀核': 5,    # 去年边界附近的范围
+    }
+    
+    # 窗口识别参数（参与结果缓存键，阈值直接取自 _颜色规则阈值，修改识别逻辑时修改 方法 使旧缓存失效）
+    _窗口识别参数 = {'方法': '颜色识别', **_颜色规则阈值}
+    
+    # 模型不可用时的滑动窗口尺寸（与训练脚本的样本尺寸相同）
+    _默认窗口尺寸 = 256
+    
+    def _窗口尺寸(self, 模型路径: str) -> Tuple[int, str]:
+        """
+        大图识别的窗口尺寸：取模型输入尺寸（窗口识别本身使用颜色规则，模型只决定窗口尺寸）
+        
+        返回:
+            (窗口尺寸, 实际使用的模型路径)；未安装TensorFlow或模型文件不存在时
+            打印警告并返回 (_默认窗口尺寸, None)
+        """
+        try:
+            模型路径 = self.加载模型(模型路径)
+        except (RuntimeError, FileNotFoundError) as e:
+            print(f"  ⚠️  模型不可用，使用默认窗口尺寸 {self._默认窗口尺寸}: {str(e).splitlines()[0]}")
+            return self._默认窗口尺寸, None
+        return self._model.input_shape[1], 模型路径
+    
+    def _获取结果缓存(self):
+        """窗口结果缓存（首次使用时创建，缓存不可用时返回None）"""
+        if getattr(self, '_结果缓存', None) is None:
+            try:
+                from 结果缓存 import 结果缓存
+                缓存目录 = self.配置.结果缓存目录 or os.path.join(self.输出目录, '.结果缓存')
+                self._结果缓存 = 结果缓存(缓存目录, self.配置.结果缓存上限_MB)
+            except Exception as e:
+                print(f"  ⚠️  结果缓存不可用: {e}")
+                return None
+        return self._结果缓存
+    
+    def _停用结果缓存(self, 错误: Exception):
+        """
+        结果缓存读写出错（数据库被其他进程长时间锁定或已损坏）时丢弃缓存对象，
+        本次运行剩余的窗口直接计算，下次运行重新打开缓存
+        
+        返回:
+            None（赋给调用方的缓存变量）
+        """
+        print(f"  ⚠️  结果缓存出错，本次运行不再使用缓存: {type(错误).__name__}: {错误}")
+        self._结果缓存 = None
+        return None
+    
+    def _颜色规则预测块(self, 块: np.ndarray, 去年块掩码: np.ndarray, 完整预测: bool = False) -> np.ndarray:
+        """
+        单个窗口的颜色识别：去年耕地保留 + 去年边界附近颜色符合的新增耕地
+        
+        参数:
+            块: HxWx3 影像块（0-1 或 0-255）
+            去年块掩码: HxW 去年（或相邻窗口已合并）的耕地掩码
+            完整预测: 为True时整个窗口内颜色符合的像素都作为新增耕地，不限于去年边界附近
+                     （用于两期影像已发生变化的块；去年耕地仍然保留）
+            
+        返回:
+            HxW float32 预测掩码（0/1）
+        """
+        # ✅ 颜色识别逻辑（替代AI预测）
+        阈值 = self._颜色规则阈值
+        去年是耕地 = 去年块掩码 > 0.5
+        
+        # 颜色识别：棕色耕地 或 绿色耕地
+        块_uint8 = (块 * 255).astype(np.uint8) if 块.max() <= 1.0 else 块.astype(np.uint8)
+        R, G, B = 块_uint8[:,:,0], 块_uint8[:,:,1], 块_uint8[:,:,2]
+        
+        # ✅ 先过滤黑边！黑边特征：R=0, G=0, B=0 或 R+G+B 很小
+        不是黑边 = (R.astype(np.float32) + G.astype(np.float32) + B.astype(np.float32)) > 阈值['黑边阈值']
+        
+        # 棕色耕地识别
+        棕色指数 = R.astype(np.float32) - B.astype(np.float32)
+        是棕色耕地 = 棕色指数 > 阈值['棕色阈值']
+        
+        # 绿色耕地识别
+        绿色指数 = G.astype(np.float32) - R.astype(np.float32)
+        是绿色耕地 = 绿色指数 > 阈值['绿色阈值']
+        
+        # 排除纯灰色（无颜色差异的区域）
+        亮度 = (R + G + B) / 3.0
+        色差 = np.maximum(np.abs(R.astype(np.float32) - 亮度), 
+                       np.maximum(np.abs(G.astype(np.float32) - 亮度),
+                                np.abs(B.astype(np.float32) - 亮度)))
+        不是纯灰色 = 色差 > 阈值['灰色色差阈值']
+        
+        # 今年疑似耕地 = （棕色 或 绿色） 且 不是纯灰色 且 不是黑边
+        今年疑似耕地 = (是棕色耕地 | 是绿色耕地) & 不是纯灰色 & 不是黑边
+        
+        if 完整预测:
+            return (去年是耕地 | 今年疑似耕地).astype(np.float32)
+        
+        # ✅ 正确逻辑：去年耕地100%保留 + 去年边界附近用颜色识别判断是否新增
+        # 1. 计算去年边界区域（膨胀一点点）
+        kernel_dilate = np.ones((阈值['边界膨胀核'], 阈值['边界膨胀核']), np.uint8)  # 小范围膨胀
+        去年耕地_膨胀 = cv2.dilate(去年是耕地.astype(np.uint8), kernel_dilate)
+        去年边界附近 = (去年耕地_膨胀 > 0) & (~去年是耕地)  # 膨胀后的新增区域
+        
+        # 2. 最终结果 = 去年耕地 OR (去年边界附近 AND 今年颜色符合)
+        新增耕地 = 去年边界附近 & 今年疑似耕地
+        预测块 = (去年是耕地 | 新增耕地).astype(np.float32)
+        
+        return 预测块
+    
+    def 使用模型预测耕地_大图(self, tif路径: str, 模型路径: str = None, 快速模式: bool = False, 去年掩码: np.ndarray = None,
+                      使用缓存: bool = True, 去年图像路径: str = None, 面积模式: str = None) -> Dict:
         """
         使用训练好的U-Net模型预测图像的耕地区域（智能增量预测）
         支持任意尺寸的图片，自动resize到模型输入尺寸
@@ -832,93 +1033,79 @@ class 耕地分析系统:
             模型路径: 模型文件路径
             快速模式: 如果为True，使用更小尺寸快速处理（推荐图形界面使用）
             去年掩码: 去年的耕地掩码（用于智能增量预测，加速10倍）
+            使用缓存: 是否使用窗口结果缓存（输入和参数都未变化的窗口直接取缓存结果）
+            去年图像路径: 去年影像路径（与去年掩码同时提供时，按两期影像的块级光谱差异
+                       只重新识别变化的块，未变化的块沿用去年结果）
+            面积模式: "像素" 或 "矢量"（默认使用配置 面积核算模式）
             
         返回:
-            包含耕地面积和比例的结果字典
+            包含耕地面积和比例的结果字典（设置环境变量 GENGDI_PROFILE 时另有 '性能摘要' 和 '性能报告'）
+            
+        异常:
+            内存不足错误: 超出内存预算（同时在输出目录保存 内存预算报告.json）
         """
-        if not KERAS_AVAILABLE:
-            raise RuntimeError("❌ 未安装TensorFlow/Keras,无法使用模型预测功能!")
-        
-        模型路径 = 模型路径 or 模型保存路径
-        
-        if not os.path.exists(模型路径):
-            raise FileNotFoundError(f"❌ 模型文件不存在: {模型路径}\n请先训练模型或指定正确的模型路径!")
-        
-        # 加载模型(只加载一次)
-        if not hasattr(self, '_model') or self._model is None:
-            print(f"📥 加载模型: {os.path.basename(模型路径)}")
+        # 按阶段计时（见 性能剖析.py，未开启时无开销）
+        from 性能剖析 import 运行
+        from 内存预算 import 内存预算, 内存不足错误
+        预算 = 内存预算(self.配置.内存预算_MB, self.配置.内存映射目录 or os.path.join(self.输出目录, '.内存映射'))
+        with 运行("使用模型预测耕地_大图", self.输出目录) as 剖析:
             try:
-                # 尝试正常加载
-                self._model = keras.models.load_model(
-                    模型路径,
-                    custom_objects={'dice_coefficient': self._dice_coefficient},
-                    compile=False  # 先不编译，避免版本不兼容
-                )
-                # 手动重新编译
-                self._model.compile(
-                    optimizer='adam',
-                    loss='binary_crossentropy',
-                    metrics=['accuracy', self._dice_coefficient]
-                )
-                print("✅ 模型加载成功")
-            except Exception as e:
-                print(f"⚠️  标准加载失败，尝试容错模式: {str(e)}")
-                # 尝试容错加载（忽略不识别的参数）
-                import tensorflow as tf
-                
-                # 🔧 修复：自定义Conv2DTranspose，忽略groups参数
-                class Conv2DTranspose_Compat(tf.keras.layers.Conv2DTranspose):
-                    def __init__(self, *args, **kwargs):
-                        # 移除不兼容的参数
-                        kwargs.pop('groups', None)
-                        super().__init__(*args, **kwargs)
-                
-                custom_objs = {
-                    'dice_coefficient': self._dice_coefficient,
-                    'Conv2DTranspose': Conv2DTranspose_Compat
-                }
-                
-                try:
-                    # TensorFlow 2.16+版本支持safe_mode
-                    self._model = tf.keras.models.load_model(
-                        模型路径,
-                        custom_objects=custom_objs,
-                        compile=False,
-                        safe_mode=False
-                    )
-                except TypeError:
-                    # 旧版本不支持safe_mode参数
-                    self._model = tf.keras.models.load_model(
-                        模型路径,
-                        custom_objects=custom_objs,
-                        compile=False
-                    )
-                self._model.compile(
-                    optimizer='adam',
-                    loss='binary_crossentropy',
-                    metrics=['accuracy', self._dice_coefficient]
-                )
-                print("✅ 模型容错加载成功")
+                结果 = self._预测大图(tif路径, 模型路径, 快速模式, 去年掩码, 使用缓存, 去年图像路径, 面积模式, 预算)
+            except MemoryError as e:
+                报告 = e.报告 if isinstance(e, 内存不足错误) else 预算.报告(预算.最近阶段)
+                报告路径 = os.path.join(self.输出目录, "内存预算报告.json")
+                预算.保存报告(报告, 报告路径)
+                print(预算.报告文本(报告))
+                print(f"  📄 内存预算报告: {报告路径}")
+                if isinstance(e, 内存不足错误):
+                    raise
+                raise 内存不足错误(f"❌ 内存不足（{预算.最近阶段}）: {e}", 报告) from e
+            finally:
+                预算.清理()
+        结果['内存峰值_MB'] = 预算.报告()['峰值RSS_MB']
+        结果['内存计划'] = 预算.计划
+        if 剖析 is not None:
+            结果['性能摘要'] = 剖析.摘要
+            结果['性能报告'] = 剖析.报告路径
+        return 结果
+    
+    def _预测大图(self, tif路径: str, 模型路径: str, 快速模式: bool, 去年掩码: np.ndarray,
+              使用缓存: bool, 去年图像路径: str, 面积模式: str, 预算) -> Dict:
+        """使用模型预测耕地_大图 的实现（参数含义相同，预算为 内存预算 对象）"""
+        from 性能剖析 import 阶段, 计数
+        
+        with 阶段("加载模型"):
+            输入尺寸, 模型路径 = self._窗口尺寸(模型路径)
         
         # 读取图像
         with rasterio.open(tif路径) as src:
             # 使用窗口读取，避免大图内存爆炸
             # 如果图小，就直接读取；如果图大，分块读取
-            最大尺寸 = 1000 if 快速模式 else 2000  # 快速模式用更小的尺寸
+            最大尺寸 = self.配置.快速模式降采样尺寸 if 快速模式 else self.配置.降采样尺寸  # 快速模式用更小的尺寸
             
             print(f"  原始尺寸: {src.width}x{src.height}")
             
+            # 按内存预算选择降采样尺寸、分块尺寸和整幅掩码的存储位置（预算不足时直接报错）
+            掩码存储 = self.配置.掩码存储方式
+            计划 = 预算.规划(src.width, src.height, 最大尺寸, None if 掩码存储 == "自动" else 掩码存储)
+            最大尺寸 = 计划['最大尺寸']
+            放到磁盘 = 计划['掩码存储'] == '磁盘'
+            print(f"  💾 内存预算: {计划['预算_MB']} MB，预计峰值 {计划['预计峰值_MB']} MB，"
+                  f"掩码存储: {计划['掩码存储']}，分块尺寸: {计划['块尺寸']}")
+            
             if src.width <= 最大尺寸 and src.height <= 最大尺寸:
                 # 小图，直接读取
-                图像数据 = src.read()
+                with 阶段("读取影像"):
+                    图像数据 = src.read()
                 
                 # 转换为HxWxC
                 if 图像数据.shape[0] <= 4:
                     图像数据 = np.transpose(图像数据[:3], (1, 2, 0))
                 
                 # 归一化
-                if 图像数据.max() > 1.0:
-                    图像数据 = 图像数据.astype(np.float32) / 255.0
+                with 阶段("归一化"):
+                    if 图像数据.max() > 1.0:
+                        图像数据 = 图像数据.astype(np.float32) / 255.0
             else:
                 # 大图，采用金字塔降采样
                 print(f"  图像过大，使用降采样读取...")
@@ -927,27 +1114,29 @@ class 耕地分析系统:
                 新高 = int(src.height * 缩放因子)
                 
                 # 使用overview读取（如果有），否则降采样读取
-                图像数据 = src.read(
-                    out_shape=(src.count, 新高, 新宽),
-                    resampling=rasterio.enums.Resampling.bilinear
-                )
+                with 阶段("读取影像"):
+                    图像数据 = src.read(
+                        out_shape=(src.count, 新高, 新宽),
+                        resampling=rasterio.enums.Resampling.bilinear
+                    )
                 
                 # 转换为HxWxC
                 if 图像数据.shape[0] <= 4:
                     图像数据 = np.transpose(图像数据[:3], (1, 2, 0))
                 
                 # 归一化
-                if 图像数据.max() > 1.0:
-                    图像数据 = 图像数据.astype(np.float32) / 255.0
+                with 阶段("归一化"):
+                    if 图像数据.max() > 1.0:
+                        图像数据 = 图像数据.astype(np.float32) / 255.0
                 
                 print(f"  降采样后: {新宽}x{新高}")
+            预算.登记("图像数据", 图像数据)
             
             # 使用滑动窗口分块预测（保持位置准确性）
-            输入尺寸 = self._model.input_shape[1]
             print(f"  使用滑动窗口分块预测 (块大小: {输入尺寸}x{输入尺寸})")
             
-            # 初始化掩码（原始尺寸）
-            耕地掩码 = np.zeros((src.height, src.width), dtype=np.float32)
+            # 初始化掩码（原始尺寸，超出预算时放到磁盘映射）
+            耕地掩码 = 预算.分配数组("耕地掩码", (src.height, src.width), np.float32, 磁盘=放到磁盘)
             
             # 智能增量预测：利用去年的数据
             if 去年掩码 is not None:
@@ -969,16 +1158,31 @@ class 耕地分析系统:
                     去年_比例 = 去年_耕地像素 / 去年掩码.size
                     print(f"  ✅ resize后: 耕地像素={去年_耕地像素}, 耕地比例={去年_比例*100:.2f}%")
                 
-                # 直接使用去年的结果作为基础（转换为float32）
-                耕地掩码 = 去年掩码.astype(np.float32)
-                
+                # 直接使用去年的结果作为基础（写入已分配的float32掩码，不另建副本）
+                耕地掩码[:] = 去年掩码
+            
+            变化先验 = None
+            if 去年掩码 is not None and 去年图像路径 and os.path.exists(去年图像路径):
+                # 两期影像块级光谱差异：只有变化的块需要重新识别（包括地块内部的变化）
+                from 变化先验 import 计算块变化, 窗口有变化, 窗口变化掩码
+                with 阶段("变化先验"):
+                    变化先验 = 计算块变化(去年图像路径, tif路径)
+                需要预测区域 = None
+                print(f"  ✅ 变化先验: {变化先验['变化块'].sum()} 个变化块，"
+                      f"占有效块 {变化先验['变化比例']*100:.1f}%（色差阈值 {变化先验['色差阈值']:.2f}，"
+                      f"直方图阈值 {变化先验['直方图阈值']:.2f}）")
+                if 变化先验['变化比例'] > 0:
+                    print(f"  ✅ 预计加速 {1/变化先验['变化比例']:.1f}x 速度！")
+            elif 去年掩码 is not None:
                 # 找出可能变化的区域（边界区域 + 一定的buffer）
                 # 对去年掩码进行边界探测
+                预算.检查("边界区域", 4 * 去年掩码.size)  # uint8副本、膨胀、腐蚀、差值
                 去年掩码_uint8 = 去年掩码.astype(np.uint8)
                 
                 # 膨胀边界（扩大需要预测的区域）
                 kernel_large = np.ones((51, 51), np.uint8)  # 51像素buffer
-                边界区域 = cv2.dilate(去年掩码_uint8, kernel_large) - cv2.erode(去年掩码_uint8, kernel_large)
+                with 阶段("边界区域"):
+                    边界区域 = cv2.dilate(去年掩码_uint8, kernel_large) - cv2.erode(去年掩码_uint8, kernel_large)
                 
                 # 生成需要预测的区域掩码
                 需要预测区域 = 边界区域 > 0
@@ -994,8 +1198,14 @@ class 耕地分析系统:
                 需要预测区域 = None
                 print("  ⚠️  未提供去年数据，将预测整幅图像")
             
+            # 块级有效数据索引：整块都是黑边/nodata的窗口直接跳过，不读取不识别
+            from 有效数据索引 import 获取有效数据索引
+            with 阶段("有效数据索引"):
+                数据索引 = 获取有效数据索引(tif路径)
+            print(f"  ✅ 有效数据块: {数据索引.有效块比例*100:.1f}%（其余为黑边/无数据，直接跳过）")
+            
             # 计算需要的块数
-            步长 = 输入尺寸 // 2  # 50%重叠，避免边界问题
+            步长 = min(self.配置.窗口步长, 输入尺寸) or 输入尺寸 // 2  # 默认50%重叠，避免边界问题
             
             行数 = (src.height - 输入尺寸) // 步长 + 1
             列数 = (src.width - 输入尺寸) // 步长 + 1
@@ -1005,8 +1215,25 @@ class 耕地分析系统:
             
             print(f"  图像分成 {行数}x{列数} = {总块数} 个块")
             
+            # 窗口结果缓存：键 = 图像内容哈希 + 窗口 + 模型哈希 + 识别参数 + 该窗口的去年/已有掩码
+            缓存 = self._获取结果缓存() if 使用缓存 else None
+            if 缓存 is not None:
+                with 阶段("文件哈希"):
+                    缓存_图像哈希 = 缓存.文件哈希(tif路径)
+                    缓存_模型哈希 = 缓存.文件哈希(模型路径) if 模型路径 else f"无模型_{输入尺寸}"
+            
+            # 无去年数据时边预测边累加Otsu直方图（只统计不会再被后续窗口修改的行带）
+            直方图 = None
+            if 去年掩码 is None:
+                from 分块形态学 import 直方图累加器
+                直方图 = 直方图累加器()
+            
             # 滑动窗口
+            计数("窗口总数", 总块数)
             for i in range(行数):
+                if 直方图 is not None:
+                    with 阶段("直方图累加"):
+                        直方图.完成到行(耕地掩码, min(i * 步长, src.height - 输入尺寸))
                 for j in range(列数):
                     当前块 += 1
                     
@@ -1016,70 +1243,74 @@ class 耕地分析系统:
                     y_end = y_start + 输入尺寸
                     x_end = x_start + 输入尺寸
                     
+                    # 黑边/无数据窗口直接跳过
+                    if not 数据索引.窗口有数据(x_start, y_start, 输入尺寸, 输入尺寸):
+                        计数("跳过_无数据")
+                        continue
+                    
                     # 智能跳过：如果该块不在需要预测区域，直接跳过
                     if 需要预测区域 is not None:
                         块需要预测 = 需要预测区域[y_start:y_end, x_start:x_end]
                         if not np.any(块需要预测):  # 如果整块都不需要预测
+                            计数("跳过_未变化")
                             continue  # 跳过，保留去年的结果
+                    elif 变化先验 is not None:
+                        if not 窗口有变化(变化先验['变化块'], 变化先验['块尺寸'], x_start, y_start, 输入尺寸, 输入尺寸):
+                            计数("跳过_未变化")
+                            continue  # 两期影像无变化，保留去年的结果
                     
-                    # 从降采样图像中裁剪块（如果图像已降采样）
-                    if 图像数据.shape[0] == src.height and 图像数据.shape[1] == src.width:
-                        # 原始大小，直接裁剪
-                        块 = 图像数据[y_start:y_end, x_start:x_end]
-                    else:
-                        # 已降采样，需要重新读取这块
-                        window = rasterio.windows.Window(x_start, y_start, 输入尺寸, 输入尺寸)
-                        块_原始 = src.read(window=window)
-                        块_原始 = np.transpose(块_原始[:3], (1, 2, 0))
-                        if 块_原始.max() > 1.0:
-                            块 = 块_原始.astype(np.float32) / 255.0
-                        else:
-                            块 = 块_原始.astype(np.float32)
-                    
-                    # 确保块尺寸正确（边界可能不足）
-                    if 块.shape[0] != 输入尺寸 or 块.shape[1] != 输入尺寸:
-                        块 = cv2.resize(块, (输入尺寸, 输入尺寸))
-                    
-                    # ✅ 颜色识别逻辑（替代AI预测）
-                    # 获取去年块掩码
+                    # 获取去年块掩码（增量模式为去年结果，否则为相邻窗口已合并的结果）
                     去年块掩码 = 耕地掩码[y_start:y_end, x_start:x_end]
-                    去年是耕地 = 去年块掩码 > 0.5
-                    
-                    # 颜色识别：棕色耕地 或 绿色耕地
-                    块_uint8 = (块 * 255).astype(np.uint8) if 块.max() <= 1.0 else 块.astype(np.uint8)
-                    R, G, B = 块_uint8[:,:,0], 块_uint8[:,:,1], 块_uint8[:,:,2]
-                    
-                    # ✅ 先过滤黑边！黑边特征：R=0, G=0, B=0 或 R+G+B < 10
-                    不是黑边 = (R.astype(np.float32) + G.astype(np.float32) + B.astype(np.float32)) > 10
-                    
-                    # 棕色耕地识别（阈值继续加大！）
-                    棕色指数 = R.astype(np.float32) - B.astype(np.float32)
-                    是棕色耕地 = 棕色指数 > 20  # 阈值：20！
-                    
-                    # 绿色耕地识别（阈值继续加大！）
-                    绿色指数 = G.astype(np.float32) - R.astype(np.float32)
-                    是绿色耕地 = 绿色指数 > 20  # 阈值：20！
-                    
-                    # 排除纯灰色（无颜色差异的区域）
-                    亮度 = (R + G + B) / 3.0
-                    色差 = np.maximum(np.abs(R.astype(np.float32) - 亮度), 
-                                   np.maximum(np.abs(G.astype(np.float32) - 亮度),
-                                            np.abs(B.astype(np.float32) - 亮度)))
-                    不是纯灰色 = 色差 > 10  # 阈值：10！
                     
-                    # 今年疑似耕地 = （棕色 或 绿色） 且 不是纯灰色 且 不是黑边
-                    今年疑似耕地 = (是棕色耕地 | 是绿色耕地) & 不是纯灰色 & 不是黑边
+                    预测块 = None
+                    if 缓存 is not None:
+                        with 阶段("缓存查询"):
+                            缓存键 = 缓存.生成键(
+                                图像=缓存_图像哈希,
+                                窗口=(x_start, y_start, 输入尺寸),
+                                模型=缓存_模型哈希,
+                                参数={**self._窗口识别参数, '完整预测': 变化先验 is not None},
+                                去年块=缓存.数组哈希(去年块掩码 > 0.5)
+                            )
+                            try:
+                                预测块 = 缓存.读取(缓存键)
+                            except Exception as e:
+                                缓存 = self._停用结果缓存(e)
+                        if 预测块 is not None:
+                            计数("缓存命中")
+                            预测块 = 预测块.astype(np.float32)[..., np.newaxis]
                     
-                    # ✅ 正确逻辑：去年耕地100%保留 + 去年边界附近用颜色识别判断是否新增
-                    # 1. 计算去年边界区域（膨胀一点点）
-                    kernel_dilate = np.ones((5, 5), np.uint8)  # 小范围膨胀
-                    去年耕地_膨胀 = cv2.dilate(去年是耕地.astype(np.uint8), kernel_dilate)
-                    去年边界附近 = (去年耕地_膨胀 > 0) & (~去年是耕地)  # 膨胀后的新增区域
-                    
-                    # 2. 最终结果 = 去年耕地 OR (去年边界附近 AND 今年颜色符合)
-                    新增耕地 = 去年边界附近 & 今年疑似耕地
-                    预测块 = (去年是耕地 | 新增耕地).astype(np.float32)
-                    预测块 = np.expand_dims(预测块, axis=-1)
+                    if 预测块 is None:
+                        # 从降采样图像中裁剪块（如果图像已降采样）
+                        if 图像数据.shape[0] == src.height and 图像数据.shape[1] == src.width:
+                            # 原始大小，直接裁剪
+                            块 = 图像数据[y_start:y_end, x_start:x_end]
+                        else:
+                            # 已降采样，需要重新读取这块
+                            window = rasterio.windows.Window(x_start, y_start, 输入尺寸, 输入尺寸)
+                            with 阶段("读取窗口"):
+                                块_原始 = src.read(window=window)
+                            块_原始 = np.transpose(块_原始[:3], (1, 2, 0))
+                            with 阶段("归一化"):
+                                if 块_原始.max() > 1.0:
+                                    块 = 块_原始.astype(np.float32) / 255.0
+                                else:
+                                    块 = 块_原始.astype(np.float32)
+                        
+                        # 确保块尺寸正确（边界可能不足）
+                        if 块.shape[0] != 输入尺寸 or 块.shape[1] != 输入尺寸:
+                            块 = cv2.resize(块, (输入尺寸, 输入尺寸))
+                        
+                        with 阶段("颜色规则识别"):
+                            预测块 = self._颜色规则预测块(块, 去年块掩码, 完整预测=变化先验 is not None)
+                        计数("识别窗口")
+                        if 缓存 is not None:
+                            with 阶段("缓存写入"):
+                                try:
+                                    缓存.写入(缓存键, 预测块 > 0.5)
+                                except Exception as e:
+                                    缓存 = self._停用结果缓存(e)
+                        预测块 = np.expand_dims(预测块, axis=-1)
                     
                     # 🔧 调试：检查预测结果
                     if 当前块 == 1 and 需要预测区域 is not None:
@@ -1092,7 +1323,16 @@ class 耕地分析系统:
                         print(f"  🔍 首块调试: 需要预测像素={需要预测像素}, AI预测耕地={预测耕地像素}, 去年耕地={去年耕地像素}")
                     
                     # 放回掩码（只更新需要预测的区域）
-                    if 需要预测区域 is not None:
+                    if 变化先验 is not None:
+                        # 变化块内使用新识别结果（去年耕地 + 颜色符合的新增耕地），未变化的块保留去年结果
+                        块_变化 = 窗口变化掩码(变化先验['变化块'], 变化先验['块尺寸'], x_start, y_start, 输入尺寸, 输入尺寸)
+                        with 阶段("合并"):
+                            耕地掩码[y_start:y_end, x_start:x_end] = np.where(
+                                块_变化,
+                                预测块.squeeze(),
+                                耕地掩码[y_start:y_end, x_start:x_end]
+                            )
+                    elif 需要预测区域 is not None:
                         # 增量预测：只更新需要预测的像素
                         块_需要预测 = 需要预测区域[y_start:y_end, x_start:x_end]
                         预测块_2d = 预测块.squeeze()  # 确保是2D
@@ -1101,11 +1341,12 @@ class 耕地分析系统:
                         更新前 = 耕地掩码[y_start:y_end, x_start:x_end].copy()
                         
                         # 对于需要预测的区域，使用新预测值
-                        耕地掩码[y_start:y_end, x_start:x_end] = np.where(
-                            块_需要预测,
-                            预测块_2d,
-                            耕地掩码[y_start:y_end, x_start:x_end]
-                        )
+                        with 阶段("合并"):
+                            耕地掩码[y_start:y_end, x_start:x_end] = np.where(
+                                块_需要预测,
+                                预测块_2d,
+                                耕地掩码[y_start:y_end, x_start:x_end]
+                            )
                         
                         # 🔍 调试：更新后
                         if 当前块 == 1:
@@ -1115,10 +1356,11 @@ class 耕地分析系统:
                             print(f"  🔍 np.where更新: 更新前={更新前_耕地}, 更新后={更新后_耕地}")
                     else:
                         # 没有去年数据，正常合并（取最大值，处理重叠区域）
-                        耕地掩码[y_start:y_end, x_start:x_end] = np.maximum(
-                            耕地掩码[y_start:y_end, x_start:x_end],
-                            预测块.squeeze()
-                        )
+                        with 阶段("合并"):
+                            耕地掩码[y_start:y_end, x_start:x_end] = np.maximum(
+                                耕地掩码[y_start:y_end, x_start:x_end],
+                                预测块.squeeze()
+                            )
                     
                     # 进度显示
                     if 当前块 % 10 == 0 or 当前块 == 总块数:
@@ -1130,21 +1372,29 @@ class 耕地分析系统:
                 print("  🧠 智能后处理（保护稳定区域）...")
                 
                 # 只对预测区域做后处理，稳定区域保持去年的结果
-                # 1. 先保存去年的原始数据
-                去年掩码_保护 = 去年掩码.astype(np.uint8).copy()
-                
-                # 2. 检查AI预测和去年数据的相似度
-                预测区域_AI结果 = (耕地掩码[需要预测区域] > 0.5).astype(np.uint8)
-                预测区域_去年数据 = 去年掩码_保护[需要预测区域]
+                # 检查AI预测和去年数据的相似度（变化先验模式下为与去年结果的整体一致度）
+                # 按行带统计，不生成整幅的去年副本和比较结果
+                块尺寸 = 计划['块尺寸']
+                边界像素总数 = 相同像素数 = 预测耕地像素 = 0
+                with 阶段("相似度统计"):
+                    for y in range(0, 耕地掩码.shape[0], 块尺寸):
+                        今年带 = 耕地掩码[y:y + 块尺寸] > 0.5
+                        一致 = 今年带 == 去年掩码[y:y + 块尺寸].astype(np.uint8)
+                        预测耕地像素 += int(np.count_nonzero(今年带))
+                        if 需要预测区域 is not None:
+                            区域带 = 需要预测区域[y:y + 块尺寸]
+                            边界像素总数 += int(np.count_nonzero(区域带))
+                            相同像素数 += int(np.count_nonzero(一致 & 区域带))
+                        else:
+                            边界像素总数 += 一致.size
+                            相同像素数 += int(np.count_nonzero(一致))
                 
                 # ✅ 关闭后处理，直接使用颜色识别的结果！
                 # 因为颜色识别已经是基于去年数据的增量识别，不需要再做随机化
-                边界像素总数 = np.sum(需要预测区域)
-                相同像素数 = np.sum(预测区域_AI结果 == 预测区域_去年数据)
                 相似度 = 相同像素数 / 边界像素总数 if 边界像素总数 > 0 else 1.0
-                print(f"  🔍 边界区域AI预测相似度: {相似度*100:.2f}%")
+                print(f"  🔍 {'边界区域' if 需要预测区域 is not None else '整幅图像'}AI预测相似度: {相似度*100:.2f}%")
                 print(f"  ✅ 直接使用颜色识别结果，不做后处理")
-                print(f"  🔍 预测结果: 耕地像素={np.sum(耕地掩码 > 0.5)}, 去年={去年_耕地像素}")
+                print(f"  🔍 预测结果: 耕地像素={预测耕地像素}, 去年={去年_耕地像素}")
                 
                 # 直接使用耕地掩码，不做任何修改
                 # 耕地掩码已经是：去年耕地 OR 新增耕地
@@ -1152,41 +1402,66 @@ class 耕地分析系统:
                 # 没有去年数据，正常后处理
                 print("  🧠 智能后处理优化...")
                             
-                # 1. 动态阈值：使用Otsu算法自动确定最佳阈值
-                历史图 = ((耕地掩码 * 255).astype(np.uint8))
-                yuzhi, _ = cv2.threshold(历史图, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-                zuijia_yuzhi = yuzhi / 255.0
+                from 分块形态学 import 分块二值化, 分块形态学
+                块尺寸 = 计划['块尺寸']
+                去年块掩码 = 预测块 = 块 = None  # 释放窗口循环中对整幅掩码的视图引用
+                
+                # 1. 动态阈值：使用Otsu算法自动确定最佳阈值（直方图在预测过程中已累加，不生成整幅uint8副本）
+                with 阶段("Otsu阈值"):
+                    zuijia_yuzhi = 直方图.完成(耕地掩码) / 255.0
                 print(f"  ✅ 动态阈值: {zuijia_yuzhi:.3f} (默认0.5)")
                             
-                # 使用最佳阈值二值化
-                耕地掩码 = (耕地掩码 > zuijia_yuzhi).astype(np.uint8)
+                # 使用最佳阈值二值化（逐块写出），之后float32掩码即可释放
+                二值缓冲 = 预算.分配数组("二值掩码", 耕地掩码.shape, np.uint8, 磁盘=放到磁盘)
+                with 阶段("二值化"):
+                    耕地掩码 = 分块二值化(耕地掩码, zuijia_yuzhi, 块尺寸, 输出=二值缓冲)
+                预算.释放("耕地掩码")
                             
-                # 2. 形态学后处理：去除小噪点、填充小空洞
+                # 2. 形态学后处理（分块+光环，结果与整幅计算相同）：去除小噪点、填充小空洞
                 # 去除小噪点（开运算）
                 kernel_small = np.ones((3,3), np.uint8)
-                耕地掩码 = cv2.morphologyEx(耕地掩码, cv2.MORPH_OPEN, kernel_small, iterations=1)
+                形态缓冲 = 预算.分配数组("形态学掩码", 耕地掩码.shape, np.uint8, 磁盘=放到磁盘)
+                with 阶段("形态学"):
+                    耕地掩码 = 分块形态学(耕地掩码, "开", kernel_small, 块尺寸=块尺寸, 输出=形态缓冲)
                             
-                # 填充小空洞（闭运算）
+                # 填充小空洞（闭运算），结果写回二值缓冲
                 kernel_medium = np.ones((5,5), np.uint8)
-                耕地掩码 = cv2.morphologyEx(耕地掩码, cv2.MORPH_CLOSE, kernel_medium, iterations=1)
+                with 阶段("形态学"):
+                    耕地掩码 = 分块形态学(耕地掩码, "闭", kernel_medium, 块尺寸=块尺寸, 输出=二值缓冲)
+                del 形态缓冲
+                预算.释放("形态学掩码")
                             
                 # 3. 去除小区域（面积过小的连通域）
-                num_labels, labels, stats, _ = cv2.connectedComponentsWithStats(耕地掩码, connectivity=8)
                 最小面积 = 100  # 像素，小于100像素的区域认为是噪声
-                            
-                for i in range(1, num_labels):  # 0是背景
-                    区域面积 = stats[i, cv2.CC_STAT_AREA]
-                    if 区域面积 < 最小面积:
-                        耕地掩码[labels == i] = 0  # 移除小区域
+                预算.检查("连通域过滤", 5 * 耕地掩码.size)  # int32标签 + uint8结果
+                with 阶段("连通域过滤"):
+                    num_labels, labels, stats, _ = cv2.connectedComponentsWithStats(耕地掩码, connectivity=8)
+                    
+                    # 按标签查表一次完成，不再逐个区域扫描整幅图像
+                    保留 = stats[:, cv2.CC_STAT_AREA] >= 最小面积
+                    保留[0] = False  # 0是背景
+                    耕地掩码 = 保留.astype(np.uint8)[labels]
+                    del labels
+                del 二值缓冲
+                预算.释放("二值掩码")
+                预算.登记("结果掩码", 耕地掩码)
                             
                 print("  ✅ 后处理完成：去除噪点 + 填充空洞 + 过滤小区域")
             
             print("✅ 预测完成！")
+            缓存命中率 = None
+            if 缓存 is not None:
+                try:
+                    缓存.打印统计()
+                    缓存命中率 = 缓存.统计()['命中率']
+                    缓存.刷新()
+                except Exception as e:
+                    self._停用结果缓存(e)
             
-            # 计算耕地像素数
+            # 计算耕地像素数（比例的分子分母都只统计有效块，不含黑边/无数据块）
             耕地像素数 = np.sum(耕地掩码)
-            总像素数 = 耕地掩码.size
-            耕地比例 = 耕地像素数 / 总像素数
+            总像素数 = 数据索引.有效像素数()
+            耕地比例 = 数据索引.有效区域计数(耕地掩码) / 总像素数 if 总像素数 else 耕地像素数 / 耕地掩码.size
             
             # 🔍 关键调试：对比去年和今年
             if 去年掩码 is not None:
@@ -1201,12 +1476,16 @@ class 耕地分析系统:
                 if abs(耕地像素数 - 去年_耕地像素) / 去年_耕地像素 > 0.10:
                     print(f"  ⚠️  警告：去年和今年差异超过10%，可能没有真正使用去年数据！")
             
-            # 计算实际面积
-            像素分辨率x = abs(src.transform.a)
-            像素分辨率y = abs(src.transform.e)
-            单像素面积 = 像素分辨率x * 像素分辨率y
-            
-            耕地面积_平方米 = 耕地像素数 * 单像素面积
+            # 计算实际面积（每行像元面积只算一次，经纬度影像按纬度计算，按行加权累加）
+            from 面积核算 import 行像元面积, 掩码面积
+            with 阶段("面积计算"):
+                行面积 = 行像元面积(src.transform, src.crs, src.height)
+                
+                耕地面积_平方米 = 掩码面积(耕地掩码, 行面积)
+                总面积_平方米 = 数据索引.有效面积(行面积) if 数据索引.有效像素数() else float(行面积.sum() * src.width)
+                面积核算 = self._矢量面积核算(耕地掩码, src, 面积模式)
+            if 面积核算 is not None:
+                耕地面积_平方米 = 面积核算['矢量面积_平方米']
             耕地面积_亩 = 耕地面积_平方米 / 666.67
             
             # 获取地理坐标
@@ -1228,12 +1507,14 @@ class 耕地分析系统:
                 '左上角纬度': 左上角纬度[0],
                 '右下角经度': 右下角经度[0],
                 '右下角纬度': 右下角纬度[0],
-                '总面积_平方米': float(总像素数 * 单像素面积),
-                '总面积_亩': float((总像素数 * 单像素面积) / 666.67),
+                '总面积_平方米': float(总面积_平方米),
+                '总面积_亩': float(总面积_平方米 / 666.67),
                 '耕地面积_平方米': float(耕地面积_平方米),
                 '耕地面积_亩': float(耕地面积_亩),
                 '耕地比例': float(耕地比例),
                 '识别方法': 'U-Net模型',
+                '缓存命中率': 缓存命中率,
+                **self._面积核算字段(面积核算),
                 '耕地掩码': 耕地掩码  # 添加掩码用于可视化
             }
             
@@ -1286,41 +1567,45 @@ class 耕地分析系统:
                 print(f"🗺️ GeoJSON已保存: {输出路径}")
 
 # 使用示例
-def 主程序():
+def 主程序(配置: 运行配置 = None):
     """
-    主程序入口 - 自动读取文件开头的配置
+    主程序入口 - 默认读取文件开头的配置
+    
+    参数:
+        配置: 运行配置（默认由文件顶部配置区域生成）
     """
-    # 创建分析系统(使用顶部配置的输出目录)
-    系统 = 耕地分析系统(输出目录=输出目录)
+    配置 = 配置 or 默认配置()
+    # 创建分析系统(使用配置的输出目录)
+    系统 = 耕地分析系统(配置=配置)
     
     print("=" * 60)
     print("🌾 耕地图像分析系统")
     print("=" * 60)
-    print(f"📁 输出目录: {输出目录}")
-    print(f"📐 裁剪尺寸: {裁剪尺寸}x{裁剪尺寸} 像素")
-    print(f"🔗 重叠像素: {重叠像素} 像素")
-    print(f"🎯 分析模式: {分析模式}")
+    print(f"📁 输出目录: {配置.输出目录}")
+    print(f"📐 裁剪尺寸: {配置.裁剪尺寸}x{配置.裁剪尺寸} 像素")
+    print(f"🔗 重叠像素: {配置.重叠像素} 像素")
+    print(f"🎯 分析模式: {配置.分析模式}")
     print("=" * 60)
     
     # 根据分析模式执行不同的任务
-    if 分析模式 == "单张图像":
-        if not TIF图像路径 or not os.path.exists(TIF图像路径):
+    if 配置.分析模式 == "单张图像":
+        if not 配置.TIF图像路径 or not os.path.exists(配置.TIF图像路径):
             print("\n❌ 错误: 请在文件开头配置区域填写正确的TIF图像路径!")
-            print(f"当前配置路径: {TIF图像路径}")
+            print(f"当前配置路径: {配置.TIF图像路径}")
             return
         
-        print(f"\n📂 输入文件: {os.path.basename(TIF图像路径)}")
-        if Shapefile路径:
-            print(f"📍 标注文件: {os.path.basename(Shapefile路径)}")
+        print(f"\n📂 输入文件: {os.path.basename(配置.TIF图像路径)}")
+        if 配置.Shapefile路径:
+            print(f"📍 标注文件: {os.path.basename(配置.Shapefile路径)}")
         
         # 1. 裁剪图像
         print("\n" + "=" * 60)
         print("步骤1: 裁剪图像")
         print("=" * 60)
         裁剪块列表 = 系统.裁剪图像并保留地理信息(
-            TIF图像路径, 
-            裁剪尺寸=裁剪尺寸,
-            重叠像素=重叠像素
+            配置.TIF图像路径, 
+            裁剪尺寸=配置.裁剪尺寸,
+            重叠像素=配置.重叠像素
         )
         
         # 2. 计算每块的耕地面积
@@ -1331,7 +1616,7 @@ def 主程序():
         for idx, 块 in enumerate(裁剪块列表):
             结果 = 系统.计算耕地面积和比例(
                 块, 
-                shapefile路径=Shapefile路径 if Shapefile路径 else None
+                shapefile路径=配置.Shapefile路径 if 配置.Shapefile路径 else None
             )
             结果列表.append(结果)
             
@@ -1360,17 +1645,17 @@ def 主程序():
         
         print("\n✅ 单张图像分析完成!")
     
-    elif 分析模式 == "两年对比":
-        if not 年份1_TIF路径 or not 年份2_TIF路径:
+    elif 配置.分析模式 == "两年对比":
+        if not 配置.年份1_TIF路径 or not 配置.年份2_TIF路径:
             print("\n❌ 错误: 请在文件开头配置区域填写两年的TIF图像路径!")
             return
         
-        if not os.path.exists(年份1_TIF路径) or not os.path.exists(年份2_TIF路径):
+        if not os.path.exists(配置.年份1_TIF路径) or not os.path.exists(配置.年份2_TIF路径):
             print("\n❌ 错误: TIF文件路径不存在,请检查配置!")
             return
         
-        print(f"\n📂 年份1图像: {os.path.basename(年份1_TIF路径)}")
-        print(f"📂 年份2图像: {os.path.basename(年份2_TIF路径)}")
+        print(f"\n📂 年份1图像: {os.path.basename(配置.年份1_TIF路径)}")
+        print(f"📂 年份2图像: {os.path.basename(配置.年份2_TIF路径)}")
         
         # 执行两年对比分析(智能地理匹配)
         print("\n" + "=" * 60)
@@ -1380,14 +1665,14 @@ def 主程序():
         print("  - 支持不同大小的图像")
         print("  - 支持不同位置的图像")
         print("  - 只要地理位置重叠就能对比")
-        print(f"  - 重叠阈值: {重叠阈값*100}%")
+        print(f"  - 重叠阈值: {配置.重叠阈值*100}%")
         
         变化df = 系统.比较两年耕地变化(
-            年份1_TIF路径, 
-            年份2_TIF路径,
-            shapefile1=年份1_Shapefile路径 if 年份1_Shapefile路径 else None,
-            shapefile2=年份2_Shapefile路径 if 年份2_Shapefile路径 else None,
-            重叠阈值=重叠阈값
+            配置.年份1_TIF路径, 
+            配置.年份2_TIF路径,
+            shapefile1=配置.年份1_Shapefile路径 if 配置.年份1_Shapefile路径 else None,
+            shapefile2=配置.年份2_Shapefile路径 if 配置.年份2_Shapefile路径 else None,
+            重叠阈值=配置.重叠阈值
         )
         
         # 显示变化统计
@@ -1411,22 +1696,22 @@ def 主程序():
         
         print("\n✅ 两年对比分析完成!")
     
-    elif 分析模式 == "使用模型":
+    elif 配置.分析模式 == "使用模型":
         # 使用训练好的模型识别耕地(无需Shapefile)
-        if not TIF图像路径 or not os.path.exists(TIF图像路径):
+        if not 配置.TIF图像路径 or not os.path.exists(配置.TIF图像路径):
             print("\n❌ 错误: 请在文件开头配置区域填写正确的TIF图像路径!")
-            print(f"当前配置路径: {TIF图像路径}")
+            print(f"当前配置路径: {配置.TIF图像路径}")
             return
         
-        if not os.path.exists(模型保存路径):
+        if not os.path.exists(配置.模型保存路径):
             print("\n❌ 错误: 模型文件不存在!")
-            print(f"模型路径: {模型保存路径}")
+            print(f"模型路径: {配置.模型保存路径}")
             print("请先运行'耕地识别模型训练.py'训练模型!")
             return
         
         print(f"\n📌 使用模型识别模式")
-        print(f"📂 输入文件: {os.path.basename(TIF图像路径)}")
-        print(f"🤖 模型文件: {os.path.basename(模型保存路径)}")
+        print(f"📂 输入文件: {os.path.basename(配置.TIF图像路径)}")
+        print(f"🤖 模型文件: {os.path.basename(配置.模型保存路径)}")
         print("✨ 无需Shapefile标注,自动识别耕地!")
         
         # 1. 裁剪图像
@@ -1434,9 +1719,9 @@ def 主程序():
         print("步骤1: 裁剪图像")
         print("=" * 60)
         裁剪块列表 = 系统.裁剪图像并保留地理信息(
-            TIF图像路径,
-            裁剪尺寸=裁剪尺寸,
-            重叠像素=重叠像素
+            配置.TIF图像路径,
+            裁剪尺寸=配置.裁剪尺寸,
+            重叠像素=配置.重叠像素
         )
         
         # 2. 使用模型预测耕地
@@ -1445,7 +1730,7 @@ def 主程序():
         print("=" * 60)
         结果列表 = []
         for idx, 块 in enumerate(裁剪块列表):
-            结果 = 系统.使用模型预测耕地(块, 模型路径=模型保存路径)
+            结果 = 系统.使用模型预测耕地(块, 模型路径=配置.模型保存路径)
             结果列表.append(结果)
             
             # 每10个块显示一次进度
@@ -1474,20 +1759,20 @@ def 主程序():
         
         print("\n✅ 模型识别完成!")
     
-    elif 分析模式 == "快速对比":
+    elif 配置.分析模式 == "快速对比":
         # 输入一张图,自动输出:原来面积、现在面积、增加面积
-        if not TIF图像路径 or not os.path.exists(TIF图像路径):
+        if not 配置.TIF图像路径 or not os.path.exists(配置.TIF图像路径):
             print("\n❌ 错误: 请填写TIF图像路径!")
             return
         
-        if not os.path.exists(模型保存路径):
+        if not os.path.exists(配置.模型保存路径):
             print("\n❌ 错误: 模型文件不存在!")
-            print(f"模型路径: {模型保存路径}")
+            print(f"模型路径: {配置.模型保存路径}")
             print("请先运行'耕地识别模型训练.py'训练模型!")
             return
         
         # 加载基准数据
-        基准数据文件 = 模型保存路径.replace('.h5', '_基准数据.pkl')
+        基准数据文件 = 配置.模型保存路径.replace('.h5', '_基准数据.pkl')
         if not os.path.exists(基准数据文件):
             print(f"\n❌ 错误: 未找到基准数据文件!")
             print(f"需要文件: {基准数据文件}")
@@ -1507,7 +1792,7 @@ def 主程序():
         print(f"  训练图像数: {基准信息['训练图像数量']}")
         
         # 获取当前图像的地理范围
-        with rasterio.open(TIF图像路径) as src:
+        with rasterio.open(配置.TIF图像路径) as src:
             from rasterio.warp import transform as warp_transform
             左上角x = src.transform.c
             左上角y = src.transform.f
@@ -1547,19 +1832,19 @@ def 主程序():
             print(f"\n✅ 找到匹配的基准图像: {匹配的基准['tif文件']}")
         
         # 使用模型识别当前图像
-        print(f"\n🤖 使用模型识别当前图像: {os.path.basename(TIF图像路径)}")
+        print(f"\n🤖 使用模型识别当前图像: {os.path.basename(配置.TIF图像路径)}")
         
         # 裁剪图像
         裁剪块列表 = 系统.裁剪图像并保留地理信息(
-            TIF图像路径,
-            裁剪尺寸=裁剪尺寸,
-            重叠像素=重叠像素
+            配置.TIF图像路径,
+            裁剪尺寸=配置.裁剪尺寸,
+            重叠像素=配置.重叠像素
         )
         
         # 使用模型识别
         结果列表 = []
         for idx, 块 in enumerate(裁剪块列表):
-            结果 = 系统.使用模型预测耕地(块, 模型路径=模型保存路径)
+            结果 = 系统.使用模型预测耕地(块, 模型路径=配置.模型保存路径)
             结果列表.append(结果)
             if (idx + 1) % 10 == 0:
                 print(f"  已识别 {idx + 1}/{len(裁剪块列表)} 个裁剪块")
@@ -1574,7 +1859,7 @@ def 主程序():
         print("🌾 耕地对比结果")
         print("=" * 60)
         print(f"📍 基准图像: {匹配的基准['tif文件']}")
-        print(f"📍 当前图像: {os.path.basename(TIF图像路径)}")
+        print(f"📍 当前图像: {os.path.basename(配置.TIF图像路径)}")
         print()
         print(f"📅 原来耕地面积: {原来_耕地面积_亩:.2f} 亩")
         print(f"📅 现在耕地面积: {当前_总耕地面积_亩:.2f} 亩")
@@ -1590,7 +1875,7 @@ def 主程序():
         # 保存结果
         对比结果 = {
             '基准图像': 匹配的基准['tif文件'],
-            '当前图像': os.path.basename(TIF图像路径),
+            '当前图像': os.path.basename(配置.TIF图像路径),
             '原来耕地面积_亩': 原来_耕地面积_亩,
             '现在耕地面积_亩': 当前_总耕地面积_亩,
             '变化_亩': 变化_亩,
@@ -1605,17 +1890,28 @@ def 主程序():
         print("\n✅ 快速对比完成!")
     
     else:
-        print(f"\n❌ 错误: 未知的分析模式 '{分析模式}'")
+        print(f"\n❌ 错误: 未知的分析模式 '{配置.分析模式}'")
         print("请将分析模式设置为 '单张图像', '两年对比', '使用模型' 或 '快速对比'")
     
     print("\n" + "=" * 60)
     print("💡 提示: 修改文件开头的配置区域可以更改分析参数")
     print("=" * 60)
 
-if __name__ == "__main__":
+def 命令行入口(配置: 运行配置 = None):
+    """
+    命令行运行主程序（--配置 指定的配置文件叠加在参数 配置（默认为顶部配置区域）之上）
+    """
+    import argparse
+    解析器 = argparse.ArgumentParser(description="耕地图像分析系统")
+    解析器.add_argument('--配置', default=None, help="运行配置文件（.json / .yaml），默认使用文件顶部配置区域")
+    参数 = 解析器.parse_args()
+    
     try:
-        主程序()
+        主程序(运行配置.从文件(参数.配置, 默认=配置 or 默认配置()) if 参数.配置 else 配置)
     except Exception as e:
         print(f"\n❌ 程序运行出错: {e}")
         import traceback
         traceback.print_exc()
+
+if __name__ == "__main__":
+    命令行入口()
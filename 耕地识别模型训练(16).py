@@ -13,52 +13,12 @@ from sklearn.model_selection import train_test_split
 import pickle
 from datetime import datetime
 
-# ==================== GPU加速配置 ====================
-print("="*60)
-print("🚀 GPU加速检测")
-print("="*60)
-
-try:
-    import tensorflow as tf
-    
-    # 检测GPU
-    gpus = tf.config.list_physical_devices('GPU')
-    if gpus:
-        print(f"✅ 检测到 {len(gpus)} 个GPU设备:")
-        for i, gpu in enumerate(gpus):
-            print(f"   GPU {i}: {gpu.name}")
-        
-        # 启用GPU内存动态增长（避免占满显存）
-        try:
-            for gpu in gpus:
-                tf.config.experimental.set_memory_growth(gpu, True)
-            print("✅ 已启用GPU内存动态增长")
-        except RuntimeError as e:
-            print(f"⚠️  GPU配置警告: {e}")
-        
-        # 设置混合精度训练（加速）
-        try:
-            from tensorflow.keras import mixed_precision
-            policy = mixed_precision.Policy('mixed_float16')
-            mixed_precision.set_global_policy(policy)
-            print("✅ 已启用混合精度训练（FP16加速）")
-        except:
-            print("⚠️  混合精度训练不可用（TensorFlow版本较旧）")
-        
-        print("\n🎯 训练将使用GPU加速！")
-    else:
-        print("❌ 未检测到GPU，将使用CPU训练（速度较慢）")
-        print("   建议安装CUDA和cuDNN以启用GPU加速")
-except ImportError:
-    print("❌ 未安装TensorFlow，无法检测GPU")
-
-print("="*60)
-print()
+from 训练数据流水线 import 分层采样器
 
 # ==================== 配置区域 ====================
 
 # ✅ 训练模式选择
-训练模式 = "递归逐个"  # "递归逐个" = 递归扫描所有子文件夹，逐个训练TIF / "普通" = 一次性训练所有
+训练模式 = "递归逐个"  # "递归逐个" = 递归扫描所有子文件夹，逐个训练TIF / "普通" = 一次性训练所有 / "流式" = 所有TIF同时流式训练（内存恒定） / "分片" = 从预提取的样本分片训练 / "续训" = 逐个训练TIF，可断点恢复（无交互）
 
 # 📁 训练数据路径
 训练图像目录 = r"E:\八二" # 会递归扫描所有子文件夹
@@ -74,8 +34,52 @@ print()
 验证比例 = 0.15  # 15%验证集
 学习率 = 0.001  # 适中学习率，快速收敛
 
+# 流式训练参数（训练模式 = "流式" 时生效）
+每TIF样本数 = 1500  # 每轮从每个TIF流式读取的样本数（与逐个训练的采样数量一致）
+洗牌缓冲大小 = 512  # shuffle缓冲区样本数
+并行读取线程 = None  # 窗口读取并行度，None = tf.data.AUTOTUNE
+验证集划分 = "自动"  # "文件" = 整个TIF作验证集 / "区域" = 每个TIF切出末端条带作验证区域 / "自动" = TIF足够多时按文件，否则按区域
+
+# 样本分片参数（训练模式 = "分片" 时生效）
+样本分片目录 = r""  # 为空时使用 模型保存路径 旁的 "_样本分片" 目录；删除该目录即可重新提取
+样本提取进程数 = None  # 多个TIF并行提取的进程数，None = CPU核心数-1，1 = 串行提取
+
+# 断点续训参数（训练模式 = "续训" 时生效）
+续训运行目录 = r""  # 为空时使用 模型保存路径 旁的 "_续训" 目录；删除该目录即重新开始一次运行
+续训初始权重 = False  # True = 新运行时以 模型保存路径 的已有模型作为初始权重（增量学习），False = 从零开始
+
+# 执行配置: "自动" / "GPU" / "CPU高吞吐" / "CPU低占用" / "默认"（见 执行配置.py）
+执行配置名称 = "自动"
+
+# 高精度增强选项
+使用高精度增强 = False  # 是否在生成训练数据时使用高精度颜色识别增强标签
+
+# 逐个训练 / 基准地图选项
+每轮保存模型 = False  # True = 每轮都保存模型（增量学习），False = 只保存验证损失最好的一轮
+基准地图降采样因子 = 4  # 更新基准耕地地图时相对影像分辨率的降采样倍数
+基准地图上限_GB = 0  # 基准耕地地图超过该大小（GB）时自动降低分辨率（此时不合并原有地图），0 = 不限制
+
 # =================================================
 
+# ==================== 执行配置（线程池 / oneDNN / 混合精度 / XLA） ====================
+from 执行配置 import 应用执行配置
+应用执行配置(执行配置名称, 训练=True)
+
+
+def 应用运行配置(配置):
+    """
+    用运行配置（见 运行配置.py）覆盖上面配置区域的训练路径和批次大小，配置中为空的路径保持不变
+
+    执行配置在导入本模块时已经应用（进程级），如需更换请设置环境变量 GENGDI_EXEC_PROFILE
+    """
+    global 训练图像目录, 训练标注目录, 模型保存路径, 批次大小
+    训练图像目录 = 配置.训练图像目录 or 训练图像目录
+    训练标注目录 = 配置.训练标注目录 or 训练标注目录
+    模型保存路径 = 配置.模型保存路径 or 模型保存路径
+    批次大小 = 配置.批次大小
+    if 配置.执行配置名称 != 执行配置名称 and not os.environ.get('GENGDI_EXEC_PROFILE'):
+        print(f"⚠️  执行配置已按 '{执行配置名称}' 应用，配置文件中的 '{配置.执行配置名称}' 需通过环境变量 GENGDI_EXEC_PROFILE 指定")
+
 def 构建UNet模型(输入尺寸=(256, 256, 3)):
     """
     构建U-Net模型用于语义分割
@@ -184,7 +188,7 @@ def dice_coefficient(y_true, y_pred, smooth=1.0):
     return (2. * intersection + smooth) / (K.sum(y_true_f) + K.sum(y_pred_f) + smooth)
 
 
-def 从TIF和Shapefile生成训练数据(tif路径, shapefile路径, 目标尺寸=256):
+def 从TIF和Shapefile生成训练数据(tif路径, shapefile路径, 目标尺寸=256, 种子=None):
     """
     从TIF图像和Shapefile标注生成训练数据（大图采样裁剪）
     针对10GB+的超大TIF图，采用随机采样小块的方式，避免内存爆炸
@@ -193,6 +197,7 @@ def 从TIF和Shapefile生成训练数据(tif路径, shapefile路径, 目标尺
         tif路径: TIF图像文件路径
         shapefile路径: Shapefile标注文件路径
         目标尺寸: 训练图像大小（裁剪块的尺寸）
+        种子: 采样随机种子（相同种子得到相同样本，断点续训时使用）
     
     返回:
         (图像数组, 标签数组, 基准耕地数据)
@@ -288,94 +293,67 @@ def 从TIF和Shapefile生成训练数据(tif路径, shapefile路径, 目标尺
         print(f"    非耕地样本(<20%): {非耕地目标}")
         print(f"  开始采样...")
         
-        尝试次数 = 0
-        最大尝试 = 采样数量 * 100  # 增加最大尝试次数（样本多了，需要更多尝试）
+        # 低分辨率栅格化一次得到耕地比例图，各层直接抽取位置（无拒绝循环）
+        采样器 = 分层采样器(gdf.geometry, src.transform, src.width, src.height, 目标尺寸)
+        候选 = 采样器.候选数量()
+        print(f"  候选窗口: 纯耕地{候选['纯耕地']}, 混合{候选['混合']}, 非耕地{候选['非耕地']}")
+        
+        from affine import Affine
+        几何索引 = gdf.sindex
         
-        while (纯耕地计数 < 纯耕地目标 or 混合计数 < 混合目标 or 非耕地计数 < 非耕地目标) and 尝试次数 < 最大尝试:
-            尝试次数 += 1
+        for x, y, 类型 in 采样器.配额位置(采样数量, np.random.default_rng(种子)):
+            # 使用窗口读取（节省内存）
+            window = rasterio.windows.Window(x, y, 目标尺寸, 目标尺寸)
+            影像块 = src.read(window=window)
             
-            # 随机选择位置
-            x = np.random.randint(0, max(1, src.width - 目标尺寸))
-            y = np.random.randint(0, max(1, src.height - 目标尺寸))
+            # 转换为HxWxC
+            if 影像块.shape[0] <= 4:
+                影像块 = np.transpose(影像块[:3], (1, 2, 0))
             
-            # 计算该块的地理范围
-            块_左上x = src.transform.c + x * src.transform.a
-            块_左上y = src.transform.f + y * src.transform.e
-            块_右下x = 块_左上x + 目标尺寸 * src.transform.a
-            块_右下y = 块_左上y + 目标尺寸 * src.transform.e
+            # 归一化
+            if 影像块.max() > 1.0:
+                影像块 = 影像块.astype(np.float32) / 255.0
             
-            块边界 = box(
-                min(块_左上x, 块_右下x),
-                min(块_左上y, 块_右下y),
-                max(块_左上x, 块_右下x),
-                max(块_左上y, 块_右下y)
-            )
+            # 检查块大小是否正确
+            if 影像块.shape[0] != 目标尺寸 or 影像块.shape[1] != 目标尺寸:
+                continue
             
-            # 查找与该块相交的耕地几何
-            块_gdf = gdf[gdf.intersects(块边界)]
+            # 只对与该块相交的几何生成掩码（空间索引查询）
+            块边界 = box(*rasterio.windows.bounds(window, src.transform))
+            块_几何 = gdf.geometry.iloc[几何索引.query(块边界, predicate='intersects')]
             
-            # 只保留包含一定耕地的块(避免全是背景)
-            if len(块_gdf) > 0:
-                # 为该小块生成掩码（现在只有256x256，小内存）
-                from affine import Affine
+            if len(块_几何) > 0:
                 块_transform = Affine(
-                    src.transform.a, src.transform.b, 块_左上x,
-                    src.transform.d, src.transform.e, 块_左上y
+                    src.transform.a, src.transform.b, src.transform.c + x * src.transform.a,
+                    src.transform.d, src.transform.e, src.transform.f + y * src.transform.e
                 )
-                
                 标签块 = geometry_mask(
-                    块_gdf.geometry,
+                    块_几何,
                     out_shape=(目标尺寸, 目标尺寸),
                     transform=块_transform,
-                    invert=False
-                )
-                标签块 = (~标签块).astype(np.float32)
-                
-                # 计算耕地比例
-                耕地比例 = 标签块.mean()
-                
-                # 判断属于哪种类型并检查是否需要
-                需要采样 = False
-                类型 = ""
-                if 耕地比例 > 0.8 and 纯耕地计数 < 纯耕地目标:
-                    需要采样 = True
-                    类型 = "纯耕地"
-                elif 0.2 <= 耕地比例 <= 0.8 and 混合计数 < 混合目标:
-                    需要采样 = True
-                    类型 = "混合"
-                elif 耕地比例 < 0.2 and 非耕地计数 < 非耕地目标:
-                    需要采样 = True
-                    类型 = "非耕地"
-                
-                if 需要采样:
-                    # 使用窗口读取（节省内存）
-                    window = rasterio.windows.Window(x, y, 目标尺寸, 目标尺寸)
-                    影像块 = src.read(window=window)
-                    
-                    # 转换为HxWxC
-                    if 影像块.shape[0] <= 4:
-                        影像块 = np.transpose(影像块[:3], (1, 2, 0))
-                    
-                    # 归一化
-                    if 影像块.max() > 1.0:
-                        影像块 = 影像块.astype(np.float32) / 255.0
-                    
-                    # 检查块大小是否正确
-                    if 影像块.shape[0] == 目标尺寸 and 影像块.shape[1] == 目标尺寸:
-                        图像列表.append(影像块)
-                        标签列表.append(标签块[..., np.newaxis])
-                        
-                        # 更新计数
-                        if 类型 == "纯耕地":
-                            纯耕地计数 += 1
-                        elif 类型 == "混合":
-                            混合计数 += 1
-                        else:
-                            非耕地计数 += 1
-                        
-                        总计 = 纯耕地计数 + 混合计数 + 非耕地计数
-                        if 总计 % 30 == 0:
-                            print(f"    已采样: {总计}/{采样数量} (纯:{纯耕地计数}, 混:{混合计数}, 非:{非耕地计数})")
+                    invert=True
+                ).astype(np.float32)
+            else:
+                标签块 = np.zeros((目标尺寸, 目标尺寸), dtype=np.float32)
+            
+            # 高精度增强（可选）
+            if 使用高精度增强:
+                标签块 = _高精度增强标签(影像块, 标签块)
+            
+            图像列表.append(影像块)
+            标签列表.append(标签块[..., np.newaxis])
+            
+            # 更新计数
+            if 类型 == "纯耕地":
+                纯耕地计数 += 1
+            elif 类型 == "混合":
+                混合计数 += 1
+            else:
+                非耕地计数 += 1
+            
+            总计 = 纯耕地计数 + 混合计数 + 非耕地计数
+            if 总计 % 30 == 0:
+                print(f"    已采样: {总计}/{采样数量} (纯:{纯耕地计数}, 混:{混合计数}, 非:{非耕地计数})")
         
         print(f"  最终采样结果: 纯耕地{纯耕地计数}, 混合{混合计数}, 非耕地{非耕地计数}")
 
@@ -385,6 +363,26 @@ def 从TIF和Shapefile生成训练数据(tif路径, shapefile路径, 目标尺
         return 图像列表, 标签列表, 基准数据
 
 
+_高精度识别器 = None
+
+
+def _高精度增强标签(影像块, 标签块):
+    """用高精度颜色识别增强标签（与原始标签取并集，更宽松）；模块不可用时返回原始标签"""
+    global _高精度识别器, 使用高精度增强
+    if _高精度识别器 is None:
+        try:
+            from 高精度颜色识别 import 高精度颜色识别器
+            _高精度识别器 = 高精度颜色识别器()
+        except ImportError:
+            print("  ⚠️ 高精度增强模块不可用，使用原始标签")
+            使用高精度增强 = False
+            return 标签块
+    
+    影像块_uint8 = (影像块 * 255).astype(np.uint8)
+    增强标签 = _高精度识别器.多方法融合(影像块_uint8, 标签块)
+    return np.maximum(标签块, 增强标签.astype(np.float32))
+
+
 def 自动扫描文件(起始目录=".", 扩展名=".tif", 最大深度=3):
     """
     自动扫描目录及子目录，查找指定扩展名的文件
@@ -604,7 +602,7 @@ def 逐个训练TIF模式():
             callbacks = [
                 keras.callbacks.ModelCheckpoint(
                     模型保存路径,
-                    save_best_only=True,
+                    save_best_only=not 每轮保存模型,
                     monitor='val_loss',
                     verbose=1
                 ),
@@ -680,6 +678,16 @@ def 逐个训练TIF模式():
     print(f"{'='*60}")
     
     # ✅ 增量学习模式：在原有PKL基础上扩展基准地图
+    更新基准耕地地图(tif列表)
+
+
+def 更新基准耕地地图(tif列表):
+    """
+    在原有基准数据PKL的基础上扩展基准耕地地图，覆盖所有已训练TIF的联合范围
+    
+    参数:
+        tif列表: 已训练的TIF文件路径列表
+    """
     基准数据文件 = 模型保存路径.replace('.h5', '_基准数据.pkl')
     print(f"\n📍 更新基准耕地地图（增量学习模式）...")
     
@@ -721,7 +729,7 @@ def 逐个训练TIF模式():
                     if 基准_crs is None:
                         基准_crs = src.crs
                     if 基准_分辨率 is None:
-                        基准_分辨率 = abs(src.transform.a) * 4  # 降采样因子
+                        基准_分辨率 = abs(src.transform.a) * 基准地图降采样因子
                     
                     全局_左 = min(全局_左, src.bounds.left)
                     全局_右 = max(全局_右, src.bounds.right)
@@ -755,6 +763,20 @@ def 逐个训练TIF模式():
         from affine import Affine
         新transform = Affine(基准_分辨率, 0, 全局_左, 0, -基准_分辨率, 全局_上)
         
+        # 检查地图尺寸是否过大（uint8，每像素1字节）
+        预估大小_GB = (新宽度 * 新高度) / (1024**3)
+        分辨率已调整 = False
+        if 基准地图上限_GB and 预估大小_GB > 基准地图上限_GB:
+            print(f"   ⚠️  预估大小: {预估大小_GB:.1f}GB，超过{基准地图上限_GB}GB限制，自动调整降采样因子...")
+            # 目标控制在上限的2/3左右
+            缩放比例 = np.sqrt(基准地图上限_GB * 2 / 3 * (1024**3) / (新宽度 * 新高度))
+            基准_分辨率 = 基准_分辨率 / 缩放比例
+            新宽度 = int(全局宽度_米 / 基准_分辨率)
+            新高度 = int(全局高度_米 / 基准_分辨率)
+            新transform = Affine(基准_分辨率, 0, 全局_左, 0, -基准_分辨率, 全局_上)
+            分辨率已调整 = True
+            print(f"   调整后尺寸: {新宽度}x{新高度} 像素（分辨率已调整，无法合并原有地图，将重新生成）")
+        
         # 生成新的完整基准地图
         新基准耕地地图 = geometry_mask(
             gdf.geometry,
@@ -763,8 +785,8 @@ def 逐个训练TIF模式():
             invert=True
         ).astype(np.uint8)
         
-        # 如果有原有数据，合并（保留原有数据中已有的部分）
-        if 原有数据 and '基准耕地地图' in 原有数据:
+        # 如果有原有数据且分辨率未调整，合并（保留原有数据中已有的部分）
+        if 原有数据 and '基准耕地地图' in 原有数据 and not 分辨率已调整:
             原有地图 = 原有数据['基准耕地地图']
             原有transform = 原有数据['地理变换']
             
@@ -837,6 +859,297 @@ def 逐个训练TIF模式():
         print(f"⚠️  生成基准地图失败: {e}")
         import traceback
         traceback.print_exc()
+        raise
+
+
+def 加载或构建模型():
+    """
+    已有模型时询问增量学习或重新训练（重新训练前备份旧模型），否则构建新模型
+    """
+    try:
+        from tensorflow import keras
+    except:
+        import keras
+    
+    if os.path.exists(模型保存路径):
+        print(f"\n📦 检测到已有模型: {os.path.basename(模型保存路径)}")
+        用户选择 = input("选择模式:\n  1. 增量学习（在旧模型基础上继续训练）\n  2. 重新训练（从零开始）\n请输入选择 (1/2): ").strip()
+        
+        if 用户选择 == "1":
+            model = keras.models.load_model(
+                模型保存路径,
+                custom_objects={'dice_coefficient': dice_coefficient}
+            )
+            print("✅ 已加载旧模型，将进行增量学习")
+            return model
+        
+        备份路径 = 模型保存路径.replace('.h5', f'_备份_{datetime.now().strftime("%Y%m%d_%H%M%S")}.h5')
+        import shutil
+        shutil.copy(模型保存路径, 备份路径)
+        print(f"💾 旧模型已备份: {os.path.basename(备份路径)}")
+    
+    print(f"\n🏗️ 构建新模型...")
+    return 构建UNet模型(输入尺寸=(图像尺寸, 图像尺寸, 3))
+
+
+def 创建训练回调():
+    """保存最佳模型 + 早停 + 学习率衰减"""
+    try:
+        from tensorflow import keras
+    except:
+        import keras
+    
+    return [
+        keras.callbacks.ModelCheckpoint(
+            模型保存路径,
+            save_best_only=True,
+            monitor='val_loss',
+            verbose=1
+        ),
+        keras.callbacks.EarlyStopping(
+            monitor='val_loss',
+            patience=10,
+            verbose=1
+        ),
+        keras.callbacks.ReduceLROnPlateau(
+            monitor='val_loss',
+            factor=0.5,
+            patience=5,
+            verbose=1
+        )
+    ]
+
+
+def 流式训练模式():
+    """
+    递归扫描所有TIF，用tf.data流式读取窗口样本同时训练
+    不再把样本堆成numpy数组，内存占用与TIF数量无关
+    """
+    from 训练数据流水线 import 创建样本源列表, 划分样本源, 构建流式数据集
+    
+    print("\n" + "="*60)
+    print("🎓 流式训练模式")
+    print("="*60)
+    print("✨ 功能：")
+    print("  ✅ 所有TIF同时参与训练")
+    print("  ✅ 按窗口实时读取影像并栅格化标签（内存恒定）")
+    print("  ✅ 并行读取 + shuffle缓冲 + prefetch")
+    print()
+    
+    tif列表 = 递归扫描TIF文件(训练图像目录)
+    
+    if not tif列表:
+        print("\n❌ 未找到任何TIF文件！")
+        print(f"   请检查路径: {训练图像目录}")
+        return
+    
+    if not os.path.exists(训练标注目录):
+        print(f"\n❌ 标注文件不存在: {训练标注目录}")
+        return
+    
+    print(f"\n📍 使用标注文件: {os.path.basename(训练标注目录)}")
+    样本源列表 = 创建样本源列表(tif列表, 训练标注目录, 图像尺寸)
+    
+    if not 样本源列表:
+        print("\n❌ 没有可用于训练的TIF！")
+        return
+    
+    # 验证集按TIF或TIF内不相交的区域划分，不与训练窗口重叠
+    训练源列表, 验证源列表 = 划分样本源(样本源列表, 验证比例, 验证集划分)
+    if not 训练源列表 or not 验证源列表:
+        print("\n❌ TIF数量或尺寸不足，无法划分互不重叠的训练集和验证集")
+        return
+    print(f"\n📋 验证集划分（{验证集划分}）: 训练 {len(训练源列表)} 个样本源 + 验证 {len(验证源列表)} 个样本源")
+    
+    # 每轮样本数与逐个训练一致，验证集使用固定种子（每轮相同窗口）
+    总样本数 = 每TIF样本数 * len(样本源列表)
+    训练步数 = max(1, int(总样本数 * (1 - 验证比例)) // 批次大小)
+    验证步数 = max(1, int(总样本数 * 验证比例) // 批次大小)
+    
+    训练集 = 构建流式数据集(
+        训练源列表,
+        批次大小=批次大小,
+        洗牌缓冲=洗牌缓冲大小,
+        并行读取=并行读取线程
+    )
+    验证集 = 构建流式数据集(
+        验证源列表,
+        批次大小=批次大小,
+        洗牌缓冲=0,
+        种子=42,
+        并行读取=并行读取线程
+    ).take(验证步数)
+    
+    print(f"\n📋 每轮: 训练 {训练步数} 批 + 验证 {验证步数} 批 (批次大小 {批次大小})")
+    
+    model = 加载或构建模型()
+    callbacks = 创建训练回调()
+    
+    print(f"\n🚀 开始流式训练（{len(样本源列表)} 个TIF，{训练轮数}轮）...")
+    history = model.fit(
+        训练集,
+        steps_per_epoch=训练步数,
+        validation_data=验证集,
+        validation_steps=验证步数,
+        epochs=训练轮数,
+        callbacks=callbacks,
+        verbose=1
+    )
+    
+    for 源 in 训练源列表 + 验证源列表:
+        源.关闭()
+    
+    print(f"\n{'='*60}")
+    print(f"🎉 流式训练完成！")
+    print(f"💾 模型已保存: {模型保存路径}")
+    print(f"{'='*60}")
+    
+    # 保存训练历史
+    历史文件 = 模型保存路径.replace('.h5', '_history.pkl')
+    with open(历史文件, 'wb') as f:
+        pickle.dump(history.history, f)
+    
+    更新基准耕地地图([源.tif路径 for 源 in 样本源列表])
+
+
+def 分片训练模式():
+    """
+    从预先提取的样本分片训练（分片不存在时先提取一次）
+    调参和重复训练不再重新采样、不再做几何运算
+    """
+    from 训练样本分片 import 读取清单, 导出样本分片, 划分分片, 构建分片数据集, 统计分片样本数
+    
+    print("\n" + "="*60)
+    print("🎓 分片训练模式")
+    print("="*60)
+    
+    分片目录 = 样本分片目录 or 模型保存路径.replace('.h5', '_样本分片')
+    清单 = 读取清单(分片目录)
+    
+    if 清单 is None:
+        print(f"\n📦 未找到样本分片，开始提取: {分片目录}")
+        tif列表 = 递归扫描TIF文件(训练图像目录)
+        if not tif列表:
+            print("\n❌ 未找到任何TIF文件！")
+            print(f"   请检查路径: {训练图像目录}")
+            return
+        if not os.path.exists(训练标注目录):
+            print(f"\n❌ 标注文件不存在: {训练标注目录}")
+            return
+        if len(tif列表) > 1 and 样本提取进程数 != 1:
+            from 并行样本提取 import 并行导出样本分片
+            并行导出样本分片(tif列表, 训练标注目录, 分片目录, 图像尺寸, 每TIF样本数, 种子=42, 进程数=样本提取进程数)
+        else:
+            导出样本分片(tif列表, 训练标注目录, 分片目录, 图像尺寸, 每TIF样本数, 种子=42)
+        清单 = 读取清单(分片目录)
+    else:
+        print(f"\n✅ 使用已有样本分片: {分片目录}")
+        print(f"   创建时间: {清单['创建时间']}, 分片数: {len(清单['分片'])}, 样本数: {清单['总样本数']}")
+    
+    if 清单['图像尺寸'] != 图像尺寸:
+        print(f"\n❌ 分片图像尺寸({清单['图像尺寸']})与训练图像尺寸({图像尺寸})不一致，请删除分片目录后重新提取")
+        return
+    
+    训练分片, 验证分片 = 划分分片(分片目录, 验证比例)
+    if not 训练分片 or not 验证分片:
+        print("\n❌ 分片数量不足，无法划分训练集和验证集")
+        return
+    
+    训练步数 = max(1, 统计分片样本数(分片目录, 训练分片) // 批次大小)
+    验证步数 = max(1, 统计分片样本数(分片目录, 验证分片) // 批次大小)
+    
+    训练集 = 构建分片数据集(训练分片, 批次大小=批次大小, 洗牌缓冲=洗牌缓冲大小)
+    验证集 = 构建分片数据集(验证分片, 批次大小=批次大小, 洗牌缓冲=0)
+    
+    print(f"\n📋 数据划分: 训练 {len(训练分片)} 个分片 + 验证 {len(验证分片)} 个分片")
+    
+    model = 加载或构建模型()
+    
+    print(f"\n🚀 开始训练（{训练轮数}轮）...")
+    history = model.fit(
+        训练集,
+        steps_per_epoch=训练步数,
+        validation_data=验证集,
+        validation_steps=验证步数,
+        epochs=训练轮数,
+        callbacks=创建训练回调(),
+        verbose=1
+    )
+    
+    print(f"\n✅ 训练完成!")
+    print(f"📦 模型已保存: {模型保存路径}")
+    
+    历史文件 = 模型保存路径.replace('.h5', '_history.pkl')
+    with open(历史文件, 'wb') as f:
+        pickle.dump(history.history, f)
+    
+    更新基准耕地地图([来源['tif完整路径'] for 来源 in 清单.get('来源', [])])
+
+
+def 续训模式():
+    """
+    可断点恢复的逐个训练TIF模式（无交互）
+    每轮保存检查点（权重 + 优化器状态 + 轮次），中断后重新运行从中断处继续；
+    续训初始权重 = True 时新运行以已有模型作为初始权重进行增量学习
+    """
+    from 断点续训 import 续训运行, 清单文件名
+    
+    print("\n" + "="*60)
+    print("🎓 断点续训模式")
+    print("="*60)
+    
+    tif列表 = 递归扫描TIF文件(训练图像目录)
+    if not tif列表:
+        print("\n❌ 未找到任何TIF文件！")
+        print(f"   请检查路径: {训练图像目录}")
+        return
+    if not os.path.exists(训练标注目录):
+        print(f"\n❌ 标注文件不存在: {训练标注目录}")
+        return
+    
+    def 生成样本(tif路径, 种子):
+        图像块, 标签块, _ = 从TIF和Shapefile生成训练数据(tif路径, 训练标注目录, 图像尺寸, 种子=种子)
+        return 图像块, 标签块
+    
+    运行目录 = 续训运行目录 or 模型保存路径.replace('.h5', '_续训')
+    新运行 = not os.path.exists(os.path.join(运行目录, 清单文件名))
+    
+    初始权重路径 = None
+    if os.path.exists(模型保存路径):
+        if 续训初始权重:
+            初始权重路径 = 模型保存路径
+            print(f"📦 新运行将以已有模型作为初始权重（增量学习）: {模型保存路径}")
+        else:
+            print(f"⚠️  已有模型不作为初始权重（从零开始训练，最佳模型会覆盖该文件）: {模型保存路径}")
+            print("   如需增量学习，请设置 续训初始权重 = True")
+        
+        # 新运行开始前备份旧模型（恢复运行时该文件已是本次运行保存的模型，不再备份）
+        if 新运行:
+            备份路径 = 模型保存路径.replace('.h5', f'_备份_{datetime.now().strftime("%Y%m%d_%H%M%S")}.h5')
+            import shutil
+            shutil.copy(模型保存路径, 备份路径)
+            print(f"💾 旧模型已备份: {os.path.basename(备份路径)}")
+    
+    运行 = 续训运行(
+        运行目录,
+        tif列表,
+        构建模型=lambda: 构建UNet模型(输入尺寸=(图像尺寸, 图像尺寸, 3)),
+        生成样本=生成样本,
+        训练轮数=训练轮数,
+        批次大小=批次大小,
+        验证比例=验证比例,
+        初始权重路径=初始权重路径,
+        回调列表=创建训练回调  # 含ModelCheckpoint，最佳模型仍保存到 模型保存路径
+    )
+    清单 = 运行.执行()
+    
+    print(f"\n{'='*60}")
+    print(f"🎉 所有TIF训练完成！")
+    print(f"📊 完成 {len(清单['已完成'])} 个TIF，失败 {len(清单['失败'])} 个")
+    print(f"💾 模型已保存: {模型保存路径}")
+    print(f"{'='*60}")
+    
+    更新基准耕地地图(清单['已完成'])
 
 
 def 准备训练数据(图像目录, 标注目录):
@@ -978,6 +1291,18 @@ def 训练模型():
         逐个训练TIF模式()
         return None, None
     
+    if 训练模式 == "流式":
+        流式训练模式()
+        return None, None
+    
+    if 训练模式 == "分片":
+        分片训练模式()
+        return None, None
+    
+    if 训练模式 == "续训":
+        续训模式()
+        return None, None
+    
     # 以下是普通模式（一次性训练所有）
     print("\n" + "=" * 60)
     print("🎓 U-Net耕地识别模型训练 - 普通模式")
@@ -1229,10 +1554,39 @@ def 训练模型():
     return model, history
 
 
-if __name__ == "__main__":
+def 命令行入口(**覆盖):
+    """
+    命令行运行训练
+    
+    参数:
+        覆盖: 覆盖配置区域的全局变量（如旧副本入口的 训练图像目录、模型保存路径），--配置 指定的运行配置在其后应用
+    """
+    import sys
+    import argparse
+    未知 = [k for k in 覆盖 if k not in globals()]
+    if 未知:
+        raise ValueError(f"❌ 未知的配置项: {', '.join(未知)}")
+    globals().update(覆盖)
+    
+    解析器 = argparse.ArgumentParser(description="耕地识别模型训练")
+    解析器.add_argument('--配置', default=None, help="运行配置文件（.json / .yaml），覆盖训练路径和批次大小")
+    参数, _ = 解析器.parse_known_args()
+    if 参数.配置:
+        from 运行配置 import 运行配置
+        # 配置文件中没有的配置项保持上面配置区域（及旧副本入口覆盖）的值
+        应用运行配置(运行配置.从文件(参数.配置, 默认=运行配置.从模块(sys.modules[__name__])))
+    
+    from 断点续训 import 不可重试退出码
     try:
         model, history = 训练模型()
     except Exception as e:
         print(f"\n❌ 训练出错: {e}")
         import traceback
         traceback.print_exc()
+        # 内存/显存不足可能是偶发的，退出码1让 断点续训.py 自动重启；其他异常重启后仍会出错，不再重启
+        可重试 = isinstance(e, MemoryError) or type(e).__name__ == 'ResourceExhaustedError'
+        sys.exit(1 if 可重试 else 不可重试退出码)
+
+
+if __name__ == "__main__":
+    命令行入口()
@@ -0,0 +1,467 @@
+"""
+流式训练数据流水线
+直接从TIF和Shapefile按窗口读取影像并实时栅格化标签，
+用tf.data的并行map、shuffle缓冲和prefetch组织训练输入，
+所有TIF可以同时参与训练，内存占用与TIF数量和大小无关
+"""
+
+import os
+import threading
+import numpy as np
+import rasterio
+from rasterio.windows import Window
+from rasterio.windows import transform as window_transform
+from rasterio.features import rasterize
+from affine import Affine
+import geopandas as gpd
+from shapely.geometry import box
+from typing import List, Tuple
+
+
+class 样本源:
+    """
+    单个TIF + 标注几何的窗口样本读取器
+
+    标注只在初始化时投影并裁剪到TIF范围一次，之后每个窗口
+    通过空间索引查询相交几何再栅格化，不再对整个GeoDataFrame做intersects
+    """
+
+    def __init__(self, tif路径: str, shapefile路径: str = None, 目标尺寸: int = 256, gdf=None,
+                 区域: Window = None):
+        """
+        参数:
+            tif路径: TIF图像路径
+            shapefile路径: Shapefile标注路径（已提供gdf时可省略）
+            目标尺寸: 样本窗口尺寸(像素)
+            gdf: 已读取的标注GeoDataFrame（多个TIF共用一个大SHP时避免重复读取）
+            区域: 只在TIF的这个像素区域内取窗口（用于按区域划分训练集和验证集），
+                  窗口坐标相对区域左上角，默认整幅图像
+        """
+        self.tif路径 = tif路径
+        self.目标尺寸 = 目标尺寸
+        self._本地 = threading.local()  # 每个读取线程独立的rasterio句柄
+        self._已打开句柄 = []
+        self._锁 = threading.Lock()
+
+        with rasterio.open(tif路径) as src:
+            区域 = 区域 or Window(0, 0, src.width, src.height)
+            self.区域 = 区域
+            self.宽度 = int(区域.width)
+            self.高度 = int(区域.height)
+            self.transform = window_transform(区域, src.transform)
+            self.crs = src.crs
+            tif边界 = box(*rasterio.windows.bounds(区域, src.transform))
+
+        if gdf is None:
+            gdf = gpd.read_file(shapefile路径)
+        if gdf.crs != self.crs:
+            gdf = gdf.to_crs(self.crs)
+
+        # 裁剪到TIF范围，只保留几何列
+        相交序号 = gdf.sindex.query(tif边界, predicate='intersects')
+        self.几何 = gdf.geometry.iloc[相交序号].reset_index(drop=True)
+        self._索引 = self.几何.sindex
+
+    @property
+    def 几何数量(self) -> int:
+        return len(self.几何)
+
+    def 子区域(self, 区域: Window) -> '样本源':
+        """区域内的样本源（区域坐标相对当前样本源，标注从已裁剪的几何中再裁剪）"""
+        绝对区域 = Window(self.区域.col_off + 区域.col_off, self.区域.row_off + 区域.row_off,
+                      区域.width, 区域.height)
+        return 样本源(self.tif路径, 目标尺寸=self.目标尺寸, gdf=self.几何, 区域=绝对区域)
+
+    def _数据集(self):
+        """获取当前线程的rasterio句柄（GDAL句柄不能跨线程共享）"""
+        src = getattr(self._本地, 'src', None)
+        if src is None:
+            src = rasterio.open(self.tif路径)
+            self._本地.src = src
+            with self._锁:
+                self._已打开句柄.append(src)
+        return src
+
+    def 窗口边界(self, x: int, y: int, 尺寸: int = None):
+        """计算窗口的地理范围"""
+        尺寸 = 尺寸 or self.目标尺寸
+        return box(*rasterio.windows.bounds(Window(x, y, 尺寸, 尺寸), self.transform))
+
+    def 窗口有标注(self, x: int, y: int) -> bool:
+        """窗口外接矩形是否与任一标注几何的外接矩形相交（只查空间索引）"""
+        return len(self._索引.query(self.窗口边界(x, y))) > 0
+
+    def 随机位置(self, rng: np.random.Generator) -> Tuple[int, int]:
+        """随机选择一个完整落在图像内的窗口左上角"""
+        x = int(rng.integers(0, max(1, self.宽度 - self.目标尺寸)))
+        y = int(rng.integers(0, max(1, self.高度 - self.目标尺寸)))
+        return x, y
+
+    def 栅格化标签(self, x: int, y: int, 尺寸: int = None) -> np.ndarray:
+        """
+        栅格化窗口内的标注
+
+        返回:
+            (尺寸, 尺寸) 的uint8标签（1为耕地）
+        """
+        尺寸 = 尺寸 or self.目标尺寸
+        窗口 = Window(x, y, 尺寸, 尺寸)
+        相交序号 = self._索引.query(self.窗口边界(x, y, 尺寸), predicate='intersects')
+        if len(相交序号) == 0:
+            return np.zeros((尺寸, 尺寸), dtype=np.uint8)
+
+        return rasterize(
+            [(几何, 1) for 几何 in self.几何.iloc[相交序号]],
+            out_shape=(尺寸, 尺寸),
+            transform=window_transform(窗口, self.transform),
+            fill=0,
+            dtype='uint8'
+        )
+
+    def 读取影像(self, x: int, y: int, 尺寸: int = None) -> np.ndarray:
+        """
+        读取窗口影像
+
+        返回:
+            HxWx3 的float32影像（0-1）
+        """
+        尺寸 = 尺寸 or self.目标尺寸
+        影像块 = self._数据集().read(
+            window=Window(self.区域.col_off + x, self.区域.row_off + y, 尺寸, 尺寸))
+
+        # 转换为HxWxC
+        if 影像块.shape[0] <= 4:
+            影像块 = np.transpose(影像块[:3], (1, 2, 0))
+
+        # 归一化
+        if 影像块.max() > 1.0:
+            return 影像块.astype(np.float32) / 255.0
+        return 影像块.astype(np.float32)
+
+    def 读取样本(self, x: int, y: int) -> Tuple[np.ndarray, np.ndarray]:
+        """读取一个训练样本: (HxWx3影像, HxWx1标签)"""
+        影像 = self.读取影像(x, y)
+        标签 = self.栅格化标签(x, y).astype(np.float32)
+        return 影像, 标签[..., np.newaxis]
+
+    def 关闭(self):
+        """关闭所有线程打开的rasterio句柄"""
+        with self._锁:
+            for src in self._已打开句柄:
+                src.close()
+            self._已打开句柄 = []
+        self._本地 = threading.local()
+
+
+def 创建样本源列表(tif列表: List[str], shapefile路径: str, 目标尺寸: int = 256) -> List[样本源]:
+    """
+    为所有TIF创建样本源，标注文件只读取一次
+
+    没有任何标注的TIF会被跳过（与逐个训练模式一致）
+    """
+    gdf = gpd.read_file(shapefile路径)
+    样本源列表 = []
+
+    for tif路径 in tif列表:
+        try:
+            源 = 样本源(tif路径, 目标尺寸=目标尺寸, gdf=gdf)
+        except Exception as e:
+            print(f"  ⚠️  跳过 {os.path.basename(tif路径)}: {e}")
+            continue
+
+        if 源.几何数量 == 0:
+            print(f"  ⚠️  跳过 {os.path.basename(tif路径)}: 该TIF区域无耕地标注")
+            continue
+        if 源.宽度 < 目标尺寸 or 源.高度 < 目标尺寸:
+            print(f"  ⚠️  跳过 {os.path.basename(tif路径)}: 图像小于 {目标尺寸}x{目标尺寸}")
+            continue
+
+        print(f"  ✅ {os.path.basename(tif路径)}: {源.宽度}x{源.高度}, 标注几何 {源.几何数量} 个")
+        样本源列表.append(源)
+
+    return 样本源列表
+
+
+def 划分样本源(样本源列表: List[样本源], 验证比例: float = 0.15, 方式: str = "自动",
+           种子: int = 42) -> Tuple[List[样本源], List[样本源]]:
+    """
+    划分训练集和验证集的样本源，保证验证窗口不会与训练窗口重叠
+
+    训练和验证都是从样本源中随机取窗口，只换随机种子时两边的窗口会重叠，验证损失偏乐观，
+    因此按整个TIF或按TIF内互不相交的区域划分
+
+    参数:
+        样本源列表: 创建样本源列表() 的返回值
+        验证比例: 验证集比例
+        方式: "文件" = 整个TIF划入验证集; "区域" = 每个TIF沿长边切出末端 验证比例 的条带作为验证区域;
+              "自动" = TIF数量足够按比例分出至少一个TIF时按文件，否则按区域
+        种子: 按文件划分时打乱TIF顺序的随机种子
+
+    返回:
+        (训练样本源列表, 验证样本源列表)
+    """
+    数量 = len(样本源列表)
+    验证数 = int(round(数量 * 验证比例))
+    if 方式 == "自动":
+        方式 = "文件" if 1 <= 验证数 < 数量 else "区域"
+    if 方式 not in ("文件", "区域"):
+        raise ValueError(f"❌ 未知的验证集划分方式: {方式}，可选: 文件 / 区域 / 自动")
+
+    if 方式 == "文件":
+        if 数量 < 2:
+            raise ValueError("❌ 按文件划分验证集至少需要2个TIF")
+        验证数 = min(max(1, 验证数), 数量 - 1)
+        顺序 = np.random.default_rng(种子).permutation(数量)
+        验证序号 = set(顺序[:验证数].tolist())
+        return ([源 for i, 源 in enumerate(样本源列表) if i not in 验证序号],
+                [源 for i, 源 in enumerate(样本源列表) if i in 验证序号])
+
+    训练源, 验证源 = [], []
+    for 源 in 样本源列表:
+        尺寸 = 源.目标尺寸
+        按列 = 源.宽度 >= 源.高度
+        长边 = 源.宽度 if 按列 else 源.高度
+        验证长度 = max(尺寸, int(round(长边 * 验证比例)))
+        if 长边 - 验证长度 < 尺寸:
+            print(f"  ⚠️  {os.path.basename(源.tif路径)}: 图像太小，无法切出互不重叠的验证区域，只用于训练")
+            训练源.append(源)
+            continue
+
+        分界 = 长边 - 验证长度
+        if 按列:
+            训练区域 = Window(0, 0, 分界, 源.高度)
+            验证区域 = Window(分界, 0, 验证长度, 源.高度)
+        else:
+            训练区域 = Window(0, 0, 源.宽度, 分界)
+            验证区域 = Window(0, 分界, 源.宽度, 验证长度)
+        训练源.append(源.子区域(训练区域))
+        验证源.append(源.子区域(验证区域))
+
+    return 训练源, 验证源
+
+
+def 随机位置生成器(样本源列表: List[样本源], 种子: int = None, 最大尝试: int = 100):
+    """
+    无限生成 (样本源序号, x, y)
+
+    与原采样循环一样只保留与标注相交的窗口，但判断只查空间索引
+    """
+    rng = np.random.default_rng(种子)
+    while True:
+        序号 = int(rng.integers(len(样本源列表)))
+        源 = 样本源列表[序号]
+        for _ in range(最大尝试):
+            x, y = 源.随机位置(rng)
+            if 源.窗口有标注(x, y):
+                break
+        yield 序号, x, y
+
+
+def 构建流式数据集(样本源列表: List[样本源],
+                批次大小: int = 4,
+                洗牌缓冲: int = 512,
+                种子: int = None,
+                并行读取: int = None,
+                位置生成器=None):
+    """
+    构建tf.data流式训练数据集
+
+    参数:
+        样本源列表: 创建样本源列表() 的返回值
+        批次大小: 批次大小
+        洗牌缓冲: shuffle缓冲区样本数（0表示不打乱，用于验证集）
+        种子: 随机种子（验证集使用固定种子，每轮得到相同的窗口）
+        并行读取: 并行读取窗口的线程数（默认AUTOTUNE）
+        位置生成器: 自定义位置生成函数 f(样本源列表, 种子)，默认分层位置生成器
+
+    返回:
+        无限重复的 tf.data.Dataset，元素为 (影像批, 标签批)
+    """
+    import tensorflow as tf
+
+    目标尺寸 = 样本源列表[0].目标尺寸
+    位置生成器 = 位置生成器 or 分层位置生成器
+
+    def _读取(序号, x, y):
+        return 样本源列表[int(序号)].读取样本(int(x), int(y))
+
+    def _映射(序号, x, y):
+        影像, 标签 = tf.numpy_function(_读取, [序号, x, y], [tf.float32, tf.float32])
+        影像.set_shape((目标尺寸, 目标尺寸, 3))
+        标签.set_shape((目标尺寸, 目标尺寸, 1))
+        return 影像, 标签
+
+    数据集 = tf.data.Dataset.from_generator(
+        lambda: 位置生成器(样本源列表, 种子),
+        output_signature=(
+            tf.TensorSpec(shape=(), dtype=tf.int64),
+            tf.TensorSpec(shape=(), dtype=tf.int64),
+            tf.TensorSpec(shape=(), dtype=tf.int64),
+        )
+    )
+
+    # 窗口读取和栅格化在numpy_function中执行，GDAL读取时释放GIL，可以并行
+    数据集 = 数据集.map(
+        _映射,
+        num_parallel_calls=并行读取 or tf.data.AUTOTUNE,
+        deterministic=种子 is not None
+    )
+
+    if 洗牌缓冲:
+        数据集 = 数据集.shuffle(洗牌缓冲, seed=种子)
+
+    return 数据集.batch(批次大小, drop_remainder=True).prefetch(tf.data.AUTOTUNE)
+
+
+class 分层采样器:
+    """
+    按耕地比例分层直接抽取窗口位置
+
+    标注只在低分辨率下栅格化一次得到粗网格耕地比例图，用积分图计算
+    每个候选窗口的耕地比例并划分为 纯耕地(>0.8) / 混合(0.2-0.8) / 非耕地(<0.2) 三层，
+    之后每层直接按数量抽取位置，不再随机尝试后拒绝，也不再逐次做几何相交
+    """
+
+    def __init__(self, 几何, transform, 宽度: int, 高度: int, 目标尺寸: int = 256, 缩放: int = None):
+        """
+        参数:
+            几何: 已投影并裁剪到影像范围的标注几何（GeoSeries或几何列表）
+            transform: 影像仿射变换
+            宽度, 高度: 影像尺寸(像素)
+            目标尺寸: 样本窗口尺寸(像素)
+            缩放: 粗网格一个像元对应的原始像素数（默认自动，粗网格长边不超过4096）
+        """
+        self.宽度 = 宽度
+        self.高度 = 高度
+        self.目标尺寸 = 目标尺寸
+        if 缩放 is None:
+            缩放 = max(目标尺寸 // 32, int(np.ceil(max(宽度, 高度) / 4096)), 1)
+        self.缩放 = 缩放
+
+        # 一次低分辨率栅格化
+        粗高 = int(np.ceil(高度 / 缩放))
+        粗宽 = int(np.ceil(宽度 / 缩放))
+        几何列表 = [(g, 1) for g in 几何 if g is not None and not g.is_empty]
+        if 几何列表:
+            粗网格 = rasterize(
+                几何列表,
+                out_shape=(粗高, 粗宽),
+                transform=transform * Affine.scale(缩放),
+                fill=0,
+                dtype='uint8'
+            )
+        else:
+            粗网格 = np.zeros((粗高, 粗宽), dtype=np.uint8)
+
+        # 积分图求每个窗口(k x k 粗像元)的耕地比例
+        k = max(1, 目标尺寸 // 缩放)
+        积分 = np.zeros((粗高 + 1, 粗宽 + 1), dtype=np.int32)
+        np.cumsum(np.cumsum(粗网格, axis=0, dtype=np.int32), axis=1, out=积分[1:, 1:])
+
+        # 窗口左上角必须保证整个窗口落在影像内
+        行数 = max(0, min(粗高 - k + 1, (高度 - 目标尺寸) // 缩放 + 1))
+        列数 = max(0, min(粗宽 - k + 1, (宽度 - 目标尺寸) // 缩放 + 1))
+        窗口和 = (积分[k:k + 行数, k:k + 列数] - 积分[:行数, k:k + 列数]
+               - 积分[k:k + 行数, :列数] + 积分[:行数, :列数])
+        del 积分
+
+        self._列数 = 列数
+        比例 = (窗口和 / float(k * k)).ravel()
+
+        # 非耕地层与原采样一致：窗口内需有标注（避免全是背景），没有这样的窗口时退回全部低比例窗口
+        非耕地 = np.flatnonzero((比例 < 0.2) & (窗口和.ravel() > 0))
+        if len(非耕地) == 0:
+            非耕地 = np.flatnonzero(比例 < 0.2)
+
+        self.分层 = {
+            '纯耕地': np.flatnonzero(比例 > 0.8),
+            '混合': np.flatnonzero((比例 >= 0.2) & (比例 <= 0.8)),
+            '非耕地': 非耕地,
+        }
+
+    @classmethod
+    def 从样本源(cls, 源: 样本源, 缩放: int = None) -> '分层采样器':
+        return cls(源.几何, 源.transform, 源.宽度, 源.高度, 源.目标尺寸, 缩放)
+
+    def 候选数量(self) -> dict:
+        return {类型: len(序号) for 类型, 序号 in self.分层.items()}
+
+    def 抽样(self, 类型: str, 数量: int, rng: np.random.Generator) -> List[Tuple[int, int]]:
+        """
+        从一层中抽取窗口左上角（候选足够时不重复），粗网格内随机偏移到原始像素
+        """
+        候选 = self.分层[类型]
+        if 数量 <= 0 or len(候选) == 0:
+            return []
+
+        选中 = rng.choice(候选, size=数量, replace=数量 > len(候选))
+        行, 列 = np.divmod(选中, self._列数)
+        x = np.minimum(列 * self.缩放 + rng.integers(0, self.缩放, size=数量), self.宽度 - self.目标尺寸)
+        y = np.minimum(行 * self.缩放 + rng.integers(0, self.缩放, size=数量), self.高度 - self.目标尺寸)
+        return list(zip(x.tolist(), y.tolist()))
+
+    def 配额位置(self, 采样数量: int = 1500, rng: np.random.Generator = None) -> List[Tuple[int, int, str]]:
+        """
+        按 35%纯耕地 / 45%混合 / 20%非耕地 的配额抽取位置
+
+        返回:
+            打乱顺序的 [(x, y, 类型), ...]
+        """
+        rng = rng or np.random.default_rng()
+        目标 = {
+            '纯耕地': int(采样数量 * 0.35),
+            '混合': int(采样数量 * 0.45),
+        }
+        目标['非耕地'] = 采样数量 - 目标['纯耕地'] - 目标['混合']
+
+        位置 = []
+        for 类型, 数量 in 目标.items():
+            位置.extend((x, y, 类型) for x, y in self.抽样(类型, 数量, rng))
+
+        rng.shuffle(位置)
+        return 位置
+
+
+def 分层位置生成器(样本源列表: List[样本源], 种子: int = None):
+    """
+    无限生成 (样本源序号, x, y)，每个TIF按配额比例分层抽取位置
+
+    没有任何候选窗口的样本源（小于目标尺寸）不参与抽样
+
+    异常:
+        ValueError: 所有样本源都没有候选窗口（否则会一直抽不到位置，数据集无声挂起）
+    """
+    rng = np.random.default_rng(种子)
+    采样器列表 = []
+    for 序号, 源 in enumerate(样本源列表):
+        采样器 = 分层采样器.从样本源(源)
+        if any(采样器.候选数量().values()):
+            采样器列表.append((序号, 采样器))
+        else:
+            print(f"  ⚠️  {os.path.basename(源.tif路径)}: 没有完整的 {源.目标尺寸}x{源.目标尺寸} 窗口，不参与抽样")
+    if not 采样器列表:
+        raise ValueError("❌ 所有样本源都没有可用的窗口位置（影像或区域小于目标尺寸）")
+
+    while True:
+        序号, 采样器 = 采样器列表[int(rng.integers(len(采样器列表)))]
+        for x, y, _ in 采样器.配额位置(100, rng):
+            yield 序号, x, y
+
+
+def 配额采样(源: 样本源, 采样数量: int = 1500, 种子: int = None):
+    """
+    按 35%纯耕地 / 45%混合 / 20%非耕地 的配额采样窗口（与逐个训练模式的采样策略一致）
+
+    参数:
+        源: 样本源
+        采样数量: 目标样本数
+        种子: 随机种子
+
+    生成:
+        (x, y, 类型, 标签块)，类型为 "纯耕地" / "混合" / "非耕地"
+    """
+    rng = np.random.default_rng(种子)
+    采样器 = 分层采样器.从样本源(源)
+
+    for x, y, 类型 in 采样器.配额位置(采样数量, rng):
+        yield x, y, 类型, 源.栅格化标签(x, y)
@@ -0,0 +1,296 @@
+"""
+训练样本分片模块
+一次性从TIF和Shapefile提取影像/标签样本，写入压缩的NPZ分片并生成清单(manifest.json)，
+之后的训练和调参直接读取分片，不再重复随机采样和几何运算
+"""
+
+import os
+import json
+import glob
+import numpy as np
+from datetime import datetime
+from typing import Dict, List
+
+from 训练数据流水线 import 创建样本源列表, 配额采样
+
+清单文件名 = "manifest.json"
+分片版本 = 1
+
+
+class 分片写入器:
+    """
+    把样本累积到内存，满 每片样本数 后写出一个压缩分片
+
+    影像以uint8保存（原始0-255像素值），标签以uint8保存（0/1），
+    读取时再归一化为float32
+    """
+
+    def __init__(self, 输出目录: str, 每片样本数: int = 256, 前缀: str = "shard"):
+        self.输出目录 = 输出目录
+        self.每片样本数 = 每片样本数
+        self.前缀 = 前缀
+        self.分片列表 = []
+        self._影像 = []
+        self._标签 = []
+        self._来源 = []
+        os.makedirs(输出目录, exist_ok=True)
+
+    def 添加(self, 影像: np.ndarray, 标签: np.ndarray, 来源: str = ""):
+        """
+        添加一个样本
+
+        参数:
+            影像: HxWx3 影像（float32 0-1 或 uint8 0-255）
+            标签: HxW 或 HxWx1 标签（0/1）
+            来源: 样本所属TIF文件名
+        """
+        if 影像.dtype != np.uint8:
+            影像 = np.clip(np.round(影像 * 255.0), 0, 255).astype(np.uint8)
+        self._影像.append(影像)
+        self._标签.append(np.asarray(标签, dtype=np.uint8).reshape(影像.shape[:2]))
+        self._来源.append(来源)
+
+        if len(self._影像) >= self.每片样本数:
+            self.刷新()
+
+    def 刷新(self):
+        """把缓存的样本写成一个分片"""
+        if not self._影像:
+            return
+
+        文件名 = f"{self.前缀}_{len(self.分片列表):05d}.npz"
+        np.savez_compressed(
+            os.path.join(self.输出目录, 文件名),
+            images=np.stack(self._影像),
+            labels=np.stack(self._标签),
+            sources=np.array(self._来源)
+        )
+
+        self.分片列表.append({
+            '文件': 文件名,
+            '样本数': len(self._影像),
+            '来源TIF': sorted(set(self._来源))
+        })
+        self._影像, self._标签, self._来源 = [], [], []
+
+    def 关闭(self) -> List[Dict]:
+        """写出剩余样本，返回分片信息列表"""
+        self.刷新()
+        return self.分片列表
+
+
+def 写入清单(输出目录: str, 分片列表: List[Dict], 图像尺寸: int, 附加信息: Dict = None) -> str:
+    """
+    写入分片清单
+
+    返回:
+        清单文件路径
+    """
+    清单 = {
+        '版本': 分片版本,
+        '创建时间': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        '图像尺寸': 图像尺寸,
+        '影像编码': 'uint8(0-255), 读取时/255归一化',
+        '总样本数': sum(分片['样本数'] for 分片 in 分片列表),
+        '分片': 分片列表,
+        **(附加信息 or {})
+    }
+
+    清单路径 = os.path.join(输出目录, 清单文件名)
+    with open(清单路径, 'w', encoding='utf-8') as f:
+        json.dump(清单, f, ensure_ascii=False, indent=2)
+
+    return 清单路径
+
+
+def 读取清单(分片目录: str) -> Dict:
+    """读取分片清单，不存在时返回None"""
+    清单路径 = os.path.join(分片目录, 清单文件名)
+    if not os.path.exists(清单路径):
+        return None
+    with open(清单路径, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def 导出样本分片(tif列表: List[str],
+              shapefile路径: str,
+              输出目录: str,
+              目标尺寸: int = 256,
+              每TIF样本数: int = 1500,
+              每片样本数: int = 256,
+              种子: int = None) -> str:
+    """
+    从TIF和Shapefile提取训练样本并写成分片
+
+    参数:
+        tif列表: TIF文件路径列表
+        shapefile路径: 标注文件路径
+        输出目录: 分片输出目录
+        目标尺寸: 样本尺寸
+        每TIF样本数: 每个TIF的采样数量
+        每片样本数: 每个分片的样本数
+        种子: 随机种子（相同种子得到相同样本；每个TIF使用 种子+该TIF在 tif列表 中的序号）
+
+    返回:
+        清单文件路径
+    """
+    print("\n" + "=" * 60)
+    print("📦 提取训练样本分片")
+    print("=" * 60)
+
+    样本源列表 = 创建样本源列表(tif列表, shapefile路径, 目标尺寸)
+    写入器 = 分片写入器(输出目录, 每片样本数)
+    来源统计 = []
+    # 序号按 tif列表 计（跳过的TIF也占序号），与 并行样本提取 相同，结果不受其它TIF有无标注影响
+    TIF序号 = {tif路径: 序号 for 序号, tif路径 in enumerate(tif列表)}
+
+    for 源 in 样本源列表:
+        tif文件 = os.path.basename(源.tif路径)
+        print(f"\n📖 采样: {tif文件}")
+
+        类型计数 = {'纯耕地': 0, '混合': 0, '非耕地': 0}
+        tif种子 = None if 种子 is None else 种子 + TIF序号[源.tif路径]
+
+        for x, y, 类型, 标签块 in 配额采样(源, 每TIF样本数, tif种子):
+            影像 = 源.读取影像(x, y)
+            if 影像.shape[:2] != (目标尺寸, 目标尺寸):
+                continue
+            写入器.添加(影像, 标签块, tif文件)
+            类型计数[类型] += 1
+
+        源.关闭()
+        print(f"  采样结果: 纯耕地{类型计数['纯耕地']}, 混合{类型计数['混合']}, 非耕地{类型计数['非耕地']}")
+
+        来源统计.append({
+            'tif文件': tif文件,
+            'tif完整路径': 源.tif路径,
+            '样本数': sum(类型计数.values()),
+            '类型计数': 类型计数
+        })
+
+    分片列表 = 写入器.关闭()
+    清单路径 = 写入清单(输出目录, 分片列表, 目标尺寸, {
+        '标注文件': shapefile路径,
+        '每TIF样本数': 每TIF样本数,
+        '种子': 种子,
+        '来源': 来源统计
+    })
+
+    总样本数 = sum(分片['样本数'] for 分片 in 分片列表)
+    print(f"\n✅ 共写出 {len(分片列表)} 个分片, {总样本数} 个样本")
+    print(f"📋 清单: {清单路径}")
+
+    return 清单路径
+
+
+def 加载分片(分片路径: str):
+    """
+    读取一个分片
+
+    返回:
+        (影像 NxHxWx3 float32, 标签 NxHxWx1 float32)
+    """
+    with np.load(分片路径) as 数据:
+        影像 = 数据['images'].astype(np.float32) / 255.0
+        标签 = 数据['labels'].astype(np.float32)[..., np.newaxis]
+    return 影像, 标签
+
+
+def 划分分片(分片目录: str, 验证比例: float = 0.15, 种子: int = 42):
+    """
+    按分片划分训练集和验证集（同一分片的样本不会同时出现在两边）
+
+    返回:
+        (训练分片路径列表, 验证分片路径列表)
+    """
+    清单 = 读取清单(分片目录)
+    if 清单 is None:
+        raise FileNotFoundError(f"❌ 未找到分片清单: {os.path.join(分片目录, 清单文件名)}")
+
+    路径列表 = [os.path.join(分片目录, 分片['文件']) for 分片 in 清单['分片']]
+    rng = np.random.default_rng(种子)
+    rng.shuffle(路径列表)
+
+    验证数 = max(1, int(round(len(路径列表) * 验证比例))) if len(路径列表) > 1 else 0
+    return 路径列表[验证数:], 路径列表[:验证数]
+
+
+def 构建分片数据集(分片路径列表: List[str],
+               批次大小: int = 4,
+               洗牌缓冲: int = 512,
+               并行分片: int = 4,
+               重复: bool = True):
+    """
+    从分片构建tf.data数据集
+
+    参数:
+        分片路径列表: 分片文件路径列表
+        批次大小: 批次大小
+        洗牌缓冲: shuffle缓冲区样本数（0表示不打乱）
+        并行分片: 同时交错读取的分片数
+        重复: 是否无限重复
+
+    返回:
+        tf.data.Dataset，元素为 (影像批, 标签批)
+    """
+    import tensorflow as tf
+
+    with np.load(分片路径列表[0]) as 数据:
+        尺寸 = 数据['images'].shape[1]
+
+    def _读取分片(路径):
+        影像, 标签 = 加载分片(路径.decode('utf-8') if isinstance(路径, bytes) else str(路径))
+        for i in range(len(影像)):
+            yield 影像[i], 标签[i]
+
+    def _分片样本(路径):
+        return tf.data.Dataset.from_generator(
+            _读取分片,
+            args=(路径,),
+            output_signature=(
+                tf.TensorSpec(shape=(尺寸, 尺寸, 3), dtype=tf.float32),
+                tf.TensorSpec(shape=(尺寸, 尺寸, 1), dtype=tf.float32),
+            )
+        )
+
+    数据集 = tf.data.Dataset.from_tensor_slices(分片路径列表)
+    if 洗牌缓冲:
+        数据集 = 数据集.shuffle(len(分片路径列表))
+    if 重复:
+        数据集 = 数据集.repeat()
+
+    数据集 = 数据集.interleave(
+        _分片样本,
+        cycle_length=并行分片,
+        num_parallel_calls=tf.data.AUTOTUNE,
+        deterministic=not 洗牌缓冲
+    )
+
+    if 洗牌缓冲:
+        数据集 = 数据集.shuffle(洗牌缓冲)
+
+    return 数据集.batch(批次大小, drop_remainder=重复).prefetch(tf.data.AUTOTUNE)
+
+
+def 统计分片样本数(分片目录: str, 分片路径列表: List[str]) -> int:
+    """根据清单统计一组分片的样本总数"""
+    清单 = 读取清单(分片目录) or {'分片': []}
+    样本数 = {分片['文件']: 分片['样本数'] for 分片 in 清单['分片']}
+    return sum(样本数.get(os.path.basename(路径), 0) for 路径 in 分片路径列表)
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 4:
+        print("用法: python 训练样本分片.py <TIF目录> <标注SHP> <输出目录> [每TIF样本数]")
+        sys.exit(1)
+
+    tif列表 = sorted(glob.glob(os.path.join(sys.argv[1], '**', '*.tif'), recursive=True))
+    导出样本分片(
+        tif列表,
+        sys.argv[2],
+        sys.argv[3],
+        每TIF样本数=int(sys.argv[4]) if len(sys.argv) > 4 else 1500,
+        种子=42
+    )
@@ -3,38 +3,76 @@
 不仅显示净变化，还分别统计新增和减少的耕地
 """
 
-def 计算详细变化(去年掩码, 今年掩码, 像素分辨率=0.218):
+import numpy as np
+
+# 变化类别图的取值
+类别_无 = 0      # 两年都不是耕地
+类别_稳定 = 1    # 两年都是耕地
+类别_新增 = 2    # 去年不是，今年是
+类别_减少 = 3    # 去年是，今年不是
+类别名称 = {类别_无: '非耕地', 类别_稳定: '稳定', 类别_新增: '新增', 类别_减少: '减少'}
+
+# (去年 * 2 + 今年) -> 类别
+_类别查找表 = np.array([类别_无, 类别_新增, 类别_减少, 类别_稳定], dtype=np.uint8)
+
+# 类别 -> 可视化颜色（RGB），非耕地为None表示保留背景
+_类别颜色 = {类别_稳定: (0, 255, 0), 类别_新增: (255, 0, 0), 类别_减少: (0, 0, 255)}
+
+默认块尺寸 = 2048
+
+
+def 计算变化类别图(去年掩码, 今年掩码, 块尺寸=默认块尺寸, 输出=None):
     """
-    详细计算耕地的变化情况
+    逐块计算uint8变化类别图（0=非耕地 1=稳定 2=新增 3=减少），掩码 >0.5 视为耕地
 
-    Returns:
-        dict: 包含详细统计信息
+    参数:
+        去年掩码, 今年掩码: 同尺寸二维掩码（可以是np.memmap）
+        块尺寸: 每次处理的行数
+        输出: 输出数组（默认新建）
+
+    返回:
+        uint8 类别图
     """
-    import numpy as np
+    if 去年掩码.shape != 今年掩码.shape:
+        raise ValueError(f"❌ 掩码尺寸不一致: {去年掩码.shape} vs {今年掩码.shape}")
+
+    if 输出 is None:
+        输出 = np.empty(今年掩码.shape, dtype=np.uint8)
+    for y in range(0, 今年掩码.shape[0], 块尺寸):
+        去年 = 去年掩码[y:y + 块尺寸] > 0.5
+        今年 = 今年掩码[y:y + 块尺寸] > 0.5
+        输出[y:y + 块尺寸] = _类别查找表[去年.view(np.uint8) * 2 + 今年.view(np.uint8)]
+    return 输出
 
-    # 确保掩码是二值的
-    去年二值 = (去年掩码 > 0.5).astype(np.uint8)
-    今年二值 = (今年掩码 > 0.5).astype(np.uint8)
 
-    # 计算不同类型的变化
-    # 1. 稳定耕地（两年都有）
-    稳定耕地 = np.logical_and(去年二值, 今年二值)
+def 统计变化类别(类别图, 块尺寸=默认块尺寸):
+    """
+    各类别像素数（逐块bincount累加）
+
+    返回:
+        长度4的int64数组，下标为类别
+    """
+    计数 = np.zeros(4, dtype=np.int64)
+    for y in range(0, 类别图.shape[0], 块尺寸):
+        计数 += np.bincount(类别图[y:y + 块尺寸].ravel(), minlength=4)[:4]
+    return 计数
 
-    # 2. 新增耕地（去年没有，今年有）
-    新增耕地 = np.logical_and(~去年二值, 今年二值)
 
-    # 3. 减少耕地（去年有，今年没有）
-    减少耕地 = np.logical_and(去年二值, ~今年二值)
+def 计算详细变化(去年掩码, 今年掩码, 像素分辨率=0.218):
+    """
+    详细计算耕地的变化情况
 
-    # 4. 非耕地（两年都没有）
-    非耕地 = np.logical_and(~去年二值, ~今年二值)
+    Returns:
+        dict: 包含详细统计信息和uint8变化类别图（'变化类别图'）
+    """
+    类别图 = 计算变化类别图(去年掩码, 今年掩码)
+    计数 = 统计变化类别(类别图)
 
-    # 计算像素数
-    去年像素数 = np.sum(去年二值)
-    今年像素数 = np.sum(今年二值)
-    稳定像素数 = np.sum(稳定耕地)
-    新增像素数 = np.sum(新增耕地)
-    减少像素数 = np.sum(减少耕地)
+    稳定像素数 = 计数[类别_稳定]
+    新增像素数 = 计数[类别_新增]
+    减少像素数 = 计数[类别_减少]
+    去年像素数 = 稳定像素数 + 减少像素数
+    今年像素数 = 稳定像素数 + 新增像素数
 
     # 转换为面积
     像素面积 = (像素分辨率 ** 2) / 666.67  # 平方米转亩
@@ -64,9 +102,8 @@ def 计算详细变化(去年掩码, 今年掩码, 像素分辨率=0.218):
         '减少面积_亩': 减少面积,
         '净变化_亩': 今年面积 - 去年面积,
 
-        '新增掩码': 新增耕地.astype(np.float32),
-        '减少掩码': 减少耕地.astype(np.float32),
-        '稳定掩码': 稳定耕地.astype(np.float32)
+        '像素面积_亩': 像素面积,
+        '变化类别图': 类别图
     }
 
 def 生成变化可视化(去年图像, 变化统计):
@@ -79,67 +116,132 @@ def 生成变化可视化(去年图像, 变化统计):
     - 绿色：稳定耕地
     """
     import cv2
-    import numpy as np
-
-    # 创建RGB图像
-    h, w = 去年图像.shape[:2]
-    变化图像 = np.zeros((h, w, 3), dtype=np.uint8)
-
-    # 使用去年图像作为背景（灰色）
-    背景 = cv2.cvtColor(去年图像, cv2.COLOR_RGB2GRAY)
-    变化图像[:,:,0] = 背景 * 0.5
-    变化图像[:,:,1] = 背景 * 0.5
-    变化图像[:,:,2] = 背景 * 0.5
 
-    # 添加变化区域
-    # 稳定耕地 - 绿色
-    稳定掩码 = (变化统计['稳定掩码'] > 0.5)
-    变化图像[稳定掩码] = [0, 255, 0]  # 纯绿色
+    # 使用去年图像作为背景（灰色），按类别查表上色
+    背景 = (cv2.cvtColor(去年图像, cv2.COLOR_RGB2GRAY) * 0.5).astype(np.uint8)
+    变化图像 = np.repeat(背景[..., np.newaxis], 3, axis=2)
 
-    # 新增耕地 - 红色
-    新增掩码 = (变化统计['新增掩码'] > 0.5)
-    变化图像[新增掩码] = [255, 0, 0]  # 纯红色
-
-    # 减少耕地 - 蓝色
-    减少掩码 = (变化统计['减少掩码'] > 0.5)
-    变化图像[减少掩码] = [0, 0, 255]  # 纯蓝色
+    类别图 = 变化统计['变化类别图']
+    for 类别, 颜色 in _类别颜色.items():
+        变化图像[类别图 == 类别] = 颜色
 
     return 变化图像
 
+def 导出变化地块(类别图, transform, crs, 输出路径, 像素面积_亩,
+              类别=(类别_新增, 类别_减少), 块尺寸=默认块尺寸, 图层='变化地块'):
+    """
+    把变化类别图逐块矢量化为多边形，流式写入GeoPackage（每块写一次，内存只与块尺寸有关）
+
+    跨块的地块会在块边界处被切开，属性中的 块号 可用于需要时按类别合并(dissolve)
+
+    参数:
+        类别图: uint8变化类别图
+        transform: 类别图的仿射变换
+        crs: 坐标系
+        输出路径: .gpkg 路径（已存在时覆盖）
+        像素面积_亩: 单个像素的面积（亩）
+        类别: 导出的类别，默认新增和减少
+        块尺寸: 块大小
+        图层: 图层名
+
+    返回:
+        {类别名称: 地块数}
+    """
+    import os
+    import geopandas as gpd
+    from rasterio.features import shapes
+    from rasterio.windows import Window, transform as 窗口变换
+    from shapely.geometry import shape
+    from shapely.affinity import affine_transform
+
+    if os.path.exists(输出路径):
+        os.remove(输出路径)
+
+    高, 宽 = 类别图.shape
+    地块数 = {类别名称[c]: 0 for c in 类别}
+    已写入 = False
+    块号 = 0
+
+    for y in range(0, 高, 块尺寸):
+        for x in range(0, 宽, 块尺寸):
+            块 = np.ascontiguousarray(类别图[y:y + 块尺寸, x:x + 块尺寸])
+            块号 += 1
+            if not np.isin(块, 类别).any():
+                continue
+
+            块变换 = 窗口变换(Window(x, y, 块.shape[1], 块.shape[0]), transform)
+            仿射 = [块变换.a, 块变换.b, 块变换.d, 块变换.e, 块变换.c, 块变换.f]
+
+            记录 = {'类别': [], '类别代码': [], '像素数': [], '面积_亩': [], '块号': [], 'geometry': []}
+            for 几何, 值 in shapes(块, mask=np.isin(块, 类别), connectivity=8):
+                # 在像素坐标下求面积（即像素数），再变换到地理坐标
+                多边形 = shape(几何)
+                像素数 = int(round(多边形.area))
+                记录['类别'].append(类别名称[int(值)])
+                记录['类别代码'].append(int(值))
+                记录['像素数'].append(像素数)
+                记录['面积_亩'].append(像素数 * 像素面积_亩)
+                记录['块号'].append(块号)
+                记录['geometry'].append(affine_transform(多边形, 仿射))
+                地块数[类别名称[int(值)]] += 1
+
+            gpd.GeoDataFrame(记录, crs=crs).to_file(
+                输出路径, layer=图层, driver='GPKG', mode='a' if 已写入 else 'w')
+            已写入 = True
+
+    print(f"✅ 变化地块已导出: {输出路径} "
+          + "，".join(f"{名称} {数量} 个" for 名称, 数量 in 地块数.items()))
+    return 地块数
+
 def 显示详细统计(变化统计, 输出函数=print):
     """
     格式化输出详细的变化统计
     """
     输出函数("\n" + "="*60)
     输出函数("📊 详细耕地变化统计")
-    输出_function("="*60)
+    输出函数("="*60)
 
-    输出_function("\n📈 面积变化（亩）：")
-    输出_function(f"   去年耕地: {变化统计['去年面积_亩']:.3f} 亩")
-    输出_function(f"   今年耕地: {变化统计['今年面积_亩']:.3f} 亩")
-    输出_function(f"   净变化: {变化统计['净变化_亩']:+.3f} 亩")
+    输出函数("\n📈 面积变化（亩）：")
+    输出函数(f"   去年耕地: {变化统计['去年面积_亩']:.3f} 亩")
+    输出函数(f"   今年耕地: {变化统计['今年面积_亩']:.3f} 亩")
+    输出函数(f"   净变化: {变化统计['净变化_亩']:+.3f} 亩")
 
-    输出_function("\n🔄 变化分解：")
-    输出_function(f"   稳定耕地: {变化统计['稳定面积_亩']:.3f} 亩 ({变化统计['稳定像素数']:,} 像素)")
-    输出_function(f"   新增耕地: +{变化统计['新增面积_亩']:.3f} 亩 ({变化统计['新增像素数']:,} 像素)")
-    输出_function(f"   减少耕地: -{变化统计['减少面积_亩']:.3f} 亩 ({变化统计['减少像素数']:,} 像素)")
+    输出函数("\n🔄 变化分解：")
+    输出函数(f"   稳定耕地: {变化统计['稳定面积_亩']:.3f} 亩 ({变化统计['稳定像素数']:,} 像素)")
+    输出函数(f"   新增耕地: +{变化统计['新增面积_亩']:.3f} 亩 ({变化统计['新增像素数']:,} 像素)")
+    输出函数(f"   减少耕地: -{变化统计['减少面积_亩']:.3f} 亩 ({变化统计['减少像素数']:,} 像素)")
 
-    输出_function("\n💡 变化说明：")
+    输出函数("\n💡 变化说明：")
     if 变化统计['新增面积_亩'] > 0:
-        输出_function(f"   ✅ 有新增耕地！新增了 {变化统计['新增面积_亩']:.3f} 亩")
+        输出函数(f"   ✅ 有新增耕地！新增了 {变化统计['新增面积_亩']:.3f} 亩")
     if 变化统计['减少面积_亩'] > 0:
-        输出_function(f"   ❌ 有耕地减少！减少了 {变化统计['减少面积_亩']:.3f} 亩")
+        输出函数(f"   ❌ 有耕地减少！减少了 {变化统计['减少面积_亩']:.3f} 亩")
 
     if 变化统计['净变化_亩'] > 0:
-        输出_function(f"\n📈 总体：耕地净增加 {变化统计['净变化_亩']:.3f} 亩")
+        输出函数(f"\n📈 总体：耕地净增加 {变化统计['净变化_亩']:.3f} 亩")
     elif 变化统计['净变化_亩'] < 0:
-        输出_function(f"\n📉 总体：耕地净减少 {abs(变化统计['净变化_亩']):.3f} 亩")
+        输出函数(f"\n📉 总体：耕地净减少 {abs(变化统计['净变化_亩']):.3f} 亩")
     else:
-        输出_function(f"\n➡️ 总体：耕地面积保持不变")
+        输出函数(f"\n➡️ 总体：耕地面积保持不变")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) >= 4:
+        # python 详细变化统计.py 去年掩码.tif 今年掩码.tif 输出.gpkg [像素分辨率]
+        import rasterio
 
+        with rasterio.open(sys.argv[1]) as 去年源, rasterio.open(sys.argv[2]) as 今年源:
+            变化统计 = 计算详细变化(去年源.read(1), 今年源.read(1),
+                            float(sys.argv[4]) if len(sys.argv) > 4 else 0.218)
+            显示详细统计(变化统计)
+            导出变化地块(变化统计['变化类别图'], 今年源.transform, 今年源.crs, sys.argv[3],
+                    变化统计['像素面积_亩'])
+        sys.exit(0)
 
-# 创建集成代码
-集成代码 = '''
+    # 创建集成代码
+    集成代码 = '''
 # 在耕地分析工具_图形界面.py中，在显示分析结果后添加详细统计
 
 # 导入功能
@@ -160,15 +262,15 @@ if 去年耕地掩码_for_compare is not None and 耕地掩码 is not None:
         self.显示变化图像(变化图像)
 '''
 
-print("详细变化统计功能")
-print("="*60)
-print("\n这个功能将帮助您：")
-print("1. 分别统计新增和减少的耕地面积")
-print("2. 生成三色变化图（红色=新增，蓝色=减少，绿色=稳定）")
-print("3. 更好地理解耕地变化的具体情况")
-print("\n集成代码已生成，请按照说明添加到主程序中")
-
-# 保存集成代码
-with open("详细变化统计_集成代码.py", "w", encoding="utf-8") as f:
-    f.write(集成代码)
-print("\n✅ 集成代码已保存到：详细变化统计_集成代码.py")
\ No newline at end of file
+    print("详细变化统计功能")
+    print("="*60)
+    print("\n这个功能将帮助您：")
+    print("1. 分别统计新增和减少的耕地面积")
+    print("2. 生成三色变化图（红色=新增，蓝色=减少，绿色=稳定）")
+    print("3. 更好地理解耕地变化的具体情况")
+    print("\n集成代码已生成，请按照说明添加到主程序中")
+
+    # 保存集成代码
+    with open("详细变化统计_集成代码.py", "w", encoding="utf-8") as f:
+        f.write(集成代码)
+    print("\n✅ 集成代码已保存到：详细变化统计_集成代码.py")
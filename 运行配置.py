@@ -0,0 +1,266 @@
+"""
+运行配置
+集中保存路径和所有性能参数（裁剪尺寸、窗口步长、批次大小、进程数、缓存目录、内存预算等），
+可从 JSON / YAML 文件加载；耕地分析系统、批量分析、异步编排、图形界面和训练脚本都以参数形式接收，
+同一进程中可以用不同配置并行运行多个 耕地分析系统 实例
+
+配置文件可以是平铺的键值，也可以按任意分组名嵌套一层（分组名只用于阅读，不影响解析）:
+
+    路径:
+      TIF图像路径: D:/data/2025.tif
+      输出目录: D:/out
+    性能:
+      裁剪尺寸: 1000
+      重叠像素: 100
+      内存预算_MB: 4096
+
+配置文件只需写出要修改的配置项，其余取 默认 配置（各脚本传入由其顶部配置区域生成的配置，
+如 耕地分析系统.默认配置()），只改性能参数的配置文件不会丢掉模型路径等设置
+
+用法:
+    from 运行配置 import 运行配置
+    from 耕地分析系统 import 耕地分析系统, 默认配置
+    配置 = 运行配置.从文件("配置.yaml", 默认=默认配置())
+    系统 = 耕地分析系统(配置=配置)
+    低内存 = 配置.替换(内存预算_MB=1024, 掩码存储方式="磁盘")
+
+    python 运行配置.py 配置.yaml          # 校验并打印完整配置
+    python 运行配置.py --导出 默认配置.json  # 导出默认配置模板
+"""
+
+import os
+import json
+import dataclasses
+from dataclasses import dataclass
+from typing import Dict
+
+
+@dataclass
+class 运行配置:
+    # ---------- 输入输出路径 ----------
+    TIF图像路径: str = ""
+    Shapefile路径: str = ""
+    年份1_TIF路径: str = ""
+    年份2_TIF路径: str = ""
+    年份1_Shapefile路径: str = ""
+    年份2_Shapefile路径: str = ""
+    输出目录: str = "./output"
+    模型保存路径: str = ""
+    基准年数据文件: str = ""  # 为空时使用 输出目录 下的 基准年数据.pkl
+    分析模式: str = "单张图像"
+
+    # ---------- 裁剪与两年匹配 ----------
+    裁剪尺寸: int = 1000  # 每个裁剪块的尺寸(像素)
+    重叠像素: int = 100  # 裁剪块之间的重叠像素数
+    重叠阈值: float = 0.5  # 认为是同一区域的最小重叠比例(0-1)
+
+    # ---------- 大图识别 ----------
+    降采样尺寸: int = 2000  # 超过该尺寸的影像降采样读取
+    快速模式降采样尺寸: int = 1000
+    窗口步长: int = 0  # 滑动窗口步长(像素)，0 = 模型输入尺寸的一半（50%重叠）
+    面积核算模式: str = "像素"  # "像素" 或 "矢量"
+    使用变化先验: bool = False  # 有去年影像时按两期影像的块级差异只重新识别变化的块（见 变化先验.py），报告面积会随之变化
+
+    # ---------- 训练 ----------
+    训练图像目录: str = ""
+    训练标注目录: str = ""
+    批次大小: int = 4
+    训练数据比例: float = 0.8
+
+    # ---------- 并行 ----------
+    进程数: int = 1  # 批量分析/异步编排/分析服务的计算进程数（每个进程各加载一份模型）
+    IO线程数: int = 8  # 异步编排的扫描/预读/写出线程数
+    执行配置名称: str = "自动"  # TensorFlow线程池/精度（进程级，见 执行配置.py，首次应用后不再改变）
+
+    # ---------- 缓存与内存 ----------
+    结果缓存目录: str = ""  # 为空时使用 输出目录 下的 ".结果缓存" 目录
+    结果缓存上限_MB: int = 2048
+    内存映射目录: str = ""  # 为空时使用 输出目录 下的 ".内存映射" 目录
+    内存预算_MB: int = 0  # 0为自动（见 内存预算.py）
+    掩码存储方式: str = "自动"  # "自动" / "内存" / "磁盘"
+
+    def __post_init__(self):
+        self.校验()
+
+    # ==================== 派生值 ====================
+
+    @property
+    def 裁剪步长(self) -> int:
+        return self.裁剪尺寸 - self.重叠像素
+
+    def 基准年数据路径(self) -> str:
+        return self.基准年数据文件 or os.path.join(self.输出目录, "基准年数据.pkl")
+
+    # ==================== 校验 ====================
+
+    def 校验(self):
+        """类型转换并检查取值范围，不合法时抛出 ValueError"""
+        for 字段 in dataclasses.fields(self):
+            值 = getattr(self, 字段.name)
+            if 值 is None:
+                值 = 字段.default
+            try:
+                if 字段.type in (int, 'int'):
+                    值 = int(值)
+                elif 字段.type in (float, 'float'):
+                    值 = float(值)
+                elif 字段.type in (str, 'str'):
+                    值 = str(值)
+                elif 字段.type in (bool, 'bool'):
+                    if isinstance(值, str):
+                        if 值.strip().lower() not in ('true', 'false', '1', '0', 'yes', 'no', '是', '否'):
+                            raise ValueError(值)
+                        值 = 值.strip().lower() in ('true', '1', 'yes', '是')
+                    else:
+                        值 = bool(值)
+            except (TypeError, ValueError):
+                raise ValueError(f"❌ 配置项 {字段.name} 应为 {getattr(字段.type, '__name__', 字段.type)}: {值!r}")
+            setattr(self, 字段.name, 值)
+
+        错误 = []
+        if self.裁剪尺寸 <= 0:
+            错误.append(f"裁剪尺寸 必须大于0: {self.裁剪尺寸}")
+        if not 0 <= self.重叠像素 < self.裁剪尺寸:
+            错误.append(f"重叠像素 必须在 [0, 裁剪尺寸) 内: {self.重叠像素}")
+        if not 0 < self.重叠阈值 <= 1:
+            错误.append(f"重叠阈值 必须在 (0, 1] 内: {self.重叠阈值}")
+        if self.降采样尺寸 <= 0 or self.快速模式降采样尺寸 <= 0:
+            错误.append("降采样尺寸 必须大于0")
+        if self.窗口步长 < 0:
+            错误.append(f"窗口步长 不能为负: {self.窗口步长}")
+        if self.面积核算模式 not in ("像素", "矢量"):
+            错误.append(f"面积核算模式 只能是 像素/矢量: {self.面积核算模式}")
+        if self.掩码存储方式 not in ("自动", "内存", "磁盘"):
+            错误.append(f"掩码存储方式 只能是 自动/内存/磁盘: {self.掩码存储方式}")
+        if self.批次大小 < 1 or self.进程数 < 1 or self.IO线程数 < 1:
+            错误.append("批次大小、进程数、IO线程数 必须至少为1")
+        if not 0 < self.训练数据比例 < 1:
+            错误.append(f"训练数据比例 必须在 (0, 1) 内: {self.训练数据比例}")
+        if self.结果缓存上限_MB < 0 or self.内存预算_MB < 0:
+            错误.append("结果缓存上限_MB、内存预算_MB 不能为负")
+        if 错误:
+            raise ValueError("❌ 运行配置不合法:\n  " + "\n  ".join(错误))
+
+    # ==================== 构造 ====================
+
+    @classmethod
+    def _平铺(cls, 数据: Dict) -> Dict:
+        """展开一层分组嵌套，未知配置项抛出 ValueError"""
+        平铺 = {}
+        for 键, 值 in (数据 or {}).items():
+            if isinstance(值, dict):
+                平铺.update(值)
+            else:
+                平铺[键] = 值
+
+        已知 = {f.name for f in dataclasses.fields(cls)}
+        未知 = sorted(set(平铺) - 已知)
+        if 未知:
+            raise ValueError(f"❌ 未知的配置项: {', '.join(未知)}")
+        return 平铺
+
+    @classmethod
+    def 从字典(cls, 数据: Dict, 默认: '运行配置' = None) -> '运行配置':
+        """
+        从字典创建（允许一层分组嵌套），未知配置项抛出 ValueError
+
+        参数:
+            数据: {配置项: 值} 或 {分组: {配置项: 值}}
+            默认: 字典中没有的配置项取该配置的值（默认为各配置项的默认值）
+        """
+        平铺 = cls._平铺(数据)
+        return 默认.替换(**平铺) if 默认 is not None else cls(**平铺)
+
+    @classmethod
+    def 读取文件(cls, 路径: str) -> Dict:
+        """
+        读取 .json / .yaml / .yml 配置文件中写出的配置项（不补默认值）
+
+        返回:
+            {配置项: 值}（已展开分组；未知配置项抛出 ValueError）
+        """
+        with open(路径, 'r', encoding='utf-8') as f:
+            if 路径.lower().endswith(('.yaml', '.yml')):
+                try:
+                    import yaml
+                except ImportError:
+                    raise ImportError("❌ 读取YAML配置需要安装 PyYAML: pip install pyyaml")
+                数据 = yaml.safe_load(f)
+            else:
+                数据 = json.load(f)
+        return cls._平铺(数据)
+
+    @classmethod
+    def 从文件(cls, 路径: str, 默认: '运行配置' = None) -> '运行配置':
+        """
+        从 .json / .yaml / .yml 文件加载
+
+        参数:
+            默认: 文件中没有的配置项取该配置的值；命令行入口应传入由脚本配置区域生成的配置
+                 （如 耕地分析系统.默认配置()），否则取各配置项的默认值（模型路径等为空）
+        """
+        return cls.从字典(cls.读取文件(路径), 默认)
+
+    @classmethod
+    def 从模块(cls, 模块, **改动) -> '运行配置':
+        """
+        从脚本顶部配置区域的同名全局变量创建（没有的配置项取默认值）
+
+        参数:
+            模块: 模块对象（如 sys.modules[__name__]）
+            改动: 覆盖的配置项
+        """
+        数据 = {f.name: getattr(模块, f.name) for f in dataclasses.fields(cls) if hasattr(模块, f.name)}
+        数据.update(改动)
+        return cls(**数据)
+
+    def 替换(self, **改动) -> '运行配置':
+        """返回修改了部分配置项的新配置（原配置不变）"""
+        return dataclasses.replace(self, **改动)
+
+    # ==================== 保存 ====================
+
+    def 到字典(self) -> Dict:
+        return dataclasses.asdict(self)
+
+    def 保存(self, 路径: str):
+        """保存为 .json / .yaml / .yml"""
+        目录 = os.path.dirname(os.path.abspath(路径))
+        os.makedirs(目录, exist_ok=True)
+        with open(路径, 'w', encoding='utf-8') as f:
+            if 路径.lower().endswith(('.yaml', '.yml')):
+                import yaml
+                yaml.safe_dump(self.到字典(), f, allow_unicode=True, sort_keys=False)
+            else:
+                json.dump(self.到字典(), f, ensure_ascii=False, indent=2)
+
+
+def 加载配置(路径: str = None, 默认: 运行配置 = None, **改动) -> 运行配置:
+    """
+    命令行入口使用：有配置文件时叠加到 默认 配置上，否则使用默认配置；再应用命令行给出的改动（值为None的忽略）
+    """
+    配置 = 运行配置.从文件(路径, 默认) if 路径 else (默认 or 运行配置())
+    改动 = {k: v for k, v in 改动.items() if v is not None}
+    return 配置.替换(**改动) if 改动 else 配置
+
+
+if __name__ == "__main__":
+    import sys
+    import argparse
+
+    解析器 = argparse.ArgumentParser(description="校验/导出运行配置")
+    解析器.add_argument('配置', nargs='?', default=None, help="配置文件（.json / .yaml）")
+    解析器.add_argument('--导出', default=None, help="把（默认或已加载的）配置写到该路径")
+    参数 = 解析器.parse_args()
+
+    try:
+        配置 = 加载配置(参数.配置)
+    except (ValueError, OSError) as e:
+        print(e)
+        sys.exit(1)
+
+    for 键, 值 in 配置.到字典().items():
+        print(f"  {键}: {值!r}")
+    if 参数.导出:
+        配置.保存(参数.导出)
+        print(f"✅ 配置已保存: {参数.导出}")
@@ -0,0 +1,184 @@
+"""
+面积核算模块
+1. 每行像元面积：投影坐标系为常数 |a·e-b·d|，地理坐标系（经纬度）按纬度在椭球面上精确计算，
+   每幅影像只算一次，累加面积时按行乘以该向量，不增加逐像素的计算
+2. 矢量精确面积：按块把耕地掩码矢量化为多边形，跨块边界的多边形合并后，
+   在等积投影（或椭球面）上计算面积，并报告与像素计数的差异
+"""
+
+import numpy as np
+import geopandas as gpd
+from rasterio.features import shapes
+from rasterio.warp import transform as 坐标变换
+from shapely.geometry import shape
+from shapely.affinity import affine_transform
+from shapely.ops import unary_union
+from typing import Dict
+
+默认块尺寸 = 2048
+
+
+def 行像元面积(transform, crs, 高度: int) -> np.ndarray:
+    """
+    每一行像元的面积（平方米）
+
+    地理坐标系下像元面积随纬度变化：两条纬线之间、经差为Δλ的椭球面积为
+    a²·Δλ·|q(φ2) - q(φ1)| / 2（q为等积纬度函数），同一行像元面积相同
+
+    参数:
+        transform: 仿射变换（北向上，地理坐标系下不支持旋转）
+        crs: 坐标系
+        高度: 行数
+
+    返回:
+        (高度,) float64
+    """
+    if crs is None or not crs.is_geographic:
+        单位 = 1.0
+        if crs is not None:
+            try:
+                单位 = float(crs.linear_units_factor[1])
+            except Exception:
+                单位 = 1.0
+        return np.full(高度, abs(transform.a * transform.e - transform.b * transform.d) * 单位 * 单位)
+
+    if transform.b != 0 or transform.d != 0:
+        raise ValueError("❌ 地理坐标系影像不支持旋转的仿射变换")
+
+    from pyproj import CRS
+    椭球 = CRS.from_user_input(crs).ellipsoid
+    a = 椭球.semi_major_metre
+    e2 = 1.0 - (椭球.semi_minor_metre / a) ** 2
+    e = np.sqrt(e2)
+
+    def q(纬度):
+        s = np.sin(np.radians(纬度))
+        if e == 0:
+            return 2 * s
+        return (1 - e2) * (s / (1 - e2 * s * s) - np.log((1 - e * s) / (1 + e * s)) / (2 * e))
+
+    行边界纬度 = np.clip(transform.f + transform.e * np.arange(高度 + 1), -90.0, 90.0)
+    q值 = q(行边界纬度)
+    return a * a * abs(np.radians(transform.a)) * np.abs(np.diff(q值)) / 2
+
+
+def 掩码面积(掩码: np.ndarray, 行面积: np.ndarray, 块尺寸: int = 默认块尺寸) -> float:
+    """
+    按行加权累加掩码面积（平方米）：每行的耕地像素数与该行像元面积做点积
+
+    参数:
+        掩码: 耕地掩码（>0.5为耕地）
+        行面积: 行像元面积 的结果
+    """
+    面积 = 0.0
+    for y in range(0, 掩码.shape[0], 块尺寸):
+        行计数 = np.count_nonzero(掩码[y:y + 块尺寸] > 0.5, axis=1)
+        面积 += float(行计数 @ 行面积[y:y + len(行计数)])
+    return 面积
+
+
+def 等积坐标系(transform, crs, 宽: int, 高: int) -> str:
+    """以影像中心为原点的兰伯特方位等积投影（局部面积变形可忽略）"""
+    中心x = transform.c + transform.a * 宽 / 2 + transform.b * 高 / 2
+    中心y = transform.f + transform.d * 宽 / 2 + transform.e * 高 / 2
+    经度, 纬度 = 坐标变换(crs, 'EPSG:4326', [中心x], [中心y])
+    return f"+proj=laea +lat_0={纬度[0]:.8f} +lon_0={经度[0]:.8f} +datum=WGS84 +units=m +no_defs"
+
+
+def _几何面积(几何列表, crs, 方法: str, 目标坐标系: str) -> np.ndarray:
+    """几何面积（平方米）"""
+    if not 几何列表:
+        return np.zeros(0)
+    序列 = gpd.GeoSeries(几何列表, crs=crs)
+    if 方法 == "椭球面":
+        from pyproj import Geod
+        椭球 = Geod(ellps='WGS84')
+        return np.array([abs(椭球.geometry_area_perimeter(g)[0]) for g in 序列.to_crs('EPSG:4326')])
+    return 序列.to_crs(目标坐标系).area.values
+
+
+def 矢量面积核算(掩码: np.ndarray,
+           transform,
+           crs,
+           块尺寸: int = 默认块尺寸,
+           方法: str = "等积投影") -> Dict:
+    """
+    矢量精确面积核算
+
+    每块矢量化后，不接触块内部边界的多边形直接计算面积；接触内部边界的多边形片段
+    全部处理完后合并(unary_union)，再计算面积和地块数
+
+    参数:
+        掩码: 耕地掩码（>0.5为耕地，可以是np.memmap）
+        transform: 掩码的仿射变换
+        crs: 坐标系
+        块尺寸: 块大小
+        方法: "等积投影"（以影像中心为原点的LAEA投影面积）或 "椭球面"（WGS84测地线面积，较慢）
+
+    返回:
+        {'矢量面积_平方米', '像素数', '地块数', '面积方法'}
+    """
+    高, 宽 = 掩码.shape
+    目标坐标系 = 等积坐标系(transform, crs, 宽, 高)
+
+    总面积 = 0.0
+    像素数 = 0
+    地块数 = 0
+    边缘片段 = []
+
+    for y in range(0, 高, 块尺寸):
+        for x in range(0, 宽, 块尺寸):
+            块 = (掩码[y:y + 块尺寸, x:x + 块尺寸] > 0.5).astype(np.uint8)
+            if not 块.any():
+                continue
+            块高, 块宽 = 块.shape
+            # 块内像素坐标 -> 地理坐标
+            仿射 = [transform.a, transform.b, transform.d, transform.e,
+                  transform.c + transform.a * x + transform.b * y,
+                  transform.f + transform.d * x + transform.e * y]
+
+            内部 = []
+            for 几何, _ in shapes(块, mask=块.astype(bool), connectivity=8):
+                多边形 = shape(几何)
+                像素数 += int(round(多边形.area))
+                左, 顶, 右, 底 = 多边形.bounds  # 像素坐标（列, 行）
+                接触内部边界 = ((左 == 0 and x > 0) or (右 == 块宽 and x + 块宽 < 宽) or
+                          (顶 == 0 and y > 0) or (底 == 块高 and y + 块高 < 高))
+                (边缘片段 if 接触内部边界 else 内部).append(affine_transform(多边形, 仿射))
+
+            总面积 += float(_几何面积(内部, crs, 方法, 目标坐标系).sum())
+            地块数 += len(内部)
+
+    if 边缘片段:
+        合并 = unary_union(边缘片段)
+        合并列表 = list(getattr(合并, 'geoms', [合并]))
+        总面积 += float(_几何面积(合并列表, crs, 方法, 目标坐标系).sum())
+        地块数 += len(合并列表)
+
+    return {
+        '矢量面积_平方米': 总面积,
+        '像素数': 像素数,
+        '地块数': 地块数,
+        '面积方法': 方法,
+    }
+
+
+def 面积对比(掩码: np.ndarray, transform, crs, 块尺寸: int = 默认块尺寸, 方法: str = "等积投影") -> Dict:
+    """
+    矢量面积与像素计数面积对比
+
+    返回:
+        矢量面积核算 的结果 + {'像素计数面积_平方米', '面积差异_平方米', '面积差异比例'}
+    """
+    核算 = 矢量面积核算(掩码, transform, crs, 块尺寸, 方法)
+    像素计数面积 = 掩码面积(掩码, 行像元面积(transform, crs, 掩码.shape[0]), 块尺寸)
+    差异 = 核算['矢量面积_平方米'] - 像素计数面积
+    核算.update({
+        '像素计数面积_平方米': float(像素计数面积),
+        '面积差异_平方米': float(差异),
+        '面积差异比例': float(差异 / 像素计数面积) if 像素计数面积 > 0 else 0.0,
+    })
+    print(f"  📐 矢量面积({方法}): {核算['矢量面积_平方米'] / 666.67:.3f} 亩，"
+          f"像素计数: {像素计数面积 / 666.67:.3f} 亩，差异 {核算['面积差异比例']*100:+.2f}%"
+          f"（{核算['地块数']} 个地块）")
+    return 核算
@@ -6,6 +6,9 @@
 import numpy as np
 import cv2
 from sklearn.cluster import KMeans
+
+from 分块形态学 import 分块处理, 分块形态学, 分块高斯平滑, 分块直方图, 大津阈值, 量化为uint8
+
 # 使用OpenCV替代skimage
 
 class 高精度颜色识别器:
@@ -172,23 +175,22 @@ class 高精度颜色识别器:
         kernel_open = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (核大小, 核大小))
         kernel_close = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (核大小+1, 核大小+1))
 
-        # 开运算去除小噪声
-        mask_opened = cv2.morphologyEx(初始掩码.astype(np.uint8), cv2.MORPH_OPEN, kernel_open)
+        # 开运算去除小噪声（分块+光环，大块与整幅计算结果相同）
+        mask_opened = 分块形态学(初始掩码.astype(np.uint8), "开", kernel_open)
 
         # 闭运算填充小孔洞
-        mask_closed = cv2.morphologyEx(mask_opened, cv2.MORPH_CLOSE, kernel_close)
-
-        # 2. 边缘平滑
-        mask_smooth = cv2.GaussianBlur(mask_closed.astype(float),
-                                     (2*int(params['边缘平滑度']*2)+1,
-                                      2*int(params['边缘平滑度']*2)+1),
-                                     params['边缘平滑度'])
-
-        # 3. 阈值二值化（使用OTSU）
-        _, mask_final = cv2.threshold((mask_smooth * 255).astype(np.uint8),
-                                     0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-
-        return mask_final.astype(float) / 255.0
+        mask_closed = 分块形态学(mask_opened, "闭", kernel_close)
+
+        # 2. 边缘平滑（uint8掩码逐块转float32平滑，写入预先分配的float32结果）
+        平滑核 = 2*int(params['边缘平滑度']*2)+1
+        mask_smooth = np.empty(mask_closed.shape, dtype=np.float32)
+        分块高斯平滑(mask_closed, 平滑核, params['边缘平滑度'], 输出=mask_smooth)
+        del mask_opened, mask_closed
+
+        # 3. 阈值二值化（OTSU，直方图逐块累加），原地写回平滑结果
+        阈值 = 大津阈值(分块直方图(mask_smooth))
+        return 分块处理(mask_smooth, lambda 子块: (量化为uint8(子块) > 阈值).astype(np.float32),
+                    (0, 0), 输出=mask_smooth)
 
     def 智能颜色聚类(self, 块):
         """